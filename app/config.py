@@ -1,6 +1,15 @@
 import yaml
 import os
 from dataclasses import dataclass
+from app.embeddings.cache import DEFAULT_QUERY_CACHE_SIZE
+from app.embeddings.coalescer import DEFAULT_QUERY_BATCH_MAX_SIZE, DEFAULT_QUERY_BATCH_WAIT_MS
+from app.ingestion.reembed import DEFAULT_REEMBED_BATCH_SIZE, DEFAULT_REEMBED_PAUSE_MS
+from app.rag.retriever import DEFAULT_RRF_K
+from app.storage.chunk_cache import DEFAULT_HYDRATION_CACHE_SIZE
+from app.storage.connections import DEFAULT_READ_CONNECTIONS
+from app.storage.duckdb_store import DEFAULT_IVF_NPROBE, VECTOR_INDEXES
+from app.storage.hnsw_index import DEFAULT_HNSW_EF_CONSTRUCTION, DEFAULT_HNSW_EF_SEARCH, DEFAULT_HNSW_M
+from app.storage.quantized_index import DEFAULT_RERANK_FACTOR
 
 # Judge for the RAGAS eval harness. Deliberately defaults to a model that is a
 # *different family and larger* than the generator (llm_model), so faithfulness /
@@ -9,6 +18,14 @@ from dataclasses import dataclass
 # different family from llm_model even if you can't go larger.
 DEFAULT_RAGAS_JUDGE_MODEL = "qwen2.5:32b"
 
+# Embedding backends selectable via `embedding_backend`. "onnx" runs a model
+# exported with `python -m app.embeddings.onnx_export` through ONNX Runtime.
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx")
+
+# Seconds a query's retrieval (embedding plus search) may take before the
+# request fails and its DuckDB queries are interrupted. 0 disables the limit.
+DEFAULT_RETRIEVAL_TIMEOUT_S = 10.0
+
 
 @dataclass
 class Settings:
@@ -20,6 +37,33 @@ class Settings:
     duckdb_path: str
     llm_model: str
     ragas_judge_model: str = DEFAULT_RAGAS_JUDGE_MODEL
+    query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE
+    embedding_backend: str = "sentence-transformers"
+    onnx_model_dir: str = "./data/onnx/all-MiniLM-L6-v2"
+    onnx_quantized: bool = True
+    embedding_workers: int = 0
+    embedding_threads_per_worker: int = 1
+    embedding_pin_threads: bool = False
+    query_batch_wait_ms: float = DEFAULT_QUERY_BATCH_WAIT_MS
+    query_batch_max_size: int = DEFAULT_QUERY_BATCH_MAX_SIZE
+    warm_up_on_startup: bool = True
+    embedding_truncate_dim: int = 0
+    reembed_batch_size: int = DEFAULT_REEMBED_BATCH_SIZE
+    reembed_pause_ms: float = DEFAULT_REEMBED_PAUSE_MS
+    reembed_untagged: bool = False
+    vector_index: str = "numpy"
+    hnsw_m: int = DEFAULT_HNSW_M
+    hnsw_ef_construction: int = DEFAULT_HNSW_EF_CONSTRUCTION
+    hnsw_ef_search: int = DEFAULT_HNSW_EF_SEARCH
+    rerank_factor: int = DEFAULT_RERANK_FACTOR
+    ivf_lists: int = 0
+    ivf_nprobe: int = DEFAULT_IVF_NPROBE
+    hydration_cache_size: int = DEFAULT_HYDRATION_CACHE_SIZE
+    read_connections: int = DEFAULT_READ_CONNECTIONS
+    retrieval_timeout_s: float = DEFAULT_RETRIEVAL_TIMEOUT_S
+    compress_documents: bool = True
+    hybrid_search: bool = False
+    rrf_k: int = DEFAULT_RRF_K
 
     @classmethod
     def load(cls, config_path: str = "config.yaml") -> "Settings":
@@ -41,6 +85,18 @@ class Settings:
         if missing:
             raise ValueError(f"Missing required configuration fields: {', '.join(missing)}")
 
+        embedding_backend = str(config_data.get("embedding_backend", "sentence-transformers"))
+        if embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(
+                f"Unknown embedding_backend '{embedding_backend}', expected one of: {', '.join(EMBEDDING_BACKENDS)}"
+            )
+
+        vector_index = str(config_data.get("vector_index", "numpy"))
+        if vector_index not in VECTOR_INDEXES:
+            raise ValueError(
+                f"Unknown vector_index '{vector_index}', expected one of: {', '.join(VECTOR_INDEXES)}"
+            )
+
         return cls(
             embedding_model=str(config_data["embedding_model"]),
             chunk_size=int(config_data["chunk_size"]),
@@ -55,6 +111,49 @@ class Settings:
             ragas_judge_model=str(
                 config_data.get("ragas_judge_model", DEFAULT_RAGAS_JUDGE_MODEL)
             ),
+            query_cache_size=int(
+                config_data.get("query_cache_size", DEFAULT_QUERY_CACHE_SIZE)
+            ),
+            embedding_backend=embedding_backend,
+            onnx_model_dir=str(config_data.get("onnx_model_dir", "./data/onnx/all-MiniLM-L6-v2")),
+            onnx_quantized=bool(config_data.get("onnx_quantized", True)),
+            embedding_workers=int(config_data.get("embedding_workers", 0)),
+            embedding_threads_per_worker=int(config_data.get("embedding_threads_per_worker", 1)),
+            embedding_pin_threads=bool(config_data.get("embedding_pin_threads", False)),
+            query_batch_wait_ms=float(
+                config_data.get("query_batch_wait_ms", DEFAULT_QUERY_BATCH_WAIT_MS)
+            ),
+            query_batch_max_size=int(
+                config_data.get("query_batch_max_size", DEFAULT_QUERY_BATCH_MAX_SIZE)
+            ),
+            warm_up_on_startup=bool(config_data.get("warm_up_on_startup", True)),
+            embedding_truncate_dim=int(config_data.get("embedding_truncate_dim", 0)),
+            reembed_batch_size=int(
+                config_data.get("reembed_batch_size", DEFAULT_REEMBED_BATCH_SIZE)
+            ),
+            reembed_pause_ms=float(
+                config_data.get("reembed_pause_ms", DEFAULT_REEMBED_PAUSE_MS)
+            ),
+            reembed_untagged=bool(config_data.get("reembed_untagged", False)),
+            vector_index=vector_index,
+            hnsw_m=int(config_data.get("hnsw_m", DEFAULT_HNSW_M)),
+            hnsw_ef_construction=int(
+                config_data.get("hnsw_ef_construction", DEFAULT_HNSW_EF_CONSTRUCTION)
+            ),
+            hnsw_ef_search=int(config_data.get("hnsw_ef_search", DEFAULT_HNSW_EF_SEARCH)),
+            rerank_factor=int(config_data.get("rerank_factor", DEFAULT_RERANK_FACTOR)),
+            ivf_lists=int(config_data.get("ivf_lists", 0)),
+            ivf_nprobe=int(config_data.get("ivf_nprobe", DEFAULT_IVF_NPROBE)),
+            hydration_cache_size=int(
+                config_data.get("hydration_cache_size", DEFAULT_HYDRATION_CACHE_SIZE)
+            ),
+            read_connections=int(config_data.get("read_connections", DEFAULT_READ_CONNECTIONS)),
+            retrieval_timeout_s=float(
+                config_data.get("retrieval_timeout_s", DEFAULT_RETRIEVAL_TIMEOUT_S)
+            ),
+            compress_documents=bool(config_data.get("compress_documents", True)),
+            hybrid_search=bool(config_data.get("hybrid_search", False)),
+            rrf_k=int(config_data.get("rrf_k", DEFAULT_RRF_K)),
         )
 
 # Load settings immediately to fail fast on startup if config is invalid
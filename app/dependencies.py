@@ -1,5 +1,16 @@
-from app.storage.duckdb_store import DuckDBStore
-from app.embeddings.local_embedder import LocalEmbedder
+import functools
+import re
+import threading
+from collections.abc import Callable
+from app.storage.duckdb_store import UNTAGGED_MODEL, DuckDBStore
+from app.storage.hnsw_index import HNSWParams
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.cache import QueryEmbeddingCache
+from app.embeddings.coalescer import EmbeddingCoalescer
+from app.embeddings.lazy import LazyEmbedder
+from app.embeddings.matryoshka import build_truncated
+from app.embeddings.pool import PooledEmbedder
+from app.ingestion.reembed import RUNNING, ReembeddingMigration
 from app.rag.llm.ollama_client import OllamaClient
 from app.rag.retriever import Retriever
 from app.rag.engine import RAGEngine
@@ -9,29 +20,226 @@ from app.config import settings
 _store = None
 _embedder = None
 _llm = None
+_query_cache = None
+_ingest_pool = None
+# Uploads look the pool up from worker threads; only one may spawn it.
+_ingest_pool_lock = threading.Lock()
+_coalescer = None
+_previous_embedders: dict[str, LazyEmbedder] = {}
+_reembedding: ReembeddingMigration | None = None
 
 def get_store() -> DuckDBStore:
     global _store
     if _store is None:
-        _store = DuckDBStore(db_path=settings.duckdb_path)
+        # The store takes its width from the first write; a store built with
+        # another model (or width) is re-embedded, see start_reembedding().
+        _store = DuckDBStore(
+            db_path=settings.duckdb_path,
+            vector_index=settings.vector_index,
+            hnsw_params=HNSWParams(
+                m=settings.hnsw_m,
+                ef_construction=settings.hnsw_ef_construction,
+                ef_search=settings.hnsw_ef_search,
+            ),
+            rerank_factor=settings.rerank_factor,
+            ivf_lists=settings.ivf_lists,
+            ivf_nprobe=settings.ivf_nprobe,
+            hydration_cache_size=settings.hydration_cache_size,
+            text_index=settings.hybrid_search,
+            read_connections=settings.read_connections,
+            compress_documents=settings.compress_documents,
+        )
         _store.initialize()
     return _store
 
-def get_embedder() -> LocalEmbedder:
+def rebalance_store_partitions() -> bool:
+    """Retrain the store's IVF partitions if it has outgrown them (vector_index "ivf")."""
+    store = get_store()
+    return store.ivf_needs_rebalance() and store.rebalance_ivf()
+
+def save_store_index() -> None:
+    """Write the store's on-disk vector index, if the store was opened."""
+    if _store is not None:
+        _store.save_index()
+
+def close_resources() -> None:
+    """
+    Shut down the ingest worker processes, the query coalescer's thread and
+    the store's executor and connections, if they were started, so a reload
+    starts from scratch instead of orphaning them. Save the index first.
+    """
+    global _store, _ingest_pool, _coalescer
+    if _ingest_pool is not None:
+        _ingest_pool.close()
+        _ingest_pool = None
+    if _coalescer is not None:
+        _coalescer.close()
+        _coalescer = None
+    if _store is not None:
+        _store.close()
+        _store = None
+
+def embedder_factory(intra_op_threads: int = 0) -> Callable[[], BaseEmbedder]:
+    """
+    Picklable constructor for the configured embedding backend, so worker
+    processes can build their own copy of the model.
+    """
+    factory: Callable[[], BaseEmbedder]
+    if settings.embedding_backend == "onnx":
+        from app.embeddings.onnx_embedder import ONNXEmbedder
+        factory = functools.partial(
+            ONNXEmbedder, settings.onnx_model_dir,
+            quantized=settings.onnx_quantized, intra_op_threads=intra_op_threads,
+        )
+    else:
+        from app.embeddings.local_embedder import LocalEmbedder
+        factory = functools.partial(LocalEmbedder, model_name=settings.embedding_model)
+    if settings.embedding_truncate_dim > 0:
+        factory = functools.partial(build_truncated, factory, settings.embedding_truncate_dim)
+    return factory
+
+def embedder_factory_for_model(model_id: str) -> Callable[[], BaseEmbedder]:
+    """
+    Constructor for the embedder whose `model_id` is `model_id`, worked out
+    from the ID alone, so a store built under an earlier configuration can
+    still be queried while it is re-embedded with the current one.
+    """
+    truncated = re.fullmatch(r"(.+)@(\d+)d", model_id)
+    if truncated:
+        return functools.partial(build_truncated, embedder_factory_for_model(truncated.group(1)), int(truncated.group(2)))
+    if model_id.startswith("openai:"):
+        from app.embeddings.openai_embedder import OpenAIEmbedder
+        return functools.partial(OpenAIEmbedder, model=model_id[len("openai:"):])
+    if model_id.endswith(("@onnx", "@onnx-int8")):
+        # Only the export in onnx_model_dir is known; _build_embedder checks it.
+        from app.embeddings.onnx_embedder import ONNXEmbedder
+        return functools.partial(ONNXEmbedder, settings.onnx_model_dir, quantized=model_id.endswith("-int8"))
+    from app.embeddings.local_embedder import LocalEmbedder
+    return functools.partial(LocalEmbedder, model_name=model_id)
+
+def _build_embedder(model_id: str) -> BaseEmbedder:
+    embedder = embedder_factory_for_model(model_id)()
+    if embedder.model_id != model_id:
+        raise ValueError(f"Cannot rebuild embedding model '{model_id}' (got '{embedder.model_id}')")
+    return embedder
+
+def get_embedder() -> LazyEmbedder:
     global _embedder
     if _embedder is None:
-        # Load once
-        _embedder = LocalEmbedder(model_name=settings.embedding_model)
+        # The backend (and its torch / onnxruntime import) is resolved on
+        # first use or during startup warm-up, not here
+        _embedder = LazyEmbedder(lambda: embedder_factory()())
     return _embedder
 
+def serving_embedder(store: DuckDBStore, embedder: BaseEmbedder) -> BaseEmbedder:
+    """
+    The embedder that matches the vectors `store` searches: normally the
+    configured `embedder`, but while the store still holds another model's
+    vectors (until a re-embedding migration switches it over) that model,
+    rebuilt from its ID, so queries and new chunks stay in the old space.
+    Untagged chunks' model cannot be rebuilt, so until they are adopted or
+    re-embedded the configured one stands in for it.
+    """
+    active = store.embedding_model
+    if active is None or active in (embedder.model_id, UNTAGGED_MODEL):
+        return embedder
+    if active not in _previous_embedders:
+        # setdefault: a concurrent caller may have added one meanwhile
+        _previous_embedders.setdefault(active, LazyEmbedder(functools.partial(_build_embedder, active)))
+    return _previous_embedders[active]
+
+def start_reembedding() -> ReembeddingMigration | None:
+    """
+    If the store holds vectors from a model other than the configured one,
+    start re-embedding it in the background (resuming any earlier progress).
+    Loads the configured model; disabled when `reembed_batch_size` is 0.
+    """
+    global _reembedding
+    if settings.reembed_batch_size <= 0:
+        return None
+    if _reembedding is not None and _reembedding.state == RUNNING:
+        return _reembedding
+    store = get_store()
+    embedder = get_embedder()
+    if (store.embedding_model == UNTAGGED_MODEL and not settings.reembed_untagged
+            and store.dimension == embedder.dimension):
+        # Most likely the configured model's own vectors from before tagging.
+        store.adopt_untagged_chunks(embedder.model_id)
+    if store.embedding_model is None or store.embedding_model == embedder.model_id:
+        if store.reembedding_model is not None:
+            # Left over from a migration to a model no longer configured.
+            store.abort_reembedding()
+        return None
+    _reembedding = ReembeddingMigration(
+        store, embedder,
+        batch_size=settings.reembed_batch_size,
+        pause_ms=settings.reembed_pause_ms,
+    )
+    _reembedding.start()
+    return _reembedding
+
+def current_reembedding() -> ReembeddingMigration | None:
+    """The re-embedding migration started by this process, if any."""
+    return _reembedding
+
+def get_ingest_pool() -> PooledEmbedder | None:
+    """
+    Multi-process embedder for bulk ingestion, or None when
+    `embedding_workers` is 0 and ingestion should use `get_embedder()`.
+    """
+    global _ingest_pool
+    with _ingest_pool_lock:
+        if _ingest_pool is None and settings.embedding_workers > 0:
+            _ingest_pool = PooledEmbedder(
+                embedder_factory(settings.embedding_threads_per_worker),
+                num_workers=settings.embedding_workers,
+                threads_per_worker=settings.embedding_threads_per_worker,
+                pin_threads=settings.embedding_pin_threads,
+            )
+        return _ingest_pool
+
 def get_llm() -> OllamaClient:
     global _llm
     if _llm is None:
         _llm = OllamaClient(base_url=settings.ollama_base_url, model=settings.llm_model)
     return _llm
 
+def get_query_cache() -> QueryEmbeddingCache | None:
+    global _query_cache
+    if _query_cache is None and settings.query_cache_size > 0:
+        # Shared by every per-request Retriever, so hits survive across requests
+        _query_cache = QueryEmbeddingCache(max_size=settings.query_cache_size)
+    return _query_cache
+
+def get_embedding_coalescer(embedder: BaseEmbedder) -> EmbeddingCoalescer | None:
+    """
+    Async batching front-end over `embedder` for query traffic, or None
+    when `query_batch_max_size` is 0. Rebuilt only if the embedder changes.
+    """
+    global _coalescer
+    if settings.query_batch_max_size <= 0:
+        return None
+    if _coalescer is None or _coalescer.embedder is not embedder:
+        if _coalescer is not None:
+            # Releases its thread once the batch in flight is done.
+            _coalescer.close()
+        _coalescer = EmbeddingCoalescer(
+            embedder,
+            max_wait_ms=settings.query_batch_wait_ms,
+            max_batch_size=settings.query_batch_max_size,
+        )
+    return _coalescer
+
+def current_embedding_coalescer() -> EmbeddingCoalescer | None:
+    """The coalescer serving queries, if one has been built yet (for metrics)."""
+    return _coalescer
+
 def get_retriever() -> Retriever:
-    return Retriever(get_store(), get_embedder())
+    store = get_store()
+    embedder = serving_embedder(store, get_embedder())
+    return Retriever(store, embedder, get_query_cache(), get_embedding_coalescer(embedder),
+                     hybrid=settings.hybrid_search, rrf_k=settings.rrf_k,
+                     timeout_s=settings.retrieval_timeout_s or None)
 
 def get_engine() -> RAGEngine:
     return RAGEngine(get_retriever(), get_llm())
@@ -1,20 +1,39 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+import numpy as np
+import numpy.typing as npt
+
 class BaseEmbedder(ABC):
     """
     Abstract base class for embedding models.
     All concrete implementations (Local, OpenAI) must inherit from this.
     """
-    
+
+    @property
+    def model_id(self) -> str:
+        """
+        Identifier of the model producing the vectors. Vectors from different
+        model IDs are not comparable, so caches key on it.
+        """
+        return type(self).__name__
+
+    @property
+    def dimension(self) -> int:
+        """
+        Length of the vectors this embedder produces. The default embeds a
+        probe string; backends that know their width should override it.
+        """
+        return len(self.embed_single("dimension probe"))
+
     @abstractmethod
     def embed_single(self, text: str) -> List[float]:
         """
         Generate embedding for a single string.
-        
+
         Args:
             text: The text to embed.
-            
+
         Returns:
             A list of floats representing the vector embedding.
         """
@@ -24,11 +43,30 @@ class BaseEmbedder(ABC):
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of strings.
-        
+
         Args:
             texts: A list of strings to embed.
-            
+
         Returns:
             A list of lists of floats, where each inner list is a vector.
         """
         pass
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        """
+        Generate embeddings for a list of strings as one contiguous matrix.
+
+        This is the bulk-ingestion path: vectors stay as a (len(texts), dim)
+        float32 array all the way into storage instead of being boxed into
+        Python floats. The default falls back to `embed_batch`; backends that
+        produce arrays natively should override it.
+
+        Args:
+            texts: A list of strings to embed.
+
+        Returns:
+            A C-contiguous float32 array with one row per input text.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.ascontiguousarray(self.embed_batch(texts), dtype=np.float32)
@@ -0,0 +1,65 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+# Padded tokens per forward pass. 8192 is e.g. 32 full 256-token MiniLM
+# sequences, or 512 short ones, which is about the same amount of compute.
+DEFAULT_MAX_BATCH_TOKENS = 8192
+DEFAULT_MAX_BATCH_SIZE = 512
+
+
+@dataclass
+class PaddingStats:
+    real_tokens: int
+    padded_tokens: int
+    batches: int
+
+    @property
+    def waste(self) -> float:
+        """Fraction of computed token positions that are padding."""
+        return 1.0 - self.real_tokens / self.padded_tokens if self.padded_tokens else 0.0
+
+
+def plan_token_batches(lengths: Sequence[int], max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                       max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> list[npt.NDArray[np.intp]]:
+    """
+    Group input positions into batches of similar token length.
+
+    Inputs are sorted longest-first and greedily packed while
+    `batch_size * longest_in_batch` (the padded cost of the batch) stays
+    within `max_batch_tokens`. Every input lands in exactly one batch; a
+    single input longer than the budget gets a batch of its own. Callers
+    scatter results back with the returned index arrays, which restores the
+    original order.
+    """
+    if not lengths:
+        return []
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+
+    batches: list[npt.NDArray[np.intp]] = []
+    start = 0
+    while start < len(order):
+        # Sorted descending, so the first item sets the batch's padded length.
+        longest = max(1, int(lengths[order[start]]))
+        size = max(1, min(max_batch_size, max_batch_tokens // longest))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def padding_stats(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> PaddingStats:
+    """Real vs padded token counts for a batch plan over `lengths`."""
+    real = 0
+    padded = 0
+    for batch in batches:
+        batch_lengths = [int(lengths[i]) for i in batch]
+        real += sum(batch_lengths)
+        padded += max(batch_lengths) * len(batch_lengths)
+    return PaddingStats(real_tokens=real, padded_tokens=padded, batches=len(batches))
+
+
+def arrival_order_batches(n: int, batch_size: int) -> list[npt.NDArray[np.intp]]:
+    """Fixed-size batches in input order: the plan bucketing replaces."""
+    return [np.arange(start, min(start + batch_size, n)) for start in range(0, n, batch_size)]
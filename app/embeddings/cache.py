@@ -0,0 +1,129 @@
+import threading
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+# Number of query embeddings kept in the retriever's LRU cache.
+DEFAULT_QUERY_CACHE_SIZE = 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form of a query for cache keys: Unicode NFKC, case-folded, with
+    whitespace runs collapsed. Only the key is normalized; the model always
+    sees the query as the user typed it.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of query embeddings keyed by
+    (model ID, normalized query). Shared across requests so repeated
+    questions from the UI, retries and eval runs skip the model entirely.
+    """
+    def __init__(self, max_size: int = DEFAULT_QUERY_CACHE_SIZE):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compute(self, model_id: str, query: str,
+                       compute: Callable[[str], list[float]]) -> list[float]:
+        """
+        Return the cached embedding for `query`, computing it with `compute`
+        on a miss. `compute` receives `query` itself, so turning the cache on
+        never changes what a case-sensitive model is asked to embed; variants
+        that normalize to the same key share the first one's vector.
+        """
+        key = (model_id, normalize_query(query))
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        # Compute outside the lock: a model forward pass must not serialize
+        # unrelated cache hits behind it.
+        return self._store(key, compute(query))
+
+    async def aget_or_compute(self, model_id: str, query: str,
+                              compute: Callable[[str], Awaitable[list[float]]]) -> list[float]:
+        """`get_or_compute` for an async `compute`, e.g. `EmbeddingCoalescer.embed`."""
+        key = (model_id, normalize_query(query))
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._store(key, await compute(query))
+
+    def get_or_compute_many(self, model_id: str, queries: list[str],
+                            compute_batch: Callable[[list[str]], list[list[float]]]) -> list[list[float]]:
+        """
+        `get_or_compute` for several queries, computing all the misses with
+        one call to `compute_batch` (e.g. `BaseEmbedder.embed_batch`).
+        """
+        keys = [(model_id, normalize_query(query)) for query in queries]
+        cached = [self._lookup(key) for key in keys]
+        # The first query seen for each missing key is the one embedded.
+        missing: dict[tuple[str, str], str] = {}
+        for query, key, vector in zip(queries, keys, cached, strict=False):
+            if vector is None:
+                missing.setdefault(key, query)
+        computed: dict[tuple[str, str], list[float]] = {}
+        if missing:
+            vectors = compute_batch(list(missing.values()))
+            computed = {key: self._store(key, vector) for key, vector in zip(missing, vectors, strict=False)}
+        return [list(computed[key]) if vector is None else vector for key, vector in zip(keys, cached, strict=False)]
+
+    def _lookup(self, key: tuple[str, str]) -> list[float] | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return list(cached)
+            self._misses += 1
+            return None
+
+    def _store(self, key: tuple[str, str], vector: list[float]) -> list[float]:
+        vector = list(vector)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return list(vector)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                size=len(self._entries),
+                max_size=self.max_size,
+            )
@@ -0,0 +1,158 @@
+import asyncio
+import bisect
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.embeddings.base import BaseEmbedder
+
+# The first request of a batch waits up to this long for others to join it.
+DEFAULT_QUERY_BATCH_WAIT_MS = 2.0
+DEFAULT_QUERY_BATCH_MAX_SIZE = 64
+
+# Upper bounds of the histogram buckets; the last bucket is open-ended.
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+class Histogram:
+    """Fixed-bucket histogram (per-bucket, not cumulative, counts), thread-safe."""
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, value)] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        n = sum(counts)
+        labels = [f"le_{b:g}" for b in self.bounds] + ["inf"]
+        return {
+            "count": n,
+            "sum": total,
+            "mean": total / n if n else 0.0,
+            "buckets": dict(zip(labels, counts, strict=False)),
+        }
+
+
+@dataclass
+class _Pending:
+    text: str
+    future: "asyncio.Future[list[float]]"
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class EmbeddingCoalescer:
+    """
+    Async front-end to an embedder for concurrent query traffic.
+
+    Callers `await embed(text)`. Requests arriving within `max_wait_ms` of the
+    first pending one are run as a single `embed_batch_array` call, and each
+    caller's future is resolved with its own row. While a forward pass is in
+    flight, new requests keep accumulating and go out as the next batch as
+    soon as it finishes, so under load batches grow instead of queueing.
+
+    All model calls go through one worker thread, so the wrapped embedder is
+    never entered concurrently from here.
+    """
+    def __init__(self, embedder: BaseEmbedder, max_wait_ms: float = DEFAULT_QUERY_BATCH_WAIT_MS,
+                 max_batch_size: int = DEFAULT_QUERY_BATCH_MAX_SIZE):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.embedder = embedder
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_ms = Histogram(WAIT_MS_BUCKETS)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-coalescer")
+        self._pending: list[_Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._busy = False
+        self._closed = False
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def model_id(self) -> str:
+        return self.embedder.model_id
+
+    async def embed(self, text: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[float]] = loop.create_future()
+        self._pending.append(_Pending(text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch(loop)
+        elif self._timer is None and not self._busy:
+            self._timer = loop.call_later(self.max_wait, self._dispatch, loop)
+        return await future
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # The running batch picks up whatever is pending when it finishes.
+        if self._busy or not self._pending:
+            return
+
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        self._busy = True
+        task = loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[_Pending]) -> None:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        for p in batch:
+            self.wait_ms.observe((started - p.enqueued_at) * 1000.0)
+
+        try:
+            vectors = await loop.run_in_executor(
+                self._executor, self.embedder.embed_batch_array, [p.text for p in batch]
+            )
+        except Exception as e:  # noqa: BLE001 - handed to the waiting callers
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+        else:
+            for p, row in zip(batch, vectors.tolist(), strict=False):
+                # A caller that was cancelled while waiting has no one to receive it.
+                if not p.future.done():
+                    p.future.set_result(row)
+        finally:
+            self._busy = False
+            if self._pending:
+                self._dispatch(loop)
+            elif self._closed:
+                self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+        }
+
+    def close(self) -> None:
+        """
+        Release the worker thread once the requests already queued have
+        their vectors (at once if there are none). Safe from any thread.
+        """
+        self._closed = True
+        if not self._busy and not self._pending:
+            self._executor.shutdown(wait=False)
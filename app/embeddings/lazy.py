@@ -0,0 +1,87 @@
+import logging
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from app.embeddings.base import BaseEmbedder
+from app.readiness import FAILED, LOADED, LOADING, READY, WARMING, ModelStatus
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_TEXTS = ["warm-up query", "A longer warm-up passage so the first real batch is not the first of its shape."]
+
+
+class LazyEmbedder(BaseEmbedder):
+    """
+    Defers building the embedder (and importing torch / onnxruntime) until
+    it is first used or `warm_up` is called, so the API starts serving
+    immediately. `status` tracks load and warm-up for the readiness check.
+    """
+    def __init__(self, factory: Callable[[], BaseEmbedder]):
+        self._factory = factory
+        self._embedder: BaseEmbedder | None = None
+        self._lock = threading.Lock()
+        self.status = ModelStatus()
+
+    @property
+    def embedder(self) -> BaseEmbedder:
+        if self._embedder is None:
+            with self._lock:
+                # Another thread may have finished loading while we waited.
+                if self._embedder is None:
+                    self.status.begin(LOADING)
+                    try:
+                        embedder = self._factory()
+                    except Exception as e:
+                        self.status.fail(e)
+                        raise
+                    self.status.finish(LOADING, LOADED)
+                    self._embedder = embedder
+        return self._embedder
+
+    @property
+    def loaded(self) -> bool:
+        return self._embedder is not None
+
+    def warm_up(self) -> None:
+        """
+        Load the model and run a throwaway batch so one-off first-inference
+        costs (allocator growth, kernel selection) are paid here rather than
+        by the first query. Errors are recorded on `status`, not raised.
+        """
+        try:
+            embedder = self.embedder
+            self.status.begin(WARMING)
+            embedder.embed_batch_array(WARM_UP_TEXTS)
+        except Exception as e:  # noqa: BLE001 - recorded on `status`, see above
+            logger.warning(f"Embedder warm-up failed: {e}")
+            if self.status.state != FAILED:
+                self.status.fail(e)
+            return
+        self.status.finish(WARMING, READY)
+
+    @property
+    def model_id(self) -> str:
+        return self.embedder.model_id
+
+    @property
+    def dimension(self) -> int:
+        return self.embedder.dimension
+
+    def embed_single(self, text: str) -> list[float]:
+        return self.embedder.embed_single(text)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return self.embedder.embed_batch(texts)
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        return self.embedder.embed_batch_array(texts)
+
+    def __getattr__(self, name: str) -> Any:
+        # Backend extras such as `token_lengths`.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.embedder, name)
@@ -1,13 +1,32 @@
 from typing import List
+import numpy as np
+import numpy.typing as npt
 from sentence_transformers import SentenceTransformer
 from app.embeddings.base import BaseEmbedder
+from app.embeddings.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_TOKENS, plan_token_batches
 
 class LocalEmbedder(BaseEmbedder):
     """
     Local embedding model using sentence-transformers.
     """
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2",
+                 max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+
+    @property
+    def model_id(self) -> str:
+        return self.model_name
+
+    @property
+    def dimension(self) -> int:
+        dimension = self.model.get_sentence_embedding_dimension()
+        if dimension is None:
+            raise ValueError(f"Model '{self.model_name}' does not report its embedding dimension")
+        return int(dimension)
 
     def embed_single(self, text: str) -> List[float]:
         # SentenceTransformer returns ndarray or list depending on config, usually ndarray
@@ -18,3 +37,32 @@ class LocalEmbedder(BaseEmbedder):
         if not texts:
             return []
         return list(self.model.encode(texts).tolist())
+
+    def token_lengths(self, texts: list[str]) -> list[int]:
+        """
+        Token count of each text as the model will see it (special tokens
+        included, truncated at the model's max sequence length).
+        """
+        encoded = self.model.tokenizer(
+            texts, add_special_tokens=True, truncation=True, max_length=self.model.max_seq_length
+        )
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Bucket by token length under a padded-token budget rather than a
+        # fixed item count, so short chunks share large batches and long
+        # ones don't drag padding across the rest.
+        out: npt.NDArray[np.float32] | None = None
+        for idx in plan_token_batches(self.token_lengths(texts), self.max_batch_tokens, self.max_batch_size):
+            vectors = np.asarray(
+                self.model.encode([texts[i] for i in idx], batch_size=len(idx), convert_to_numpy=True),
+                dtype=np.float32,
+            )
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[idx] = vectors
+        assert out is not None
+        return out
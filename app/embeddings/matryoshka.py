@@ -0,0 +1,60 @@
+from collections.abc import Callable
+
+import numpy as np
+import numpy.typing as npt
+
+from app.embeddings.base import BaseEmbedder
+
+
+def truncate_embeddings(matrix: npt.NDArray[np.float32], dimension: int) -> npt.NDArray[np.float32]:
+    """
+    Keep the first `dimension` components of each row and re-normalize to
+    unit length, which is how Matryoshka-trained models are meant to be
+    shortened.
+    """
+    if dimension > matrix.shape[1]:
+        raise ValueError(f"Cannot truncate {matrix.shape[1]}-dim embeddings to {dimension}")
+    head = matrix[:, :dimension]
+    norms = np.linalg.norm(head, axis=1, keepdims=True)
+    return np.ascontiguousarray(head / np.clip(norms, 1e-12, None), dtype=np.float32)
+
+
+class TruncatedEmbedder(BaseEmbedder):
+    """
+    Serves the leading `dimension` components of another embedder's vectors.
+    Only meaningful for Matryoshka-trained models (e.g. nomic-embed-text-v1.5,
+    mxbai-embed-large-v1, text-embedding-3-*); for other models the prefix of
+    a vector carries no special information and retrieval quality collapses.
+    """
+    def __init__(self, embedder: BaseEmbedder, dimension: int):
+        if dimension < 1:
+            raise ValueError("dimension must be positive")
+        self.embedder = embedder
+        self._dimension = dimension
+
+    @property
+    def model_id(self) -> str:
+        # Truncated vectors live in a different space from the full ones.
+        return f"{self.embedder.model_id}@{self._dimension}d"
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed_single(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return list(self.embed_batch_array(texts).tolist())
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return truncate_embeddings(self.embedder.embed_batch_array(texts), self._dimension)
+
+
+def build_truncated(factory: Callable[[], BaseEmbedder], dimension: int) -> TruncatedEmbedder:
+    """Module-level (so picklable for worker processes) constructor."""
+    return TruncatedEmbedder(factory(), dimension)
@@ -0,0 +1,150 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.batching import (
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_BATCH_TOKENS,
+    plan_token_batches,
+)
+
+# Files written by `app.embeddings.onnx_export` into the model directory.
+CONFIG_FILE = "embedder_config.json"
+TOKENIZER_FILE = "tokenizer.json"
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model.int8.onnx"
+
+
+def load_embedder_config(model_dir: str | Path) -> dict[str, Any]:
+    config_path = Path(model_dir) / CONFIG_FILE
+    if not config_path.is_file():
+        raise FileNotFoundError(
+            f"No exported ONNX model at {model_dir}. "
+            "Run `python -m app.embeddings.onnx_export` first."
+        )
+    with open(config_path, "r") as f:
+        config: dict[str, Any] = json.load(f)
+    return config
+
+
+class ONNXEmbedder(BaseEmbedder):
+    """
+    Sentence embedder running an exported transformer through ONNX Runtime on
+    CPU, optionally int8-quantized. Pooling and normalization are replayed in
+    NumPy from the exported config so vectors match the PyTorch
+    SentenceTransformer the model was exported from.
+    """
+    def __init__(self, model_dir: str, quantized: bool = True,
+                 intra_op_threads: int = 0,
+                 max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        # Imported here so the PyTorch-only setup never needs onnxruntime.
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.config = load_embedder_config(model_dir)
+        self.quantized = quantized
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+
+        model_path = Path(model_dir) / (INT8_MODEL_FILE if quantized else FP32_MODEL_FILE)
+        if not model_path.is_file():
+            raise FileNotFoundError(
+                f"{model_path} not found; export with "
+                f"{'--quantize' if quantized else '--no-quantize'} or change onnx_quantized."
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(Path(model_dir) / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=int(self.config["max_seq_length"]))
+        # Padding is applied per length bucket in `_encode`, not globally.
+        self.tokenizer.no_padding()
+        self.pad_token_id = int(self.config["pad_token_id"])
+
+    @property
+    def model_id(self) -> str:
+        # int8 vectors drift slightly from fp32, so they get their own ID.
+        suffix = "onnx-int8" if self.quantized else "onnx"
+        return f"{self.config['model_name']}@{suffix}"
+
+    @property
+    def dimension(self) -> int:
+        return int(self.config["dimension"])
+
+    def embed_single(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return list(self.embed_batch_array(texts).tolist())
+
+    def token_lengths(self, texts: list[str]) -> list[int]:
+        return [len(e.ids) for e in self.tokenizer.encode_batch(texts)]
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Tokenize once, then run length buckets under a padded-token budget
+        # so each forward pass pads only to its own longest member.
+        encodings = self.tokenizer.encode_batch(texts)
+        lengths = [len(e.ids) for e in encodings]
+        out = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for idx in plan_token_batches(lengths, self.max_batch_tokens, self.max_batch_size):
+            out[idx] = self._encode([encodings[i] for i in idx])
+        return out
+
+    def _encode(self, encodings: list[Any]) -> npt.NDArray[np.float32]:
+        seq_len = max(len(e.ids) for e in encodings)
+        input_ids = np.full((len(encodings), seq_len), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), seq_len), dtype=np.int64)
+        token_type_ids = np.zeros((len(encodings), seq_len), dtype=np.int64)
+        for row, e in enumerate(encodings):
+            n = len(e.ids)
+            input_ids[row, :n] = e.ids
+            attention_mask[row, :n] = 1
+            token_type_ids[row, :n] = e.type_ids
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = token_type_ids
+
+        hidden = self.session.run(["last_hidden_state"], inputs)[0]
+        return pool_and_normalize(
+            hidden, attention_mask,
+            pooling=str(self.config["pooling"]), normalize=bool(self.config["normalize"]),
+        )
+
+
+def pool_and_normalize(hidden: npt.NDArray[np.float32], attention_mask: npt.NDArray[np.int64],
+                       pooling: str = "mean", normalize: bool = True) -> npt.NDArray[np.float32]:
+    """
+    Reduce token states (batch, seq, dim) to sentence vectors the way
+    sentence-transformers' Pooling and Normalize modules do.
+    """
+    if pooling == "cls":
+        pooled = hidden[:, 0]
+    elif pooling == "mean":
+        mask = attention_mask[..., np.newaxis].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    else:
+        raise ValueError(f"Unsupported pooling mode: {pooling}")
+
+    pooled = pooled.astype(np.float32, copy=False)
+    if normalize:
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        pooled = pooled / np.clip(norms, 1e-12, None)
+    return pooled
@@ -0,0 +1,146 @@
+"""
+Export a sentence-transformers model to ONNX for `ONNXEmbedder`, optionally
+with a dynamically int8-quantized copy, and check that the exported vectors
+match the PyTorch model.
+
+Usage:
+    python -m app.embeddings.onnx_export --model all-MiniLM-L6-v2 --output ./data/onnx/all-MiniLM-L6-v2
+"""
+
+import argparse
+import inspect
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.onnx_embedder import CONFIG_FILE, FP32_MODEL_FILE, INT8_MODEL_FILE
+
+logger = logging.getLogger(__name__)
+
+PARITY_SAMPLE_TEXTS = [
+    "DuckDB is an in-process SQL OLAP database management system.",
+    "How do I configure retries with exponential backoff?",
+    "Local-first software keeps the primary copy of data on the user's device.",
+    "short",
+    (
+        "A much longer passage about retrieval-augmented generation, which combines a "
+        "vector search over bookmarked pages with a language model that answers "
+        "questions using only the retrieved context, citing its sources as it goes."
+    ),
+]
+
+
+def export_sentence_transformer(model: Any, model_name: str, output_dir: str | Path,
+                                quantize: bool = True, opset: int = 14) -> Path:
+    """
+    Export the transformer of a loaded SentenceTransformer to
+    `output_dir/model.onnx` (plus `model.int8.onnx` when `quantize`), along
+    with its tokenizer and the pooling settings `ONNXEmbedder` needs.
+    """
+    import torch
+    from sentence_transformers.models import Normalize, Pooling
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    tokenizer.save_pretrained(str(output))
+
+    pooling_module = next(m for m in model if isinstance(m, Pooling))
+    config: dict[str, Any] = {
+        "model_name": model_name,
+        "dimension": int(model.get_sentence_embedding_dimension()),
+        "max_seq_length": int(model.max_seq_length),
+        "pooling": "cls" if pooling_module.pooling_mode_cls_token else "mean",
+        "normalize": any(isinstance(m, Normalize) for m in model),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": int(tokenizer.pad_token_id),
+    }
+
+    class _LastHiddenState(torch.nn.Module):
+        # Expose only the token states; pooling happens in NumPy.
+        def __init__(self, auto_model: torch.nn.Module):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+            return self.auto_model(*inputs, return_dict=True).last_hidden_state  # type: ignore[no-any-return]
+
+    dummy = tokenizer(["export sample"], return_tensors="pt")
+    input_names: list[str] = ["input_ids", "attention_mask"]
+    if "token_type_ids" in dummy:
+        input_names.append("token_type_ids")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+
+    export_kwargs: dict[str, Any] = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # Newer torch defaults to the dynamo exporter; the TorchScript one
+        # handles dynamic batch/sequence axes without extra dependencies.
+        export_kwargs["dynamo"] = False
+
+    fp32_path = output / FP32_MODEL_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(transformer.auto_model.eval()),
+            tuple(dummy[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            **export_kwargs,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(fp32_path), str(output / INT8_MODEL_FILE), weight_type=QuantType.QInt8)
+
+    with open(output / CONFIG_FILE, "w") as f:
+        json.dump(config, f, indent=2)
+    return output
+
+
+def vector_parity(reference: BaseEmbedder, candidate: BaseEmbedder,
+                  texts: list[str] = PARITY_SAMPLE_TEXTS) -> dict[str, float]:
+    """
+    Cosine similarity between the vectors two embedders produce for the same
+    texts. fp32 ONNX should be ~1.0; int8 typically stays above 0.99.
+    """
+    a = reference.embed_batch_array(texts)
+    b = candidate.embed_batch_array(texts)
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    cosines = (a * b).sum(axis=1)
+    return {"min_cosine": float(cosines.min()), "mean_cosine": float(cosines.mean())}
+
+
+def main() -> None:
+    from sentence_transformers import SentenceTransformer
+
+    from app.embeddings.local_embedder import LocalEmbedder
+    from app.embeddings.onnx_embedder import ONNXEmbedder
+
+    parser = argparse.ArgumentParser(description="Export a sentence-transformers model to ONNX.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--quantize", action=argparse.BooleanOptionalAction, default=True)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    model = SentenceTransformer(args.model, device="cpu")
+    export_sentence_transformer(model, args.model, args.output, quantize=args.quantize)
+    logger.info("Exported %s to %s", args.model, args.output)
+
+    reference = LocalEmbedder(args.model)
+    for quantized in ([False, True] if args.quantize else [False]):
+        parity = vector_parity(reference, ONNXEmbedder(args.output, quantized=quantized))
+        logger.info("%s parity vs PyTorch: %s", "int8" if quantized else "fp32", parity)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,116 @@
 import httpx
+import logging
 import os
-from typing import List
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, List
 from app.embeddings.base import BaseEmbedder
 
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+# Per-request limits of the embeddings endpoint (300k tokens, 2048 inputs),
+# with headroom on tokens because they are estimated, not counted.
+DEFAULT_MAX_REQUEST_TOKENS = 250_000
+DEFAULT_MAX_REQUEST_INPUTS = 2048
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Native widths; text-embedding-3-* also accept a shorter `dimensions`.
+MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Conservative token estimate without a tokenizer: English averages about
+    four characters per token with cl100k, so three overshoots comfortably.
+    """
+    return len(text) // 3 + 1
+
+
+def plan_request_batches(texts: list[str], max_tokens: int = DEFAULT_MAX_REQUEST_TOKENS,
+                         max_inputs: int = DEFAULT_MAX_REQUEST_INPUTS) -> list[list[int]]:
+    """
+    Split input positions into contiguous request-sized runs: each stays
+    within `max_inputs` inputs and `max_tokens` estimated tokens (a single
+    input over the budget is sent on its own and left to the API to reject).
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
 class OpenAIEmbedder(BaseEmbedder):
     """
     OpenAI embedding model.
+
+    Holds one pooled `httpx.Client` for its lifetime. Large inputs are cut
+    into request-sized sub-batches that are sent `max_concurrency` at a time,
+    retried with exponential backoff on 429/5xx and connection errors, and
+    reassembled in input order.
     """
-    def __init__(self, api_key: str | None = None, model: str = "text-embedding-3-small"):
+    def __init__(self, api_key: str | None = None, model: str = "text-embedding-3-small",
+                 base_url: str = "https://api.openai.com/v1",
+                 max_concurrency: int = 4, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 20.0,
+                 max_request_tokens: int = DEFAULT_MAX_REQUEST_TOKENS,
+                 max_request_inputs: int = DEFAULT_MAX_REQUEST_INPUTS,
+                 timeout: float = 60.0, dimensions: int | None = None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY is required for OpenAIEmbedder")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
         self.model = model
-        self.base_url = "https://api.openai.com/v1"
+        # Server-side Matryoshka truncation for the text-embedding-3 models.
+        self.dimensions = dimensions
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_request_tokens = max_request_tokens
+        self.max_request_inputs = max_request_inputs
+
+        # Thread-safe and shared by every sub-batch; sized so concurrent
+        # requests never wait on (or reopen) a connection.
+        self._client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="openai-embed")
+
+    @property
+    def model_id(self) -> str:
+        if self.dimensions is not None:
+            return f"openai:{self.model}@{self.dimensions}d"
+        return f"openai:{self.model}"
+
+    @property
+    def dimension(self) -> int:
+        if self.dimensions is not None:
+            return self.dimensions
+        if self.model in MODEL_DIMENSIONS:
+            return MODEL_DIMENSIONS[self.model]
+        return super().dimension
 
     def embed_single(self, text: str) -> List[float]:
         """
@@ -26,26 +124,64 @@ class OpenAIEmbedder(BaseEmbedder):
         """
         if not texts:
             return []
-            
-        # Replace newlines as recommended by OpenAI for older models, 
+
+        # Replace newlines as recommended by OpenAI for older models,
         # but 3-small handles it better. Still good practice for some cases.
         cleaned_texts = [text.replace("\n", " ") for text in texts]
-        
-        with httpx.Client(timeout=60.0) as client:
-            response = client.post(
-                f"{self.base_url}/embeddings",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "input": cleaned_texts,
-                    "model": self.model
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # OpenAI guarantees order matches input
-            embeddings = [item["embedding"] for item in data["data"]]
-            return embeddings
+
+        batches = plan_request_batches(cleaned_texts, self.max_request_tokens, self.max_request_inputs)
+        if len(batches) == 1:
+            return self._post_embeddings(cleaned_texts)
+
+        # map() yields in submission order, so sub-batch order == input order.
+        parts = self._executor.map(
+            self._post_embeddings, [[cleaned_texts[i] for i in batch] for batch in batches]
+        )
+        return [vector for part in parts for vector in part]
+
+    def _post_embeddings(self, texts: list[str]) -> list[list[float]]:
+        payload: dict[str, Any] = {"input": texts, "model": self.model}
+        if self.dimensions is not None:
+            payload["dimensions"] = self.dimensions
+
+        attempt = 0
+        while True:
+            try:
+                response = self._client.post(f"{self.base_url}/embeddings", json=payload)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Embedding request failed ({e!r}); retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    data = response.json()["data"]
+                    if len(data) != len(texts):
+                        raise ValueError(f"Expected {len(texts)} embeddings, got {len(data)}")
+                    # OpenAI guarantees order matches input
+                    return [item["embedding"] for item in data]
+                delay = self._retry_after(response) or self._backoff(attempt)
+                logger.warning(f"Embedding request got HTTP {response.status_code}; retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter, so parallel sub-batches that failed together spread out.
+        return float(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+    def _retry_after(self, response: httpx.Response) -> float | None:
+        try:
+            return min(self.backoff_max, float(response.headers["retry-after"]))
+        except (KeyError, ValueError):
+            return None
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._client.close()
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
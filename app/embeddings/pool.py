@@ -0,0 +1,138 @@
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from app.embeddings.base import BaseEmbedder
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+# Worker-process state, set once by `_init_worker`.
+_worker_embedder: BaseEmbedder | None = None
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _init_worker(factory: Callable[[], BaseEmbedder], threads: int,
+                 cpu_sets: Optional["multiprocessing.Queue[list[int]]"]) -> None:
+    global _worker_embedder
+    # Thread limits must be in place before torch / onnxruntime start their pools.
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    if cpu_sets is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpu_sets.get(timeout=1.0))
+        except queue.Empty:
+            # A replacement for a crashed worker finds the sets already taken.
+            logger.warning("No CPU set left for embedding worker %d; running unpinned", os.getpid())
+
+    _worker_embedder = factory()
+
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+
+def _embed_shard(texts: list[str]) -> npt.NDArray[np.float32]:
+    assert _worker_embedder is not None, "worker used before initialization"
+    return _worker_embedder.embed_batch_array(texts)
+
+
+def _worker_model_id() -> str:
+    assert _worker_embedder is not None, "worker used before initialization"
+    return _worker_embedder.model_id
+
+
+def cpu_sets_for_workers(num_workers: int, threads_per_worker: int,
+                         available: Sequence[int] | None = None) -> list[list[int]]:
+    """
+    Split the CPUs this process may run on into one disjoint set per worker
+    (wrapping around if there are more threads than CPUs).
+    """
+    if available is None:
+        if hasattr(os, "sched_getaffinity"):
+            available = sorted(os.sched_getaffinity(0))
+        else:
+            available = list(range(os.cpu_count() or 1))
+    cpus = list(available)
+    return [
+        [cpus[(w * threads_per_worker + t) % len(cpus)] for t in range(threads_per_worker)]
+        for w in range(num_workers)
+    ]
+
+
+class PooledEmbedder(BaseEmbedder):
+    """
+    Spreads `embed_batch` work across worker processes, each holding its own
+    model built by `factory` (which must be picklable, e.g. a class or a
+    `functools.partial` of one). Inputs are cut into contiguous shards and
+    results reassembled in input order.
+    """
+    def __init__(self, factory: Callable[[], BaseEmbedder], num_workers: int,
+                 threads_per_worker: int = 1, pin_threads: bool = False,
+                 min_shard_size: int = 8):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.num_workers = num_workers
+        self.min_shard_size = min_shard_size
+
+        # Spawn, not fork: forking a process that already holds torch /
+        # onnxruntime thread pools can deadlock the children.
+        ctx = multiprocessing.get_context("spawn")
+        cpu_sets: multiprocessing.Queue[list[int]] | None = None
+        if pin_threads:
+            cpu_sets = ctx.Queue()
+            for cpus in cpu_sets_for_workers(num_workers, threads_per_worker):
+                cpu_sets.put(cpus)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(factory, threads_per_worker, cpu_sets),
+        )
+        self._model_id: str | None = None
+
+    @property
+    def model_id(self) -> str:
+        if self._model_id is None:
+            self._model_id = self._executor.submit(_worker_model_id).result()
+        return self._model_id
+
+    def _shards(self, texts: list[str]) -> list[list[str]]:
+        n_shards = max(1, min(self.num_workers, len(texts) // self.min_shard_size))
+        bounds = np.linspace(0, len(texts), n_shards + 1).astype(int)
+        return [texts[bounds[i]:bounds[i + 1]] for i in range(n_shards)]
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        # map() yields in submission order, so shard order == input order.
+        parts = list(self._executor.map(_embed_shard, self._shards(texts)))
+        return np.ascontiguousarray(np.concatenate(parts), dtype=np.float32)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return list(self.embed_batch_array(texts).tolist())
+
+    def embed_single(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from app.embeddings.batching import arrival_order_batches, padding_stats, plan_token_batches
+
+
+def test_plan_covers_every_input_exactly_once():
+    lengths = [5, 120, 7, 300, 64, 64, 3]
+
+    batches = plan_token_batches(lengths, max_batch_tokens=256, max_batch_size=4)
+
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(lengths)))
+
+
+def test_plan_respects_token_budget_and_size_cap():
+    lengths = [10] * 50 + [200] * 3
+
+    batches = plan_token_batches(lengths, max_batch_tokens=400, max_batch_size=16)
+
+    for batch in batches:
+        assert len(batch) <= 16
+        assert max(lengths[i] for i in batch) * len(batch) <= 400
+    # Long inputs come first and are batched together
+    assert sorted(lengths[i] for i in batches[0]) == [200, 200]
+
+
+def test_oversized_input_gets_its_own_batch():
+    batches = plan_token_batches([1000, 5, 5], max_batch_tokens=100)
+
+    assert batches[0].tolist() == [0]
+    assert sorted(batches[1].tolist()) == [1, 2]
+
+
+def test_bucketing_reduces_padding_waste():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(5, 256, size=500).tolist()
+
+    arrival = padding_stats(lengths, arrival_order_batches(len(lengths), 32))
+    bucketed = padding_stats(lengths, plan_token_batches(lengths, max_batch_tokens=32 * 256))
+
+    assert arrival.real_tokens == bucketed.real_tokens == sum(lengths)
+    assert bucketed.waste < arrival.waste / 4
+
+
+def test_empty_plan_and_stats():
+    assert plan_token_batches([]) == []
+    assert padding_stats([], []).waste == pytest.approx(0.0)
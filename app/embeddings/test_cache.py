@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.embeddings.cache import QueryEmbeddingCache, normalize_query
+
+
+def test_normalize_query_collapses_case_whitespace_and_unicode():
+    assert normalize_query("  What   is\tDuckDB? ") == "what is duckdb?"
+    # NFKC folds compatibility characters such as full-width letters
+    assert normalize_query("ＤｕｃｋＤＢ") == "duckdb"
+
+
+def test_cache_hits_skip_compute_for_near_identical_queries():
+    cache = QueryEmbeddingCache(max_size=8)
+    compute = MagicMock(return_value=[0.1, 0.2])
+
+    first = cache.get_or_compute("model-a", "What is DuckDB?", compute)
+    second = cache.get_or_compute("model-a", "  what is  duckdb? ", compute)
+
+    assert first == second == [0.1, 0.2]
+    compute.assert_called_once_with("What is DuckDB?")
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+    assert stats.hit_rate == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_aget_or_compute_embeds_the_query_as_typed():
+    cache = QueryEmbeddingCache(max_size=8)
+    seen = []
+
+    async def compute(query):
+        seen.append(query)
+        return [1.0]
+
+    assert await cache.aget_or_compute("m", "DuckDB  Arrow", compute) == [1.0]
+    assert await cache.aget_or_compute("m", "duckdb arrow", compute) == [1.0]
+    assert seen == ["DuckDB  Arrow"]
+
+
+def test_cache_keys_on_model_id():
+    cache = QueryEmbeddingCache(max_size=8)
+    compute = MagicMock(side_effect=[[1.0], [2.0]])
+
+    assert cache.get_or_compute("model-a", "q", compute) == [1.0]
+    assert cache.get_or_compute("model-b", "q", compute) == [2.0]
+    assert compute.call_count == 2
+
+
+def test_get_or_compute_many_batches_only_the_misses():
+    cache = QueryEmbeddingCache(max_size=8)
+    cache.get_or_compute("model-a", "cached", lambda q: [0.0])
+    compute_batch = MagicMock(return_value=[[1.0], [2.0]])
+
+    vectors = cache.get_or_compute_many("model-a", ["New one", "cached", "new  ONE", "other"], compute_batch)
+
+    assert vectors == [[1.0], [0.0], [1.0], [2.0]]
+    compute_batch.assert_called_once_with(["New one", "other"])
+    assert cache.get_or_compute("model-a", "other", MagicMock()) == [2.0]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = QueryEmbeddingCache(max_size=2)
+    compute = MagicMock(side_effect=lambda q: [float(len(q))])
+
+    cache.get_or_compute("m", "a", compute)
+    cache.get_or_compute("m", "bb", compute)
+    cache.get_or_compute("m", "a", compute)    # refresh "a"
+    cache.get_or_compute("m", "ccc", compute)  # evicts "bb"
+    cache.get_or_compute("m", "a", compute)
+
+    assert cache.stats().size == 2
+    assert compute.call_count == 3
+    cache.get_or_compute("m", "bb", compute)
+    assert compute.call_count == 4
+
+
+def test_cached_vectors_are_not_shared_with_callers():
+    cache = QueryEmbeddingCache(max_size=2)
+    vector = cache.get_or_compute("m", "q", lambda q: [1.0, 2.0])
+    vector.append(3.0)
+
+    assert cache.get_or_compute("m", "q", lambda q: [9.0]) == [1.0, 2.0]
+
+
+def test_cache_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        QueryEmbeddingCache(max_size=0)
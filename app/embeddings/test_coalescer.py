@@ -0,0 +1,119 @@
+import asyncio
+import threading
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.coalescer import EmbeddingCoalescer, Histogram
+
+
+class RecordingEmbedder(BaseEmbedder):
+    """Embeds each text as [len(text)] and records every batch it is given."""
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def embed_single(self, text: str) -> list[float]:
+        return [float(len(text))]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_single(t) for t in texts]
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.batches.append(list(texts))
+        try:
+            return np.array(self.embed_batch(texts), dtype=np.float32)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FailingEmbedder(RecordingEmbedder):
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        raise RuntimeError("model crashed")
+
+
+def test_histogram_buckets_and_summary():
+    hist = Histogram([1, 5])
+    for value in (0.5, 1, 3, 10):
+        hist.observe(value)
+
+    snap = hist.snapshot()
+    assert snap["buckets"] == {"le_1": 2, "le_5": 1, "inf": 1}
+    assert snap["count"] == 4
+    assert snap["mean"] == pytest.approx(14.5 / 4)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward_pass():
+    embedder = RecordingEmbedder()
+    coalescer = EmbeddingCoalescer(embedder, max_wait_ms=20, max_batch_size=64)
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+    try:
+        results = await asyncio.gather(*(coalescer.embed(t) for t in texts))
+    finally:
+        coalescer.close()
+
+    assert results == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert embedder.batches == [texts]
+    stats = coalescer.stats()
+    assert stats["batch_size"]["count"] == 1
+    assert stats["batch_size"]["sum"] == 5
+    assert stats["wait_ms"]["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_batch_dispatches_without_waiting_and_model_is_never_reentered():
+    embedder = RecordingEmbedder()
+    # A long window: only the size cap (and back-to-back follow-ups) can flush.
+    coalescer = EmbeddingCoalescer(embedder, max_wait_ms=10_000, max_batch_size=4)
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(coalescer.embed("x" * n) for n in range(1, 9))), timeout=5
+        )
+    finally:
+        coalescer.close()
+
+    assert [r[0] for r in results] == [float(n) for n in range(1, 9)]
+    assert [len(b) for b in embedder.batches] == [4, 4]
+    assert embedder.max_active == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_caller_in_the_batch():
+    coalescer = EmbeddingCoalescer(FailingEmbedder(), max_wait_ms=5)
+
+    try:
+        results = await asyncio.gather(coalescer.embed("a"), coalescer.embed("b"), return_exceptions=True)
+    finally:
+        coalescer.close()
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_rejects_empty_batches():
+    with pytest.raises(ValueError):
+        EmbeddingCoalescer(RecordingEmbedder(), max_batch_size=0)
+
+
+@pytest.mark.asyncio
+async def test_close_answers_queued_requests_before_releasing_the_thread():
+    embedder = RecordingEmbedder()
+    coalescer = EmbeddingCoalescer(embedder, max_wait_ms=20)
+
+    queued = asyncio.ensure_future(coalescer.embed("abc"))
+    await asyncio.sleep(0)
+    coalescer.close()
+
+    assert await asyncio.wait_for(queued, timeout=5) == [3.0]
+    with pytest.raises(RuntimeError):
+        await coalescer.embed("late")
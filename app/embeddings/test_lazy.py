@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.lazy import LazyEmbedder
+
+
+class TinyEmbedder(BaseEmbedder):
+    dimension = 2
+
+    def embed_single(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_single(t) for t in texts]
+
+
+def test_model_is_not_built_until_first_use():
+    factory = MagicMock(return_value=TinyEmbedder())
+    lazy = LazyEmbedder(factory)
+
+    assert not lazy.loaded
+    assert lazy.status.state == "not_loaded"
+    factory.assert_not_called()
+
+    assert lazy.embed_single("abc") == [3.0, 1.0]
+    assert lazy.embed_batch(["a"]) == [[1.0, 1.0]]
+    assert lazy.dimension == 2
+    assert lazy.model_id == "TinyEmbedder"
+    factory.assert_called_once()
+    assert lazy.status.state == "loaded"
+    assert "loading" in lazy.status.as_dict()["seconds"]
+
+
+def test_warm_up_loads_runs_a_batch_and_marks_ready():
+    inner = TinyEmbedder()
+    inner.embed_batch_array = MagicMock(wraps=inner.embed_batch_array)
+    lazy = LazyEmbedder(lambda: inner)
+
+    lazy.warm_up()
+
+    inner.embed_batch_array.assert_called_once()
+    status = lazy.status.as_dict()
+    assert status["state"] == "ready"
+    assert set(status["seconds"]) == {"loading", "warming"}
+
+
+def test_load_failure_is_recorded_and_raised_to_callers():
+    lazy = LazyEmbedder(MagicMock(side_effect=OSError("model not found")))
+
+    lazy.warm_up()  # does not raise
+    assert lazy.status.state == "failed"
+    assert "model not found" in lazy.status.error
+
+    with pytest.raises(OSError):
+        lazy.embed_single("query")
@@ -7,6 +7,7 @@ from app.embeddings.local_embedder import LocalEmbedder
 
 from unittest.mock import MagicMock, patch
 import numpy as np
+import pytest
 
 def test_local_embedder_single():
     with patch("app.embeddings.local_embedder.SentenceTransformer") as mock_cls:
@@ -47,3 +48,62 @@ def test_local_embedder_empty_batch():
         embedder = LocalEmbedder("test-model")
         vectors = embedder.embed_batch([])
         assert vectors == []
+
+def test_local_embedder_batch_array_is_contiguous_float32():
+    with patch("app.embeddings.local_embedder.SentenceTransformer") as mock_cls:
+        mock_model = MagicMock()
+        mock_model.tokenizer.return_value = {"input_ids": [[1, 2], [1, 2, 3]]}
+        mock_model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 2), dtype=np.float32)
+        mock_cls.return_value = mock_model
+
+        embedder = LocalEmbedder("test-model")
+        matrix = embedder.embed_batch_array(["hello", "world"])
+
+        assert matrix.dtype == np.float32
+        assert matrix.shape == (2, 2)
+        assert matrix.flags["C_CONTIGUOUS"]
+        _, kwargs = mock_model.encode.call_args
+        assert kwargs["convert_to_numpy"] is True
+
+def test_local_embedder_batch_array_buckets_by_token_length_and_keeps_order():
+    with patch("app.embeddings.local_embedder.SentenceTransformer") as mock_cls:
+        mock_model = MagicMock()
+        texts = ["a", "a b c d e f", "a b", "a b c d e f g h"]
+        mock_model.tokenizer.return_value = {"input_ids": [t.split() for t in texts]}
+        # Each "vector" is the text's word count, so order is checkable
+        mock_model.encode.side_effect = lambda batch, **kwargs: np.array(
+            [[float(len(t.split()))] for t in batch], dtype=np.float32
+        )
+        mock_cls.return_value = mock_model
+
+        embedder = LocalEmbedder("test-model", max_batch_tokens=12)
+        matrix = embedder.embed_batch_array(texts)
+
+        assert matrix[:, 0].tolist() == [1.0, 6.0, 2.0, 8.0]
+        batches = [call.args[0] for call in mock_model.encode.call_args_list]
+        # Longest first, each batch within 12 padded tokens
+        assert batches == [["a b c d e f g h"], ["a b c d e f", "a b"], ["a"]]
+
+def test_base_embedder_batch_array_falls_back_to_embed_batch():
+    from app.embeddings.base import BaseEmbedder
+
+    class ListEmbedder(BaseEmbedder):
+        def embed_single(self, text):
+            return [1.0, 2.0]
+
+        def embed_batch(self, texts):
+            return [[1.0, 2.0] for _ in texts]
+
+    matrix = ListEmbedder().embed_batch_array(["a", "b", "c"])
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (3, 2)
+    assert ListEmbedder().embed_batch_array([]).shape == (0, 0)
+
+def test_local_embedder_dimension_must_be_reported():
+    with patch("app.embeddings.local_embedder.SentenceTransformer") as mock_cls:
+        mock_cls.return_value.get_sentence_embedding_dimension.return_value = 384
+        assert LocalEmbedder("test-model").dimension == 384
+
+        mock_cls.return_value.get_sentence_embedding_dimension.return_value = None
+        with pytest.raises(ValueError, match="does not report"):
+            _ = LocalEmbedder("test-model").dimension
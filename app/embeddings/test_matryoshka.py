@@ -0,0 +1,47 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.matryoshka import TruncatedEmbedder, build_truncated, truncate_embeddings
+
+
+class RampEmbedder(BaseEmbedder):
+    """Returns [1, 2, ..., 8] for every input."""
+    def embed_single(self, text: str) -> list[float]:
+        return [float(i) for i in range(1, 9)]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_single(t) for t in texts]
+
+
+def test_truncate_keeps_prefix_and_renormalizes():
+    matrix = np.array([[3.0, 4.0, 100.0], [0.0, 2.0, -5.0]], dtype=np.float32)
+
+    out = truncate_embeddings(matrix, 2)
+
+    assert out.dtype == np.float32 and out.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(out, [[0.6, 0.8], [0.0, 1.0]], rtol=1e-6)
+    with pytest.raises(ValueError):
+        truncate_embeddings(matrix, 4)
+
+
+def test_truncated_embedder_reports_its_own_space():
+    embedder = TruncatedEmbedder(RampEmbedder(), 2)
+
+    vector = embedder.embed_single("x")
+
+    assert len(vector) == embedder.dimension == 2
+    assert vector == pytest.approx([1 / 5 ** 0.5, 2 / 5 ** 0.5])
+    assert embedder.model_id == "RampEmbedder@2d"
+    assert embedder.embed_batch([]) == []
+
+
+def test_build_truncated_is_picklable_for_worker_pools():
+    import functools
+
+    factory = functools.partial(build_truncated, RampEmbedder, 4)
+    embedder = pickle.loads(pickle.dumps(factory))()
+
+    assert embedder.embed_batch_array(["a", "b"]).shape == (2, 4)
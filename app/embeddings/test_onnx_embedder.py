@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.onnx_embedder import ONNXEmbedder, pool_and_normalize
+from app.embeddings.onnx_export import export_sentence_transformer, vector_parity
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + [
+    "the", "a", "is", "duckdb", "database", "how", "do", "i", "configure", "retries", "with",
+    "short", "local", "first", "software", "keeps", "data", "on", "device",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """A randomly initialised 2-layer BERT wrapped as a SentenceTransformer, built offline."""
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    model_dir = tmp_path_factory.mktemp("tiny-bert")
+    (model_dir / "vocab.txt").write_text("\n".join(VOCAB))
+    BertTokenizerFast(vocab_file=str(model_dir / "vocab.txt")).save_pretrained(model_dir)
+    BertModel(BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64, max_position_embeddings=64,
+    )).save_pretrained(model_dir)
+
+    transformer = models.Transformer(str(model_dir), max_seq_length=32)
+    return SentenceTransformer(
+        modules=[transformer, models.Pooling(32, "mean"), models.Normalize()], device="cpu"
+    )
+
+
+@pytest.fixture(scope="module")
+def exported_dir(tiny_model, tmp_path_factory):
+    output = tmp_path_factory.mktemp("onnx")
+    export_sentence_transformer(tiny_model, "tiny-bert", output, quantize=True)
+    return output
+
+
+class SentenceTransformerEmbedder(BaseEmbedder):
+    def __init__(self, model):
+        self.model = model
+
+    def embed_single(self, text):
+        return self.model.encode(text).tolist()
+
+    def embed_batch(self, texts):
+        return self.model.encode(texts).tolist()
+
+
+def test_pool_and_normalize_mean_ignores_padding():
+    hidden = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]], dtype=np.int64)
+
+    pooled = pool_and_normalize(hidden, mask, pooling="mean", normalize=False)
+    assert pooled.tolist() == [[2.0, 0.0]]
+
+    normalized = pool_and_normalize(hidden, mask, pooling="mean", normalize=True)
+    assert np.allclose(normalized, [[1.0, 0.0]])
+
+
+def test_pool_and_normalize_cls_and_unknown_mode():
+    hidden = np.array([[[3.0, 4.0], [0.0, 1.0]]], dtype=np.float32)
+    mask = np.ones((1, 2), dtype=np.int64)
+
+    assert np.allclose(pool_and_normalize(hidden, mask, pooling="cls"), [[0.6, 0.8]])
+    with pytest.raises(ValueError):
+        pool_and_normalize(hidden, mask, pooling="max")
+
+
+def test_missing_export_raises_file_not_found(tmp_path):
+    with pytest.raises(FileNotFoundError, match="onnx_export"):
+        ONNXEmbedder(str(tmp_path))
+
+
+def test_onnx_fp32_matches_pytorch(tiny_model, exported_dir):
+    embedder = ONNXEmbedder(str(exported_dir), quantized=False, max_batch_tokens=16)
+
+    parity = vector_parity(SentenceTransformerEmbedder(tiny_model), embedder)
+
+    assert parity["min_cosine"] > 0.9999
+    assert embedder.model_id == "tiny-bert@onnx"
+    assert embedder.embed_batch_array(["a", "b", "c"]).shape == (3, 32)
+
+
+def test_onnx_int8_stays_close_to_pytorch(tiny_model, exported_dir):
+    embedder = ONNXEmbedder(str(exported_dir), quantized=True)
+
+    parity = vector_parity(SentenceTransformerEmbedder(tiny_model), embedder)
+
+    assert parity["min_cosine"] > 0.99
+    assert embedder.model_id == "tiny-bert@onnx-int8"
+    vector = embedder.embed_single("duckdb is a database")
+    assert len(vector) == 32
+    assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
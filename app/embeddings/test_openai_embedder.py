@@ -1,7 +1,12 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from app.embeddings.openai_embedder import OpenAIEmbedder
+from app.embeddings.openai_embedder import OpenAIEmbedder, plan_request_batches
+import httpx
+import json
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 def test_openai_embedder_init():
     with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
@@ -61,3 +66,133 @@ def test_openai_embedder_single():
         embedding = embedder.embed_single("hello")
         
         assert embedding == [0.1, 0.2]
+
+# --- Against a local stand-in for the embeddings endpoint ---
+
+class FakeEmbeddingsAPI:
+    """
+    Threaded HTTP/1.1 server answering POST /v1/embeddings with
+    [len(text), 0.0] per input. `failures` is a queue of status codes
+    returned (in order) before requests start succeeding.
+    """
+    def __init__(self, failures=(), delay=0.0):
+        self.failures = list(failures)
+        self.delay = delay
+        self.requests = []
+        self.bodies = []
+        self.peers = set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with api.lock:
+                    api.requests.append(body["input"])
+                    api.bodies.append(body)
+                    api.peers.add(self.client_address)
+                    api.active += 1
+                    api.max_active = max(api.max_active, api.active)
+                    status = api.failures.pop(0) if api.failures else 200
+                try:
+                    time.sleep(api.delay)
+                    if status == 200:
+                        payload = {"data": [{"index": i, "embedding": [float(len(t)), 0.0]}
+                                            for i, t in enumerate(body["input"])]}
+                    else:
+                        payload = {"error": {"message": "nope"}}
+                    data = json.dumps(payload).encode()
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header("Retry-After", "0")
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with api.lock:
+                        api.active -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_embedder(api, **kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    return OpenAIEmbedder(api_key="sk-test", base_url=api.base_url, **kwargs)
+
+
+def test_plan_request_batches_respects_input_and_token_limits():
+    texts = ["x" * 30] * 7
+    # Each text estimates to 11 tokens
+    assert plan_request_batches(texts, max_tokens=1000, max_inputs=3) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert plan_request_batches(texts, max_tokens=25, max_inputs=100) == [[0, 1], [2, 3], [4, 5], [6]]
+    assert plan_request_batches(["x" * 300, "y"], max_tokens=10) == [[0], [1]]
+
+
+def test_sub_batches_are_sent_concurrently_and_reassembled_in_order():
+    texts = ["a" * n for n in range(1, 41)]
+    with (FakeEmbeddingsAPI(delay=0.05) as api,
+          make_embedder(api, max_request_inputs=4, max_concurrency=3) as embedder):
+        vectors = embedder.embed_batch(texts)
+
+    assert [v[0] for v in vectors] == [float(n) for n in range(1, 41)]
+    assert len(api.requests) == 10
+    assert all(len(r) <= 4 for r in api.requests)
+    assert 1 < api.max_active <= 3
+    # Connections are pooled: never more sockets than the concurrency limit
+    assert len(api.peers) <= 3
+
+
+def test_retries_rate_limits_and_server_errors():
+    with FakeEmbeddingsAPI(failures=[429, 503, 500]) as api, make_embedder(api) as embedder:
+        vectors = embedder.embed_batch(["hello", "hi"])
+
+    assert vectors == [[5.0, 0.0], [2.0, 0.0]]
+    assert len(api.requests) == 4
+
+
+def test_gives_up_after_max_retries():
+    with (FakeEmbeddingsAPI(failures=[503] * 10) as api,
+          make_embedder(api, max_retries=2) as embedder,
+          pytest.raises(httpx.HTTPStatusError)):
+        embedder.embed_batch(["hello"])
+
+    assert len(api.requests) == 3
+
+
+def test_client_errors_are_not_retried():
+    with (FakeEmbeddingsAPI(failures=[400]) as api,
+          make_embedder(api) as embedder,
+          pytest.raises(httpx.HTTPStatusError)):
+        embedder.embed_batch(["hello"])
+
+    assert len(api.requests) == 1
+
+
+def test_requested_dimensions_are_sent_and_change_model_id():
+    with FakeEmbeddingsAPI() as api:
+        embedder = make_embedder(api, dimensions=256)
+        with embedder:
+            embedder.embed_batch(["hello"])
+
+    assert api.bodies[0]["dimensions"] == 256
+    assert embedder.dimension == 256
+    assert embedder.model_id == "openai:text-embedding-3-small@256d"
+    assert OpenAIEmbedder(api_key="sk-test").dimension == 1536
@@ -0,0 +1,75 @@
+import functools
+import os
+
+import numpy as np
+import pytest
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.pool import PooledEmbedder, cpu_sets_for_workers
+
+
+class IndexEmbedder(BaseEmbedder):
+    """Picklable stand-in model: embeds "<n>" as [n, worker pid]."""
+    def __init__(self, name: str = "index-embedder"):
+        self.name = name
+
+    @property
+    def model_id(self) -> str:
+        return self.name
+
+    def embed_single(self, text: str) -> list[float]:
+        return [float(text), float(os.getpid())]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_single(t) for t in texts]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with PooledEmbedder(functools.partial(IndexEmbedder, name="pooled"), num_workers=2, min_shard_size=4) as pool:
+        yield pool
+
+
+def test_pool_preserves_input_order_across_workers(pool):
+    texts = [str(i) for i in range(101)]
+
+    matrix = pool.embed_batch_array(texts)
+
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (101, 2)
+    assert matrix[:, 0].tolist() == [float(i) for i in range(101)]
+    # Work actually left this process
+    assert os.getpid() not in set(matrix[:, 1].astype(int).tolist())
+
+
+def test_pool_single_and_list_apis(pool):
+    assert pool.embed_single("7")[0] == 7.0
+    assert [v[0] for v in pool.embed_batch(["1", "2"])] == [1.0, 2.0]
+    assert pool.embed_batch([]) == []
+    assert pool.model_id == "pooled"
+
+
+def test_shards_are_contiguous_and_bounded(pool):
+    texts = [str(i) for i in range(10)]
+
+    shards = pool._shards(texts)
+
+    assert len(shards) == 2
+    assert [t for shard in shards for t in shard] == texts
+    # Inputs smaller than two shards are not split
+    assert pool._shards(texts[:5]) == [texts[:5]]
+
+
+def test_cpu_sets_for_workers_are_disjoint_then_wrap():
+    assert cpu_sets_for_workers(2, 2, available=[0, 1, 2, 3]) == [[0, 1], [2, 3]]
+    assert cpu_sets_for_workers(3, 1, available=[4, 5]) == [[4], [5], [4]]
+
+
+def test_pool_requires_a_worker():
+    with pytest.raises(ValueError):
+        PooledEmbedder(IndexEmbedder, num_workers=0)
+
+
+def test_pinned_pool_embeds():
+    with PooledEmbedder(IndexEmbedder, num_workers=2, pin_threads=True, min_shard_size=1) as pinned:
+        assert pinned.embed_batch_array(["3", "4"])[:, 0].tolist() == [3.0, 4.0]
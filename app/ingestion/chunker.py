@@ -1,6 +1,5 @@
 from dataclasses import dataclass
 from typing import List
-import nltk
 
 @dataclass
 class Chunk:
@@ -12,11 +11,17 @@ class Chunk:
 def chunk_text(text: str, chunk_size: int = 400, overlap: int = 50) -> List[Chunk]:
     """
     Splits text into chunks of approximately `chunk_size` tokens (estimated by words/chars).
-    Respects sentence boundaries using nltk.
+    Respects sentence boundaries using nltk. Each chunk's text is
+    `text[start_char_idx:end_char_idx]`, so it can be stored as offsets
+    (unless a sentence could not be located, when sentences are joined
+    with spaces instead).
     """
     if not text.strip():
         return []
 
+    # Imported here: nltk takes over a second to import and only ingestion needs it.
+    import nltk
+
     try:
         nltk.data.find('tokenizers/punkt')
     except LookupError:
@@ -48,8 +53,9 @@ def chunk_text(text: str, chunk_size: int = 400, overlap: int = 50) -> List[Chun
         # Real tokenizers (tiktoken/bert) are slower, this is "good enough" for RAG usually
         token_count = len(sent.split())
         start = text.find(sent, current_char_idx)
+        found = start != -1
         # If not found (shouldn't happen with exact match), fallback
-        if start == -1: 
+        if not found:
             start = current_char_idx
         
         end = start + len(sent)
@@ -59,7 +65,8 @@ def chunk_text(text: str, chunk_size: int = 400, overlap: int = 50) -> List[Chun
             "text": sent,
             "tokens": token_count,
             "start": start,
-            "end": end
+            "end": end,
+            "found": found
         })
 
     i = 0
@@ -83,9 +90,13 @@ def chunk_text(text: str, chunk_size: int = 400, overlap: int = 50) -> List[Chun
             else:
                 break
         
-        # Create chunk object
-        chunk_text_str = " ".join([s["text"] for s in chunk_sentences])
+        # Create chunk object: the span of text the sentences cover, keeping
+        # its own whitespace between them
         chunk_end_idx = chunk_sentences[-1]["end"]
+        if all(s["found"] for s in chunk_sentences):
+            chunk_text_str = text[chunk_start_idx:chunk_end_idx]
+        else:
+            chunk_text_str = " ".join([s["text"] for s in chunk_sentences])
         
         chunks.append(Chunk(
             text=chunk_text_str,
@@ -1,5 +1,4 @@
 from typing import Optional
-from readability import Document
 from bs4 import BeautifulSoup
 import re
 
@@ -12,6 +11,9 @@ def clean_html(html_content: str) -> Optional[str]:
     if not html_content or not html_content.strip():
         return None
 
+    # Imported here so the API process doesn't load it until the first ingest.
+    from readability import Document
+
     try:
         # 1. Extract main content using readability
         doc = Document(html_content)
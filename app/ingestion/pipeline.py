@@ -1,29 +1,44 @@
 import asyncio
 import uuid
 import logging
-from typing import AsyncGenerator, Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict, Any
+from collections.abc import AsyncGenerator
 from urllib.parse import urlparse
 
 from app.ingestion.parser import parse_bookmarks, Bookmark
 from app.ingestion.fetcher import fetch_url
 from app.ingestion.cleaner import clean_html
-from app.ingestion.chunker import chunk_text
-from app.storage.base import BaseStorage, Chunk
+from app.ingestion.chunker import Chunk as TextChunk, chunk_text
+from app.storage.base import BaseStorage, BookmarkRecord, Chunk
 from app.embeddings.base import BaseEmbedder
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Bookmarks are written to storage this many at a time, with their chunks,
+# instead of one write per bookmark. A batch is written sooner once it holds
+# this many chunks, which are embedded in one call: enough for a worker pool
+# to split across its processes, where one bookmark's few chunks are not.
+WRITE_BATCH_BOOKMARKS = 64
+EMBED_BATCH_CHUNKS = 256
+
 async def ingest_bookmarks(
     html_content: str, 
     storage: BaseStorage, 
     embedder: BaseEmbedder,
     chunk_size: int = 400,
-    chunk_overlap: int = 50
+    chunk_overlap: int = 50,
+    batch_bookmarks: int = WRITE_BATCH_BOOKMARKS,
+    batch_chunks: int = EMBED_BATCH_CHUNKS,
 ) -> AsyncGenerator[Dict[str, Any], None]:
     """
     Orchestrates the ingestion process.
-    Yields progress events.
+    Yields progress events. Cleaning, embedding and storage writes run in
+    worker threads, so queries are served while a large import runs.
+    Bookmarks are embedded and written in batches of `batch_bookmarks`
+    (or about `batch_chunks` chunks), so a bookmark is counted as a success
+    once its batch has been stored.
     """
     # 1. Parse
     yield {"status": "parsing", "message": "Parsing HTML content..."}
@@ -38,8 +53,19 @@ async def ingest_bookmarks(
     # 2. Process
     success_count = 0
     failed_count = 0
-    
+    batch = _WriteBatch()
+
     for i, bookmark in enumerate(bookmarks):
+        # A bookmark listed twice is written twice, in separate batches
+        if (len(batch.records) >= batch_bookmarks or batch.n_chunks >= batch_chunks
+                or bookmark.url in batch.urls):
+            stored, errors = await _flush(batch, storage, embedder)
+            success_count += stored
+            failed_count += len(errors)
+            for event in errors:
+                yield event
+            batch = _WriteBatch()
+
         yield {
             "status": "processing", 
             "current": i + 1, 
@@ -55,22 +81,15 @@ async def ingest_bookmarks(
             fetch_result = await fetch_url(bookmark.url)
             
             if fetch_result.status_code >= 400 or not fetch_result.content:
-                # Log failure but continue
-                # Update bookmark status in DB
-                storage.upsert_bookmark(
-                    url=bookmark.url,
-                    title=bookmark.title,
-                    folder=bookmark.folder,
-                    date_added=bookmark.date_added,
-                    domain=urlparse(bookmark.url).netloc,
-                    status="failed"
-                )
+                # Log failure but continue; the bookmark is recorded as
+                # failed with the next batch
+                batch.records.append(_record(bookmark, "failed"))
                 failed_count += 1
                 yield {"status": "failed", "url": bookmark.url, "reason": fetch_result.error or "Fetch failed"}
                 continue
                 
             # Clean
-            clean_text = clean_html(fetch_result.content)
+            clean_text = await asyncio.to_thread(clean_html, fetch_result.content)
             if not clean_text:
                 failed_count += 1
                 yield {"status": "failed", "url": bookmark.url, "reason": "No content after cleaning"}
@@ -83,48 +102,97 @@ async def ingest_bookmarks(
                  yield {"status": "failed", "url": bookmark.url, "reason": "No chunks generated"}
                  continue
             
-            # Embed
-            texts = [c.text for c in chunks]
-            embeddings = embedder.embed_batch(texts)
-            
-            # Assign embeddings and convert to Storage Chunk
-            db_chunks: list[Chunk] = []
-            for j, c in enumerate(chunks):
-                # chunk_text returns simple Chunk(text, start, end, chunk_index)
-                # We need to map to app.storage.base.Chunk(chunk_id, bookmark_url, text, chunk_index, embedding, ...)
-                
-                db_chunks.append(Chunk(
-                    chunk_id=str(uuid.uuid4()),
-                    bookmark_url=bookmark.url,
-                    text=c.text,
-                    chunk_index=c.chunk_index,
-                    embedding=embeddings[j],
-                    start_char_idx=c.start_char_idx,
-                    end_char_idx=c.end_char_idx
-                ))
-                
-            # Store
-            # First upsert bookmark metadata
-            storage.upsert_bookmark(
-                url=bookmark.url,
-                title=bookmark.title,
-                folder=bookmark.folder,
-                date_added=bookmark.date_added,
-                domain=urlparse(bookmark.url).netloc,
-                status="indexed"
-            )
-            # Then store chunks
-            storage.store_chunks(db_chunks)
-            
-            success_count += 1
-            
+            # Embedded with the rest of the batch when it is written
+            batch.records.append(_record(bookmark, "indexed"))
+            batch.documents[bookmark.url] = clean_text
+            batch.chunks[bookmark.url] = chunks
+            batch.n_chunks += len(chunks)
+
         except Exception as e:
             failed_count += 1
             yield {"status": "error", "url": bookmark.url, "message": str(e)}
-            
+
+    stored, errors = await _flush(batch, storage, embedder)
+    success_count += stored
+    failed_count += len(errors)
+    for event in errors:
+        yield event
+
     yield {
         "status": "completed", 
         "success": success_count, 
         "failed": failed_count, 
         "message": "Ingestion complete"
     }
+
+
+def _record(bookmark: Bookmark, status: str) -> BookmarkRecord:
+    return BookmarkRecord(
+        url=bookmark.url,
+        title=bookmark.title,
+        folder=bookmark.folder,
+        date_added=bookmark.date_added,
+        domain=urlparse(bookmark.url).netloc,
+        status=status,
+    )
+
+
+@dataclass
+class _WriteBatch:
+    """
+    Bookmarks processed since the last write, and the cleaned text and
+    (not yet embedded) chunks of those to index, by URL.
+    """
+    records: list[BookmarkRecord] = field(default_factory=list)
+    documents: dict[str, str] = field(default_factory=dict)
+    chunks: dict[str, list[TextChunk]] = field(default_factory=dict)
+    n_chunks: int = 0
+
+    @property
+    def urls(self) -> set[str]:
+        return {r.url for r in self.records}
+
+
+def _embed_and_store(storage: BaseStorage, embedder: BaseEmbedder, batch: _WriteBatch) -> None:
+    # chunk_text returns simple Chunk(text, start, end, chunk_index)
+    # We need to map to app.storage.base.Chunk(chunk_id, bookmark_url, text, chunk_index, embedding, ...)
+    db_chunks: list[Chunk] = []
+    texts = [c.text for chunks in batch.chunks.values() for c in chunks]
+    if texts:
+        # One float32 matrix for the whole batch, so a worker pool has enough
+        # texts to shard; each Chunk below holds a row view into it
+        embeddings = embedder.embed_batch_array(texts)
+        for url, chunks in batch.chunks.items():
+            for c in chunks:
+                db_chunks.append(Chunk(
+                    chunk_id=str(uuid.uuid4()),
+                    bookmark_url=url,
+                    text=c.text,
+                    chunk_index=c.chunk_index,
+                    embedding=embeddings[len(db_chunks)],
+                    start_char_idx=c.start_char_idx,
+                    end_char_idx=c.end_char_idx
+                ))
+
+    # Bookmark metadata first, then their chunks, tagged with the model that
+    # embedded them, with the text they are spans of
+    storage.upsert_bookmarks(batch.records)
+    if db_chunks:
+        # Read here, in the worker thread: a pooled embedder asks a worker process
+        storage.store_chunks(db_chunks, model_id=embedder.model_id, documents=batch.documents)
+
+
+async def _flush(batch: _WriteBatch, storage: BaseStorage,
+                 embedder: BaseEmbedder) -> tuple[int, list[dict[str, Any]]]:
+    """
+    Embed and write `batch` in a worker thread. Returns the number of
+    bookmarks indexed and, if that failed, an error event for each bookmark
+    it would have indexed.
+    """
+    if not batch.records:
+        return 0, []
+    try:
+        await asyncio.to_thread(_embed_and_store, storage, embedder, batch)
+    except Exception as e:  # noqa: BLE001 - reported like any other bookmark error
+        return 0, [{"status": "error", "url": url, "message": str(e)} for url in batch.chunks]
+    return len(batch.chunks), []
@@ -0,0 +1,118 @@
+import logging
+import threading
+from typing import Any
+
+from app.embeddings.base import BaseEmbedder
+from app.storage.duckdb_store import DuckDBStore
+
+logger = logging.getLogger(__name__)
+
+# Chunks re-embedded per batch, and the pause between batches that leaves
+# the model and the writer to queries and uploads.
+DEFAULT_REEMBED_BATCH_SIZE = 64
+DEFAULT_REEMBED_PAUSE_MS = 100.0
+
+# Migration states reported by `ReembeddingMigration.status`.
+IDLE = "idle"
+RUNNING = "running"
+SWITCHED = "switched"
+STOPPED = "stopped"
+FAILED = "failed"
+
+
+class ReembeddingMigration:
+    """
+    Re-embeds the chunk texts already in the store with a new model, without
+    refetching any page, then switches the store over to it.
+
+    Works in batches of `batch_size` chunks with a `pause_ms` sleep between
+    them, so a migration running next to live traffic only takes a bounded
+    share of the CPU. Progress is staged in the database, so a stopped or
+    crashed migration resumes where it left off. Chunks ingested meanwhile
+    (with the old model) are picked up before the switch.
+    """
+    def __init__(self, store: DuckDBStore, embedder: BaseEmbedder,
+                 batch_size: int = DEFAULT_REEMBED_BATCH_SIZE,
+                 pause_ms: float = DEFAULT_REEMBED_PAUSE_MS):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.store = store
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.pause = pause_ms / 1000.0
+
+        self.state = IDLE
+        self.from_model: str | None = None
+        self.to_model: str | None = None
+        self.error: str | None = None
+        self.embedded = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run(self) -> bool:
+        """
+        Run the migration to completion on the calling thread. Returns True
+        once the store has switched models, False if stopped first.
+        """
+        self.state = RUNNING
+        try:
+            self.from_model = self.store.embedding_model
+            self.to_model = self.embedder.model_id
+            self.store.begin_reembedding(self.to_model, self.embedder.dimension)
+            while not self._stop.is_set():
+                batch = self.store.pending_reembedding(self.batch_size)
+                if not batch:
+                    if self.store.switch_embedding_model():
+                        break
+                    # Chunks were ingested since the check; go round again.
+                    continue
+                chunk_ids = [chunk_id for chunk_id, _ in batch]
+                vectors = self.embedder.embed_batch_array([text for _, text in batch])
+                self.store.store_reembedded(chunk_ids, vectors)
+                self.embedded += len(batch)
+                self._stop.wait(self.pause)
+            else:
+                self.state = STOPPED
+                return False
+        except Exception as e:
+            logger.exception("Re-embedding migration failed")
+            self.state = FAILED
+            self.error = f"{type(e).__name__}: {e}"
+            raise
+
+        self.state = SWITCHED
+        logger.info(f"Store switched from embedding model '{self.from_model}' to '{self.to_model}'")
+        return True
+
+    def start(self) -> threading.Thread:
+        """Run the migration on a daemon thread."""
+        def target() -> None:
+            try:
+                self.run()
+            except Exception:  # noqa: BLE001, S110 - run() logged it and recorded it on the migration
+                pass
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=target, name="reembed-migration", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop after the current batch; staged vectors are kept for a later resume."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> dict[str, Any]:
+        done, total = (0, 0)
+        if self.state == RUNNING:
+            done, total = self.store.reembedding_progress()
+        return {
+            "state": self.state,
+            "from_model": self.from_model,
+            "to_model": self.to_model,
+            "chunks_done": done,
+            "chunks_total": total,
+            "embedded_this_run": self.embedded,
+            "error": self.error,
+        }
@@ -63,3 +63,11 @@ def test_no_mid_sentence_splits():
 def test_empty_text():
     chunks = chunk_text("")
     assert chunks == []
+
+def test_chunks_are_spans_of_the_text():
+    text = "First paragraph here.\n\nSecond one follows.  Third sentence!\nFourth and last."
+    chunks = chunk_text(text, chunk_size=5, overlap=2)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.text == text[chunk.start_char_idx:chunk.end_char_idx]
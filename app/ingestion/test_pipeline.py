@@ -1,9 +1,12 @@
+import threading
+
 import pytest
 from unittest.mock import AsyncMock, patch
 
 from app.ingestion.pipeline import ingest_bookmarks
 from app.storage.base import BaseStorage
 from app.embeddings.base import BaseEmbedder
+from app.embeddings.pool import PooledEmbedder
 from app.ingestion.fetcher import FetchResult
 
 # Mock dependencies
@@ -15,8 +18,10 @@ class MockStorage(BaseStorage):
     def upsert_bookmark(self, url, title, folder, date_added, domain, status):
         self.bookmarks[url] = {"status": status}
         
-    def store_chunks(self, chunks):
+    def store_chunks(self, chunks, model_id=None, documents=None):
         self.chunks.extend(chunks)
+        self.model_id = model_id
+        self.documents = documents
         
     def get_by_url(self, url):
         return self.bookmarks.get(url)
@@ -66,6 +71,9 @@ async def test_ingest_pipeline_success():
         assert "https://example.com" in storage.bookmarks
         assert storage.bookmarks["https://example.com"]["status"] == "indexed"
         assert len(storage.chunks) > 0
+        assert storage.model_id == embedder.model_id
+        document = storage.documents["https://example.com"]
+        assert all(document[c.start_char_idx:c.end_char_idx] == c.text for c in storage.chunks)
 
 @pytest.mark.asyncio
 async def test_ingest_pipeline_deduplication():
@@ -133,3 +141,100 @@ async def test_ingest_pipeline_failure():
         assert completion["failed"] == 1
         
         assert storage.bookmarks["https://fail.com"]["status"] == "failed"
+
+@pytest.mark.asyncio
+async def test_ingest_pipeline_writes_bookmarks_in_batches():
+    html_content = "<DL><p>" + "".join(
+        f'<DT><A HREF="https://{name}.com">{name}</A>' for name in ("a", "fail", "a", "b", "c", "d")
+    ) + "</DL><p>"
+
+    class BatchRecordingStorage(MockStorage):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def upsert_bookmarks(self, bookmarks):
+            self.batches.append([(b.url, b.status) for b in bookmarks])
+            super().upsert_bookmarks(bookmarks)
+
+    async def fetch(url):
+        if "fail" in url:
+            return FetchResult(url=url, content=None, status_code=404, error="Not Found")
+        return FetchResult(
+            url=url,
+            content="<html><body><p>Valid content for this bookmark. " * 5 + "</p></body></html>",
+            status_code=200,
+        )
+
+    storage = BatchRecordingStorage()
+    with patch("app.ingestion.pipeline.fetch_url", side_effect=fetch):
+        events = [e async for e in ingest_bookmarks(html_content, storage, MockEmbedder(), batch_bookmarks=3)]
+
+    # The repeated URL starts a new batch, then a full batch is written
+    assert storage.batches == [
+        [("https://a.com", "indexed"), ("https://fail.com", "failed")],
+        [("https://a.com", "indexed"), ("https://b.com", "indexed"), ("https://c.com", "indexed")],
+        [("https://d.com", "indexed")],
+    ]
+    assert (events[-1]["success"], events[-1]["failed"]) == (5, 1)
+
+
+@pytest.mark.asyncio
+async def test_ingest_pipeline_spreads_an_upload_across_pool_workers():
+    # Typical bookmarks: a short page each, one chunk apiece
+    html_content = "<DL><p>" + "".join(
+        f'<DT><A HREF="https://site{i}.com">Site {i}</A>' for i in range(40)
+    ) + "</DL><p>"
+
+    async def fetch(url):
+        return FetchResult(
+            url=url,
+            content=f"<html><body><p>The page at {url} has a paragraph of content. " * 3 + "</p></body></html>",
+            status_code=200,
+        )
+
+    storage = MockStorage()
+    with PooledEmbedder(MockEmbedder, num_workers=2) as pool, \
+            patch("app.ingestion.pipeline.fetch_url", side_effect=fetch):
+        shards = []
+        split = pool._shards
+
+        def recording_shards(texts):
+            shards.append(split(texts))
+            return shards[-1]
+
+        pool._shards = recording_shards
+        events = [e async for e in ingest_bookmarks(html_content, storage, pool)]
+
+    assert events[-1]["success"] == 40
+    assert len(storage.chunks) == 40
+    # Chunks of many bookmarks were embedded together, so each worker got a shard
+    assert [len(s) for s in shards] == [2]
+
+@pytest.mark.asyncio
+async def test_ingest_pipeline_reads_the_model_id_off_the_event_loop():
+    html_content = '<DL><p><DT><A HREF="https://example.com">Example</A></DL><p>'
+
+    class ThreadRecordingEmbedder(MockEmbedder):
+        def __init__(self):
+            self.threads = []
+
+        @property
+        def model_id(self):
+            # A pooled embedder blocks here on a worker process
+            self.threads.append(threading.current_thread())
+            return "recorded"
+
+    storage = MockStorage()
+    embedder = ThreadRecordingEmbedder()
+    with patch("app.ingestion.pipeline.fetch_url", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = FetchResult(
+            url="https://example.com",
+            content="<html><body><p>Valid content for this bookmark. " * 5 + "</p></body></html>",
+            status_code=200,
+        )
+        events = [e async for e in ingest_bookmarks(html_content, storage, embedder)]
+
+    assert events[-1]["success"] == 1
+    assert storage.model_id == "recorded"
+    assert embedder.threads and threading.main_thread() not in embedder.threads
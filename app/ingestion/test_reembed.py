@@ -0,0 +1,135 @@
+import threading
+
+import duckdb
+import pytest
+
+from app.embeddings.base import BaseEmbedder
+from app.ingestion.reembed import FAILED, STOPPED, SWITCHED, ReembeddingMigration
+from app.storage.base import Chunk
+from app.storage.duckdb_store import DuckDBStore
+
+
+class ConstantEmbedder(BaseEmbedder):
+    """Embeds every text as the same unit vector, counting the texts it saw."""
+    def __init__(self, model_id="model-b", dimension=3):
+        self._model_id = model_id
+        self._dimension = dimension
+        self.texts = []
+
+    @property
+    def model_id(self):
+        return self._model_id
+
+    @property
+    def dimension(self):
+        return self._dimension
+
+    def embed_single(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        self.texts.extend(texts)
+        return [[1.0] + [0.0] * (self._dimension - 1) for _ in texts]
+
+
+@pytest.fixture
+def store():
+    store = DuckDBStore(db_path=":memory:")
+    store.initialize()
+    store.upsert_bookmark("https://a.com", "A", "", None, "a.com", "indexed")
+    store.store_chunks(
+        [Chunk(f"c{i}", "https://a.com", f"text {i}", i, [0.5] * 4) for i in range(5)],
+        model_id="model-a",
+    )
+    return store
+
+
+def test_migration_reembeds_stored_texts_in_batches_and_switches(store):
+    embedder = ConstantEmbedder()
+    migration = ReembeddingMigration(store, embedder, batch_size=2, pause_ms=0)
+
+    assert migration.run() is True
+
+    assert migration.state == SWITCHED
+    assert sorted(embedder.texts) == [f"text {i}" for i in range(5)]
+    assert store.embedding_model == "model-b"
+    assert store.dimension == 3
+    assert store.search([1.0, 0.0, 0.0], k=1)[0].score == pytest.approx(1.0)
+    status = migration.status()
+    assert (status["from_model"], status["to_model"], status["embedded_this_run"]) == ("model-a", "model-b", 5)
+
+
+def test_stopped_migration_keeps_progress_and_old_vectors(store):
+    embedder = ConstantEmbedder()
+    migration = ReembeddingMigration(store, embedder, batch_size=2, pause_ms=0)
+    calls = 0
+    original = store.store_reembedded
+
+    def store_then_stop(chunk_ids, vectors):
+        nonlocal calls
+        original(chunk_ids, vectors)
+        calls += 1
+        migration._stop.set()
+
+    store.store_reembedded = store_then_stop
+    assert migration.run() is False
+    assert migration.state == STOPPED
+    assert store.embedding_model == "model-a"
+    assert store.reembedding_progress() == (2, 5)
+
+    store.store_reembedded = original
+    assert ReembeddingMigration(store, embedder, batch_size=2, pause_ms=0).run() is True
+    # Nothing re-embedded twice.
+    assert len(embedder.texts) == 5
+
+
+def test_background_migration_records_failure(store):
+    class BrokenEmbedder(ConstantEmbedder):
+        def embed_batch(self, texts):
+            raise RuntimeError("model exploded")
+
+    migration = ReembeddingMigration(store, BrokenEmbedder(), pause_ms=0)
+    migration.start().join(timeout=5)
+
+    assert migration.state == FAILED
+    assert "model exploded" in migration.status()["error"]
+    assert store.embedding_model == "model-a"
+
+
+def test_stop_interrupts_the_pause_between_batches(store):
+    migration = ReembeddingMigration(store, ConstantEmbedder(), batch_size=1, pause_ms=60_000)
+    thread = migration.start()
+    while migration.embedded == 0:
+        threading.Event().wait(0.01)
+    migration.stop(timeout=5)
+
+    assert not thread.is_alive()
+    assert migration.state == STOPPED
+
+
+def test_status_can_be_read_while_the_migration_runs(store):
+    embedder = ConstantEmbedder()
+    migration = ReembeddingMigration(store, embedder, batch_size=1, pause_ms=0)
+    errors = []
+    done = threading.Event()
+
+    def poll():
+        while not done.is_set():
+            try:
+                status = migration.status()
+                assert 0 <= status["chunks_done"] <= status["chunks_total"]
+            except (AssertionError, duckdb.Error) as exc:
+                errors.append(exc)
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    try:
+        thread = migration.start()
+        thread.join(10)
+    finally:
+        done.set()
+        poller.join()
+
+    assert errors == []
+    assert migration.state == SWITCHED
+    assert store.reembedding_progress() == (0, 0)
@@ -1,9 +1,17 @@
+import asyncio
+from contextlib import asynccontextmanager
 from typing import Dict, Any
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.routes import ingest, query
+from app.dependencies import (
+    close_resources, current_reembedding, get_embedder, get_llm, rebalance_store_partitions, save_store_index,
+    start_reembedding,
+)
+from app.readiness import FAILED, SERVING_STATES, llm_status, warm_up_models
 from os import PathLike
 from pathlib import Path
 
@@ -29,10 +37,52 @@ def select_static_directory(
 
 STATIC_DIRECTORY = select_static_directory()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    print(f"Starting Bookmarks RAG Knowledge Assistant with config: {settings}")
+    print("\n" + "="*50)
+    print("🚀 Backend API running at: http://localhost:8000")
+    if Path(STATIC_DIRECTORY).resolve() == Path("frontend/dist").resolve():
+        print("🎨 Built frontend UI running at: http://localhost:8000")
+    else:
+        print("🎨 Vite development UI: run separately at http://localhost:5173")
+    print("="*50 + "\n")
+
+    # Models load in the background: /health answers at once, /ready flips
+    # once the embedder is usable.
+    warm_up_task = None
+    if settings is not None and settings.warm_up_on_startup:
+        warm_up_task = asyncio.create_task(warm_up_models(get_embedder(), get_llm()))
+    # If the configured embedding model changed, stored chunks are re-embedded
+    # in the background once it has loaded; queries use the old vectors until
+    # the store switches over.
+    reembed_task = None
+    if settings is not None and settings.reembed_batch_size > 0:
+        reembed_task = asyncio.create_task(asyncio.to_thread(start_reembedding))
+    # IVF partitions that are missing or outgrown are retrained in the
+    # background; searches scan more of the table until then.
+    rebalance_task = None
+    if settings is not None and settings.vector_index == "ivf":
+        rebalance_task = asyncio.create_task(asyncio.to_thread(rebalance_store_partitions))
+    yield
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    if reembed_task is not None:
+        reembed_task.cancel()
+    if rebalance_task is not None:
+        rebalance_task.cancel()
+    migration = current_reembedding()
+    if migration is not None:
+        # Progress is staged in the database; the next start resumes it.
+        migration.stop()
+    await asyncio.to_thread(save_store_index)
+    await asyncio.to_thread(close_resources)
+
 app = FastAPI(
     title="Bookmarks RAG Knowledge Assistant",
     description="Local-first RAG tool for browser bookmarks",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS Setup
@@ -51,23 +101,33 @@ embedder = None
 storage = None
 llm = None
 
-@app.on_event("startup")
-async def startup_event() -> None:
-    print(f"Starting Bookmarks RAG Knowledge Assistant with config: {settings}")
-    print("\n" + "="*50)
-    print("🚀 Backend API running at: http://localhost:8000")
-    if Path(STATIC_DIRECTORY).resolve() == Path("frontend/dist").resolve():
-        print("🎨 Built frontend UI running at: http://localhost:8000")
-    else:
-        print("🎨 Vite development UI: run separately at http://localhost:5173")
-    print("="*50 + "\n")
-    # Initialize DB if needed (tables created on first connection usually)
-    pass
-
 @app.get("/health")
 async def health_check() -> Dict[str, str]:
     return {"status": "ok", "version": "0.1.0"}
 
+@app.get("/ready")
+async def readiness_check(response: Response) -> dict[str, Any]:
+    """
+    200 once the embedder can serve queries, 503 while it is still loading
+    (or failed). The LLM is reported but not required: without it queries
+    still retrieve and return an error answer. A background re-embedding
+    migration is reported too; queries are served throughout it.
+    """
+    embedder_status = get_embedder().status.as_dict()
+    if embedder_status["state"] in SERVING_STATES:
+        status = "ready"
+    else:
+        status = "failed" if embedder_status["state"] == FAILED else "starting"
+        response.status_code = 503
+    migration = current_reembedding()
+    # Its progress is a count query; keep it off the event loop.
+    migration_status = await migration.store.run_blocking(migration.status) if migration is not None else None
+    return {
+        "status": status,
+        "models": {"embedder": embedder_status, "llm": llm_status.as_dict()},
+        "embedding_migration": migration_status,
+    }
+
 # Register routers
 app.include_router(ingest.router, prefix="/api", tags=["ingest"])
 app.include_router(query.router, prefix="/api", tags=["query"])
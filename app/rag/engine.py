@@ -39,7 +39,7 @@ Cite the sources using [Source X] format where X is the number of the source.
         Execute a RAG query and return the full response.
         """
         # 1. Retrieve
-        chunks = self.retriever.retrieve(user_query, k=k, filters=filters)
+        chunks = await self.retriever.aretrieve(user_query, k=k, filters=filters)
         
         if not chunks:
             return RAGResponse(answer="I couldn't find any relevant bookmarks to answer your question.", sources=[])
@@ -60,7 +60,7 @@ Cite the sources using [Source X] format where X is the number of the source.
         uses `query()`. Kept for unit coverage and a possible later streaming route.
         """
         # 1. Retrieve
-        chunks = self.retriever.retrieve(user_query, k=k, filters=filters)
+        chunks = await self.retriever.aretrieve(user_query, k=k, filters=filters)
         
         if not chunks:
             yield "I couldn't find any relevant bookmarks to answer your question."
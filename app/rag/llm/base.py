@@ -40,3 +40,10 @@ class BaseLLM(ABC):
             Chunks of the generated response string as they arrive.
         """
         pass
+
+    async def warm_up(self) -> None:
+        """
+        Get the model ready to answer (e.g. loaded into memory) so the first
+        real query doesn't pay for it. Raises if the provider is unreachable.
+        The default does nothing.
+        """
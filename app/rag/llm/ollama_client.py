@@ -99,6 +99,18 @@ class OllamaClient(BaseLLM):
                 logger.error(f"Ollama stream failed: {e}")
                 yield f"Error: {str(e)}"
 
+    async def warm_up(self) -> None:
+        """
+        Ask Ollama to load the model: a generate call with an empty prompt
+        loads it into memory without producing any tokens.
+        """
+        async with httpx.AsyncClient(timeout=300.0) as client:
+            response = await client.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "prompt": "", "stream": False},
+            )
+            response.raise_for_status()
+
     def _build_prompt(self, system_prompt: str, user_query: str, context_chunks: List[str]) -> str:
         context_text = "\n\n".join(context_chunks)
         # Using Llama 3 instruct format if possible, or generic.
@@ -74,3 +74,19 @@ async def test_ollama_generate_stream():
     assert json_body["model"] == "test-model"
     assert json_body["stream"] is True
 
+
+@pytest.mark.asyncio
+async def test_ollama_warm_up_loads_model_with_empty_prompt():
+    client = OllamaClient(base_url="http://mock-ollama", model="test-model")
+    mock_response = MagicMock()
+    mock_response.raise_for_status = MagicMock()
+
+    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value = mock_response
+
+        await client.warm_up()
+
+        call_args = mock_post.call_args
+        assert call_args[0][0] == "http://mock-ollama/api/generate"
+        assert call_args[1]["json"] == {"model": "test-model", "prompt": "", "stream": False}
+        mock_response.raise_for_status.assert_called_once()
@@ -1,15 +1,103 @@
+import asyncio
 from typing import List, Dict, Any, Optional
-from app.storage.base import BaseStorage, RetrievedChunk
+from collections.abc import Sequence
+from app.storage.base import BaseStorage, RetrievedChunk, per_query_arguments
 from app.embeddings.base import BaseEmbedder
+from app.embeddings.cache import QueryEmbeddingCache
+from app.embeddings.coalescer import EmbeddingCoalescer
+
+# Reciprocal rank fusion adds 1 / (DEFAULT_RRF_K + rank) per list a chunk is
+# ranked in; 60 is the usual constant, damping the difference between the
+# very top ranks.
+DEFAULT_RRF_K = 60
+# Hybrid retrieval ranks this many times k from each list before fusing.
+FUSION_DEPTH_FACTOR = 4
+
+
+def _fusion_key(chunk: RetrievedChunk) -> Any:
+    return chunk.metadata.get("chunk_id") or (chunk.metadata.get("url"), chunk.text)
+
+
+def reciprocal_rank_fusion(rankings: list[list[RetrievedChunk]], k: int,
+                           rrf_k: int = DEFAULT_RRF_K) -> list[RetrievedChunk]:
+    """
+    The top `k` chunks across `rankings` (each best first) by reciprocal
+    rank fusion. Ranks, not scores, are combined, so cosine similarities and
+    BM25 scores need no calibration.
+
+    The fused score, which orders the results, goes in each chunk's metadata
+    as "fused_score"; `score` stays the one from the first ranking (the
+    vector search's cosine similarity), and is None for chunks only the
+    other rankings found.
+    """
+    fused: dict[Any, float] = {}
+    chunks: dict[Any, RetrievedChunk] = {}
+    scores: dict[Any, float | None] = {}
+    for position, ranking in enumerate(rankings):
+        for rank, chunk in enumerate(ranking, start=1):
+            key = _fusion_key(chunk)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            chunks.setdefault(key, chunk)
+            if position == 0:
+                scores.setdefault(key, chunk.score)
+    best = sorted(fused, key=lambda key: fused[key], reverse=True)[:k]
+    return [
+        RetrievedChunk(
+            text=chunks[key].text, score=scores.get(key),
+            metadata={**chunks[key].metadata, "fused_score": fused[key]},
+        )
+        for key in best
+    ]
+
 
 class Retriever:
     """
     RAG Retriever component.
     Orchestrates embedding the query and searching the vector store.
+    With `hybrid`, the store's keyword (BM25) results are fused with the
+    vector results by reciprocal rank, so exact terms that embeddings blur
+    (names, error codes) still surface at small k.
+
+    The `a`-prefixed methods are for request handlers: embedding and search
+    run on the store's executor (or the coalescer), never on the event
+    loop, and give up after `timeout_s` seconds (None: no limit), which
+    also interrupts the store's queries.
     """
-    def __init__(self, storage: BaseStorage, embedder: BaseEmbedder):
+    def __init__(self, storage: BaseStorage, embedder: BaseEmbedder,
+                 query_cache: QueryEmbeddingCache | None = None,
+                 coalescer: EmbeddingCoalescer | None = None,
+                 hybrid: bool = False, rrf_k: int = DEFAULT_RRF_K,
+                 timeout_s: float | None = None):
         self.storage = storage
         self.embedder = embedder
+        self.query_cache = query_cache
+        self.coalescer = coalescer
+        self.hybrid = hybrid
+        self.rrf_k = rrf_k
+        self.timeout_s = timeout_s
+
+    def _embed_query(self, query: str) -> list[float]:
+        if self.query_cache is None:
+            return self.embedder.embed_single(query)
+        return self.query_cache.get_or_compute(
+            self.embedder.model_id, query, self.embedder.embed_single
+        )
+
+    def _embed_queries(self, queries: list[str]) -> list[list[float]]:
+        if self.query_cache is None:
+            return self.embedder.embed_batch(queries)
+        return self.query_cache.get_or_compute_many(
+            self.embedder.model_id, queries, self.embedder.embed_batch
+        )
+
+    async def _aembed_query(self, query: str) -> list[float]:
+        if self.coalescer is None:
+            return await self.storage.run_blocking(self._embed_query, query)
+        if self.query_cache is None:
+            return await self.coalescer.embed(query)
+        return await self.query_cache.aget_or_compute(
+            self.coalescer.model_id, query, self.coalescer.embed
+        )
 
     def retrieve(self, query: str, k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[RetrievedChunk]:
         """
@@ -19,9 +107,124 @@ class Retriever:
             return []
 
         # Embed the query
-        query_embedding = self.embedder.embed_single(query)
+        query_embedding = self._embed_query(query)
         
         # Search storage
-        results = self.storage.search(query_embedding, k=k, filters=filters)
-        
+        return self.search(query, query_embedding, k=k, filters=filters)
+
+    async def aretrieve(self, query: str, k: int = 5, filters: dict[str, Any] | None = None) -> list[RetrievedChunk]:
+        """
+        `retrieve` for request handlers. With a coalescer, the query embedding
+        is batched with those of other in-flight requests. Raises
+        TimeoutError after `timeout_s`.
+        """
+        if not query.strip():
+            return []
+        return await asyncio.wait_for(self._aretrieve(query, k, filters), self.timeout_s)
+
+    async def _aretrieve(self, query: str, k: int, filters: dict[str, Any] | None) -> list[RetrievedChunk]:
+        query_embedding = await self._aembed_query(query)
+        return await self.asearch(query, query_embedding, k=k, filters=filters)
+
+    def retrieve_many(self, queries: list[str], k: int | Sequence[int] = 5,
+                      filters: None | dict[str, Any] | Sequence[dict[str, Any] | None] = None
+                      ) -> list[list[RetrievedChunk]]:
+        """
+        `retrieve` for a batch of queries (eval runs, query expansion), with
+        one `k` and filter for all or a list of one per query. The queries
+        are embedded in one batch and searched with `storage.search_many`,
+        so a store that scores them in one pass scans its vectors once.
+        """
+        ks, per_query = per_query_arguments(len(queries), k, filters)
+        asked = [i for i, query in enumerate(queries) if query.strip()]
+        results: list[list[RetrievedChunk]] = [[] for _ in queries]
+        if not asked:
+            return results
+        found = self.search_many(
+            [queries[i] for i in asked], self._embed_queries([queries[i] for i in asked]),
+            [ks[i] for i in asked], [per_query[i] for i in asked],
+        )
+        for i, chunks in zip(asked, found, strict=False):
+            results[i] = chunks
         return results
+
+    async def aretrieve_many(self, queries: list[str], k: int | Sequence[int] = 5,
+                             filters: None | dict[str, Any] | Sequence[dict[str, Any] | None] = None
+                             ) -> list[list[RetrievedChunk]]:
+        """`retrieve_many` for request handlers, like `aretrieve`."""
+        ks, per_query = per_query_arguments(len(queries), k, filters)
+        asked = [i for i, query in enumerate(queries) if query.strip()]
+        results: list[list[RetrievedChunk]] = [[] for _ in queries]
+        if not asked:
+            return results
+        found = await asyncio.wait_for(self._aretrieve_many(
+            [queries[i] for i in asked], [ks[i] for i in asked], [per_query[i] for i in asked],
+        ), self.timeout_s)
+        for i, chunks in zip(asked, found, strict=False):
+            results[i] = chunks
+        return results
+
+    async def _aretrieve_many(self, queries: list[str], k: list[int],
+                              filters: list[dict[str, Any] | None]) -> list[list[RetrievedChunk]]:
+        query_embeddings = await self.storage.run_blocking(self._embed_queries, queries)
+        return await self.asearch_many(queries, query_embeddings, k, filters)
+
+    def search_many(self, queries: list[str], query_embeddings: list[list[float]], k: list[int],
+                    filters: list[dict[str, Any] | None]) -> list[list[RetrievedChunk]]:
+        """`search` for a batch of already embedded queries, with a `k` and filter per query."""
+        if not self.hybrid:
+            return self.storage.search_many(query_embeddings, k, filters)
+        depths = [k_i * FUSION_DEPTH_FACTOR for k_i in k]
+        vector_results = self.storage.search_many(query_embeddings, depths, filters)
+        return [
+            reciprocal_rank_fusion([
+                ranked, self.storage.lexical_search(query, k=depth, filters=query_filters),
+            ], k_i, self.rrf_k)
+            for query, ranked, depth, k_i, query_filters in zip(queries, vector_results, depths, k, filters, strict=False)
+        ]
+
+    def search(self, query: str, query_embedding: list[float], k: int = 5,
+               filters: dict[str, Any] | None = None) -> list[RetrievedChunk]:
+        """Search the store for an already embedded `query`."""
+        if not self.hybrid:
+            return self.storage.search(query_embedding, k=k, filters=filters)
+        depth = k * FUSION_DEPTH_FACTOR
+        return reciprocal_rank_fusion([
+            self.storage.search(query_embedding, k=depth, filters=filters),
+            self.storage.lexical_search(query, k=depth, filters=filters),
+        ], k, self.rrf_k)
+
+    async def asearch(self, query: str, query_embedding: list[float], k: int = 5,
+                      filters: dict[str, Any] | None = None) -> list[RetrievedChunk]:
+        """`search` off the event loop; the vector and keyword searches run concurrently."""
+        if not self.hybrid:
+            return await self.storage.asearch(query_embedding, k=k, filters=filters)
+        depth = k * FUSION_DEPTH_FACTOR
+        rankings = await asyncio.gather(
+            self.storage.asearch(query_embedding, k=depth, filters=filters),
+            self.storage.alexical_search(query, k=depth, filters=filters),
+        )
+        return reciprocal_rank_fusion(list(rankings), k, self.rrf_k)
+
+    async def asearch_many(self, queries: list[str], query_embeddings: list[list[float]], k: list[int],
+                           filters: list[dict[str, Any] | None]) -> list[list[RetrievedChunk]]:
+        """`search_many` off the event loop."""
+        if not self.hybrid:
+            return await self.storage.asearch_many(query_embeddings, k, filters)
+        depths = [k_i * FUSION_DEPTH_FACTOR for k_i in k]
+        # Awaited as two typed lists; the keyword searches start first, so
+        # they run while the vector batch is scored.
+        keyword_search = asyncio.gather(*(
+            self.storage.alexical_search(query, k=depth, filters=query_filters)
+            for query, depth, query_filters in zip(queries, depths, filters, strict=False)
+        ))
+        try:
+            vector_results = await self.storage.asearch_many(query_embeddings, depths, filters)
+        except BaseException:
+            keyword_search.cancel()
+            raise
+        keyword_results = await keyword_search
+        return [
+            reciprocal_rank_fusion([ranked, keyword], k_i, self.rrf_k)
+            for ranked, keyword, k_i in zip(vector_results, keyword_results, k, strict=False)
+        ]
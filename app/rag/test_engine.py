@@ -10,7 +10,7 @@ async def test_rag_engine_query():
     
     # Mock retrieval
     chunk = RetrievedChunk(text="Context text", score=0.9, metadata={"title": "Title", "url": "http://url.com"})
-    mock_retriever.retrieve.return_value = [chunk]
+    mock_retriever.aretrieve = AsyncMock(return_value=[chunk])
     
     # Mock LLM generation
     mock_llm.generate = AsyncMock(return_value="Answer")
@@ -23,7 +23,7 @@ async def test_rag_engine_query():
     assert len(response.sources) == 1
     assert response.sources[0] == chunk
     
-    mock_retriever.retrieve.assert_called_with("Question", k=5, filters=None)
+    mock_retriever.aretrieve.assert_called_with("Question", k=5, filters=None)
     mock_llm.generate.assert_called_once()
     
     # Check prompt context formatting
@@ -37,7 +37,7 @@ async def test_rag_engine_query_no_results():
     mock_retriever = MagicMock()
     mock_llm = MagicMock()
     
-    mock_retriever.retrieve.return_value = []
+    mock_retriever.aretrieve = AsyncMock(return_value=[])
     
     engine = RAGEngine(mock_retriever, mock_llm)
     response = await engine.query("Question")
@@ -52,7 +52,7 @@ async def test_rag_engine_stream():
     mock_llm = MagicMock()
     
     chunk = RetrievedChunk(text="Context", score=0.9, metadata={})
-    mock_retriever.retrieve.return_value = [chunk]
+    mock_retriever.aretrieve = AsyncMock(return_value=[chunk])
     
     async def mock_stream(*args):
         yield "Part 1"
@@ -1,7 +1,24 @@
-from unittest.mock import MagicMock
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
 from app.rag.retriever import Retriever
 from app.storage.base import RetrievedChunk
 
+
+def _async_storage():
+    """A mock store whose async methods call its sync mocks inline."""
+    storage = MagicMock()
+
+    async def run_blocking(fn, *args, timeout_s=None, **kwargs):
+        return fn(*args, **kwargs)
+
+    storage.run_blocking = run_blocking
+    storage.asearch = AsyncMock(side_effect=storage.search)
+    storage.asearch_many = AsyncMock(side_effect=storage.search_many)
+    storage.alexical_search = AsyncMock(side_effect=storage.lexical_search)
+    return storage
+
 def test_retrieve_basic():
     mock_storage = MagicMock()
     mock_embedder = MagicMock()
@@ -43,3 +60,163 @@ def test_retrieve_empty_query():
     assert results == []
     mock_embedder.embed_single.assert_not_called()
     mock_storage.search.assert_not_called()
+
+def test_retrieve_uses_query_cache():
+    from app.embeddings.cache import QueryEmbeddingCache
+
+    mock_storage = MagicMock()
+    mock_embedder = MagicMock()
+    mock_embedder.model_id = "test-model"
+    mock_embedder.embed_single.return_value = [0.1, 0.2]
+    cache = QueryEmbeddingCache(max_size=4)
+
+    retriever = Retriever(mock_storage, mock_embedder, query_cache=cache)
+    retriever.retrieve("Test query", k=3)
+    retriever.retrieve("test   query", k=3)
+
+    mock_embedder.embed_single.assert_called_once_with("Test query")
+    assert mock_storage.search.call_count == 2
+    mock_storage.search.assert_called_with([0.1, 0.2], k=3, filters=None)
+    assert cache.stats().hits == 1
+
+@pytest.mark.asyncio
+async def test_aretrieve_embeds_through_coalescer_and_cache():
+    from app.embeddings.cache import QueryEmbeddingCache
+
+    mock_storage = _async_storage()
+    mock_embedder = MagicMock()
+    coalescer = MagicMock()
+    coalescer.model_id = "test-model"
+    coalescer.embed = AsyncMock(return_value=[0.3, 0.4])
+    cache = QueryEmbeddingCache(max_size=4)
+
+    retriever = Retriever(mock_storage, mock_embedder, query_cache=cache, coalescer=coalescer)
+    await retriever.aretrieve("Test query", k=2)
+    await retriever.aretrieve("test query", k=2)
+
+    coalescer.embed.assert_awaited_once_with("Test query")
+    mock_embedder.embed_single.assert_not_called()
+    mock_storage.search.assert_called_with([0.3, 0.4], k=2, filters=None)
+
+@pytest.mark.asyncio
+async def test_aretrieve_without_coalescer_uses_embedder():
+    mock_storage = _async_storage()
+    mock_embedder = MagicMock()
+    mock_embedder.embed_single.return_value = [0.1]
+
+    retriever = Retriever(mock_storage, mock_embedder)
+    await retriever.aretrieve("query")
+
+    mock_embedder.embed_single.assert_called_once_with("query")
+    mock_storage.asearch.assert_awaited_once_with([0.1], k=5, filters=None)
+    assert await retriever.aretrieve("   ") == []
+
+@pytest.mark.asyncio
+async def test_aretrieve_gives_up_after_its_timeout():
+    mock_storage = _async_storage()
+    mock_embedder = MagicMock()
+    mock_embedder.embed_single.return_value = [0.1]
+    cancelled = asyncio.Event()
+
+    async def slow_search(*args, **kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    mock_storage.asearch = slow_search
+    retriever = Retriever(mock_storage, mock_embedder, timeout_s=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await retriever.aretrieve("query")
+    assert cancelled.is_set()
+
+@pytest.mark.asyncio
+async def test_hybrid_aretrieve_many_searches_off_the_loop_and_fuses():
+    mock_storage = _async_storage()
+    mock_embedder = MagicMock()
+    mock_embedder.embed_batch.return_value = [[0.1], [0.2]]
+    first = RetrievedChunk(text="a", score=0.9, metadata={"chunk_id": "a"})
+    second = RetrievedChunk(text="b", score=0.8, metadata={"chunk_id": "b"})
+    mock_storage.search_many.return_value = [[first], [second]]
+    mock_storage.lexical_search.side_effect = [[second], []]
+
+    retriever = Retriever(mock_storage, mock_embedder, hybrid=True)
+    results = await retriever.aretrieve_many(["q1", " ", "q2"], k=1)
+
+    assert [[r.text for r in found] for found in results] == [["a"], [], ["b"]]
+    mock_embedder.embed_batch.assert_called_once_with(["q1", "q2"])
+    mock_storage.asearch_many.assert_awaited_once_with([[0.1], [0.2]], [4, 4], [None, None])
+    assert mock_storage.alexical_search.await_count == 2
+
+def test_reciprocal_rank_fusion_rewards_chunks_ranked_by_both_lists():
+    from app.rag.retriever import reciprocal_rank_fusion
+
+    def chunk(chunk_id, score):
+        return RetrievedChunk(text=chunk_id, score=score, metadata={"chunk_id": chunk_id})
+
+    vector = [chunk("a", 0.9), chunk("b", 0.8), chunk("c", 0.7)]
+    fused = reciprocal_rank_fusion([vector, [chunk("c", 12.0), chunk("d", 9.0)]], k=4, rrf_k=60)
+
+    assert [c.text for c in fused] == ["c", "a", "b", "d"]
+    assert fused[0].metadata["fused_score"] == pytest.approx(1 / 63 + 1 / 61)
+    # Scores stay cosine similarities; keyword-only hits have none.
+    assert [c.score for c in fused] == [0.7, 0.9, 0.8, None]
+    assert "fused_score" not in vector[2].metadata
+
+def test_hybrid_retrieve_fuses_vector_and_keyword_results():
+    mock_storage = MagicMock()
+    mock_embedder = MagicMock()
+    mock_embedder.embed_single.return_value = [0.1]
+    vector_hit = RetrievedChunk(text="v", score=0.9, metadata={"chunk_id": "v"})
+    keyword_hit = RetrievedChunk(text="kw", score=7.0, metadata={"chunk_id": "kw"})
+    mock_storage.search.return_value = [vector_hit]
+    mock_storage.lexical_search.return_value = [keyword_hit, vector_hit]
+
+    retriever = Retriever(mock_storage, mock_embedder, hybrid=True)
+    results = retriever.retrieve("E1101", k=2, filters={"folder": "Tech"})
+
+    assert [r.text for r in results] == ["v", "kw"]
+    mock_storage.search.assert_called_with([0.1], k=8, filters={"folder": "Tech"})
+    mock_storage.lexical_search.assert_called_with("E1101", k=8, filters={"folder": "Tech"})
+
+def test_retrieve_many_embeds_once_and_searches_the_batch():
+    mock_storage = MagicMock()
+    mock_embedder = MagicMock()
+    mock_embedder.embed_batch.return_value = [[0.1], [0.2]]
+    hit = RetrievedChunk(text="r", score=0.9, metadata={"chunk_id": "r"})
+    mock_storage.search_many.return_value = [[hit], []]
+
+    retriever = Retriever(mock_storage, mock_embedder)
+    results = retriever.retrieve_many(["first", "  ", "second"], k=[2, 3, 4], filters={"folder": "Tech"})
+
+    assert results == [[hit], [], []]
+    mock_embedder.embed_batch.assert_called_once_with(["first", "second"])
+    mock_storage.search_many.assert_called_once_with(
+        [[0.1], [0.2]], [2, 4], [{"folder": "Tech"}, {"folder": "Tech"}]
+    )
+    mock_storage.search.assert_not_called()
+
+def test_retrieve_many_needs_one_k_and_filter_per_query():
+    retriever = Retriever(MagicMock(), MagicMock())
+    with pytest.raises(ValueError, match="one k and one filter per query"):
+        retriever.retrieve_many(["first", "second"], k=[2])
+    with pytest.raises(ValueError, match="one k and one filter per query"):
+        retriever.retrieve_many(["first", "second"], filters=[None])
+
+def test_hybrid_retrieve_many_fuses_each_query():
+    mock_storage = MagicMock()
+    mock_embedder = MagicMock()
+    mock_embedder.embed_batch.return_value = [[0.1], [0.2]]
+    first = RetrievedChunk(text="a", score=0.9, metadata={"chunk_id": "a"})
+    second = RetrievedChunk(text="b", score=0.8, metadata={"chunk_id": "b"})
+    mock_storage.search_many.return_value = [[first], [second]]
+    mock_storage.lexical_search.side_effect = [[second], []]
+
+    retriever = Retriever(mock_storage, mock_embedder, hybrid=True)
+    results = retriever.retrieve_many(["q1", "q2"], k=1)
+
+    assert [[r.text for r in found] for found in results] == [["a"], ["b"]]
+    mock_storage.search_many.assert_called_once_with([[0.1], [0.2]], [4, 4], [None, None])
+    assert mock_storage.lexical_search.call_count == 2
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from app.rag.llm.base import BaseLLM
+
+if TYPE_CHECKING:
+    from app.embeddings.lazy import LazyEmbedder
+
+logger = logging.getLogger(__name__)
+
+# Lifecycle of a model: not_loaded -> loading -> loaded -> warming -> ready,
+# or failed from any step. Loaded models serve requests, warm or not.
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+LOADED = "loaded"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+SERVING_STATES = (LOADED, READY)
+
+
+class ModelStatus:
+    """Thread-safe record of where a model is in its lifecycle, with timings."""
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.state = NOT_LOADED
+        self.error: str | None = None
+        self.seconds: dict[str, float] = {}
+        self._started: dict[str, float] = {}
+
+    def begin(self, state: str) -> None:
+        with self._lock:
+            self.state = state
+            self.error = None
+            self._started[state] = time.perf_counter()
+
+    def finish(self, state: str, next_state: str) -> None:
+        with self._lock:
+            started = self._started.pop(state, None)
+            if started is not None:
+                self.seconds[state] = round(time.perf_counter() - started, 3)
+            self.state = next_state
+
+    def fail(self, error: BaseException) -> None:
+        with self._lock:
+            self.state = FAILED
+            self.error = f"{type(error).__name__}: {error}"
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "error": self.error, "seconds": dict(self.seconds)}
+
+
+llm_status = ModelStatus()
+
+
+async def warm_up_llm(llm: BaseLLM, status: ModelStatus = llm_status) -> None:
+    status.begin(WARMING)
+    try:
+        await llm.warm_up()
+    except Exception as e:  # noqa: BLE001 - recorded on `status`
+        # The API stays up without an LLM; /ready reports why answers will fail.
+        logger.warning(f"LLM warm-up failed: {e}")
+        status.fail(e)
+    else:
+        status.finish(WARMING, READY)
+
+
+async def warm_up_models(embedder: "LazyEmbedder", llm: BaseLLM) -> None:
+    """
+    Load and warm the embedder (in a worker thread, it is CPU-bound) and the
+    LLM concurrently. Failures are recorded on their status, never raised.
+    """
+    await asyncio.gather(asyncio.to_thread(embedder.warm_up), warm_up_llm(llm))
@@ -6,8 +6,8 @@ import json
 
 from app.ingestion.pipeline import ingest_bookmarks
 from app.storage.duckdb_store import DuckDBStore
-from app.embeddings.local_embedder import LocalEmbedder
-from app.dependencies import get_store, get_embedder
+from app.embeddings.base import BaseEmbedder
+from app.dependencies import get_store, get_embedder, get_ingest_pool, serving_embedder
 
 # Simple in-memory task tracker
 tasks: Dict[str, asyncio.Queue[Any]] = {}
@@ -18,7 +18,7 @@ router = APIRouter()
 async def upload_bookmarks(
     file: UploadFile = File(...),
     storage: DuckDBStore = Depends(get_store),
-    embedder: LocalEmbedder = Depends(get_embedder)
+    embedder: BaseEmbedder = Depends(get_embedder)
 ) -> Dict[str, str]:
     content = await file.read()
     html_content = content.decode("utf-8")
@@ -29,15 +29,32 @@ async def upload_bookmarks(
     queue: asyncio.Queue[Any] = asyncio.Queue()
     tasks[task_id] = queue
     
+    # New chunks must match the vectors already stored, which differ from
+    # the configured model's until a re-embedding migration has finished.
+    # Off the event loop: either may load a model or spawn processes.
+    ingest_embedder = await asyncio.to_thread(serving_embedder, storage, embedder)
+    if ingest_embedder is embedder:
+        # Bulk embedding goes to the worker pool when one is configured
+        # (it runs the configured model); the in-process embedder stays
+        # free for queries.
+        pool = await asyncio.to_thread(get_ingest_pool)
+        if pool is not None:
+            ingest_embedder = pool
+
     # Run ingestion in background
-    asyncio.create_task(run_ingestion(task_id, html_content, storage, embedder, queue))
+    asyncio.create_task(run_ingestion(task_id, html_content, storage, ingest_embedder, queue))
     
     return {"task_id": task_id, "message": "Ingestion started"}
 
-async def run_ingestion(task_id: str, html_content: str, storage: DuckDBStore, embedder: LocalEmbedder, queue: asyncio.Queue[Any]) -> None:
+async def run_ingestion(task_id: str, html_content: str, storage: DuckDBStore, embedder: BaseEmbedder, queue: asyncio.Queue[Any]) -> None:
     try:
         async for event in ingest_bookmarks(html_content, storage, embedder):
             await queue.put(event)
+        # An on-disk vector index (HNSW) is written once per upload, and IVF
+        # partitions are retrained once the collection has outgrown them.
+        await asyncio.to_thread(storage.save_index)
+        if await asyncio.to_thread(storage.ivf_needs_rebalance):
+            await asyncio.to_thread(storage.rebalance_ivf)
     except Exception as e:
         await queue.put({"status": "error", "message": str(e)})
     finally:
@@ -6,17 +6,27 @@ from datetime import datetime
 from app.rag.engine import RAGEngine
 from app.storage.duckdb_store import DuckDBStore
 from app.rag.retriever import Retriever
-from app.dependencies import get_store, get_embedder, get_llm
+from app.config import settings
+from app.dependencies import get_store, get_embedder, get_llm, get_query_cache, get_embedding_coalescer, current_embedding_coalescer, serving_embedder
 
 router = APIRouter()
 
 from app.rag.llm.base import BaseLLM
 from app.embeddings.base import BaseEmbedder
+from app.embeddings.cache import QueryEmbeddingCache
+from app.embeddings.coalescer import EmbeddingCoalescer
 
 # --- Dependencies ---
 
-def get_retriever_dep(store: DuckDBStore = Depends(get_store), embedder: BaseEmbedder = Depends(get_embedder)) -> Retriever:
-    return Retriever(store, embedder)
+def get_retriever_dep(
+    store: DuckDBStore = Depends(get_store),
+    embedder: BaseEmbedder = Depends(get_embedder),
+    query_cache: QueryEmbeddingCache | None = Depends(get_query_cache),
+) -> Retriever:
+    embedder = serving_embedder(store, embedder)
+    return Retriever(store, embedder, query_cache, get_embedding_coalescer(embedder),
+                     hybrid=settings.hybrid_search, rrf_k=settings.rrf_k,
+                     timeout_s=settings.retrieval_timeout_s or None)
 
 def get_engine_dep(retriever: Retriever = Depends(get_retriever_dep), llm: BaseLLM = Depends(get_llm)) -> RAGEngine:
     return RAGEngine(retriever, llm)
@@ -30,7 +40,11 @@ class QueryRequest(BaseModel):
 
 class Source(BaseModel):
     text: str
-    score: float
+    # Cosine similarity to the question; with hybrid search the ranking
+    # follows `fused_score`, the reciprocal rank fusion score, and a chunk
+    # only the keyword search found has no similarity (None).
+    score: float | None
+    fused_score: float | None = None
     url: str
     title: str
     folder: str
@@ -46,6 +60,38 @@ class StatsResponse(BaseModel):
     total_chunks: int
     failed_bookmarks: int
 
+class FacetCount(BaseModel):
+    value: str
+    bookmarks: int
+    chunks: int
+
+class FacetsResponse(BaseModel):
+    folders: list[FacetCount]
+    domains: list[FacetCount]
+
+class CacheMetrics(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+    hit_rate: float
+
+class HistogramMetrics(BaseModel):
+    count: int
+    sum: float
+    mean: float
+    buckets: dict[str, int]
+
+class CoalescerMetrics(BaseModel):
+    max_wait_ms: float
+    max_batch_size: int
+    batch_size: HistogramMetrics
+    wait_ms: HistogramMetrics
+
+class MetricsResponse(BaseModel):
+    query_embedding_cache: CacheMetrics | None = None
+    query_embedding_batches: CoalescerMetrics | None = None
+
 # --- Endpoints ---
 
 @router.post("/query", response_model=QueryResponse)
@@ -62,6 +108,7 @@ async def query_endpoint(
             Source(
                 text=s.text,
                 score=s.score,
+                fused_score=s.metadata.get("fused_score"),
                 url=str(s.metadata.get("url", "")),
                 title=str(s.metadata.get("title", "")),
                 folder=str(s.metadata.get("folder", "")),
@@ -72,29 +119,37 @@ async def query_endpoint(
         ]
         
         return QueryResponse(answer=response.answer, sources=sources)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Retrieval timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/stats", response_model=StatsResponse)
 async def stats_endpoint(store: DuckDBStore = Depends(get_store)) -> StatsResponse:
-    # This logic should be in store class ideally
     try:
-        # Count bookmarks
-        res_bm = store.conn.execute("SELECT count(*) FROM bookmarks").fetchone()
-        total_bookmarks = res_bm[0] if res_bm else 0
-        
-        res_fail = store.conn.execute("SELECT count(*) FROM bookmarks WHERE status = 'failed'").fetchone()
-        failed_bookmarks = res_fail[0] if res_fail else 0
-        
-        # Count chunks
-        res_chunks = store.conn.execute("SELECT count(*) FROM chunks").fetchone()
-        total_chunks = res_chunks[0] if res_chunks else 0
-        
-        return StatsResponse(
-            total_bookmarks=total_bookmarks,
-            total_chunks=total_chunks,
-            failed_bookmarks=failed_bookmarks
-        )
+        return StatsResponse(**store.stats())
     except Exception:
         # Tables might not exist yet
         return StatsResponse(total_bookmarks=0, total_chunks=0, failed_bookmarks=0)
+
+@router.get("/facets", response_model=FacetsResponse)
+async def facets_endpoint(store: DuckDBStore = Depends(get_store)) -> FacetsResponse:
+    # Folders and domains with counts, for the filter dropdowns.
+    facets = store.facets()
+    return FacetsResponse(
+        folders=[FacetCount(**f._asdict()) for f in facets["folders"]],
+        domains=[FacetCount(**f._asdict()) for f in facets["domains"]],
+    )
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def metrics_endpoint(
+    query_cache: QueryEmbeddingCache | None = Depends(get_query_cache),
+    coalescer: EmbeddingCoalescer | None = Depends(current_embedding_coalescer),
+) -> MetricsResponse:
+    cache_metrics = None
+    if query_cache is not None:
+        cache_metrics = CacheMetrics(**query_cache.stats().as_dict())
+    batch_metrics = None
+    if coalescer is not None:
+        batch_metrics = CoalescerMetrics(**coalescer.stats())
+    return MetricsResponse(query_embedding_cache=cache_metrics, query_embedding_batches=batch_metrics)
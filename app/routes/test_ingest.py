@@ -22,6 +22,7 @@ async def test_upload_endpoint():
     with patch("app.routes.ingest.get_store") as mock_storage_dep:
         with patch("app.routes.ingest.get_embedder") as mock_embedder_dep:
             mock_storage = MagicMock()
+            mock_storage.embedding_model = None
             mock_embedder = MagicMock()
             mock_storage_dep.return_value = mock_storage
             mock_embedder_dep.return_value = mock_embedder
@@ -28,7 +28,7 @@ async def test_query_endpoint():
             RetrievedChunk(
                 text="Source Text",
                 score=0.9,
-                metadata={"url": "http://test.com", "title": "Test Title"}
+                metadata={"url": "http://test.com", "title": "Test Title", "fused_score": 0.032}
             )
         ]
     )
@@ -48,25 +48,31 @@ async def test_query_endpoint():
         assert data["answer"] == "Test Answer"
         assert len(data["sources"]) == 1
         assert data["sources"][0]["url"] == "http://test.com"
+        assert (data["sources"][0]["score"], data["sources"][0]["fused_score"]) == (0.9, 0.032)
         
         mock_engine.query.assert_called_with("What is test?", k=3, filters=None)
     finally:
         test_app.dependency_overrides = {}
 
+def test_query_endpoint_times_out_with_504():
+    mock_engine = AsyncMock(spec=RAGEngine)
+    mock_engine.query.side_effect = TimeoutError()
+
+    from app.routes.query import get_engine_dep
+    test_app.dependency_overrides[get_engine_dep] = lambda: mock_engine
+
+    try:
+        response = client.post("/query", json={"question": "slow?"})
+
+        assert response.status_code == 504
+    finally:
+        test_app.dependency_overrides = {}
+
 @pytest.mark.asyncio
 async def test_stats_endpoint():
     # Mock store
     mock_store = MagicMock(spec=DuckDBStore)
-    mock_conn = MagicMock()
-    mock_store.conn = mock_conn
-    
-    # Mock execute results
-    # total_bookmarks, failed_bookmarks, total_chunks
-    
-    mock_cursor = MagicMock()
-    # fetchone returns a tuple/row
-    mock_cursor.fetchone.side_effect = [[10], [2], [50]]
-    mock_conn.execute.return_value = mock_cursor
+    mock_store.stats.return_value = {"total_bookmarks": 10, "failed_bookmarks": 2, "total_chunks": 50}
     
     from app.routes.query import get_store
     test_app.dependency_overrides[get_store] = lambda: mock_store
@@ -81,3 +87,71 @@ async def test_stats_endpoint():
         assert data["total_chunks"] == 50
     finally:
         test_app.dependency_overrides = {}
+
+def test_facets_endpoint_lists_folders_and_domains():
+    from app.storage.collection_stats import Facet
+
+    mock_store = MagicMock(spec=DuckDBStore)
+    mock_store.facets.return_value = {
+        "folders": [Facet("Tech", 3, 12), Facet("Tech/Python", 1, 4)],
+        "domains": [Facet("python.org", 1, 4)],
+    }
+
+    from app.routes.query import get_store
+    test_app.dependency_overrides[get_store] = lambda: mock_store
+
+    try:
+        response = client.get("/facets")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["folders"][0] == {"value": "Tech", "bookmarks": 3, "chunks": 12}
+        assert [d["value"] for d in data["domains"]] == ["python.org"]
+    finally:
+        test_app.dependency_overrides = {}
+
+def test_metrics_endpoint_reports_query_cache_stats():
+    from app.embeddings.cache import QueryEmbeddingCache
+    from app.routes.query import get_query_cache, current_embedding_coalescer
+
+    cache = QueryEmbeddingCache(max_size=4)
+    cache.get_or_compute("m", "q", lambda q: [0.1])
+    cache.get_or_compute("m", "q", lambda q: [0.1])
+    test_app.dependency_overrides[get_query_cache] = lambda: cache
+    test_app.dependency_overrides[current_embedding_coalescer] = lambda: None
+
+    try:
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        data = response.json()["query_embedding_cache"]
+        assert data["hits"] == 1
+        assert data["misses"] == 1
+        assert data["hit_rate"] == 0.5
+    finally:
+        test_app.dependency_overrides = {}
+
+def test_metrics_endpoint_reports_query_batch_histograms():
+    from app.embeddings.coalescer import EmbeddingCoalescer
+    from app.routes.query import get_query_cache, current_embedding_coalescer
+
+    coalescer = EmbeddingCoalescer(MagicMock(), max_wait_ms=5, max_batch_size=16)
+    coalescer.batch_sizes.observe(3)
+    coalescer.wait_ms.observe(1.5)
+    test_app.dependency_overrides[get_query_cache] = lambda: None
+    test_app.dependency_overrides[current_embedding_coalescer] = lambda: coalescer
+
+    try:
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["query_embedding_cache"] is None
+        batches = data["query_embedding_batches"]
+        assert batches["max_batch_size"] == 16
+        assert batches["batch_size"]["count"] == 1
+        assert batches["batch_size"]["buckets"]["le_4"] == 1
+        assert batches["wait_ms"]["buckets"]["le_2"] == 1
+    finally:
+        test_app.dependency_overrides = {}
+        coalescer.close()
@@ -1,7 +1,18 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, TypeVar
+from collections.abc import Callable, Sequence
 from datetime import datetime
+import numpy as np
+import numpy.typing as npt
+
+from app.storage.executor import BlockingExecutor
+
+T = TypeVar("T")
+
+# A chunk's vector: either a plain list (legacy callers, tests) or a float32
+# row of the matrix returned by `BaseEmbedder.embed_batch_array`.
+Embedding = list[float] | npt.NDArray[np.float32]
 
 @dataclass
 class Chunk:
@@ -9,36 +20,90 @@ class Chunk:
     bookmark_url: str
     text: str
     chunk_index: int
-    embedding: List[float]
+    embedding: Embedding
     start_char_idx: Optional[int] = None
     end_char_idx: Optional[int] = None
 
+@dataclass
+class BookmarkRecord:
+    url: str
+    title: str
+    folder: str
+    date_added: datetime | None
+    domain: str
+    status: str
+
 @dataclass
 class RetrievedChunk:
     text: str
-    score: float
+    # Cosine similarity to the query; None for a hybrid search hit that
+    # only the keyword search found.
+    score: float | None
     metadata: Dict[str, Any]  # e.g. title, url, date_added
 
+def per_query_arguments(n: int, k: int | Sequence[int],
+                        filters: None | dict[str, Any] | Sequence[dict[str, Any] | None]
+                        ) -> tuple[list[int], list[dict[str, Any] | None]]:
+    """
+    A `k` and a filter for each of `n` queries, from `search_many`-style
+    arguments given once for every query or as a list of one per query.
+    """
+    ks = list(k) if isinstance(k, Sequence) else [k] * n
+    per_query = list(filters) if isinstance(filters, Sequence) else [filters] * n
+    if len(ks) != n or len(per_query) != n:
+        raise ValueError(f"Expected one k and one filter per query ({n} queries)")
+    return ks, per_query
+
 class BaseStorage(ABC):
     """
     Abstract base class for vector storage (DuckDB).
+
+    The storage methods block. Async callers use the `a`-prefixed variants
+    (or `run_blocking`), which run them on `executor` so the event loop is
+    never held up by a query.
     """
+    # Backends size their own; otherwise a default one is made on first use.
+    executor: BlockingExecutor | None = None
 
     @abstractmethod
     def upsert_bookmark(self, url: str, title: str, folder: str, 
-                        date_added: datetime, domain: str, status: str) -> None:
+                        date_added: datetime | None, domain: str, status: str) -> None:
         """
         Insert or update bookmark metadata.
         """
         pass
 
+    def upsert_bookmarks(self, bookmarks: list[BookmarkRecord]) -> None:
+        """
+        Insert or update many bookmarks at once.
+        Backends with a bulk write path should override this; the default
+        simply upserts one record at a time.
+        """
+        for b in bookmarks:
+            self.upsert_bookmark(b.url, b.title, b.folder, b.date_added, b.domain, b.status)
+
     @abstractmethod
-    def store_chunks(self, chunks: List[Chunk]) -> None:
+    def store_chunks(self, chunks: list[Chunk], model_id: str | None = None,
+                     documents: dict[str, str] | None = None) -> None:
         """
-        Store embedded chunks for a bookmark.
+        Store embedded chunks for one or more bookmarks, replacing any chunks
+        previously stored for those bookmarks. `model_id` identifies the
+        embedder that produced the vectors; backends that track it reject
+        vectors from a model other than the one they hold. `documents` maps
+        bookmark URLs to the cleaned text their chunks were cut from (see
+        the chunks' `start_char_idx` / `end_char_idx`), for backends that
+        keep it once and store chunks as offsets into it.
         """
         pass
-    
+
+    def get_document(self, url: str) -> str | None:
+        """
+        The cleaned text stored for a bookmark with its chunks, so it can be
+        re-chunked without fetching it again. Backends that do not keep
+        documents return None.
+        """
+        return None
+
     @abstractmethod
     def get_by_url(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -62,9 +127,57 @@ class BaseStorage(ABC):
         Args:
             query_embedding: The vector of the query.
             k: Number of results to return.
-            filters: Optional dictionary of filters (folder, domain, date range).
+            filters: Optional dictionary of filters: folder, folder_prefix (a folder
+                and its subfolders) and domain, each one value or a list of them,
+                and a date_from / date_to range.
             
         Returns:
             List of RetrievedChunk objects ordered by similarity score.
         """
         pass
+
+    def search_many(self, query_embeddings: Sequence[Sequence[float]], k: int | Sequence[int],
+                    filters: None | dict[str, Any] | Sequence[dict[str, Any] | None] = None
+                    ) -> list[list[RetrievedChunk]]:
+        """
+        `search` for a batch of query vectors, one result list per query.
+        `k` and `filters` apply to every query, or are lists with one entry
+        per query. Backends that can score a batch in one pass over their
+        vectors should override this; the default searches one at a time.
+        """
+        ks, per_query = per_query_arguments(len(query_embeddings), k, filters)
+        return [self.search(list(q), k_i, f) for q, k_i, f in zip(query_embeddings, ks, per_query, strict=False)]
+
+    def lexical_search(self, query: str, k: int,
+                       filters: dict[str, Any] | None = None) -> list[RetrievedChunk]:
+        """
+        Keyword search over chunk text, best match first, with the same
+        `filters` as `search`. Backends without a text index return nothing,
+        leaving hybrid retrieval to vectors alone.
+        """
+        return []
+
+    async def run_blocking(self, fn: Callable[..., T], *args: Any, timeout_s: float | None = None, **kwargs: Any) -> T:
+        """
+        `fn(*args, **kwargs)` on the store's executor. Cancelling the caller
+        (or passing `timeout_s`) interrupts the call's queries.
+        """
+        if self.executor is None:
+            self.executor = BlockingExecutor()
+        return await self.executor.run(fn, *args, timeout_s=timeout_s, **kwargs)
+
+    async def asearch(self, query_embedding: list[float], k: int, filters: dict[str, Any] | None = None,
+                      timeout_s: float | None = None) -> list[RetrievedChunk]:
+        """`search`, off the event loop."""
+        return await self.run_blocking(self.search, query_embedding, k, filters, timeout_s=timeout_s)
+
+    async def asearch_many(self, query_embeddings: Sequence[Sequence[float]], k: int | Sequence[int],
+                           filters: None | dict[str, Any] | Sequence[dict[str, Any] | None] = None,
+                           timeout_s: float | None = None) -> list[list[RetrievedChunk]]:
+        """`search_many`, off the event loop."""
+        return await self.run_blocking(self.search_many, query_embeddings, k, filters, timeout_s=timeout_s)
+
+    async def alexical_search(self, query: str, k: int, filters: dict[str, Any] | None = None,
+                              timeout_s: float | None = None) -> list[RetrievedChunk]:
+        """`lexical_search`, off the event loop."""
+        return await self.run_blocking(self.lexical_search, query, k, filters, timeout_s=timeout_s)
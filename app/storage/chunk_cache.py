@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from typing import Any, NamedTuple
+
+# Recently returned chunks (text and metadata) kept in memory for the next search.
+DEFAULT_HYDRATION_CACHE_SIZE = 4096
+
+
+class CachedChunk(NamedTuple):
+    """A chunk's text and bookmark metadata, as a search returns them."""
+    text: str
+    url: str
+    title: str
+    folder: str
+    date_added: Any
+    domain: str
+
+
+class ChunkCache:
+    """
+    Bounded, thread-safe LRU of recently hydrated chunks keyed by chunk ID,
+    so a search whose winners were returned recently skips the lookup of
+    their text and metadata. `max_size` 0 disables it.
+
+    Writers must `discard` what they change. A reader takes a `generation`
+    before its lookup and passes it to `put_many`; if anything was discarded
+    in between, its rows may predate that write and are not cached.
+    """
+    def __init__(self, max_size: int = DEFAULT_HYDRATION_CACHE_SIZE):
+        if max_size < 0:
+            raise ValueError("max_size must not be negative")
+        self.max_size = max_size
+        self._entries: OrderedDict[str, CachedChunk] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get_many(self, chunk_ids: Sequence[str]) -> dict[str, CachedChunk]:
+        """The cached chunks among `chunk_ids`, marked as recently used."""
+        found: dict[str, CachedChunk] = {}
+        with self._lock:
+            for chunk_id in chunk_ids:
+                chunk = self._entries.get(chunk_id)
+                if chunk is not None:
+                    self._entries.move_to_end(chunk_id)
+                    found[chunk_id] = chunk
+        return found
+
+    def put_many(self, chunks: dict[str, CachedChunk], generation: int) -> None:
+        """Cache `chunks`, unless something was discarded since `generation`."""
+        if not self.max_size:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            for chunk_id, chunk in chunks.items():
+                self._entries[chunk_id] = chunk
+                self._entries.move_to_end(chunk_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, chunk_ids: Iterable[str]) -> None:
+        """Drop the given chunks (e.g. rewritten or deleted ones)."""
+        with self._lock:
+            self._generation += 1
+            for chunk_id in chunk_ids:
+                self._entries.pop(chunk_id, None)
+
+    def discard_bookmarks(self, urls: Iterable[str]) -> None:
+        """Drop every chunk of the given bookmarks (e.g. after a metadata change)."""
+        changed = set(urls)
+        with self._lock:
+            self._generation += 1
+            for chunk_id in [i for i, chunk in self._entries.items() if chunk.url in changed]:
+                del self._entries[chunk_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
@@ -0,0 +1,102 @@
+import threading
+from collections.abc import Mapping, Sequence
+from typing import NamedTuple
+
+# Bookmark status that counts as a failure (see the pipeline).
+FAILED_STATUS = "failed"
+
+
+class Facet(NamedTuple):
+    """A folder or domain, with how many bookmarks and chunks it holds."""
+    value: str
+    bookmarks: int
+    chunks: int
+
+
+class _Bookmark(NamedTuple):
+    folder: str | None
+    domain: str | None
+    failed: bool
+    chunks: int
+
+
+class CollectionStats:
+    """
+    Running counts of a store's bookmarks, failed bookmarks and chunks, in
+    total and per folder and per domain, updated by each write so that
+    reading them never touches the database.
+
+    Every bookmark's folder, domain, status and chunk count is remembered,
+    so a write only moves its own bookmarks between counters. `facets()`
+    builds its sorted lists once per change and hands the same ones to
+    every reader until the next write.
+    """
+    def __init__(self) -> None:
+        self._bookmarks: dict[str, _Bookmark] = {}
+        self._failed = 0
+        self._chunks = 0
+        # Per folder / domain: [bookmarks, chunks].
+        self._folders: dict[str, list[int]] = {}
+        self._domains: dict[str, list[int]] = {}
+        self._facets: dict[str, list[Facet]] | None = None
+        self._lock = threading.Lock()
+
+    def set_bookmarks(self, urls: Sequence[str], folders: Sequence[str | None],
+                      domains: Sequence[str | None], statuses: Sequence[str | None]) -> None:
+        """Record (or update) bookmarks' folder, domain and status."""
+        with self._lock:
+            for url, folder, domain, status in zip(urls, folders, domains, statuses, strict=False):
+                old = self._bookmarks.get(url)
+                chunks = 0 if old is None else old.chunks
+                self._replace(url, old, _Bookmark(folder, domain, status == FAILED_STATUS, chunks))
+
+    def set_chunk_counts(self, counts: Mapping[str, int]) -> None:
+        """Set how many chunks the given bookmarks now have (a rewrite replaces them all)."""
+        with self._lock:
+            for url, chunks in counts.items():
+                old = self._bookmarks.get(url)
+                if old is not None:
+                    self._replace(url, old, old._replace(chunks=chunks))
+
+    def totals(self) -> dict[str, int]:
+        """Counts of bookmarks, failed bookmarks and chunks."""
+        with self._lock:
+            return {
+                "total_bookmarks": len(self._bookmarks),
+                "failed_bookmarks": self._failed,
+                "total_chunks": self._chunks,
+            }
+
+    def facets(self) -> dict[str, list[Facet]]:
+        """Every folder and every domain with its counts, by name (read-only lists)."""
+        with self._lock:
+            if self._facets is None:
+                self._facets = {
+                    "folders": self._sorted(self._folders),
+                    "domains": self._sorted(self._domains),
+                }
+            return self._facets
+
+    def _replace(self, url: str, old: _Bookmark | None, new: _Bookmark) -> None:
+        if old is not None:
+            self._count(old, -1)
+        self._count(new, 1)
+        self._bookmarks[url] = new
+        self._facets = None
+
+    def _count(self, bookmark: _Bookmark, sign: int) -> None:
+        self._failed += sign * bookmark.failed
+        self._chunks += sign * bookmark.chunks
+        for counters, value in ((self._folders, bookmark.folder), (self._domains, bookmark.domain)):
+            if not value:
+                continue
+            counts = counters.setdefault(value, [0, 0])
+            counts[0] += sign
+            counts[1] += sign * bookmark.chunks
+            if not counts[0]:
+                del counters[value]
+
+    @staticmethod
+    def _sorted(counters: dict[str, list[int]]) -> list[Facet]:
+        return [Facet(value, *counts) for value, counts in sorted(counters.items())]
+
@@ -0,0 +1,128 @@
+import contextlib
+import queue
+import threading
+from collections.abc import Iterator
+
+import duckdb
+
+from app.storage.executor import current_cancel_scope
+
+# Read cursors a store keeps open; further concurrent readers wait for one.
+DEFAULT_READ_CONNECTIONS = 4
+
+
+class ConnectionPool:
+    """
+    The connections of one DuckDB database, for use from many threads. A
+    DuckDB connection must not be used by two threads at once, but cursors
+    (further connections to the same database) are independent and run
+    their queries in parallel, each statement reading the latest committed
+    state.
+
+    - `writer` is the one connection that writes. `write()` holds it for a
+      series of autocommit statements, `transaction()` wraps them in
+      BEGIN / COMMIT (ROLLBACK on error); both are re-entrant, and
+      writers queue behind each other.
+    - `read()` lends one of `read_connections` cursors for autocommit
+      reads; a reader never waits for a writer, nor sees its uncommitted
+      changes. Inside a `BlockingExecutor` call the cursor is registered
+      with the call's cancel scope, so cancelling the call interrupts its
+      query.
+    - `cursor()` opens a dedicated connection for a long-running job that
+      manages its own transactions (migrations, IVF rebalancing).
+
+    `catalog` is the attached database cursors must `USE`, if the writer
+    attached one rather than opening it.
+    """
+    def __init__(self, writer: duckdb.DuckDBPyConnection, read_connections: int = DEFAULT_READ_CONNECTIONS,
+                 catalog: str | None = None):
+        if read_connections < 1:
+            raise ValueError("read_connections must be at least 1")
+        self.writer = writer
+        self.read_connections = read_connections
+        self.catalog = catalog
+        self._write_lock = threading.RLock()
+        # Nesting of `transaction()` blocks on the writer.
+        self._depth = 0
+        # Opened up front: cursors are made from the writer, which is not
+        # to be touched while another thread writes.
+        self._readers = [self.cursor() for _ in range(read_connections)]
+        self._idle: queue.LifoQueue[duckdb.DuckDBPyConnection] = queue.LifoQueue()
+        for reader in self._readers:
+            self._idle.put(reader)
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """A new connection to the database, owned by the caller."""
+        with self._write_lock:
+            cursor = self.writer.cursor()
+        if self.catalog is not None:
+            # Cursors start in the default catalog, not the attached one.
+            cursor.execute(f"USE {self.catalog}")
+        return cursor
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Borrow a read cursor; results must be consumed before the block ends."""
+        scope = current_cancel_scope()
+        cursor = self._idle.get()
+        try:
+            if scope is None:
+                yield cursor
+            else:
+                with scope.attach(cursor):
+                    yield cursor
+        finally:
+            self._idle.put(cursor)
+
+    @contextlib.contextmanager
+    def snapshot(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Borrow a read cursor inside one transaction, so all its queries see the same state."""
+        with self.read() as cursor:
+            cursor.begin()
+            try:
+                yield cursor
+            finally:
+                # Nothing to commit; an interrupted query may have ended the transaction already.
+                with contextlib.suppress(duckdb.TransactionException):
+                    cursor.rollback()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Hold the writer for autocommit statements."""
+        with self._write_lock:
+            yield self.writer
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Hold the writer for one transaction, committed when the block exits
+        and rolled back if it raises. Nested blocks join the outer one.
+        """
+        with self._write_lock:
+            # Only the thread holding the lock changes the depth.
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self.writer
+                finally:
+                    self._depth -= 1
+                return
+            self._depth = 1
+            try:
+                self.writer.begin()
+                yield self.writer
+                self.writer.commit()
+            except BaseException:
+                # The transaction is already gone if the commit itself failed.
+                with contextlib.suppress(duckdb.TransactionException):
+                    self.writer.rollback()
+                raise
+            finally:
+                self._depth = 0
+
+    def close(self) -> None:
+        """Close the read cursors and the writer."""
+        with self._write_lock:
+            for reader in self._readers:
+                reader.close()
+            self.writer.close()
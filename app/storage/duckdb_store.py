@@ -1,17 +1,349 @@
+import contextlib
+import threading
+from collections import Counter
+import time
 import duckdb
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
 from typing import List, Optional, Dict, Any
+from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
-from app.storage.base import BaseStorage, Chunk, RetrievedChunk
+from app.storage.base import BaseStorage, BookmarkRecord, Chunk, RetrievedChunk, per_query_arguments
+from app.storage.chunk_cache import DEFAULT_HYDRATION_CACHE_SIZE, CachedChunk, ChunkCache
+from app.storage.collection_stats import CollectionStats, Facet
+from app.storage.connections import DEFAULT_READ_CONNECTIONS, ConnectionPool
+from app.storage.documents import decode_document, encode_document, is_span
+from app.storage.executor import BlockingExecutor
+from app.storage.filter_index import FOLDER_SEPARATOR, FilterIndex
+from app.storage.hnsw_index import HNSWIndex, HNSWParams
+from app.storage.ivf import assign_partitions, default_lists, nearest_partitions, train_centroids
+from app.storage.lexical_index import BM25Index
+from app.storage.planner import FETCH_LIMIT, SearchPlan, SearchPlanner
+from app.storage.quantized_index import DEFAULT_RERANK_FACTOR, QUANTIZATIONS, QuantizedVectorIndex
+from app.storage.vector_index import BaseVectorIndex, VectorIndex, normalize_rows, top_k
 import os
+import re
+
+# Vectors from the model a migration is moving to, keyed by chunk_id, until
+# `switch_embedding_model` swaps them into `chunks`.
+REEMBED_TABLE = "chunk_embeddings_next"
+
+# Model ID given to chunks written before model tagging existed. Their real
+# model is unknown: the first model to write does not claim them, but one of
+# the same width can be adopted (`adopt_untagged_chunks`), or a re-embedding
+# migration replaces them.
+UNTAGGED_MODEL = "untagged"
+
+# Where `search` finds nearest neighbours: "numpy" keeps an exact in-memory
+# `VectorIndex` of all embeddings; "int8" and "binary" a quantized copy,
+# re-ranked against the table's full vectors; "hnsw" an approximate
+# `HNSWIndex`, saved next to the database file; "duckdb" scans the chunks
+# table in SQL, and "ivf" scans only the k-means partitions of it nearest
+# to the query.
+VECTOR_INDEXES = ("duckdb", "numpy", "hnsw", "ivf") + QUANTIZATIONS
+# Backends that search in SQL and keep no in-process index.
+SQL_INDEXES = ("duckdb", "ivf")
+
+# With "ivf" the database is opened with row groups this small (DuckDB's
+# default is 122,880 rows), so zone maps on partition_id can skip the
+# partitions a query does not probe.
+IVF_ROW_GROUP_SIZE = 2048
+# Partitions nearest to the query that an "ivf" search scans.
+DEFAULT_IVF_NPROBE = 8
+# Below this many chunks a full scan is cheap enough not to partition.
+IVF_MIN_TRAIN_ROWS = 10_000
+
+# Bookmark columns (and their types) copied into every chunk row, so
+# search never joins.
+CHUNK_BOOKMARK_COLUMNS = {"title": "TEXT", "folder": "TEXT", "date_added": "TIMESTAMP", "domain": "TEXT"}
+
+# Embeddings fetched per query when catching a saved index up with the table.
+_SYNC_BATCH = 10_000
+# Rows per Arrow batch when a batched search streams embeddings out of SQL.
+_STREAM_BATCH = 65_536
+# Documents per Arrow batch when the text index is built from them.
+_DOCUMENT_BATCH = 256
+
+
+def _embedding_matrix(chunks: list[Chunk]) -> npt.NDArray[np.float32]:
+    """
+    Stack chunk embeddings into one C-contiguous (n, dim) float32 matrix.
+    Rows that are already float32 arrays are copied buffer-to-buffer.
+    """
+    matrix = np.ascontiguousarray(np.stack([np.asarray(c.embedding, dtype=np.float32) for c in chunks]))
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected one 1-D embedding per chunk, got shape {matrix.shape}")
+    return matrix
+
+
+def _chunks_to_arrow(chunks: list[Chunk], matrix: npt.NDArray[np.float32] | None = None,
+                     partitions: npt.NDArray[np.int32] | None = None,
+                     texts: list[str | None] | None = None) -> pa.Table:
+    """
+    Build an Arrow table matching the `chunks` columns. The embedding column
+    is a FixedSizeList view over the flattened matrix (zero-copy), which
+    DuckDB reads directly as FLOAT[dim]. Without `partitions`, partition_id
+    is NULL; `texts` replaces the chunks' own (None for a chunk stored as
+    offsets into its document).
+    """
+    if matrix is None:
+        matrix = _embedding_matrix(chunks)
+    embeddings = pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), matrix.shape[1])
+    return pa.table({
+        "chunk_id": pa.array([c.chunk_id for c in chunks], type=pa.string()),
+        "bookmark_url": pa.array([c.bookmark_url for c in chunks], type=pa.string()),
+        "chunk_text": pa.array([c.text for c in chunks] if texts is None else texts, type=pa.string()),
+        "chunk_index": pa.array([c.chunk_index for c in chunks], type=pa.int32()),
+        "start_char_idx": pa.array([c.start_char_idx for c in chunks], type=pa.int32()),
+        "end_char_idx": pa.array([c.end_char_idx for c in chunks], type=pa.int32()),
+        "embedding": embeddings,
+        "partition_id": (
+            pa.nulls(len(chunks), type=pa.int32()) if partitions is None
+            else pa.array(partitions, type=pa.int32())
+        ),
+    })
+
+
+def _documents_to_arrow(documents: dict[str, str], compress: bool) -> pa.Table:
+    """Build an Arrow table matching the `documents` columns."""
+    return pa.table({
+        "url": pa.array(list(documents), type=pa.string()),
+        "body": pa.array([encode_document(text, compress) for text in documents.values()], type=pa.binary()),
+        "compressed": pa.array([compress] * len(documents), type=pa.bool_()),
+    })
+
+
+def _chunk_texts(conn: duckdb.DuckDBPyConnection,
+                 rows: Sequence[tuple[str | None, str, int | None, int | None]]) -> list[str]:
+    """
+    The text of each (chunk_text, bookmark_url, start_char_idx, end_char_idx)
+    row: its own, or else its span of the bookmark's document, with each
+    document read (by URL, FETCH_LIMIT at a time) and decoded once.
+    """
+    urls = list({url for text, url, _, _ in rows if text is None})
+    documents: dict[str, str] = {}
+    for first in range(0, len(urls), FETCH_LIMIT):
+        found = conn.execute(
+            "SELECT url, body, compressed FROM documents WHERE url = ANY(?)", [urls[first:first + FETCH_LIMIT]]
+        ).fetchall()
+        documents.update((str(url), decode_document(body, bool(compressed))) for url, body, compressed in found)
+    return [
+        text if text is not None else documents.get(url, "")[start or 0:end or 0]
+        for text, url, start, end in rows
+    ]
+
+
+def _bookmarks_to_arrow(bookmarks: list[BookmarkRecord]) -> pa.Table:
+    """
+    Build an Arrow table matching the `bookmarks` columns. Later records for
+    the same URL win, exactly as a sequence of single upserts would, since
+    DuckDB rejects an ON CONFLICT batch that touches one key twice.
+    """
+    latest = list({b.url: b for b in bookmarks}.values())
+    return pa.table({
+        "url": pa.array([b.url for b in latest], type=pa.string()),
+        "title": pa.array([b.title for b in latest], type=pa.string()),
+        "folder": pa.array([b.folder for b in latest], type=pa.string()),
+        "date_added": pa.array([b.date_added for b in latest]),
+        "domain": pa.array([b.domain for b in latest], type=pa.string()),
+        "status": pa.array([b.status for b in latest], type=pa.string()),
+    })
+
+
+def _any_of(value: Any) -> list[Any]:
+    """A filter value as a list of accepted values: one value, or a list of them."""
+    return list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+
+
+def _filter_clauses(filters: dict[str, Any] | None) -> tuple[list[str], list[Any]]:
+    """
+    WHERE clauses (over `chunks c`) and their parameters for search
+    filters. `folder`, `folder_prefix` and `domain` take a value or a list
+    of values (any of which matches); `folder_prefix` also matches
+    subfolders.
+    """
+    where_clauses: list[str] = []
+    params: list[Any] = []
+    if filters:
+        if "folder" in filters:
+            where_clauses.append("c.folder = ANY(?)")
+            params.append(_any_of(filters["folder"]))
+        if "folder_prefix" in filters:
+            prefixes = _any_of(filters["folder_prefix"])
+            where_clauses.append("(" + (" OR ".join(
+                ["(c.folder = ? OR starts_with(c.folder, ?))"] * len(prefixes)
+            ) or "FALSE") + ")")
+            for prefix in prefixes:
+                params.extend([prefix, prefix + FOLDER_SEPARATOR])
+        if "domain" in filters:
+            where_clauses.append("c.domain = ANY(?)")
+            params.append(_any_of(filters["domain"]))
+        if "date_from" in filters:
+            where_clauses.append("c.date_added >= ?")
+            params.append(filters["date_from"])
+        if "date_to" in filters:
+            where_clauses.append("c.date_added <= ?")
+            params.append(filters["date_to"])
+    return where_clauses, params
+
+
+def _copy_bookmark_columns(conn: duckdb.DuckDBPyConnection, source: str, params: list[Any]) -> None:
+    """
+    Refresh the bookmark columns copied into `chunks` from the bookmarks
+    selected by `source` ("bookmarks WHERE ..."), in the caller's
+    transaction. Chunks already up to date are not rewritten.
+    """
+    columns = CHUNK_BOOKMARK_COLUMNS
+    conn.execute(f"""
+    UPDATE chunks SET {", ".join(f"{column} = b.{column}" for column in columns)}
+    FROM (SELECT url, {", ".join(columns)} FROM {source}) b
+    WHERE chunks.bookmark_url = b.url
+      AND ({" OR ".join(f"chunks.{column} IS DISTINCT FROM b.{column}" for column in columns)})
+    """, params)
+
+
+def _put_meta(conn: duckdb.DuckDBPyConnection, key: str, value: str) -> None:
+    conn.execute(
+        "INSERT INTO store_meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value",
+        [key, value],
+    )
+
+
+def _rebuild_chunks(conn: duckdb.DuckDBPyConnection, select_sql: str, params: list[Any],
+                    dimension: int | None = None) -> None:
+    """
+    Replace `chunks` with the rows of `select_sql`, in the caller's
+    transaction. The table is recreated from its live definition, so
+    constraints and any columns added since are kept; `dimension` changes
+    the vector width.
+    """
+    ddl_row = conn.execute("SELECT sql FROM duckdb_tables() WHERE table_name = 'chunks'").fetchone()
+    ddl = re.sub(r"^CREATE TABLE chunks\(", "CREATE TABLE chunks_next(", str(ddl_row[0]) if ddl_row else "")
+    if dimension is not None:
+        ddl = re.sub(r"\bembedding FLOAT\[\d*\]", f"embedding FLOAT[{dimension}]", ddl)
+    conn.execute(ddl)
+    conn.execute(f"INSERT INTO chunks_next {select_sql}", params)
+    conn.execute("DROP TABLE chunks")
+    conn.execute("ALTER TABLE chunks_next RENAME TO chunks")
+
+
+def _connect(db_path: str, row_group_size: int | None = None) -> duckdb.DuckDBPyConnection:
+    """Open `db_path`; a row group size needs it attached (as `store`) rather than opened."""
+    if row_group_size is None:
+        return duckdb.connect(db_path)
+    conn = duckdb.connect()
+    path = db_path.replace("'", "''")
+    conn.execute(f"ATTACH '{path}' AS store (ROW_GROUP_SIZE {int(row_group_size)})")
+    conn.execute("USE store")
+    return conn
+
 
 class DuckDBStore(BaseStorage):
-    def __init__(self, db_path: str = ":memory:"):
+    """
+    DuckDB-backed store. The embedding width is not fixed by the schema:
+    it is taken from `dimension` if given, else from the first vectors
+    written, and recorded in `store_meta` so later writes and searches with
+    a differently sized model fail loudly instead of mixing vector spaces.
+
+    Likewise each chunk is tagged with the ID of the model that embedded it,
+    and the store's model (`embedding_model`) only changes through a
+    re-embedding migration: `begin_reembedding`, then `pending_reembedding`
+    / `store_reembedded` until nothing is pending, then
+    `switch_embedding_model`, which swaps the new vectors in atomically.
+    Searches keep using the old vectors until then.
+
+    With `vector_index="numpy"` (the default) searches are answered from an
+    in-memory `VectorIndex` loaded at `initialize` and kept in step with
+    every write; DuckDB then only fetches text and metadata for the winners.
+    `vector_index="hnsw"` does the same with an approximate HNSW graph
+    (`hnsw_params`), persisted at `<db_path>.hnsw` so it is not rebuilt on
+    every start: `save_index` writes it, and on open it is caught up with
+    any writes it missed. `vector_index="int8"` or `"binary"` keep only
+    quantized codes in memory and re-score the best `k * rerank_factor`
+    against the full-precision vectors in `chunks`.
+
+    `vector_index="ivf"` keeps search in SQL but partitions `chunks` by
+    k-means centroid (`partition_id`): `rebalance_ivf` trains the centroids
+    and rewrites the table clustered by partition, later writes are assigned
+    to the nearest centroid, and a query scans only the `ivf_nprobe`
+    partitions nearest to it. Until trained, it is a full scan.
+
+    A `FilterIndex` of bookmark folders, domains and dates gives each
+    search's filter selectivity, from which a `SearchPlanner` picks the
+    cheapest strategy: e.g. scoring only the filter's chunks, or searching
+    everything and filtering afterwards when the filter keeps most of them.
+
+    With `text_index=True`, a `BM25Index` over chunk texts is kept as well,
+    for `lexical_search` (exact terms, names, error codes).
+
+    Chunks overlap, so their text is not stored with them: `store_chunks`
+    is given each bookmark's cleaned text, kept once in `documents`
+    (zlib-compressed with `compress_documents`), and a chunk that is a span
+    of it stores only its character offsets. Text is sliced back out when a
+    chunk is returned. Chunks without a document (or older ones) keep
+    their own text.
+
+    `stats` and `facets` read `CollectionStats`, counts of bookmarks and
+    chunks (per folder and domain too) that every write keeps current.
+
+    The store is safe to share between threads. Reads borrow a cursor from
+    a `ConnectionPool` of `read_connections`, so they run in parallel with
+    each other and with writes, which all go through the one writer
+    connection (`conn`) in transactions; a write updates the in-memory
+    indexes before the next one starts. The async methods run on an
+    executor with one thread per read connection, since further threads
+    would only wait for a cursor.
+
+    Every strategy first ranks (chunk_id, score) pairs only; text and
+    metadata are then looked up for the k winners, from an LRU of the last
+    `hydration_cache_size` chunks returned where possible.
+    """
+    def __init__(self, db_path: str = ":memory:", dimension: int | None = None,
+                 vector_index: str = "numpy", hnsw_params: HNSWParams | None = None,
+                 rerank_factor: int = DEFAULT_RERANK_FACTOR,
+                 ivf_lists: int = 0, ivf_nprobe: int = DEFAULT_IVF_NPROBE,
+                 hydration_cache_size: int = DEFAULT_HYDRATION_CACHE_SIZE, text_index: bool = False,
+                 read_connections: int = DEFAULT_READ_CONNECTIONS, compress_documents: bool = True):
+        if vector_index not in VECTOR_INDEXES:
+            raise ValueError(f"Unknown vector_index '{vector_index}', expected one of: {', '.join(VECTOR_INDEXES)}")
         self.db_path = db_path
         if db_path != ":memory:":
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.conn = duckdb.connect(db_path)
-        
+        ivf = vector_index == "ivf"
+        self.connections = ConnectionPool(
+            _connect(db_path, IVF_ROW_GROUP_SIZE if ivf else None), read_connections, "store" if ivf else None,
+        )
+        # The writer; reads go through `connections.read()`.
+        self.conn = self.connections.writer
+        self.executor: BlockingExecutor = BlockingExecutor(read_connections, name="duckdb-store")
+        self._requested_dimension = dimension
+        self.dimension: int | None = None
+        self.embedding_model: str | None = None
+        self.reembedding_model: str | None = None
+        # One cursor per background thread; `close` closes them all.
+        self._background = threading.local()
+        self._background_cursors: list[duckdb.DuckDBPyConnection] = []
+        self._background_lock = threading.Lock()
+        self.vector_index = vector_index
+        self.hnsw_params = hnsw_params or HNSWParams()
+        self.rerank_factor = rerank_factor
+        self.index: BaseVectorIndex | None = None
+        self.filter_index: FilterIndex | None = None
+        self.planner = SearchPlanner()
+        self.ivf_lists = ivf_lists
+        self.ivf_nprobe = ivf_nprobe
+        self.centroids: np.ndarray | None = None
+        self.chunk_cache = ChunkCache(hydration_cache_size)
+        self.text_index = text_index
+        self.lexical_index: BM25Index | None = None
+        self.compress_documents = compress_documents
+        self.collection_stats = CollectionStats()
+        # Held while partition IDs are assigned and written, so a write can't
+        # use centroids that a concurrent rebalance is replacing.
+        self._partition_lock = threading.Lock()
+
     def initialize(self) -> None:
         """
         Apply schema.
@@ -24,10 +356,265 @@ class DuckDBStore(BaseStorage):
         with open(schema_path, "r") as f:
             schema_sql = f.read()
             
-        self.conn.execute(schema_sql)
+        with self.connections.write() as conn:
+            conn.execute(schema_sql)
+            # Databases from before model tagging (or IVF) lack the columns.
+            conn.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_model TEXT")
+            conn.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS partition_id INTEGER")
+            conn.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS start_char_idx INTEGER")
+            conn.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS end_char_idx INTEGER")
+        self._migrate_chunk_bookmark_columns()
+        self.embedding_model = self.get_meta("embedding_model")
+        self.reembedding_model = self.get_meta("reembedding_model")
+        if self.embedding_model is None:
+            self._tag_untagged_chunks()
+
+        # Databases created before store_meta existed carry the width only in
+        # the column type; adopt it and record it.
+        self.dimension = self._column_dimension()
+        if self.dimension is not None and self.get_meta("embedding_dimension") is None:
+            self.set_meta("embedding_dimension", str(self.dimension))
+        if self._requested_dimension is not None:
+            self._ensure_dimension(self._requested_dimension)
+        self._load_index()
+        self._load_filter_index()
+        self._load_lexical_index()
+        self._load_collection_stats()
+        self._load_centroids()
+
+    def _migrate_chunk_bookmark_columns(self) -> None:
+        """Add the copied bookmark columns to older databases' chunks and fill them in, once."""
+        if self.get_meta("chunk_bookmark_columns") is not None:
+            return
+        with self.connections.transaction() as conn:
+            for column, column_type in CHUNK_BOOKMARK_COLUMNS.items():
+                conn.execute(f"ALTER TABLE chunks ADD COLUMN IF NOT EXISTS {column} {column_type}")
+            _copy_bookmark_columns(conn, "bookmarks", [])
+            _put_meta(conn, "chunk_bookmark_columns", "1")
+
+    def get_meta(self, key: str) -> str | None:
+        with self.connections.read() as conn:
+            row = conn.execute("SELECT value FROM store_meta WHERE key = ?", [key]).fetchone()
+        return None if row is None else str(row[0])
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.connections.write() as conn:
+            _put_meta(conn, key, value)
+
+    def _column_dimension(self) -> int | None:
+        with self.connections.read() as conn:
+            row = conn.execute("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'chunks' AND column_name = 'embedding'
+            """).fetchone()
+        match = re.fullmatch(r"FLOAT\[(\d+)\]", str(row[0])) if row else None
+        return int(match.group(1)) if match else None
+
+    def _load_index(self) -> None:
+        """
+        (Re)build the index for `search` (reusing a saved one if possible)
+        and bring it in line with the embeddings in `chunks`.
+        """
+        if self.vector_index in SQL_INDEXES or self.dimension is None:
+            self.index = None
+            return
+        index: BaseVectorIndex | None = None
+        if self.vector_index == "hnsw":
+            path = None if self.db_path == ":memory:" else f"{self.db_path}.hnsw"
+            source = self.embedding_model or ""
+            if path is not None:
+                index = HNSWIndex.open(path, self.dimension, self.hnsw_params, source)
+            if index is None:
+                index = HNSWIndex(self.dimension, self.hnsw_params, path, source)
+        elif self.vector_index in QUANTIZATIONS:
+            index = QuantizedVectorIndex(
+                self.dimension, self.vector_index,
+                fetch_vectors=self._lookup_embeddings, rerank_factor=self.rerank_factor,
+            )
+        else:
+            index = VectorIndex(self.dimension)
+        self._sync_index(index)
+        self.index = index
+        self.save_index()
+
+    def _load_filter_index(self) -> None:
+        """Build the filter index from the tables."""
+        self.filter_index = FilterIndex()
+        self._refresh_filter_index()
+        with self.connections.read() as conn:
+            table = conn.execute("SELECT chunk_id, bookmark_url FROM chunks").to_arrow_table()
+        self.filter_index.add_chunks(table.column("chunk_id").to_pylist(), table.column("bookmark_url").to_pylist())
+
+    def _load_lexical_index(self) -> None:
+        """Build the BM25 index over every chunk's text, if `text_index` is on."""
+        if not self.text_index:
+            return
+        self.lexical_index = BM25Index()
+        with self.connections.snapshot() as conn:
+            reader = conn.execute(
+                "SELECT chunk_id, chunk_text FROM chunks WHERE chunk_text IS NOT NULL"
+            ).to_arrow_reader(_SYNC_BATCH)
+            for batch in reader:
+                self.lexical_index.add(batch.column(0).to_pylist(), batch.column(1).to_pylist())
+            # The rest, one document at a time: each is decoded once and sliced.
+            reader = conn.execute("""
+            SELECT d.body, d.compressed, s.chunk_ids, s.starts, s.ends
+            FROM (
+                SELECT bookmark_url, list(chunk_id) AS chunk_ids,
+                       list(start_char_idx) AS starts, list(end_char_idx) AS ends
+                FROM chunks WHERE chunk_text IS NULL GROUP BY bookmark_url
+            ) s JOIN documents d ON d.url = s.bookmark_url
+            """).to_arrow_reader(_DOCUMENT_BATCH)
+            for batch in reader:
+                chunk_ids: list[str] = []
+                texts: list[str] = []
+                for body, compressed, ids, starts, ends in zip(*(column.to_pylist() for column in batch.columns), strict=False):
+                    document = decode_document(body, compressed)
+                    chunk_ids.extend(ids)
+                    texts.extend(document[start:end] for start, end in zip(starts, ends, strict=False))
+                self.lexical_index.add(chunk_ids, texts)
+
+    def _load_collection_stats(self) -> None:
+        """Count bookmarks and their chunks, once, for `stats` and `facets`."""
+        self.collection_stats = CollectionStats()
+        with self.connections.read() as conn:
+            table = conn.execute("""
+            SELECT b.url, b.folder, b.domain, b.status, count(c.chunk_id) AS chunks
+            FROM bookmarks b LEFT JOIN chunks c ON c.bookmark_url = b.url
+            GROUP BY ALL
+            """).to_arrow_table()
+        urls = table.column("url").to_pylist()
+        self.collection_stats.set_bookmarks(
+            urls, table.column("folder").to_pylist(),
+            table.column("domain").to_pylist(), table.column("status").to_pylist(),
+        )
+        self.collection_stats.set_chunk_counts(dict(zip(urls, table.column("chunks").to_pylist(), strict=False)))
+
+    def _refresh_filter_index(self, urls: list[str] | None = None) -> None:
+        """Copy the filterable columns of bookmarks `urls` (default all) into the filter index."""
+        if self.filter_index is None:
+            return
+        query = "SELECT url, folder, domain, date_added FROM bookmarks"
+        params: list[Any] = []
+        if urls is not None:
+            query += " WHERE url = ANY(?)"
+            params.append(urls)
+        with self.connections.read() as conn:
+            table = conn.execute(query, params).to_arrow_table()
+        self.filter_index.set_bookmarks(
+            table.column("url").to_pylist(), table.column("folder").to_pylist(),
+            table.column("domain").to_pylist(), table.column("date_added").to_numpy(),
+        )
+
+    def _sync_index(self, index: BaseVectorIndex) -> None:
+        if len(index) == 0:
+            with self.connections.read() as conn:
+                table = conn.execute("SELECT chunk_id, embedding FROM chunks").to_arrow_table()
+            if table.num_rows:
+                index.add(table.column("chunk_id").to_pylist(), self._arrow_matrix(table))
+            return
+        with self.connections.read() as conn:
+            stored = {str(r[0]) for r in conn.execute("SELECT chunk_id FROM chunks").fetchall()}
+        indexed = set(index.ids)
+        index.remove(list(indexed - stored))
+        missing = sorted(stored - indexed)
+        for start in range(0, len(missing), _SYNC_BATCH):
+            index.add(*self._fetch_embeddings(missing[start:start + _SYNC_BATCH]))
+
+    def _arrow_matrix(self, table: pa.Table) -> npt.NDArray[np.float32]:
+        embeddings = table.column("embedding").combine_chunks()
+        return np.asarray(embeddings.flatten().to_numpy().reshape(-1, self.dimension), dtype=np.float32)
+
+    def _fetch_embeddings(self, chunk_ids: Sequence[str]) -> tuple[list[str], np.ndarray]:
+        """Stored vectors for `chunk_ids`; IDs not in the table are left out."""
+        with self.connections.read() as conn:
+            table = conn.execute(
+                "SELECT chunk_id, embedding FROM chunks WHERE chunk_id = ANY(?)", [list(chunk_ids)]
+            ).to_arrow_table()
+        if not table.num_rows:
+            return [], np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return table.column("chunk_id").to_pylist(), self._arrow_matrix(table)
+
+    def _lookup_embeddings(self, chunk_ids: Sequence[str]) -> tuple[list[str], np.ndarray]:
+        """`_fetch_embeddings` in lookups of FETCH_LIMIT IDs, which DuckDB answers by key."""
+        if len(chunk_ids) <= FETCH_LIMIT:
+            return self._fetch_embeddings(chunk_ids)
+        parts = [self._fetch_embeddings(chunk_ids[i:i + FETCH_LIMIT]) for i in range(0, len(chunk_ids), FETCH_LIMIT)]
+        return [chunk_id for ids, _ in parts for chunk_id in ids], np.concatenate([vectors for _, vectors in parts])
+
+    def save_index(self) -> None:
+        """Persist the search index if it is stored on disk and has unsaved changes."""
+        if self.index is not None and self.index.dirty:
+            self.index.save()
+
+    def _ensure_dimension(self, dimension: int) -> None:
+        """
+        Fix the embedding column to FLOAT[dimension] on first use, or check
+        that `dimension` matches the width the store already has.
+        """
+        if self.dimension is None:
+            # Only reachable while the column is still an untyped, empty list.
+            with self.connections.transaction() as conn:
+                conn.execute(f"ALTER TABLE chunks ALTER COLUMN embedding SET DATA TYPE FLOAT[{int(dimension)}]")
+                _put_meta(conn, "embedding_dimension", str(int(dimension)))
+            self.dimension = int(dimension)
+            self._load_index()
+        elif dimension != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {dimension} does not match this store's {self.dimension}. "
+                "Re-embed into a new database or configure the embedder that built this one."
+            )
+
+    def _tag_untagged_chunks(self) -> bool:
+        """
+        Tag chunks written without a model ID as UNTAGGED_MODEL and make it
+        the store's model, so that a re-embedding migration replaces them.
+        Returns whether there were any.
+        """
+        with self.connections.transaction() as conn:
+            row = conn.execute("SELECT count(*) FROM chunks WHERE embedding_model IS NULL").fetchone()
+            if not row or not row[0]:
+                return False
+            conn.execute("UPDATE chunks SET embedding_model = ? WHERE embedding_model IS NULL", [UNTAGGED_MODEL])
+            _put_meta(conn, "embedding_model", UNTAGGED_MODEL)
+        self.embedding_model = UNTAGGED_MODEL
+        return True
+
+    def adopt_untagged_chunks(self, model_id: str) -> None:
+        """
+        Record untagged chunks (see UNTAGGED_MODEL) as `model_id`'s, keeping
+        their vectors. For when the model that wrote them is known.
+        """
+        if self.embedding_model != UNTAGGED_MODEL:
+            raise ValueError(f"Store is embedded with '{self.embedding_model}', not untagged")
+        with self.connections.transaction() as conn:
+            conn.execute("UPDATE chunks SET embedding_model = ? WHERE embedding_model = ?", [model_id, UNTAGGED_MODEL])
+            _put_meta(conn, "embedding_model", model_id)
+        self.embedding_model = model_id
+        if isinstance(self.index, HNSWIndex):
+            # The same vectors, now under their model's name.
+            self.index.source = model_id
+            self.index.save()
+
+    def _ensure_model(self, model_id: str) -> None:
+        """
+        Record `model_id` as the store's embedding model on first use, or
+        check that it is the model the stored vectors came from. A store
+        holding untagged chunks takes writes from any model until a
+        re-embedding migration switches it to one.
+        """
+        if self.embedding_model is None and not self._tag_untagged_chunks():
+            with self.connections.transaction() as conn:
+                _put_meta(conn, "embedding_model", model_id)
+            self.embedding_model = model_id
+        elif self.embedding_model not in (model_id, UNTAGGED_MODEL):
+            raise ValueError(
+                f"Embeddings from '{model_id}' cannot be mixed with this store's '{self.embedding_model}' "
+                "vectors. Re-embed the store with the new model first."
+            )
 
     def upsert_bookmark(self, url: str, title: str, folder: str, 
-                        date_added: datetime, domain: str, status: str) -> None:
+                        date_added: datetime | None, domain: str, status: str) -> None:
         """
         Insert or update bookmark metadata.
         """
@@ -42,45 +629,370 @@ class DuckDBStore(BaseStorage):
             status = EXCLUDED.status,
             updated_at = now()
         """
-        self.conn.execute(query, [url, title, folder, date_added, domain, status])
+        # Counted before the writer is released, in commit order.
+        with self.connections.write():
+            with self.connections.transaction() as conn:
+                conn.execute(query, [url, title, folder, date_added, domain, status])
+                _copy_bookmark_columns(conn, "bookmarks WHERE url = ?", [url])
+            self.collection_stats.set_bookmarks([url], [folder], [domain], [status])
+        self.chunk_cache.discard_bookmarks([url])
+        self._refresh_filter_index([url])
 
-    def store_chunks(self, chunks: List[Chunk]) -> None:
+    def upsert_bookmarks(self, bookmarks: list[BookmarkRecord]) -> None:
         """
-        Store embedded chunks for a bookmark.
-        First delete existing chunks for this bookmark to avoid duplicates if re-ingesting.
+        Insert or update many bookmarks with a single columnar statement.
+        """
+        if not bookmarks:
+            return
+
+        with self.connections.write() as conn:
+            conn.register("bookmark_batch", _bookmarks_to_arrow(bookmarks))
+            try:
+                with self.connections.transaction():
+                    conn.execute("""
+                    INSERT INTO bookmarks (url, title, folder, date_added, domain, status, updated_at)
+                    SELECT url, title, folder, date_added, domain, status, now() FROM bookmark_batch
+                    ON CONFLICT (url) DO UPDATE SET
+                        title = EXCLUDED.title,
+                        folder = EXCLUDED.folder,
+                        date_added = EXCLUDED.date_added,
+                        domain = EXCLUDED.domain,
+                        status = EXCLUDED.status,
+                        updated_at = now()
+                    """)
+                    _copy_bookmark_columns(conn, "bookmarks WHERE url IN (SELECT url FROM bookmark_batch)", [])
+            finally:
+                conn.unregister("bookmark_batch")
+            self.collection_stats.set_bookmarks(
+                [b.url for b in bookmarks], [b.folder for b in bookmarks],
+                [b.domain for b in bookmarks], [b.status for b in bookmarks],
+            )
+        urls = list({b.url for b in bookmarks})
+        self.chunk_cache.discard_bookmarks(urls)
+        self._refresh_filter_index(urls)
+
+    def store_chunks(self, chunks: list[Chunk], model_id: str | None = None,
+                     documents: dict[str, str] | None = None) -> None:
+        """
+        Store embedded chunks for one or more bookmarks.
+        Existing chunks (and documents) of every bookmark in the batch are
+        deleted first, so re-ingesting never leaves duplicates behind.
+        `documents` maps bookmark URLs to the text their chunks were cut
+        from; a chunk whose offsets reproduce its text stores only those.
         """
         if not chunks:
             return
-            
-        bookmark_url = chunks[0].bookmark_url
-        
-        # Transaction
-        self.conn.begin()
+        documents = documents or {}
+        texts = [
+            None if is_span(documents.get(c.bookmark_url), c.text, c.start_char_idx, c.end_char_idx) else c.text
+            for c in chunks
+        ]
+
+        # Columnar path: the whole batch goes in as one Arrow table, with
+        # embeddings as a fixed-size list over a single float32 buffer, so
+        # no per-float Python objects are created on the way in.
+        matrix = _embedding_matrix(chunks)
+        # The in-memory indexes are updated before the writer is released,
+        # so concurrent writes reach them in the order they committed.
+        with self.connections.write():
+            if model_id is not None:
+                self._ensure_model(model_id)
+            self._ensure_dimension(matrix.shape[1])
+            with self._partition_lock:
+                partitions = None if self.centroids is None else assign_partitions(matrix, self.centroids)
+                replaced = self._write_chunks(
+                    _chunks_to_arrow(chunks, matrix, partitions, texts),
+                    _documents_to_arrow(documents, self.compress_documents), model_id,
+                )
+
+            self.chunk_cache.discard(replaced + [c.chunk_id for c in chunks])
+            if self.index is not None:
+                self.index.remove(replaced)
+                self.index.add([c.chunk_id for c in chunks], matrix)
+            if self.filter_index is not None:
+                self.filter_index.remove_chunks(replaced)
+                self.filter_index.add_chunks([c.chunk_id for c in chunks], [c.bookmark_url for c in chunks])
+            if self.lexical_index is not None:
+                self.lexical_index.remove(replaced)
+                self.lexical_index.add([c.chunk_id for c in chunks], [c.text for c in chunks])
+            self.collection_stats.set_chunk_counts(Counter(c.bookmark_url for c in chunks))
+
+    def _write_chunks(self, batch: pa.Table, documents: pa.Table, model_id: str | None) -> list[str]:
+        """Replace the batch's bookmarks' chunks and documents; returns the chunk IDs removed."""
+        with self.connections.write() as conn:
+            conn.register("chunk_batch", batch)
+            conn.register("document_batch", documents)
+            try:
+                with self.connections.transaction():
+                    rows = conn.execute("""
+                    SELECT chunk_id FROM chunks
+                    WHERE bookmark_url IN (SELECT DISTINCT bookmark_url FROM chunk_batch)
+                    """).fetchall()
+                    replaced = [str(r[0]) for r in rows]
+                    conn.execute("""
+                    DELETE FROM chunks
+                    WHERE bookmark_url IN (SELECT DISTINCT bookmark_url FROM chunk_batch)
+                    """)
+                    conn.execute("""
+                    DELETE FROM documents
+                    WHERE url IN (SELECT bookmark_url FROM chunk_batch UNION SELECT url FROM document_batch)
+                    """)
+                    conn.execute("INSERT INTO documents (url, body, compressed) SELECT * FROM document_batch")
+                    # LEFT JOIN, so a chunk of an unknown bookmark still fails the foreign key.
+                    conn.execute(f"""
+                    INSERT INTO chunks (chunk_id, bookmark_url, chunk_text, chunk_index, start_char_idx, end_char_idx,
+                                        embedding, embedding_model, partition_id, {", ".join(CHUNK_BOOKMARK_COLUMNS)})
+                    SELECT n.chunk_id, n.bookmark_url, n.chunk_text, n.chunk_index, n.start_char_idx, n.end_char_idx,
+                           n.embedding, ?, n.partition_id,
+                           {", ".join(f"b.{column}" for column in CHUNK_BOOKMARK_COLUMNS)}
+                    FROM chunk_batch n LEFT JOIN bookmarks b ON n.bookmark_url = b.url
+                    """, [model_id or self.embedding_model])
+            finally:
+                conn.unregister("chunk_batch")
+                conn.unregister("document_batch")
+        return replaced
+
+    @property
+    def _background_conn(self) -> duckdb.DuckDBPyConnection:
+        # Migrations and rebalancing run on background threads; a connection
+        # of their own keeps their long transactions off the writer, losing
+        # to concurrent ingestion on a write-write conflict instead. Each
+        # thread gets its own, as a cursor is not safe to share between jobs.
+        cursor: duckdb.DuckDBPyConnection | None = getattr(self._background, "cursor", None)
+        if cursor is None:
+            cursor = self.connections.cursor()
+            with self._background_lock:
+                self._background_cursors.append(cursor)
+            self._background.cursor = cursor
+        return cursor
+
+    def begin_reembedding(self, model_id: str, dimension: int) -> None:
+        """
+        Start re-embedding every chunk with `model_id`. Resumes (keeping the
+        vectors already staged) if that migration is already under way;
+        replaces it if a migration to another model was.
+        """
+        conn = self._background_conn
+        if model_id == self.embedding_model:
+            raise ValueError(f"Store is already embedded with '{model_id}'")
+        if model_id == self.reembedding_model and self.get_meta("reembedding_dimension") == str(int(dimension)):
+            return
+        conn.execute(f"DROP TABLE IF EXISTS {REEMBED_TABLE}")
+        conn.execute(f"CREATE TABLE {REEMBED_TABLE} (chunk_id TEXT PRIMARY KEY, embedding FLOAT[{int(dimension)}])")
+        _put_meta(conn, "reembedding_model", model_id)
+        _put_meta(conn, "reembedding_dimension", str(int(dimension)))
+        self.reembedding_model = model_id
+
+    def pending_reembedding(self, limit: int) -> list[tuple[str, str]]:
+        """(chunk_id, text) of up to `limit` chunks the migration has not embedded yet."""
+        conn = self._background_conn
+        # One transaction, so the documents sliced are the ones the offsets point into.
+        conn.begin()
         try:
-            self.conn.execute("DELETE FROM chunks WHERE bookmark_url = ?", [bookmark_url])
-            
-            insert_query = """
-            INSERT INTO chunks (chunk_id, bookmark_url, chunk_text, chunk_index, embedding)
-            VALUES (?, ?, ?, ?, ?)
-            """
-            
-            # Use explicit list comprehension with types
-            data = [
-                (c.chunk_id, c.bookmark_url, c.text, c.chunk_index, c.embedding)
-                for c in chunks
-            ]
-            
-            self.conn.executemany(insert_query, data)
-            self.conn.commit()
+            rows = conn.execute(f"""
+            SELECT c.chunk_id, c.chunk_text, c.bookmark_url, c.start_char_idx, c.end_char_idx FROM chunks c
+            ANTI JOIN {REEMBED_TABLE} n USING (chunk_id)
+            ORDER BY c.chunk_id LIMIT ?
+            """, [limit]).fetchall()
+            texts = _chunk_texts(conn, [row[1:] for row in rows])
+        finally:
+            with contextlib.suppress(duckdb.TransactionException):
+                conn.rollback()
+        return [(str(row[0]), text) for row, text in zip(rows, texts, strict=False)]
+
+    def store_reembedded(self, chunk_ids: list[str], embeddings: npt.NDArray[np.float32]) -> None:
+        """Stage new-model vectors for `chunk_ids` (rows of `embeddings`, in order)."""
+        if not chunk_ids:
+            return
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        batch = pa.table({
+            "chunk_id": pa.array(chunk_ids, type=pa.string()),
+            "embedding": pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), matrix.shape[1]),
+        })
+        conn = self._background_conn
+        conn.register("reembedded_batch", batch)
+        try:
+            conn.execute(f"""
+            INSERT INTO {REEMBED_TABLE} SELECT chunk_id, embedding FROM reembedded_batch
+            ON CONFLICT (chunk_id) DO UPDATE SET embedding = EXCLUDED.embedding
+            """)
+        finally:
+            conn.unregister("reembedded_batch")
+
+    def reembedding_progress(self) -> tuple[int, int]:
+        """(chunks re-embedded, chunks in the store) for the running migration."""
+        with self.connections.read() as conn:
+            try:
+                row = conn.execute(f"""
+                SELECT count(n.chunk_id), count(*) FROM chunks c
+                LEFT JOIN {REEMBED_TABLE} n USING (chunk_id)
+                """).fetchone()
+            except duckdb.CatalogException:
+                # No migration has begun, or its staging table was dropped on switch.
+                return (0, 0)
+        return (int(row[0]), int(row[1])) if row else (0, 0)
+
+    def switch_embedding_model(self) -> bool:
+        """
+        Atomically replace every chunk's vector with its staged one and make
+        the migration's model the store's. Returns False, changing nothing,
+        if chunks were written since the last `pending_reembedding` check
+        (or are being written concurrently).
+        """
+        model_id = self.reembedding_model
+        if model_id is None:
+            raise ValueError("No re-embedding migration is in progress")
+        dimension = int(self.get_meta("reembedding_dimension") or 0)
+        conn = self._background_conn
+
+        conn.begin()
+        try:
+            row = conn.execute(f"SELECT count(*) FROM chunks ANTI JOIN {REEMBED_TABLE} USING (chunk_id)").fetchone()
+            if row and row[0]:
+                conn.rollback()
+                return False
+
+            # IVF centroids belong to the old vector space; the partitions
+            # are retrained on the new vectors by the next rebalance.
+            _rebuild_chunks(conn, f"""
+            SELECT c.* REPLACE (n.embedding AS embedding, ? AS embedding_model, NULL::INTEGER AS partition_id)
+            FROM chunks c JOIN {REEMBED_TABLE} n USING (chunk_id)
+            """, [model_id], dimension)
+            conn.execute("DELETE FROM ivf_centroids")
+            conn.execute("DELETE FROM store_meta WHERE key = 'ivf_trained_rows'")
+            conn.execute(f"DROP TABLE {REEMBED_TABLE}")
+            _put_meta(conn, "embedding_model", model_id)
+            _put_meta(conn, "embedding_dimension", str(dimension))
+            conn.execute("DELETE FROM store_meta WHERE key IN ('reembedding_model', 'reembedding_dimension')")
+            conn.commit()
         except Exception as e:
-            self.conn.rollback()
-            raise e
+            # The transaction is already gone if the commit itself failed.
+            with contextlib.suppress(duckdb.TransactionException):
+                conn.rollback()
+            if isinstance(e, duckdb.TransactionException):
+                # Lost a write-write conflict with concurrent ingestion.
+                return False
+            raise
+
+        self.embedding_model = model_id
+        self.dimension = dimension
+        self.reembedding_model = None
+        self.centroids = None
+        self._load_index()
+        return True
+
+    def abort_reembedding(self) -> None:
+        """Drop a migration's staged vectors; the store keeps its current model."""
+        conn = self._background_conn
+        conn.execute(f"DROP TABLE IF EXISTS {REEMBED_TABLE}")
+        conn.execute("DELETE FROM store_meta WHERE key IN ('reembedding_model', 'reembedding_dimension')")
+        self.reembedding_model = None
+
+    def _load_centroids(self) -> None:
+        """Load trained IVF centroids and file any chunks that were written without a partition."""
+        if self.vector_index != "ivf" or self.dimension is None:
+            return
+        with self.connections.read() as conn:
+            table = conn.execute("SELECT centroid FROM ivf_centroids ORDER BY partition_id").to_arrow_table()
+        if not table.num_rows:
+            return
+        self.centroids = table.column("centroid").combine_chunks().flatten().to_numpy().reshape(table.num_rows, -1)
+
+        # Written while the store was open with another vector_index.
+        with self.connections.write() as conn:
+            unassigned = conn.execute(
+                "SELECT chunk_id, embedding FROM chunks WHERE partition_id IS NULL"
+            ).to_arrow_table()
+            if unassigned.num_rows:
+                conn.register("ivf_assignments", pa.table({
+                    "chunk_id": unassigned.column("chunk_id"),
+                    "partition_id": assign_partitions(self._arrow_matrix(unassigned), self.centroids),
+                }))
+                try:
+                    conn.execute("""
+                    UPDATE chunks SET partition_id = a.partition_id
+                    FROM ivf_assignments a WHERE chunks.chunk_id = a.chunk_id
+                    """)
+                finally:
+                    conn.unregister("ivf_assignments")
+
+    def ivf_needs_rebalance(self) -> bool:
+        """
+        Whether `rebalance_ivf` is due: the collection has reached
+        IVF_MIN_TRAIN_ROWS untrained, or doubled or halved since training.
+        """
+        if self.vector_index != "ivf" or self.dimension is None:
+            return False
+        with self.connections.read() as conn:
+            row = conn.execute("SELECT count(*) FROM chunks").fetchone()
+        count = int(row[0]) if row else 0
+        if self.centroids is None:
+            return count >= IVF_MIN_TRAIN_ROWS
+        trained = int(self.get_meta("ivf_trained_rows") or 0)
+        return count >= 2 * trained or count <= trained // 2
+
+    def rebalance_ivf(self, n_lists: int | None = None) -> bool:
+        """
+        Retrain the IVF centroids on the stored vectors (`n_lists`, else
+        `ivf_lists`, else about sqrt(rows) of them) and rewrite `chunks`
+        clustered by partition, so each partition sits in a few contiguous
+        row groups. Returns False, changing nothing, if chunks were written
+        in the meantime; call again later.
+        """
+        if self.vector_index != "ivf":
+            raise ValueError("rebalance_ivf needs vector_index='ivf'")
+        conn = self._background_conn
+        table = conn.execute("SELECT chunk_id, embedding FROM chunks").to_arrow_table()
+        if not table.num_rows:
+            return False
+        n_rows = table.num_rows
+        matrix = self._arrow_matrix(table)
+        centroids = train_centroids(matrix, n_lists or self.ivf_lists or default_lists(len(matrix)))
+        conn.register("ivf_assignments", pa.table({
+            "chunk_id": table.column("chunk_id"),
+            "partition_id": assign_partitions(matrix, centroids),
+        }))
+        conn.register("ivf_new_centroids", pa.table({
+            "partition_id": pa.array(np.arange(len(centroids), dtype=np.int32)),
+            "centroid": pa.FixedSizeListArray.from_arrays(pa.array(centroids.reshape(-1)), centroids.shape[1]),
+        }))
+        del matrix, table
+
+        with self._partition_lock:
+            conn.begin()
+            try:
+                row = conn.execute("SELECT count(*) FROM chunks ANTI JOIN ivf_assignments USING (chunk_id)").fetchone()
+                if row and row[0]:
+                    conn.rollback()
+                    return False
+                _rebuild_chunks(conn, """
+                SELECT c.* REPLACE (a.partition_id AS partition_id)
+                FROM chunks c JOIN ivf_assignments a USING (chunk_id)
+                ORDER BY a.partition_id
+                """, [])
+                conn.execute("DELETE FROM ivf_centroids")
+                conn.execute("INSERT INTO ivf_centroids SELECT partition_id, centroid FROM ivf_new_centroids")
+                _put_meta(conn, "ivf_trained_rows", str(n_rows))
+                conn.commit()
+            except Exception as e:
+                with contextlib.suppress(duckdb.TransactionException):
+                    conn.rollback()
+                if isinstance(e, duckdb.TransactionException):
+                    # Lost a write-write conflict with concurrent ingestion.
+                    return False
+                raise
+            finally:
+                conn.unregister("ivf_assignments")
+                conn.unregister("ivf_new_centroids")
+            self.centroids = centroids
+        return True
 
     def get_by_url(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve bookmark metadata by URL.
         """
-        result = self.conn.execute("SELECT * FROM bookmarks WHERE url = ?", [url]).fetchone()
+        with self.connections.read() as conn:
+            result = conn.execute("SELECT * FROM bookmarks WHERE url = ?", [url]).fetchone()
         if not result:
             return None
             
@@ -88,71 +1000,291 @@ class DuckDBStore(BaseStorage):
         columns = ["url", "title", "folder", "date_added", "domain", "status", "created_at", "updated_at"]
         return dict(zip(columns, result))
 
+    def get_document(self, url: str) -> str | None:
+        """The cleaned text a bookmark's chunks were cut from, if it was stored."""
+        with self.connections.read() as conn:
+            row = conn.execute("SELECT body, compressed FROM documents WHERE url = ?", [url]).fetchone()
+        return None if row is None else decode_document(row[0], bool(row[1]))
+
     def list_all_urls(self) -> List[str]:
         """
         List all bookmark URLs currently in the store.
         """
-        result = self.conn.execute("SELECT url FROM bookmarks").fetchall()
+        with self.connections.read() as conn:
+            result = conn.execute("SELECT url FROM bookmarks").fetchall()
         return [str(row[0]) for row in result]
 
+    def stats(self) -> dict[str, int]:
+        """Counts of bookmarks, failed bookmarks and chunks (kept in memory, no query)."""
+        return self.collection_stats.totals()
+
+    def facets(self) -> dict[str, list[Facet]]:
+        """Every folder and domain with its bookmark and chunk counts, by name (no query)."""
+        return self.collection_stats.facets()
+
+    def close(self) -> None:
+        """Close every connection to the database (the index is not saved)."""
+        self.executor.close()
+        with self._background_lock:
+            for cursor in self._background_cursors:
+                cursor.close()
+            self._background_cursors.clear()
+            self._background = threading.local()
+        self.connections.close()
+
     def search(self, query_embedding: List[float], k: int, 
                filters: Optional[Dict[str, Any]] = None) -> List[RetrievedChunk]:
         """
-        Perform vector similarity search using cosine similarity.
+        Perform vector similarity search using cosine similarity, by
+        whichever strategy `plan_search` expects to be fastest.
+        """
+        return self.search_many([query_embedding], k, filters)[0]
+
+    def search_many(self, query_embeddings: Sequence[Sequence[float]], k: int | Sequence[int],
+                    filters: None | dict[str, Any] | Sequence[dict[str, Any] | None] = None
+                    ) -> list[list[RetrievedChunk]]:
+        """
+        `search` for each of `query_embeddings`, with one `k` and filter for
+        all of them or a list of one per query. Queries sharing a filter are
+        planned and ranked as a batch: one matrix product over an in-memory
+        index, and for the SQL backends one streamed read of the embeddings
+        ("stream") once that beats a scan per query. Winners are hydrated
+        together.
+        """
+        ks, per_query_filters = per_query_arguments(len(query_embeddings), k, filters)
+        if self.dimension is None or not len(query_embeddings):
+            # Nothing has been embedded into this store yet.
+            return [[] for _ in ks]
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.dimension:
+            raise ValueError(
+                f"Query embedding has dimension {queries.shape[-1]}, this store holds {self.dimension}"
+            )
+
+        groups: dict[str, list[int]] = {}
+        for i, query_filters in enumerate(per_query_filters):
+            groups.setdefault(repr(sorted((query_filters or {}).items())), []).append(i)
+        hits: list[list[tuple[str, float]]] = [[] for _ in ks]
+        for members in groups.values():
+            group_filters = per_query_filters[members[0]]
+            group_k = max(ks[i] for i in members)
+            conditions = self._filter_conditions(group_filters)
+            plan = self._plan(group_k, conditions, len(members))
+            start = time.perf_counter()
+            ranked = self._rank(queries[members], group_k, group_filters, plan, conditions)
+            self.planner.record(plan, (time.perf_counter() - start) * 1000.0)
+            for i, query_hits in zip(members, ranked, strict=False):
+                hits[i] = query_hits[:ks[i]]
+        return self._hydrate_many(hits)
+
+    def lexical_search(self, query: str, k: int,
+                       filters: dict[str, Any] | None = None) -> list[RetrievedChunk]:
+        """
+        Top-k chunks by BM25 over their text, scored by it. Empty unless
+        the store was opened with `text_index=True`.
+        """
+        if self.lexical_index is None:
+            return []
+        assert self.filter_index is not None
+        conditions = self._filter_conditions(filters)
+        candidates = None if conditions is None else self.filter_index.candidates(**conditions)
+        if candidates is not None and not candidates:
+            return []
+        return self._hydrate(self.lexical_index.search(query, k, candidates))
+
+    def plan_search(self, k: int, filters: dict[str, Any] | None = None) -> SearchPlan:
+        """How `search` would currently run a top-`k` query with `filters`."""
+        return self._plan(k, self._filter_conditions(filters))
+
+    def _plan(self, k: int, conditions: dict[str, Any] | None, queries: int = 1) -> SearchPlan:
+        assert self.filter_index is not None
+        ivf_trained = self.vector_index == "ivf" and self.centroids is not None
+        return self.planner.plan(
+            self.vector_index, self.dimension or 0, len(self.filter_index),
+            None if conditions is None else self.filter_index.count(**conditions), k,
+            ef_search=self.hnsw_params.ef_search,
+            n_lists=len(self.centroids) if ivf_trained and self.centroids is not None else 0,
+            nprobe=self.ivf_nprobe, row_group_size=IVF_ROW_GROUP_SIZE, queries=queries,
+        )
+
+    def _filter_conditions(self, filters: dict[str, Any] | None) -> dict[str, Any] | None:
+        """`filters` as FilterIndex arguments, or None if nothing is filtered."""
+        if not filters or not _filter_clauses(filters)[0]:
+            return None
+        date_from = date_to = None
+        if "date_from" in filters or "date_to" in filters:
+            # DuckDB's own cast, so strings and aware datetimes compare
+            # exactly as they do in the SQL search.
+            with self.connections.read() as conn:
+                row = conn.execute(
+                    "SELECT ?::TIMESTAMP, ?::TIMESTAMP", [filters.get("date_from"), filters.get("date_to")]
+                ).fetchone()
+            if row is not None:
+                date_from, date_to = (None if value is None else np.datetime64(value, "us") for value in row)
+        return {
+            "folders": _any_of(filters["folder"]) if "folder" in filters else None,
+            "folder_prefixes": _any_of(filters["folder_prefix"]) if "folder_prefix" in filters else None,
+            "domains": _any_of(filters["domain"]) if "domain" in filters else None,
+            "date_from": date_from,
+            "date_to": date_to,
+        }
+
+    def _search_sql(self, query_embedding: list[float], k: int,
+                    filters: dict[str, Any] | None, nprobe: int | None) -> list[tuple[str, float]]:
+        """
+        (chunk_id, score) pairs, best first, in SQL: over the `nprobe`
+        nearest IVF partitions if given, else over every chunk. Only the ID
+        and score are carried through the scan and sort.
         """
-        where_clauses: List[str] = []
-        params: List[Any] = []
+        where_clauses, filter_params = _filter_clauses(filters)
+        if nprobe is not None and self.centroids is not None:
+            # Literal integers, so the scan can use them against zone maps.
+            probes = nearest_partitions(query_embedding, self.centroids, nprobe)
+            where_clauses.insert(0, f"c.partition_id IN ({', '.join(str(p) for p in probes)})")
         
-        # Add vector param first for similarity calc if we use it in SELECT
         # DuckDB requires casting the parameter to the correct vector type
-        
-        base_query = """
-        SELECT 
-            c.chunk_text, 
-            array_cosine_similarity(c.embedding, ?::FLOAT[384]) as score,
-            b.url, b.title, b.folder, b.date_added, b.domain
+        base_query = f"""
+        SELECT c.chunk_id, array_cosine_similarity(c.embedding, ?::FLOAT[{self.dimension}]) as score
         FROM chunks c
-        JOIN bookmarks b ON c.bookmark_url = b.url
         """
-        params.append(query_embedding)
-        
-        if filters:
-            if "folder" in filters:
-                where_clauses.append("b.folder = ?")
-                params.append(filters["folder"])
-            if "domain" in filters:
-                where_clauses.append("b.domain = ?")
-                params.append(filters["domain"])
-            if "date_from" in filters:
-                where_clauses.append("b.date_added >= ?")
-                params.append(filters["date_from"])
-            if "date_to" in filters:
-                where_clauses.append("b.date_added <= ?")
-                params.append(filters["date_to"])
+        params: list[Any] = [query_embedding] + filter_params
 
         if where_clauses:
             base_query += " WHERE " + " AND ".join(where_clauses)
         
         base_query += " ORDER BY score DESC LIMIT ?"
         params.append(k)
-        
-        # Use fetchall to get list of tuples
-        cursor = self.conn.execute(base_query, params)
-        results = cursor.fetchall()
-        
+        with self.connections.read() as conn:
+            rows = conn.execute(base_query, params).fetchall()
+        return [(str(row[0]), float(row[1])) for row in rows]
+
+    def _rank(self, queries: npt.NDArray[np.float32], k: int, filters: dict[str, Any] | None,
+              plan: SearchPlan, conditions: dict[str, Any] | None) -> list[list[tuple[str, float]]]:
+        """(chunk_id, score) pairs, best first, for each query of a batch sharing `filters`."""
+        if plan.strategy == "empty":
+            return [[] for _ in queries]
+        if plan.strategy in ("scan", "ivf"):
+            return [self._search_sql(q.tolist(), k, filters, plan.nprobe or None) for q in queries]
+        if plan.strategy == "stream":
+            return self._search_stream(queries, k, filters)
+        return self._nearest(queries, k, plan, conditions)
+
+    def _search_stream(self, queries: npt.NDArray[np.float32], k: int,
+                       filters: dict[str, Any] | None) -> list[list[tuple[str, float]]]:
+        """
+        Every query's top `k` from one pass over the stored embeddings (those
+        passing `filters`), read in Arrow batches and scored as a matrix
+        product. Each batch keeps only rows in some query's top `k`.
+        """
+        where_clauses, params = _filter_clauses(filters)
+        sql = "SELECT c.chunk_id, c.embedding FROM chunks c"
+        if where_clauses:
+            sql += " WHERE " + " AND ".join(where_clauses)
+        q = normalize_rows(queries).T
+        kept_ids: list[str] = []
+        kept_scores: list[npt.NDArray[np.float32]] = []
+        with self.connections.read() as conn:
+            for batch in conn.execute(sql, params).to_arrow_reader(_STREAM_BATCH):
+                if not batch.num_rows:
+                    continue
+                embeddings = batch.column(1)
+                scores = normalize_rows(embeddings.flatten().to_numpy().reshape(-1, self.dimension or 0)) @ q
+                if len(scores) > k:
+                    rows = np.unique(np.argpartition(-scores, k - 1, axis=0)[:k])
+                    scores = scores[rows]
+                    kept_ids.extend(batch.column(0).take(pa.array(rows)).to_pylist())
+                else:
+                    kept_ids.extend(batch.column(0).to_pylist())
+                kept_scores.append(scores)
+        if not kept_ids:
+            return [[] for _ in queries]
+        candidates = np.concatenate(kept_scores)
+        return [
+            [(kept_ids[i], float(candidates[i, column])) for i in top_k(candidates[:, column], k)]
+            for column in range(len(queries))
+        ]
+
+    def _nearest(self, queries: npt.NDArray[np.float32], k: int, plan: SearchPlan,
+                 conditions: dict[str, Any] | None) -> list[list[tuple[str, float]]]:
+        """(chunk_id, score) pairs, best first, per query, for the in-memory and by-ID strategies."""
+        assert self.filter_index is not None
+        if plan.strategy == "fetch":
+            ids, vectors = self._fetch_embeddings(self.filter_index.candidates(**(conditions or {})))
+            if not ids:
+                return [[] for _ in queries]
+            scores = normalize_rows(vectors) @ normalize_rows(queries).T
+            return [
+                [(ids[i], float(scores[i, column])) for i in top_k(scores[:, column], k)]
+                for column in range(len(queries))
+            ]
+
+        assert self.index is not None
+        if plan.strategy == "postfilter" and conditions is not None:
+            ranked = self.index.search_many(queries, plan.fetch_k)
+            kept = set(self.filter_index.keep([chunk_id for hits in ranked for chunk_id, _ in hits], **conditions))
+            ranked = [[hit for hit in hits if hit[0] in kept][:k] for hits in ranked]
+            # Where the ranking was skewed against the filter, score its chunks directly.
+            short = [i for i, hits in enumerate(ranked) if len(hits) < min(k, plan.rows)]
+            if short:
+                matching = self.filter_index.candidates(**conditions)
+                for i, hits in zip(short, self.index.search_many(queries[short], k, matching), strict=False):
+                    ranked[i] = hits
+            return ranked
+        candidates = None if conditions is None else self.filter_index.candidates(**conditions)
+        return self.index.search_many(queries, k, candidates)
+
+    def _hydrate(self, hits: list[tuple[str, float]]) -> list[RetrievedChunk]:
+        return self._hydrate_many([hits])[0]
+
+    def _hydrate_many(self, ranked: list[list[tuple[str, float]]]) -> list[list[RetrievedChunk]]:
+        """
+        Text and bookmark metadata for just the winning rows, from the chunk
+        cache or else by ID (FETCH_LIMIT IDs per lookup, as longer lists
+        scan the table), keeping the order and scores of each list of hits.
+        Chunks stored as offsets are sliced out of their documents.
+        """
+        chunk_ids = list(dict.fromkeys(chunk_id for hits in ranked for chunk_id, _ in hits))
+        found = self.chunk_cache.get_many(chunk_ids)
+        missing = [chunk_id for chunk_id in chunk_ids if chunk_id not in found]
+        if missing:
+            generation = self.chunk_cache.generation
+            fetched: dict[str, CachedChunk] = {}
+            rows = []
+            with self.connections.snapshot() as conn:
+                for start in range(0, len(missing), FETCH_LIMIT):
+                    rows.extend(conn.execute("""
+                    SELECT chunk_id, chunk_text, bookmark_url, start_char_idx, end_char_idx,
+                           title, folder, date_added, domain
+                    FROM chunks WHERE chunk_id = ANY(?)
+                    """, [missing[start:start + FETCH_LIMIT]]).fetchall())
+                texts = _chunk_texts(conn, [row[1:5] for row in rows])
+            fetched.update(
+                # A bookmark without a title, folder or domain has NULLs there.
+                (str(row[0]), CachedChunk(text, str(row[2]), row[5] or "", row[6] or "", row[7], row[8] or ""))
+                for row, text in zip(rows, texts, strict=False)
+            )
+            self.chunk_cache.put_many(fetched, generation)
+            found.update(fetched)
+        return [self._retrieved(hits, found) for hits in ranked]
+
+    @staticmethod
+    def _retrieved(hits: list[tuple[str, float]], found: dict[str, CachedChunk]) -> list[RetrievedChunk]:
         retrieved: List[RetrievedChunk] = []
-        for row in results:
-            # row is tuple
+        for chunk_id, score in hits:
+            chunk = found.get(chunk_id)
+            if chunk is None:
+                # Replaced by a write that landed after the index was read.
+                continue
             retrieved.append(RetrievedChunk(
-                text=str(row[0]),
-                score=float(row[1]),
+                text=chunk.text,
+                score=score,
                 metadata={
-                    "url": str(row[2]),
-                    "title": str(row[3]),
-                    "folder": str(row[4]),
-                    "date_added": row[5], # datetime
-                    "domain": str(row[6])
+                    "url": chunk.url,
+                    "title": chunk.title,
+                    "folder": chunk.folder,
+                    "date_added": chunk.date_added, # datetime
+                    "domain": chunk.domain,
+                    "chunk_id": chunk_id,
                 }
             ))
-            
         return retrieved
@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+import duckdb
+
+T = TypeVar("T")
+
+# Threads running blocking storage calls for async callers. More than the
+# store's read connections only queues callers on the connection pool.
+DEFAULT_STORAGE_WORKERS = 4
+
+
+class CallCancelled(Exception):
+    """Raised inside a blocking call whose awaiting caller has gone away."""
+
+
+class CancelScope:
+    """
+    The cancellation state of one blocking call. The DuckDB cursors the call
+    is using are registered here, so cancelling it interrupts their running
+    queries; a call that has not reached the database yet fails at its next
+    `attach` instead of starting a query no one will read.
+    """
+    def __init__(self) -> None:
+        self.cancelled = False
+        self._cursors: set[duckdb.DuckDBPyConnection] = set()
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        # Under the lock, so a cursor cannot be handed to another call
+        # between being detached from this one and being interrupted.
+        with self._lock:
+            self.cancelled = True
+            for cursor in self._cursors:
+                cursor.interrupt()
+
+    @contextlib.contextmanager
+    def attach(self, cursor: duckdb.DuckDBPyConnection) -> Iterator[None]:
+        """Register `cursor` for the block (raises CallCancelled if already cancelled)."""
+        with self._lock:
+            if self.cancelled:
+                raise CallCancelled()
+            self._cursors.add(cursor)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._cursors.discard(cursor)
+
+
+_current_scope: "contextvars.ContextVar[CancelScope | None]" = contextvars.ContextVar(
+    "storage_cancel_scope", default=None
+)
+
+
+def current_cancel_scope() -> CancelScope | None:
+    """The scope of the blocking call running in this thread, if it came from `BlockingExecutor.run`."""
+    return _current_scope.get()
+
+
+class BlockingExecutor:
+    """
+    Runs blocking work (DuckDB queries, NumPy scoring, model forward passes)
+    for async callers on a fixed pool of `max_workers` threads, so the event
+    loop keeps serving other requests while it runs. Calls beyond the pool
+    size queue rather than growing it.
+
+    A call is awaited like a coroutine: if the awaiting task is cancelled or
+    its `timeout_s` (seconds) passes, a call still queued never starts and one
+    already running has its DuckDB queries interrupted (see CancelScope).
+    Pure Python or NumPy work in flight cannot be stopped and runs to the
+    end, but its result is dropped.
+    """
+    def __init__(self, max_workers: int = DEFAULT_STORAGE_WORKERS, name: str = "storage"):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout_s: float | None = None, **kwargs: Any) -> T:
+        """`fn(*args, **kwargs)` on a worker thread; raises TimeoutError after `timeout_s` seconds."""
+        loop = asyncio.get_running_loop()
+        scope = CancelScope()
+        context = contextvars.copy_context()
+        context.run(_current_scope.set, scope)
+        call = loop.run_in_executor(self._pool, functools.partial(context.run, fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(call, timeout_s)
+        except (TimeoutError, asyncio.CancelledError):
+            scope.cancel()
+            raise
+
+    def close(self) -> None:
+        """Stop taking calls; queued ones are dropped, running ones finish."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
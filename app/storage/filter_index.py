@@ -0,0 +1,218 @@
+import threading
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+# Separates a folder from its subfolders in bookmark folder paths ("Tech/Python").
+FOLDER_SEPARATOR = "/"
+
+
+def folder_matches_prefix(folder: str, prefix: str) -> bool:
+    """Whether `folder` is `prefix` itself or one of its subfolders."""
+    return folder == prefix or folder.startswith(prefix + FOLDER_SEPARATOR)
+
+
+class FilterIndex:
+    """
+    In-memory lookup structures for search filters, so a filtered search
+    can pick its candidate chunks without joining `chunks` to `bookmarks`.
+
+    Each bookmark gets a slot. Every folder and domain has a bitmap over
+    the slots (one bool per bookmark), and add dates are kept with their
+    sort order, so a date range is two binary searches. A filter is
+    evaluated once per bookmark and gathered out to that bookmark's
+    chunks. Bookmarks keep their slot for the life of the index; their
+    metadata can change. Chunks per bookmark are counted too, so how many
+    chunks a filter leaves (its selectivity) is known without listing them.
+    """
+    def __init__(self, capacity: int = 1024):
+        self._capacity = max(1, capacity)
+        self._slots: dict[str, int] = {}
+        self._folders: list[str | None] = []
+        self._domains: list[str | None] = []
+        self._dates = np.full(self._capacity, np.datetime64("NaT"), dtype="datetime64[us]")
+        self._chunk_counts = np.zeros(self._capacity, dtype=np.int64)
+        self._folder_bitmaps: dict[str, npt.NDArray[np.bool_]] = {}
+        self._domain_bitmaps: dict[str, npt.NDArray[np.bool_]] = {}
+        # Slots by ascending date (undated last), rebuilt after date changes.
+        self._date_order: npt.NDArray[np.intp] | None = None
+        self._sorted_dates: npt.NDArray[np.datetime64] | None = None
+
+        self._chunk_ids: list[str] = []
+        self._chunk_rows: dict[str, int] = {}
+        # Bookmark slot of each chunk row; -1 marks a free row.
+        self._chunk_bookmarks = np.full(self._capacity, -1, dtype=np.int32)
+        self._free_rows: list[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of chunks indexed."""
+        return len(self._chunk_rows)
+
+    def set_bookmarks(self, urls: Sequence[str], folders: Sequence[str | None],
+                      domains: Sequence[str | None], dates: npt.ArrayLike) -> None:
+        """Record (or update) the filterable metadata of bookmarks; `dates` may hold NaT."""
+        added = np.asarray(dates, dtype="datetime64[us]")
+        with self._lock:
+            for i, url in enumerate(urls):
+                slot = self._slot(url)
+                self._move_bit(self._folder_bitmaps, self._folders, slot, folders[i])
+                self._move_bit(self._domain_bitmaps, self._domains, slot, domains[i])
+                self._dates[slot] = added[i]
+            self._date_order = self._sorted_dates = None
+
+    def add_chunks(self, chunk_ids: Sequence[str], urls: Sequence[str]) -> None:
+        """Attach chunks to their bookmarks (re-adding an ID moves it)."""
+        with self._lock:
+            for chunk_id, url in zip(chunk_ids, urls, strict=False):
+                row = self._chunk_rows.get(chunk_id)
+                if row is None:
+                    if self._free_rows:
+                        row = self._free_rows.pop()
+                        self._chunk_ids[row] = chunk_id
+                    else:
+                        row = len(self._chunk_ids)
+                        self._chunk_ids.append(chunk_id)
+                        if row >= len(self._chunk_bookmarks):
+                            grown = np.full(2 * len(self._chunk_bookmarks), -1, dtype=np.int32)
+                            grown[:row] = self._chunk_bookmarks[:row]
+                            self._chunk_bookmarks = grown
+                    self._chunk_rows[chunk_id] = row
+                else:
+                    self._chunk_counts[self._chunk_bookmarks[row]] -= 1
+                slot = self._slot(url)
+                self._chunk_bookmarks[row] = slot
+                self._chunk_counts[slot] += 1
+
+    def remove_chunks(self, chunk_ids: Sequence[str]) -> None:
+        """Forget chunks; unknown IDs are ignored."""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                row = self._chunk_rows.pop(chunk_id, None)
+                if row is not None:
+                    self._chunk_counts[self._chunk_bookmarks[row]] -= 1
+                    self._chunk_bookmarks[row] = -1
+                    self._free_rows.append(row)
+
+    def candidates(self, folders: Sequence[str] | None = None,
+                   folder_prefixes: Sequence[str] | None = None,
+                   domains: Sequence[str] | None = None,
+                   date_from: np.datetime64 | None = None,
+                   date_to: np.datetime64 | None = None) -> list[str]:
+        """
+        IDs of the chunks whose bookmark passes every given condition: its
+        folder is one of `folders`, it is in or under one of
+        `folder_prefixes`, its domain is one of `domains`, and it was added
+        within [`date_from`, `date_to`] (undated bookmarks never are).
+        """
+        with self._lock:
+            keep = self._bookmark_mask(folders, folder_prefixes, domains, date_from, date_to)
+            owners = self._chunk_bookmarks[:len(self._chunk_ids)]
+            live = owners >= 0
+            rows = np.flatnonzero(live & keep[np.where(live, owners, 0)])
+            return [self._chunk_ids[row] for row in rows.tolist()]
+
+    def count(self, folders: Sequence[str] | None = None,
+              folder_prefixes: Sequence[str] | None = None,
+              domains: Sequence[str] | None = None,
+              date_from: np.datetime64 | None = None,
+              date_to: np.datetime64 | None = None) -> int:
+        """How many chunks `candidates` would return, without listing them."""
+        with self._lock:
+            keep = self._bookmark_mask(folders, folder_prefixes, domains, date_from, date_to)
+            return int(self._chunk_counts[:len(keep)][keep].sum())
+
+    def keep(self, chunk_ids: Sequence[str], folders: Sequence[str] | None = None,
+             folder_prefixes: Sequence[str] | None = None,
+             domains: Sequence[str] | None = None,
+             date_from: np.datetime64 | None = None,
+             date_to: np.datetime64 | None = None) -> list[str]:
+        """The IDs among `chunk_ids` that pass the conditions, in order."""
+        with self._lock:
+            keep = self._bookmark_mask(folders, folder_prefixes, domains, date_from, date_to)
+            rows = [self._chunk_rows.get(chunk_id) for chunk_id in chunk_ids]
+            return [
+                chunk_id for chunk_id, row in zip(chunk_ids, rows, strict=False)
+                if row is not None and keep[self._chunk_bookmarks[row]]
+            ]
+
+    def _bookmark_mask(self, folders: Sequence[str] | None, folder_prefixes: Sequence[str] | None,
+                       domains: Sequence[str] | None, date_from: np.datetime64 | None,
+                       date_to: np.datetime64 | None) -> npt.NDArray[np.bool_]:
+        """Which bookmark slots pass every given condition."""
+        n = len(self._slots)
+        keep = np.ones(n, dtype=bool)
+        if folders is not None:
+            keep &= self._any_of(self._folder_bitmaps, folders, n)
+        if folder_prefixes is not None:
+            names = [f for f in self._folder_bitmaps if any(folder_matches_prefix(f, p) for p in folder_prefixes)]
+            keep &= self._any_of(self._folder_bitmaps, names, n)
+        if domains is not None:
+            keep &= self._any_of(self._domain_bitmaps, domains, n)
+        if n and (date_from is not None or date_to is not None):
+            keep &= self._in_date_range(n, date_from, date_to)
+        return keep
+
+    def _slot(self, url: str) -> int:
+        slot = self._slots.get(url)
+        if slot is not None:
+            return slot
+        slot = len(self._slots)
+        if slot >= self._capacity:
+            self._grow(2 * self._capacity)
+        self._slots[url] = slot
+        self._folders.append(None)
+        self._domains.append(None)
+        self._dates[slot] = np.datetime64("NaT")
+        self._date_order = self._sorted_dates = None
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        for bitmaps in (self._folder_bitmaps, self._domain_bitmaps):
+            for key, bitmap in bitmaps.items():
+                bitmaps[key] = np.concatenate([bitmap, np.zeros(capacity - self._capacity, dtype=bool)])
+        dates = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[us]")
+        dates[:self._capacity] = self._dates
+        self._dates = dates
+        counts = np.zeros(capacity, dtype=np.int64)
+        counts[:self._capacity] = self._chunk_counts
+        self._chunk_counts = counts
+        self._capacity = capacity
+
+    def _move_bit(self, bitmaps: dict[str, npt.NDArray[np.bool_]], values: list[str | None],
+                  slot: int, value: str | None) -> None:
+        """Set `slot`'s value, clearing its bit in the old value's bitmap."""
+        old = values[slot]
+        if old == value:
+            return
+        if old is not None:
+            bitmaps[old][slot] = False
+        if value is not None:
+            if value not in bitmaps:
+                bitmaps[value] = np.zeros(self._capacity, dtype=bool)
+            bitmaps[value][slot] = True
+        values[slot] = value
+
+    @staticmethod
+    def _any_of(bitmaps: dict[str, npt.NDArray[np.bool_]], keys: Sequence[str], n: int) -> npt.NDArray[np.bool_]:
+        union = np.zeros(n, dtype=bool)
+        for key in keys:
+            bitmap = bitmaps.get(key)
+            if bitmap is not None:
+                union |= bitmap[:n]
+        return union
+
+    def _in_date_range(self, n: int, date_from: np.datetime64 | None,
+                       date_to: np.datetime64 | None) -> npt.NDArray[np.bool_]:
+        if self._date_order is None or self._sorted_dates is None:
+            # NaT sorts last, so the dated slots form a prefix.
+            self._date_order = np.argsort(self._dates[:n], kind="stable")
+            self._sorted_dates = self._dates[:n][self._date_order]
+        dated = int(np.count_nonzero(~np.isnat(self._sorted_dates)))
+        dates = self._sorted_dates[:dated]
+        lo = 0 if date_from is None else int(np.searchsorted(dates, date_from, side="left"))
+        hi = dated if date_to is None else int(np.searchsorted(dates, date_to, side="right"))
+        in_range = np.zeros(n, dtype=bool)
+        in_range[self._date_order[lo:hi]] = True
+        return in_range
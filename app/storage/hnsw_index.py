@@ -0,0 +1,227 @@
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+
+from app.storage.vector_index import BaseVectorIndex, normalize_rows, top_k
+
+logger = logging.getLogger(__name__)
+
+# Filters that leave at most this many candidates are scored exactly. Reading
+# vectors back out of the graph costs tens of microseconds each, so beyond a
+# few hundred a filtered graph walk is cheaper, unless the filter is so
+# selective the walk comes up short (then it falls back to exact scoring).
+EXACT_CANDIDATE_LIMIT = 256
+
+# Graph parameters when none are configured (see `HNSWParams`).
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_EF_CONSTRUCTION = 200
+DEFAULT_HNSW_EF_SEARCH = 64
+
+
+@dataclass
+class HNSWParams:
+    """
+    `m`: graph links per node (memory and recall grow with it).
+    `ef_construction`: candidate list size while inserting (build time vs graph quality).
+    `ef_search`: candidate list size per query (latency vs recall); raised to k if smaller.
+    """
+    m: int = DEFAULT_HNSW_M
+    ef_construction: int = DEFAULT_HNSW_EF_CONSTRUCTION
+    ef_search: int = DEFAULT_HNSW_EF_SEARCH
+
+
+class HNSWIndex(BaseVectorIndex):
+    """
+    Approximate cosine index backed by hnswlib. Chunk IDs map to integer
+    labels; removed chunks are marked deleted and their graph slots reused
+    by later inserts. With a `path`, `save` writes the graph there and the
+    ID mapping next to it (`<path>.ids.parquet`), and `open` loads them.
+    `source` names the vectors indexed (e.g. the embedding model), so a
+    saved index is not reused for different vectors under the same IDs.
+    """
+    def __init__(self, dimension: int, params: HNSWParams | None = None,
+                 path: str | None = None, source: str = "", capacity: int = 1024):
+        # Optional dependency: only needed when vector_index is "hnsw".
+        import hnswlib
+
+        if dimension < 1:
+            raise ValueError("dimension must be positive")
+        self.dimension = dimension
+        self.params = params or HNSWParams()
+        self.path = path
+        self.source = source
+        self._graph = hnswlib.Index(space="cosine", dim=dimension)
+        self._graph.init_index(
+            max_elements=max(1, capacity), ef_construction=self.params.ef_construction,
+            M=self.params.m, allow_replace_deleted=True,
+        )
+        self._labels: dict[str, int] = {}
+        self._ids: dict[int, str] = {}
+        self._next_label = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @property
+    def ids(self) -> list[str]:
+        return list(self._labels)
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes `save` has not written yet."""
+        return self._dirty
+
+    def add(self, ids: Sequence[str], vectors: npt.ArrayLike) -> None:
+        if len(ids) == 0:
+            return
+        matrix = normalize_rows(vectors)
+        if matrix.shape != (len(ids), self.dimension):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dimension}, got {matrix.shape}")
+        positions = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        with self._lock:
+            # Re-added IDs get a fresh node: an existing node's vector can't
+            # be changed in place without leaving its old links behind.
+            self._remove_locked([chunk_id for chunk_id in positions if chunk_id in self._labels])
+            labels = np.arange(self._next_label, self._next_label + len(positions), dtype=np.uint64)
+            self._next_label += len(positions)
+            for chunk_id, label in zip(positions, labels.tolist(), strict=False):
+                self._labels[chunk_id] = label
+                self._ids[label] = chunk_id
+
+            needed = len(self._labels)
+            if needed > self._graph.get_max_elements():
+                self._graph.resize_index(max(needed, 2 * self._graph.get_max_elements()))
+            self._graph.add_items(matrix[list(positions.values())], labels, replace_deleted=True)
+            self._dirty = True
+
+    def remove(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            self._remove_locked(ids)
+
+    def _remove_locked(self, ids: Sequence[str]) -> None:
+        for chunk_id in ids:
+            label = self._labels.pop(chunk_id, None)
+            if label is None:
+                continue
+            del self._ids[label]
+            self._graph.mark_deleted(label)
+            self._dirty = True
+
+    def search(self, query: npt.ArrayLike, k: int,
+               candidates: Sequence[str] | None = None) -> list[tuple[str, float]]:
+        q = normalize_rows(query)
+        if q.shape[1] != self.dimension:
+            raise ValueError(f"Query has dimension {q.shape[1]}, index holds {self.dimension}")
+        with self._lock:
+            if candidates is None:
+                k = min(k, len(self._labels))
+                if k < 1:
+                    return []
+                self._graph.set_ef(max(self.params.ef_search, k))
+                labels, distances = self._graph.knn_query(q, k=k)
+                return [(self._ids[int(label)], 1.0 - float(d)) for label, d in zip(labels[0], distances[0], strict=False)]
+
+            allowed = [self._labels[c] for c in candidates if c in self._labels]
+            k = min(k, len(allowed))
+            if k < 1:
+                return []
+            if len(allowed) > EXACT_CANDIDATE_LIMIT:
+                allowed_set = set(allowed)
+                self._graph.set_ef(max(self.params.ef_search, k))
+                try:
+                    labels, distances = self._graph.knn_query(q, k=k, filter=allowed_set.__contains__)
+                    return [(self._ids[int(label)], 1.0 - float(d)) for label, d in zip(labels[0], distances[0], strict=False)]
+                except RuntimeError:
+                    # The walk found fewer than k matches; score them all instead.
+                    pass
+            vectors = self._graph.get_items(allowed, return_type="numpy")
+            scores = normalize_rows(vectors) @ q[0]
+            return [(self._ids[allowed[i]], float(scores[i])) for i in top_k(scores, k)]
+
+    def search_many(self, queries: npt.ArrayLike, k: int,
+                    candidates: Sequence[str] | None = None) -> list[list[tuple[str, float]]]:
+        """Unfiltered queries walk the graph in one `knn_query` call."""
+        if candidates is not None:
+            return super().search_many(queries, k, candidates)
+        matrix = normalize_rows(queries)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Query has dimension {matrix.shape[1]}, index holds {self.dimension}")
+        with self._lock:
+            k = min(k, len(self._labels))
+            if k < 1:
+                return [[] for _ in matrix]
+            self._graph.set_ef(max(self.params.ef_search, k))
+            labels, distances = self._graph.knn_query(matrix, k=k)
+            return [
+                [(self._ids[int(label)], 1.0 - float(d)) for label, d in zip(row_labels, row_distances, strict=False)]
+                for row_labels, row_distances in zip(labels, distances, strict=False)
+            ]
+
+    def save(self) -> None:
+        """Write the graph and ID mapping to `path` (atomically per file)."""
+        if self.path is None:
+            return
+        import pyarrow.parquet as pq
+
+        with self._lock:
+            mapping = pa.table(
+                {
+                    "chunk_id": pa.array(list(self._labels), type=pa.string()),
+                    "label": pa.array(list(self._labels.values()), type=pa.uint64()),
+                },
+                metadata={
+                    "dimension": str(self.dimension),
+                    "source": self.source,
+                    "m": str(self.params.m),
+                    "ef_construction": str(self.params.ef_construction),
+                    "next_label": str(self._next_label),
+                },
+            )
+            self._graph.save_index(self.path + ".tmp")
+            pq.write_table(mapping, self.path + ".ids.parquet.tmp")
+            os.replace(self.path + ".tmp", self.path)
+            os.replace(self.path + ".ids.parquet.tmp", self.path + ".ids.parquet")
+            self._dirty = False
+
+    @classmethod
+    def open(cls, path: str, dimension: int, params: HNSWParams | None = None,
+             source: str = "") -> Optional["HNSWIndex"]:
+        """
+        Load a saved index, or return None if there is none or it was built
+        for other vectors or with other graph parameters (it must be rebuilt).
+        """
+        import pyarrow.parquet as pq
+
+        params = params or HNSWParams()
+        ids_path = path + ".ids.parquet"
+        if not (os.path.exists(path) and os.path.exists(ids_path)):
+            return None
+        mapping = pq.read_table(ids_path)
+        meta: dict[bytes, bytes] = mapping.schema.metadata or {}
+        built_with: dict[str, Any] = {key.decode(): value.decode() for key, value in meta.items()}
+        expected = {"dimension": str(dimension), "source": source,
+                    "m": str(params.m), "ef_construction": str(params.ef_construction)}
+        if any(built_with.get(key) != value for key, value in expected.items()):
+            logger.info(f"Ignoring HNSW index at {path}: built for other vectors or parameters")
+            return None
+
+        import hnswlib
+
+        graph = hnswlib.Index(space="cosine", dim=dimension)
+        # allow_replace_deleted must be set again on load for slot reuse.
+        graph.load_index(path, allow_replace_deleted=True)
+        index = cls(dimension, params, path, source, capacity=1)
+        index._graph = graph
+        index._labels = dict(zip(mapping.column("chunk_id").to_pylist(), mapping.column("label").to_pylist(), strict=False))
+        index._ids = {label: chunk_id for chunk_id, label in index._labels.items()}
+        index._next_label = int(built_with.get("next_label", 0))
+        return index
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import numpy.typing as npt
+
+from app.storage.vector_index import normalize_rows
+
+# Lloyd iterations per training run; centroids barely move after this.
+TRAIN_ITERATIONS = 10
+# k-means is fitted on at most this many vectors (at least 32 per list are
+# needed for stable centroids, and more buys little).
+TRAIN_SAMPLE_SIZE = 64 * 1024
+# Vectors assigned per matrix product, bounding the temporary scores matrix.
+_ASSIGN_BATCH = 8192
+
+
+def default_lists(n_rows: int) -> int:
+    """The usual IVF sizing: about sqrt(n) lists of about sqrt(n) vectors."""
+    return max(1, round(math.sqrt(n_rows)))
+
+
+def train_centroids(vectors: npt.ArrayLike, n_lists: int, iterations: int = TRAIN_ITERATIONS,
+                    sample_size: int = TRAIN_SAMPLE_SIZE, seed: int = 0) -> npt.NDArray[np.float32]:
+    """
+    Spherical k-means: unit-length centroids that maximize the cosine of
+    each vector to its nearest one. Fitted on a random sample of at most
+    `sample_size` vectors; empty lists are re-seeded from random vectors.
+    """
+    rng = np.random.default_rng(seed)
+    data = normalize_rows(vectors)
+    if len(data) > sample_size:
+        data = data[rng.choice(len(data), sample_size, replace=False)]
+    n_lists = max(1, min(n_lists, len(data)))
+    centroids: npt.NDArray[np.float32] = data[rng.choice(len(data), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign_partitions(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_partitions(vectors: npt.ArrayLike, centroids: npt.NDArray[np.float32]) -> npt.NDArray[np.int32]:
+    """Index of the nearest (highest-cosine) centroid for each vector."""
+    data = normalize_rows(vectors)
+    labels = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), _ASSIGN_BATCH):
+        block = data[start:start + _ASSIGN_BATCH]
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def nearest_partitions(query: npt.ArrayLike, centroids: npt.NDArray[np.float32] | None,
+                       nprobe: int) -> list[int]:
+    """The `nprobe` partitions whose centroids are closest to `query`."""
+    if centroids is None or len(centroids) == 0:
+        return []
+    scores = centroids @ normalize_rows(query)[0]
+    nprobe = min(max(1, nprobe), len(scores))
+    return sorted(int(p) for p in np.argpartition(-scores, nprobe - 1)[:nprobe])
@@ -0,0 +1,208 @@
+import re
+import threading
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+
+import numpy as np
+
+from app.storage.vector_index import top_k
+
+# Okapi BM25 term-frequency saturation and document-length normalization.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words plus the compounds exact-term queries care about: dotted or hyphenated
+# names ("node.js", "scikit-learn", "3.11"), identifiers and error codes
+# ("ERR_CONNECTION_REFUSED", "E1101") and "c++" / "c#".
+_TOKEN = re.compile(r"\w+(?:[.\-]\w+)*(?:\+\+|#)?")
+_COMPOUND_SEPARATOR = re.compile(r"[.\-]")
+
+# Too common to tell chunks apart; dropping them keeps postings short.
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "does", "for", "from",
+    "has", "have", "how", "i", "if", "in", "into", "is", "it", "its", "not", "of", "on", "or", "so",
+    "that", "the", "their", "there", "these", "this", "to", "was", "we", "were", "what", "when",
+    "where", "which", "who", "why", "will", "with", "you", "your",
+])
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lower-cased terms of `text`, stopwords removed. A compound term is kept
+    whole and also split into its parts, so "scikit-learn" matches both
+    itself and "learn".
+    """
+    tokens = _TOKEN.findall(text.lower())
+    terms = [token for token in tokens if token not in STOPWORDS]
+    for token in tokens:
+        if "." in token or "-" in token:
+            terms.extend(part for part in _COMPOUND_SEPARATOR.split(token) if part and part not in STOPWORDS)
+    return terms
+
+
+class BM25Index:
+    """
+    In-memory inverted index over chunk texts, ranked by Okapi BM25, for
+    exact-term queries that embeddings blur (names, error codes, versions).
+
+    Each term's postings are one flat `array` of (row, term frequency)
+    pairs, appended to as chunks are added. Removing a chunk only marks its
+    row dead; dead postings are skipped when scoring and dropped (rows
+    renumbered) once they make up half of all postings.
+    """
+    def __init__(self, capacity: int = 1024):
+        self._capacity = max(1, capacity)
+        self._terms: dict[str, int] = {}
+        self._postings: list[array[int]] = []
+        self._chunk_ids: list[str] = []
+        self._chunk_rows: dict[str, int] = {}
+        self._lengths = np.zeros(self._capacity, dtype=np.float32)
+        self._live = np.zeros(self._capacity, dtype=bool)
+        # Distinct terms per row: the postings a removal leaves dead.
+        self._row_terms = np.zeros(self._capacity, dtype=np.int32)
+        self._total_length = 0.0
+        self._live_postings = 0
+        self._dead_postings = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of chunks indexed."""
+        return len(self._chunk_rows)
+
+    def add(self, chunk_ids: Sequence[str], texts: Sequence[str]) -> None:
+        """Index chunks (re-adding an ID replaces its text)."""
+        tokenized = [Counter(tokenize(text)) for text in texts]
+        batch_terms: list[str] = []
+        batch_tfs: list[int] = []
+        for counts in tokenized:
+            batch_terms.extend(counts)
+            batch_tfs.extend(counts.values())
+        distinct = np.array([len(counts) for counts in tokenized], dtype=np.int32)
+        lengths = np.array([sum(counts.values()) for counts in tokenized], dtype=np.float32)
+        with self._lock:
+            self._remove(chunk_ids)
+            first = len(self._chunk_ids)
+            if first + len(chunk_ids) > self._capacity:
+                self._grow(max(2 * self._capacity, first + len(chunk_ids)))
+            for row, chunk_id in enumerate(chunk_ids, start=first):
+                self._chunk_ids.append(chunk_id)
+                self._chunk_rows[chunk_id] = row
+            rows = slice(first, first + len(chunk_ids))
+            self._lengths[rows] = lengths
+            self._live[rows] = True
+            self._row_terms[rows] = distinct
+            self._total_length += float(lengths.sum())
+            self._live_postings += len(batch_terms)
+            if not batch_terms:
+                return
+
+            # The batch's postings grouped by term, so each term's array
+            # is appended to once rather than once per chunk.
+            terms = self._terms
+            for term in set(batch_terms).difference(terms):
+                terms[term] = len(self._postings)
+                self._postings.append(array("I"))
+            term_ids = np.array([terms[term] for term in batch_terms], dtype=np.int32)
+            order = np.argsort(term_ids)
+            pairs = np.empty((len(order), 2), dtype=np.uint32)
+            pairs[:, 0] = np.repeat(np.arange(first, first + len(chunk_ids), dtype=np.uint32), distinct)[order]
+            pairs[:, 1] = np.array(batch_tfs, dtype=np.uint32)[order]
+            sorted_ids = term_ids[order]
+            starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+            ends = np.r_[starts[1:], len(order)]
+            for start, end in zip(starts.tolist(), ends.tolist(), strict=False):
+                self._postings[int(sorted_ids[start])].frombytes(pairs[start:end].tobytes())
+
+    def remove(self, chunk_ids: Sequence[str]) -> None:
+        """Forget chunks; unknown IDs are ignored."""
+        with self._lock:
+            self._remove(chunk_ids)
+            if self._dead_postings > max(self._live_postings, 1024):
+                self._compact()
+
+    def search(self, query: str, k: int,
+               candidates: Sequence[str] | None = None) -> list[tuple[str, float]]:
+        """
+        Top-`k` (chunk_id, BM25 score) pairs for `query`, best first, among
+        `candidates` if given. Only chunks containing a query term score.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if k < 1 or not terms:
+            return []
+        with self._lock:
+            n_rows = len(self._chunk_ids)
+            n_live = len(self._chunk_rows)
+            if not n_live:
+                return []
+            live = self._live[:n_rows]
+            if candidates is not None:
+                live = np.zeros(n_rows, dtype=bool)
+                rows = [self._chunk_rows.get(chunk_id) for chunk_id in candidates]
+                live[[row for row in rows if row is not None]] = True
+            lengths = self._lengths[:n_rows]
+            avg_length = self._total_length / n_live
+            scores = np.zeros(n_rows, dtype=np.float32)
+            for term in terms:
+                term_id = self._terms.get(term)
+                if term_id is None:
+                    continue
+                # A copy: a view would pin the array against later appends.
+                pairs = np.array(self._postings[term_id], dtype=np.uint32).reshape(-1, 2)
+                term_rows, tf = pairs[:, 0], pairs[:, 1].astype(np.float32)
+                df = int(np.count_nonzero(self._live[term_rows]))
+                if not df:
+                    continue
+                idf = np.log1p((n_live - df + 0.5) / (df + 0.5))
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[term_rows] / avg_length)
+                scores += np.bincount(term_rows, weights=idf * tf * (BM25_K1 + 1.0) / (tf + norm),
+                                      minlength=n_rows).astype(np.float32)
+            scores[~live] = 0.0
+            matched = int(np.count_nonzero(scores))
+            if not matched:
+                return []
+            return [(self._chunk_ids[i], float(scores[i])) for i in top_k(scores, min(k, matched))]
+
+    def _remove(self, chunk_ids: Sequence[str]) -> None:
+        for chunk_id in chunk_ids:
+            row = self._chunk_rows.pop(chunk_id, None)
+            if row is not None:
+                self._live[row] = False
+                self._total_length -= float(self._lengths[row])
+                self._live_postings -= int(self._row_terms[row])
+                self._dead_postings += int(self._row_terms[row])
+
+    def _grow(self, capacity: int) -> None:
+        for name in ("_lengths", "_live", "_row_terms"):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:self._capacity] = old
+            setattr(self, name, grown)
+        self._capacity = capacity
+
+    def _compact(self) -> None:
+        """Drop dead rows and their postings, renumbering the live rows in order."""
+        n_rows = len(self._chunk_ids)
+        live = self._live[:n_rows]
+        new_rows = np.cumsum(live, dtype=np.int64) - 1
+        terms: dict[str, int] = {}
+        postings: list[array[int]] = []
+        for term, term_id in self._terms.items():
+            pairs = np.frombuffer(self._postings[term_id], dtype=np.uint32).reshape(-1, 2)
+            pairs = pairs[live[pairs[:, 0]]]
+            if len(pairs):
+                pairs = pairs.copy()
+                pairs[:, 0] = new_rows[pairs[:, 0]]
+                terms[term] = len(postings)
+                postings.append(array("I", pairs.tobytes()))
+        self._terms, self._postings = terms, postings
+
+        kept = np.flatnonzero(live)
+        self._chunk_ids = [self._chunk_ids[row] for row in kept.tolist()]
+        self._chunk_rows = {chunk_id: row for row, chunk_id in enumerate(self._chunk_ids)}
+        for name in ("_lengths", "_live", "_row_terms"):
+            old = getattr(self, name)
+            compacted = np.zeros(self._capacity, dtype=old.dtype)
+            compacted[:len(kept)] = old[kept]
+            setattr(self, name, compacted)
+        self._dead_postings = 0
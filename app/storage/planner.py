@@ -0,0 +1,170 @@
+import logging
+import math
+import threading
+from dataclasses import dataclass, replace
+
+from app.storage.hnsw_index import EXACT_CANDIDATE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# How DuckDBStore.search can answer a query:
+#   "index"      the in-memory index over every chunk (no filter);
+#   "prefilter"  the in-memory index over just the chunks the filter leaves;
+#   "postfilter" the exact in-memory index over every chunk for `fetch_k`
+#                hits, of which the best k the filter keeps are returned;
+#   "scan"       SQL over the whole chunks table, filtered in the join;
+#   "ivf"        SQL over the `nprobe` IVF partitions nearest the query;
+#   "fetch"      the filter's few chunks read by ID and scored in NumPy;
+#   "stream"     (batches only) the embeddings the filter leaves read out of
+#                SQL once and scored against every query in NumPy;
+#   "empty"      the filter leaves nothing.
+STRATEGIES = ("index", "prefilter", "postfilter", "scan", "ivf", "fetch", "stream", "empty")
+
+# "postfilter" and filtered IVF probing fetch this many times the hits the
+# filter's selectivity says are needed, so a ranking skewed against the
+# filter still leaves k.
+OVERFETCH = 2.0
+# DuckDB looks chunks up by primary key only for short ID lists (longer
+# ones scan the table), so "fetch" is only considered up to this many.
+FETCH_LIMIT = 48
+# Estimates are corrected by a running (geometric) mean of actual over
+# estimated time per strategy, giving the newest query this weight.
+CALIBRATION_WEIGHT = 0.1
+
+
+@dataclass
+class SearchCosts:
+    """
+    Unit costs in microseconds, for 384-dimensional vectors (scoring costs
+    scale with the dimension). Measured on a laptop and only roughly right
+    elsewhere: the planner rescales each strategy by how long it really took.
+    """
+    flat_row: float = 0.4          # score one row of an in-memory index
+    batch_row: float = 0.05        # score a row against each further query of a batch
+    gather_row: float = 0.7        # look up and copy a candidate row before scoring it
+    hnsw_ef: float = 5.0           # HNSW graph search, per unit of ef
+    hnsw_get_row: float = 30.0     # read one vector back out of the HNSW graph
+    hnsw_walk_node: float = 4.0    # node visited by a filtered HNSW walk
+    sql_probe_row: float = 0.08    # SQL scan, per row checked against the filter
+    sql_row: float = 2.0           # SQL scan, per row scored
+    fetch_query: float = 1500.0    # one fetch-by-ID query
+    fetch_row: float = 20.0        # per chunk fetched by ID
+    stream_row: float = 4.0        # read one row's vector out of SQL into NumPy
+
+
+@dataclass
+class SearchPlan:
+    """
+    A strategy (one of STRATEGIES) with its estimated time. `rows` is how
+    many chunks the filter leaves (every chunk without one); `fetch_k` and
+    `nprobe` parameterize "postfilter" and "ivf". For a batch, the estimate
+    covers all of its queries.
+    """
+    strategy: str
+    rows: int
+    estimated_ms: float
+    fetch_k: int = 0
+    nprobe: int = 0
+
+
+class SearchPlanner:
+    """
+    Picks the cheapest way to run each search from the collection size, the
+    filter's selectivity and k, using a cost model per strategy. `record`
+    logs each plan's estimated and actual time and feeds the ratio back
+    into later estimates for that strategy.
+    """
+    def __init__(self, costs: SearchCosts | None = None):
+        self.costs = costs or SearchCosts()
+        # Searches plan and record from several threads at once.
+        self._calibration: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, vector_index: str, dimension: int, total: int, rows: int | None, k: int,
+             ef_search: int = 0, n_lists: int = 0, nprobe: int = 0, row_group_size: int = 0,
+             queries: int = 1) -> SearchPlan:
+        """
+        Cheapest plan for a top-`k` query over `total` chunks, `rows` of
+        which pass its filter (None: unfiltered), or for a batch of
+        `queries` sharing that filter. `vector_index` is the store's
+        backend; `n_lists` is 0 until IVF partitions are trained, and
+        `row_group_size` is the table's (IVF scans whole row groups).
+        """
+        if rows == 0:
+            return SearchPlan("empty", 0, 0.0)
+        options = self._options(vector_index, dimension / 384.0, total, rows, k,
+                                ef_search, n_lists, nprobe, row_group_size, max(1, queries))
+        with self._lock:
+            calibration = dict(self._calibration)
+        return min(
+            (replace(p, estimated_ms=p.estimated_ms * calibration.get(p.strategy, 1.0)) for p in options),
+            key=lambda p: p.estimated_ms,
+        )
+
+    def record(self, plan: SearchPlan, actual_ms: float) -> None:
+        """Log how `plan` went and fold its actual time into later estimates."""
+        logger.debug(
+            f"Search plan {plan.strategy} over {plan.rows} rows: "
+            f"estimated {plan.estimated_ms:.2f} ms, took {actual_ms:.2f} ms"
+        )
+        if plan.estimated_ms <= 0 or actual_ms <= 0:
+            return
+        with self._lock:
+            factor = self._calibration.get(plan.strategy, 1.0)
+            factor *= (actual_ms / plan.estimated_ms) ** CALIBRATION_WEIGHT
+            self._calibration[plan.strategy] = min(max(factor, 0.05), 20.0)
+
+    def _options(self, vector_index: str, scale: float, total: int, rows: int | None, k: int,
+                 ef_search: int, n_lists: int, nprobe: int, row_group_size: int,
+                 queries: int) -> list[SearchPlan]:
+        c = self.costs
+        matched = total if rows is None else rows
+        # Hits to take before filtering so that about OVERFETCH * k survive.
+        fetch_k = total if rows is None else min(total, math.ceil(OVERFETCH * k * total / rows))
+
+        def score_us(n: int) -> float:
+            # A batch is one matrix product: the first query pays for reading
+            # the rows, the others only for the arithmetic.
+            return n * scale * (c.flat_row + (queries - 1) * c.batch_row)
+
+        if vector_index in ("duckdb", "ivf"):
+            scan_us = total * c.sql_probe_row + matched * c.sql_row * scale
+            options = [SearchPlan("scan", matched, queries * scan_us / 1000.0)]
+            if queries > 1:
+                stream_us = total * c.sql_probe_row + matched * c.stream_row * scale + score_us(matched)
+                options.append(SearchPlan("stream", matched, stream_us / 1000.0))
+            if rows is not None and rows <= FETCH_LIMIT:
+                options.append(SearchPlan(
+                    "fetch", rows, (c.fetch_query + rows * c.fetch_row + score_us(rows)) / 1000.0
+                ))
+            if vector_index == "ivf" and n_lists:
+                # Probe enough partitions that ~OVERFETCH * k matches are in them.
+                probes = nprobe if rows is None else max(nprobe, math.ceil(OVERFETCH * k * n_lists / rows))
+                if probes < n_lists:
+                    # A partition spans about one row group beyond its own rows.
+                    share = min(1.0, probes * (total / n_lists + row_group_size) / max(total, 1))
+                    options.append(SearchPlan("ivf", matched, queries * share * scan_us / 1000.0, nprobe=probes))
+            return options
+
+        def global_us(hits: int) -> float:
+            if vector_index == "hnsw":
+                return queries * c.hnsw_ef * max(ef_search, hits) * scale
+            return score_us(total)
+
+        if rows is None:
+            return [SearchPlan("index", total, global_us(k) / 1000.0)]
+        if vector_index == "hnsw":
+            if rows <= EXACT_CANDIDATE_LIMIT:
+                prefilter_us = queries * rows * c.hnsw_get_row * scale
+            else:
+                # The walk passes about 1/selectivity nodes per match it keeps.
+                prefilter_us = queries * c.hnsw_walk_node * min(total, max(ef_search, k) * total / rows)
+        else:
+            prefilter_us = rows * c.gather_row * scale + score_us(rows)
+        options = [SearchPlan("prefilter", rows, prefilter_us / 1000.0)]
+        if vector_index == "numpy":
+            # Only the exact index finds the same chunks either way. HNSW's
+            # global ranking misses neighbours a filtered walk would find, and
+            # quantized indexes would re-rank every fetched hit at full precision.
+            options.append(SearchPlan("postfilter", rows, global_us(fetch_k) / 1000.0, fetch_k=fetch_k))
+        return options
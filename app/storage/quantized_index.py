@@ -0,0 +1,136 @@
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from app.storage.vector_index import VectorIndex, normalize_rows, top_k
+
+# Compact encodings `QuantizedVectorIndex` can hold: one signed byte per
+# dimension plus a per-row scale (4x smaller than float32), or one bit per
+# dimension (32x smaller).
+QUANTIZATIONS = ("int8", "binary")
+
+# The first pass keeps k * DEFAULT_RERANK_FACTOR candidates for exact re-scoring.
+DEFAULT_RERANK_FACTOR = 10
+
+# int8 rows are widened to float32 this many at a time, so the temporary
+# stays in cache instead of materializing a float copy of the whole index.
+_SCORE_BLOCK = 4096
+
+# Set bits in every 16-bit value, for Hamming distances over packed codes.
+_POPCOUNT16 = np.array([i.bit_count() for i in range(1 << 16)], dtype=np.uint8)
+
+# Loads full-precision vectors for chunk IDs: returns the IDs it found (in
+# any order) and their vectors, one row each.
+FetchVectors = Callable[[Sequence[str]], tuple[list[str], npt.NDArray[np.float32]]]
+
+
+class QuantizedVectorIndex(VectorIndex):
+    """
+    Exact-on-the-shortlist cosine index over quantized embeddings. The
+    first pass scores every row from its compact code; the best
+    `k * rerank_factor` are then re-scored against full-precision vectors
+    from `fetch_vectors` (the `chunks` table), so only that shortlist is read
+    at full width. Without `fetch_vectors`, approximate scores are returned.
+
+    "int8" stores round(127 * v / max|v|) per row with that row's scale;
+    "binary" stores the sign bit of each dimension and ranks by Hamming
+    distance, mapped to an estimated cosine of cos(pi * hamming / dim).
+    """
+    def __init__(self, dimension: int, quantization: str = "int8",
+                 fetch_vectors: FetchVectors | None = None,
+                 rerank_factor: int = DEFAULT_RERANK_FACTOR, capacity: int = 1024):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of: {', '.join(QUANTIZATIONS)}")
+        self.quantization = quantization
+        self.fetch_vectors = fetch_vectors
+        self.rerank_factor = max(1, rerank_factor)
+        # Packed bits are padded to whole 16-bit words for the popcount table.
+        self._code_bytes = -(-dimension // 16) * 2
+        # int8 codes with float32 scales, or packed uint8 sign bits (no scales).
+        self._codes: npt.NDArray[np.integer[Any]]
+        self._scales: npt.NDArray[np.float32]
+        super().__init__(dimension, capacity)
+
+    @property
+    def row_bytes(self) -> int:
+        # int8 codes carry a float32 scale each.
+        return self.dimension + 4 if self.quantization == "int8" else self._code_bytes
+
+    def _allocate(self, capacity: int) -> None:
+        if self.quantization == "int8":
+            codes = np.zeros((capacity, self.dimension), dtype=np.int8)
+            scales = np.zeros(capacity, dtype=np.float32)
+            if self._size:
+                codes[:self._size] = self._codes[:self._size]
+                scales[:self._size] = self._scales[:self._size]
+            self._codes, self._scales = codes, scales
+        else:
+            codes = np.zeros((capacity, self._code_bytes), dtype=np.uint8)
+            if self._size:
+                codes[:self._size] = self._codes[:self._size]
+            self._codes = codes
+
+    def _encode_bits(self, vectors: npt.NDArray[np.float32]) -> npt.NDArray[np.uint8]:
+        packed = np.packbits(vectors > 0, axis=1)
+        if packed.shape[1] < self._code_bytes:
+            packed = np.pad(packed, ((0, 0), (0, self._code_bytes - packed.shape[1])))
+        return packed
+
+    def _set_rows(self, rows: npt.NDArray[np.intp], vectors: npt.NDArray[np.float32]) -> None:
+        if self.quantization == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._codes[rows] = np.rint(vectors / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        else:
+            self._codes[rows] = self._encode_bits(vectors)
+
+    def _move_row(self, src: int, dst: int) -> None:
+        self._codes[dst] = self._codes[src]
+        if self.quantization == "int8":
+            self._scales[dst] = self._scales[src]
+
+    def _scores(self, q: npt.NDArray[np.float32], rows: list[int] | None) -> npt.NDArray[np.float32]:
+        codes = self._codes[:self._size] if rows is None else self._codes[rows]
+        if self.quantization == "binary":
+            queries = q.reshape(self.dimension, -1).T
+            columns = []
+            for query in queries:
+                words = (codes ^ self._encode_bits(query.reshape(1, -1))).view(np.uint16)
+                hamming = _POPCOUNT16[words].sum(axis=1, dtype=np.int32)
+                columns.append(np.cos(np.pi * hamming / self.dimension).astype(np.float32))
+            return columns[0] if q.ndim == 1 else np.stack(columns, axis=1)
+
+        scales = self._scales[:self._size] if rows is None else self._scales[rows]
+        scores = np.empty((len(codes),) + q.shape[1:], dtype=np.float32)
+        block = np.empty((min(_SCORE_BLOCK, len(codes)), self.dimension), dtype=np.float32)
+        for start in range(0, len(codes), _SCORE_BLOCK):
+            chunk = codes[start:start + _SCORE_BLOCK]
+            widened = block[:len(chunk)]
+            np.copyto(widened, chunk, casting="unsafe")
+            np.dot(widened, q, out=scores[start:start + len(chunk)])
+        return scores * (scales if q.ndim == 1 else scales[:, None])
+
+    def search_many(self, queries: npt.ArrayLike, k: int,
+                    candidates: Sequence[str] | None = None) -> list[list[tuple[str, float]]]:
+        if self.fetch_vectors is None or k < 1:
+            return super().search_many(queries, k, candidates)
+        shortlists = super().search_many(queries, k * self.rerank_factor, candidates)
+        # One fetch of full-precision vectors for every query's shortlist.
+        wanted = list(dict.fromkeys(chunk_id for shortlist in shortlists for chunk_id, _ in shortlist))
+        if not wanted:
+            return [[] for _ in shortlists]
+        found, vectors = self.fetch_vectors(wanted)
+        positions = {chunk_id: i for i, chunk_id in enumerate(found)}
+        vectors = normalize_rows(vectors) if found else vectors
+        results: list[list[tuple[str, float]]] = []
+        for q, shortlist in zip(normalize_rows(queries), shortlists, strict=False):
+            rows = [positions[chunk_id] for chunk_id, _ in shortlist if chunk_id in positions]
+            if not rows:
+                results.append([])
+                continue
+            scores = vectors[rows] @ q
+            results.append([(found[rows[i]], float(scores[i])) for i in top_k(scores, k)])
+        return results
@@ -12,9 +12,45 @@ CREATE TABLE IF NOT EXISTS bookmarks (
 CREATE TABLE IF NOT EXISTS chunks (
     chunk_id TEXT PRIMARY KEY,
     bookmark_url TEXT REFERENCES bookmarks(url),
+    -- NULL when the chunk is a span of its bookmark's document (below).
     chunk_text TEXT,
     chunk_index INTEGER,
-    embedding FLOAT[384]
+    -- Character offsets of the chunk in its bookmark's document.
+    start_char_idx INTEGER,
+    end_char_idx INTEGER,
+    -- Width comes from the embedder: DuckDBStore fixes this to FLOAT[dim]
+    -- before the first vector is written and records dim in store_meta.
+    embedding FLOAT[],
+    -- ID of the model that produced `embedding` (BaseEmbedder.model_id).
+    embedding_model TEXT,
+    -- Nearest IVF centroid (ivf_centroids); NULL until partitions are trained.
+    partition_id INTEGER,
+    -- Copies of the bookmark's columns that search filters on and returns,
+    -- so a search reads only this table. DuckDBStore rewrites them whenever
+    -- the bookmark is upserted; repeated values compress to dictionaries.
+    title TEXT,
+    folder TEXT,
+    date_added TIMESTAMP,
+    domain TEXT
+);
+
+-- Cleaned text of each bookmark, stored once however many (overlapping)
+-- chunks are cut from it: UTF-8, zlib-compressed when `compressed`.
+CREATE TABLE IF NOT EXISTS documents (
+    url TEXT PRIMARY KEY,
+    body BLOB,
+    compressed BOOLEAN
+);
+
+-- k-means centroids for vector_index "ivf", one per partition_id (0..n-1).
+CREATE TABLE IF NOT EXISTS ivf_centroids (
+    partition_id INTEGER PRIMARY KEY,
+    centroid FLOAT[]
+);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
 );
 
 -- Index for vector search (if supported by extension, else linear scan is fine for small dataset)
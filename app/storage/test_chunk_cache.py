@@ -0,0 +1,37 @@
+import pytest
+
+from app.storage.chunk_cache import CachedChunk, ChunkCache
+
+
+def _chunk(url, text="text"):
+    return CachedChunk(text, url, "Title", "Folder", None, "domain")
+
+
+def test_least_recently_used_chunks_are_evicted():
+    cache = ChunkCache(max_size=2)
+    cache.put_many({"a": _chunk("u"), "b": _chunk("u")}, cache.generation)
+    cache.get_many(["a"])
+    cache.put_many({"c": _chunk("u")}, cache.generation)
+
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["a", "c"]
+
+
+def test_discards_drop_chunks_and_rows_read_before_them():
+    cache = ChunkCache()
+    cache.put_many({"a0": _chunk("https://a.com"), "a1": _chunk("https://a.com"),
+                    "b0": _chunk("https://b.com")}, cache.generation)
+    cache.discard_bookmarks(["https://a.com"])
+    assert list(cache.get_many(["a0", "a1", "b0"])) == ["b0"]
+
+    generation = cache.generation
+    cache.discard(["b0"])
+    cache.put_many({"b0": _chunk("https://b.com", "stale")}, generation)
+    assert cache.get_many(["b0"]) == {}
+
+
+def test_size_zero_disables_the_cache():
+    cache = ChunkCache(max_size=0)
+    cache.put_many({"a": _chunk("u")}, cache.generation)
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        ChunkCache(max_size=-1)
@@ -0,0 +1,31 @@
+from app.storage.collection_stats import CollectionStats, Facet
+
+
+def test_counts_follow_bookmark_moves_status_changes_and_rechunking():
+    stats = CollectionStats()
+    stats.set_bookmarks(["a", "b", "c"], ["Tech", "Tech", None], ["a.com", "b.com", "a.com"],
+                        ["indexed", "indexed", "failed"])
+    stats.set_chunk_counts({"a": 3, "b": 2, "unknown": 9})
+
+    assert stats.totals() == {"total_bookmarks": 3, "failed_bookmarks": 1, "total_chunks": 5}
+    assert stats.facets()["folders"] == [Facet("Tech", 2, 5)]
+    assert stats.facets()["domains"] == [Facet("a.com", 2, 3), Facet("b.com", 1, 2)]
+
+    # "b" moves folder (taking its chunks along), "c" is retried, "a" is re-chunked.
+    stats.set_bookmarks(["b", "c"], ["Food", None], ["b.com", "a.com"], ["indexed", "indexed"])
+    stats.set_chunk_counts({"a": 1})
+
+    assert stats.totals() == {"total_bookmarks": 3, "failed_bookmarks": 0, "total_chunks": 3}
+    assert stats.facets()["folders"] == [Facet("Food", 1, 2), Facet("Tech", 1, 1)]
+    assert stats.facets()["domains"] == [Facet("a.com", 2, 1), Facet("b.com", 1, 2)]
+
+
+def test_facets_are_built_once_per_change():
+    stats = CollectionStats()
+    stats.set_bookmarks(["a"], ["Tech"], ["a.com"], ["indexed"])
+
+    first = stats.facets()
+    assert stats.facets() is first
+    stats.set_chunk_counts({"a": 2})
+    assert stats.facets() is not first
+    assert stats.facets()["folders"] == [Facet("Tech", 1, 2)]
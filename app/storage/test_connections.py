@@ -0,0 +1,76 @@
+import threading
+
+import duckdb
+import pytest
+
+from app.storage.connections import ConnectionPool
+
+
+def _pool(read_connections=2):
+    pool = ConnectionPool(duckdb.connect(), read_connections)
+    with pool.write() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    return pool
+
+
+def _count(pool):
+    with pool.read() as conn:
+        row = conn.execute("SELECT count(*) FROM t").fetchone()
+    return row[0] if row else None
+
+
+def test_transactions_commit_roll_back_and_nest():
+    pool = _pool()
+    with pool.transaction() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+        with pool.transaction() as inner:
+            inner.execute("INSERT INTO t VALUES (2)")
+        # Readers see only committed rows.
+        assert _count(pool) == 0
+    assert _count(pool) == 2
+
+    with pytest.raises(RuntimeError), pool.transaction() as conn:
+        conn.execute("INSERT INTO t VALUES (3)")
+        raise RuntimeError("boom")
+    assert _count(pool) == 2
+    with pool.transaction() as conn:  # the writer is usable again
+        conn.execute("INSERT INTO t VALUES (4)")
+    assert _count(pool) == 3
+
+
+def test_readers_run_while_a_transaction_is_open_on_another_thread():
+    pool = _pool()
+    started, finish = threading.Event(), threading.Event()
+
+    def write():
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            started.set()
+            finish.wait(5)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert started.wait(5)
+    assert _count(pool) == 0
+    finish.set()
+    writer.join()
+    assert _count(pool) == 1
+
+
+def test_readers_wait_for_a_free_cursor():
+    pool = _pool(read_connections=1)
+    done = threading.Event()
+
+    def read():
+        _count(pool)
+        done.set()
+
+    with pool.read():
+        reader = threading.Thread(target=read)
+        reader.start()
+        assert not done.wait(0.1)
+    assert done.wait(5)
+    reader.join()
+
+    with pytest.raises(ValueError):
+        ConnectionPool(duckdb.connect(), read_connections=0)
@@ -1,14 +1,22 @@
+import importlib.util
+import os
+
+import duckdb
 import pytest
 from datetime import datetime, timezone
-from app.storage.duckdb_store import DuckDBStore
-from app.storage.base import Chunk
+from app.storage.duckdb_store import UNTAGGED_MODEL, DuckDBStore
+from app.storage.base import BookmarkRecord, Chunk
 
 # Use in-memory DB for tests
 TEST_DB_PATH = ":memory:"
 
-@pytest.fixture
-def store():
-    store = DuckDBStore(db_path=TEST_DB_PATH)
+requires_hnswlib = pytest.mark.skipif(importlib.util.find_spec("hnswlib") is None, reason="hnswlib not installed")
+VECTOR_INDEX_PARAMS = ["duckdb", "numpy", "int8", "binary", "ivf", pytest.param("hnsw", marks=requires_hnswlib)]
+
+# Every store test runs against every search path.
+@pytest.fixture(params=VECTOR_INDEX_PARAMS)
+def store(request):
+    store = DuckDBStore(db_path=TEST_DB_PATH, vector_index=request.param)
     # Ensure schema is applied
     store.initialize()
     return store
@@ -21,7 +29,7 @@ def test_file_store_creates_missing_parent_directory(tmp_path):
         assert db_path.parent.is_dir()
         assert db_path.is_file()
     finally:
-        store.conn.close()
+        store.close()
 
 def test_upsert_bookmark(store):
     url = "https://example.com"
@@ -189,6 +197,750 @@ def test_search_filters_date(store):
     assert len(results) == 1
     assert results[0].metadata["url"] == "https://old.com"
 
+def test_search_filters_value_lists_and_folder_prefix(store):
+    for i, folder in enumerate(["Tech", "Tech/Python", "Technology", "Food"]):
+        url = f"https://{i}.com"
+        store.upsert_bookmark(url, str(i), folder, datetime(2023, 1 + i, 1), f"{i % 2}.com", "processed")
+        store.store_chunks([Chunk(f"c{i}", url, folder, 0, [0.1] * 384)])
+
+    def folders(filters):
+        return sorted(r.text for r in store.search([0.1] * 384, k=10, filters=filters))
+
+    assert folders({"folder": ["Tech", "Food"]}) == ["Food", "Tech"]
+    assert folders({"folder_prefix": "Tech"}) == ["Tech", "Tech/Python"]
+    assert folders({"folder_prefix": ["Tech/Python", "Food"]}) == ["Food", "Tech/Python"]
+    assert folders({"domain": ["1.com"], "folder_prefix": "Tech"}) == ["Tech/Python"]
+    assert folders({"folder": []}) == []
+    assert folders({"date_from": "2023-02-01", "date_to": "2023-03-01"}) == ["Tech/Python", "Technology"]
+
+    # Moving a bookmark to another folder moves its chunks too.
+    store.upsert_bookmark("https://3.com", "3", "Tech/Food", datetime(2023, 4, 1), "1.com", "processed")
+    assert folders({"folder_prefix": "Tech"}) == ["Food", "Tech", "Tech/Python"]
+
+def test_filter_index_is_rebuilt_on_open(tmp_path):
+    db_path = str(tmp_path / "filters.duckdb")
+    store = DuckDBStore(db_path=db_path)
+    store.initialize()
+    store.upsert_bookmarks([
+        BookmarkRecord("https://a.com", "A", "Tech/Python", None, "a.com", "processed"),
+        BookmarkRecord("https://b.com", "B", "Food", None, "b.com", "processed"),
+    ])
+    store.store_chunks([Chunk("a0", "https://a.com", "a", 0, [1.0, 0.0]), Chunk("b0", "https://b.com", "b", 0, [0.0, 1.0])])
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path)
+    reopened.initialize()
+    assert len(reopened.filter_index) == 2
+    assert [r.text for r in reopened.search([0.0, 1.0], k=2, filters={"folder_prefix": "Tech"})] == ["a"]
+    reopened.close()
+
+def test_stats_and_facets_follow_writes_and_reopen(tmp_path):
+    from app.storage.collection_stats import Facet
+
+    db_path = str(tmp_path / "stats.duckdb")
+    store = DuckDBStore(db_path=db_path)
+    store.initialize()
+    store.upsert_bookmarks([
+        BookmarkRecord("https://a.com/1", "A", "Tech", None, "a.com", "indexed"),
+        BookmarkRecord("https://a.com/2", "A2", "Tech", None, "a.com", "indexed"),
+        BookmarkRecord("https://b.com", "B", "Food", None, "b.com", "failed"),
+    ])
+    store.store_chunks([Chunk(f"a{i}", "https://a.com/1", "a", i, [1.0, 0.0]) for i in range(3)])
+    store.store_chunks([Chunk("a2-0", "https://a.com/2", "a", 0, [1.0, 0.0])])
+    store.store_chunks([Chunk(f"a{i}", "https://a.com/1", "a", i, [1.0, 0.0]) for i in range(2)])
+    store.upsert_bookmark("https://a.com/2", "A2", "Food", None, "a.com", "indexed")
+
+    expected_stats = {"total_bookmarks": 3, "failed_bookmarks": 1, "total_chunks": 3}
+    expected_facets = {
+        "folders": [Facet("Food", 2, 1), Facet("Tech", 1, 2)],
+        "domains": [Facet("a.com", 2, 3), Facet("b.com", 1, 0)],
+    }
+    assert store.stats() == expected_stats
+    assert store.facets() == expected_facets
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path)
+    reopened.initialize()
+    assert reopened.stats() == expected_stats
+    assert reopened.facets() == expected_facets
+    reopened.close()
+
 def test_search_no_results(store):
     results = store.search([0.1]*384, k=1)
     assert len(results) == 0
+
+def test_store_chunks_accepts_float32_array_rows(store):
+    import numpy as np
+
+    url = "https://example.com"
+    store.upsert_bookmark(url, "Title", "Folder", datetime.now(timezone.utc), "domain", "processed")
+
+    matrix = np.zeros((2, 384), dtype=np.float32)
+    matrix[0, 0] = 1.0
+    matrix[1, 1] = 1.0
+    store.store_chunks([
+        Chunk("c1", url, "first", 0, matrix[0]),
+        Chunk("c2", url, "second", 1, matrix[1]),
+    ])
+
+    results = store.search([1.0] + [0.0] * 383, k=1)
+    assert results[0].text == "first"
+    assert results[0].score > 0.99
+
+def test_store_chunks_replaces_existing_chunks_for_bookmark(store):
+    url = "https://example.com"
+    store.upsert_bookmark(url, "Title", "Folder", datetime.now(timezone.utc), "domain", "processed")
+    store.store_chunks([Chunk("c1", url, "old", 0, [0.1] * 384), Chunk("c2", url, "old", 1, [0.1] * 384)])
+    store.store_chunks([Chunk("c3", url, "new", 0, [0.1] * 384)])
+
+    rows = store.conn.execute("SELECT chunk_id FROM chunks WHERE bookmark_url = ?", [url]).fetchall()
+    assert rows == [("c3",)]
+
+def test_upsert_bookmarks_bulk(store):
+    from app.storage.base import BookmarkRecord
+
+    now = datetime.now(timezone.utc)
+    store.upsert_bookmark("https://a.com", "Old A", "", now, "a.com", "pending")
+    store.upsert_bookmarks([
+        BookmarkRecord("https://a.com", "A", "Tech", now, "a.com", "indexed"),
+        BookmarkRecord("https://b.com", "B", "Food", None, "b.com", "failed"),
+        BookmarkRecord("https://b.com", "B2", "Food", None, "b.com", "indexed"),
+    ])
+
+    assert sorted(store.list_all_urls()) == ["https://a.com", "https://b.com"]
+    a = store.get_by_url("https://a.com")
+    assert a["title"] == "A"
+    assert a["status"] == "indexed"
+    assert store.get_by_url("https://b.com")["title"] == "B2"
+
+def test_store_chunks_bulk_across_bookmarks(store):
+    now = datetime.now(timezone.utc)
+    for url in ("https://a.com", "https://b.com"):
+        store.upsert_bookmark(url, url, "", now, "domain", "indexed")
+    store.store_chunks([Chunk("old", "https://a.com", "stale", 0, [0.1] * 384)])
+
+    store.store_chunks([
+        Chunk("a0", "https://a.com", "a0", 0, [0.1] * 384),
+        Chunk("b0", "https://b.com", "b0", 0, [0.2] * 384),
+        Chunk("b1", "https://b.com", "b1", 1, [0.3] * 384),
+    ])
+
+    rows = store.conn.execute("SELECT chunk_id FROM chunks ORDER BY chunk_id").fetchall()
+    assert [r[0] for r in rows] == ["a0", "b0", "b1"]
+
+def test_embedding_dimension_is_taken_from_first_write_and_recorded(store):
+    assert store.dimension is None
+    assert store.search([0.1] * 8, k=3) == []
+
+    store.upsert_bookmark("https://a.com", "A", "", None, "a.com", "indexed")
+    store.store_chunks([Chunk("c1", "https://a.com", "t", 0, [0.1] * 8)])
+
+    assert store.dimension == 8
+    assert store.get_meta("embedding_dimension") == "8"
+    assert store.search([0.1] * 8, k=1)[0].text == "t"
+
+    with pytest.raises(ValueError, match="dimension"):
+        store.store_chunks([Chunk("c2", "https://a.com", "t", 0, [0.1] * 384)])
+    with pytest.raises(ValueError, match="dimension"):
+        store.search([0.1] * 384, k=1)
+
+def test_dimension_survives_reopen_and_is_checked_against_request(tmp_path):
+    db_path = str(tmp_path / "dim.duckdb")
+    store = DuckDBStore(db_path=db_path, dimension=16)
+    store.initialize()
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path)
+    reopened.initialize()
+    assert reopened.dimension == 16
+    reopened.close()
+
+    mismatched = DuckDBStore(db_path=db_path, dimension=384)
+    with pytest.raises(ValueError, match="dimension"):
+        mismatched.initialize()
+    mismatched.close()
+
+def test_legacy_fixed_width_schema_is_adopted(tmp_path):
+    import duckdb
+
+    db_path = str(tmp_path / "legacy.duckdb")
+    conn = duckdb.connect(db_path)
+    conn.execute("CREATE TABLE chunks (chunk_id TEXT PRIMARY KEY, bookmark_url TEXT, chunk_text TEXT, chunk_index INTEGER, embedding FLOAT[384])")
+    conn.close()
+
+    store = DuckDBStore(db_path=db_path)
+    store.initialize()
+    assert store.dimension == 384
+    assert store.get_meta("embedding_dimension") == "384"
+    store.close()
+
+def test_chunks_of_older_databases_get_bookmark_columns(tmp_path):
+    import duckdb
+
+    db_path = str(tmp_path / "joined.duckdb")
+    conn = duckdb.connect(db_path)
+    conn.execute("CREATE TABLE bookmarks (url TEXT PRIMARY KEY, title TEXT, folder TEXT, date_added TIMESTAMP, domain TEXT, status TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)")
+    conn.execute("CREATE TABLE chunks (chunk_id TEXT PRIMARY KEY, bookmark_url TEXT REFERENCES bookmarks(url), chunk_text TEXT, chunk_index INTEGER, embedding FLOAT[2])")
+    conn.execute("INSERT INTO bookmarks VALUES ('https://a.com', 'A', 'Tech', '2024-01-01', 'a.com', 'indexed', NULL, NULL)")
+    conn.execute("INSERT INTO chunks VALUES ('a0', 'https://a.com', 'text', 0, [1.0, 0.0])")
+    conn.close()
+
+    store = DuckDBStore(db_path=db_path, vector_index="duckdb")
+    store.initialize()
+    assert store.conn.execute("SELECT title, folder, date_added, domain FROM chunks").fetchall() == [
+        ("A", "Tech", datetime(2024, 1, 1), "a.com")
+    ]
+    [hit] = store.search([1.0, 0.0], k=1, filters={"folder": "Tech"})
+    assert hit.metadata["title"] == "A" and hit.metadata["url"] == "https://a.com"
+    store.close()
+
+def test_bookmark_upserts_rewrite_the_chunk_copies(store):
+    store.upsert_bookmark("https://a.com", "A", "Tech", datetime(2024, 1, 1), "a.com", "indexed")
+    store.store_chunks([Chunk("a0", "https://a.com", "text", 0, [0.1] * 384)])
+    store.upsert_bookmark("https://a.com", "Renamed", "Food", datetime(2024, 2, 1), "a.com", "indexed")
+    [hit] = store.search([0.1] * 384, k=1, filters={"folder": "Food"})
+    assert (hit.metadata["title"], hit.metadata["folder"]) == ("Renamed", "Food")
+
+    store.upsert_bookmarks([BookmarkRecord("https://a.com", "Batch", "Tech", None, "a.com", "indexed")])
+    assert store.conn.execute("SELECT title, folder, date_added FROM chunks").fetchall() == [("Batch", "Tech", None)]
+    assert store.search([0.1] * 384, k=1, filters={"folder": "Food"}) == []
+
+def test_hydrated_chunks_are_cached_until_rewritten(store):
+    store.upsert_bookmark("https://a.com", "A", "Tech", None, "a.com", "indexed")
+    store.store_chunks([Chunk("a0", "https://a.com", "old", 0, [0.1] * 384)])
+    assert store.search([0.1] * 384, k=1)[0].text == "old"
+    assert list(store.chunk_cache.get_many(["a0"])) == ["a0"]
+
+    store.upsert_bookmark("https://a.com", "Renamed", "Tech", None, "a.com", "indexed")
+    assert store.search([0.1] * 384, k=1)[0].metadata["title"] == "Renamed"
+    store.store_chunks([Chunk("a0", "https://a.com", "new", 0, [0.1] * 384)])
+    assert store.search([0.1] * 384, k=1)[0].text == "new"
+
+def test_hydrated_chunks_keep_missing_metadata_empty(store):
+    store.upsert_bookmark("https://a.com", None, None, None, None, "indexed")
+    store.store_chunks([Chunk("a0", "https://a.com", "text", 0, [0.1] * 384)])
+    [hit] = store.search([0.1] * 384, k=1)
+    assert (hit.metadata["title"], hit.metadata["folder"], hit.metadata["domain"]) == ("", "", "")
+    assert store.chunk_cache.get_many(["a0"])["a0"].title == ""
+
+def test_lexical_search_follows_writes_filters_and_reopen(tmp_path):
+    db_path = str(tmp_path / "text.duckdb")
+    store = DuckDBStore(db_path=db_path, text_index=True)
+    store.initialize()
+    store.upsert_bookmark("https://a.com", "A", "Tech", None, "a.com", "indexed")
+    store.upsert_bookmark("https://b.com", "B", "Food", None, "b.com", "indexed")
+    store.store_chunks([
+        Chunk("a0", "https://a.com", "fix ERR_CONN_RESET in nginx", 0, [0.1] * 4),
+        Chunk("b0", "https://b.com", "nginx recipes", 0, [0.2] * 4),
+    ])
+    [hit] = store.lexical_search("ERR_CONN_RESET", k=5)
+    assert (hit.metadata["chunk_id"], hit.metadata["folder"]) == ("a0", "Tech")
+    assert [h.metadata["chunk_id"] for h in store.lexical_search("nginx", k=5, filters={"folder": "Food"})] == ["b0"]
+
+    store.store_chunks([Chunk("a1", "https://a.com", "rewritten", 0, [0.1] * 4)])
+    assert store.lexical_search("ERR_CONN_RESET", k=5) == []
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path, text_index=True)
+    reopened.initialize()
+    assert [h.metadata["chunk_id"] for h in reopened.lexical_search("rewritten nginx", k=5)] == ["a1", "b0"]
+    assert DuckDBStore(text_index=False).lexical_search("nginx", k=5) == []
+
+def _document_chunks(document, spans, url="https://a.com"):
+    return [
+        Chunk(f"d{i}", url, document[start:end], i, [1.0, float(i)], start_char_idx=start, end_char_idx=end)
+        for i, (start, end) in enumerate(spans)
+    ]
+
+def test_chunks_are_stored_as_offsets_into_their_document(store):
+    document = "Caf\u00e9 \U0001F600 notes.\n\nSecond paragraph about nginx. Third sentence here."
+    second = document.index("Second")
+    spans = [(0, document.index(" Third")), (second, len(document)), (document.index("Third"), len(document))]
+    store.upsert_bookmark("https://a.com", "A", "Tech", None, "a.com", "indexed")
+    chunks = _document_chunks(document, spans)
+    chunks.append(Chunk("own", "https://a.com", "not part of the document", 3, [0.0, 1.0], 0, 5))
+    store.store_chunks(chunks, documents={"https://a.com": document})
+
+    with store.connections.read() as conn:
+        stored = dict(conn.execute("SELECT chunk_id, chunk_text FROM chunks").fetchall())
+    assert stored == {"d0": None, "d1": None, "d2": None, "own": "not part of the document"}
+    found = {r.metadata["chunk_id"]: r.text for r in store.search([1.0, 1.0], k=4)}
+    assert found == {c.chunk_id: c.text for c in chunks}
+    assert store.get_document("https://a.com") == document
+
+    store.begin_reembedding("model-b", 2)
+    assert dict(store.pending_reembedding(10)) == found
+    store.abort_reembedding()
+
+    # Re-chunking without a document drops the old one.
+    store.store_chunks([Chunk("x", "https://a.com", "plain", 0, [1.0, 0.0])])
+    assert store.get_document("https://a.com") is None
+    assert [r.text for r in store.search([1.0, 0.0], k=1)] == ["plain"]
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_text_index_is_rebuilt_from_documents(tmp_path, compress):
+    document = "Fix ERR_CONN_RESET in nginx. Then restart the service. Unrelated closing words."
+    db_path = str(tmp_path / "documents.duckdb")
+    store = DuckDBStore(db_path=db_path, text_index=True, compress_documents=compress)
+    store.initialize()
+    store.upsert_bookmark("https://a.com", "A", "Tech", None, "a.com", "indexed")
+    store.store_chunks(_document_chunks(document, [(0, 28), (29, 80)]), documents={"https://a.com": document})
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path, text_index=True, compress_documents=not compress)
+    reopened.initialize()
+    [hit] = reopened.lexical_search("ERR_CONN_RESET", k=5)
+    assert (hit.metadata["chunk_id"], hit.text) == ("d0", "Fix ERR_CONN_RESET in nginx.")
+    assert reopened.get_document("https://a.com") == document
+    reopened.close()
+
+def _seed(store, model_id="model-a", dim=4):
+    store.upsert_bookmark("https://a.com", "A", "", None, "a.com", "indexed")
+    store.store_chunks([
+        Chunk("c1", "https://a.com", "first", 0, [1.0] + [0.0] * (dim - 1)),
+        Chunk("c2", "https://a.com", "second", 1, [0.0, 1.0] + [0.0] * (dim - 2)),
+    ], model_id=model_id)
+
+def test_chunks_are_tagged_with_model_and_other_models_rejected(store):
+    _seed(store)
+    assert store.embedding_model == "model-a"
+    assert store.get_meta("embedding_model") == "model-a"
+    rows = store.conn.execute("SELECT DISTINCT embedding_model FROM chunks").fetchall()
+    assert rows == [("model-a",)]
+
+    with pytest.raises(ValueError, match="model-b"):
+        store.store_chunks([Chunk("c3", "https://a.com", "t", 0, [0.1] * 4)], model_id="model-b")
+
+def test_untagged_chunks_are_re_embedded_not_adopted(store):
+    store.upsert_bookmark("https://a.com", "A", "", None, "a.com", "indexed")
+    store.store_chunks([Chunk("old", "https://a.com", "t", 0, [0.1] * 4)])
+    store.upsert_bookmark("https://b.com", "B", "", None, "b.com", "indexed")
+    store.store_chunks([Chunk("new", "https://b.com", "t", 0, [0.1] * 4)], model_id="model-a")
+
+    rows = store.conn.execute("SELECT chunk_id, embedding_model FROM chunks ORDER BY chunk_id").fetchall()
+    assert rows == [("new", "model-a"), ("old", UNTAGGED_MODEL)]
+    # The first tagged write does not claim the old vectors; a migration replaces them all.
+    assert store.embedding_model == UNTAGGED_MODEL
+    store.begin_reembedding("model-a", 4)
+    assert [chunk_id for chunk_id, _ in store.pending_reembedding(limit=10)] == ["new", "old"]
+
+def test_untagged_chunks_are_found_on_open(tmp_path):
+    db_path = str(tmp_path / "legacy.duckdb")
+    store = DuckDBStore(db_path=db_path)
+    store.initialize()
+    store.upsert_bookmark("https://a.com", "A", "", None, "a.com", "indexed")
+    store.store_chunks([Chunk("old", "https://a.com", "t", 0, [0.1] * 4)])
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path)
+    reopened.initialize()
+    assert reopened.embedding_model == UNTAGGED_MODEL
+    reopened.adopt_untagged_chunks("model-a")
+    assert reopened.embedding_model == "model-a"
+    assert reopened.conn.execute("SELECT DISTINCT embedding_model FROM chunks").fetchall() == [("model-a",)]
+    with pytest.raises(ValueError, match="not untagged"):
+        reopened.adopt_untagged_chunks("model-b")
+    reopened.close()
+
+def test_reembedding_switches_model_and_width_atomically(store):
+    import numpy as np
+
+    _seed(store)
+    store.begin_reembedding("model-b", 3)
+    assert store.reembedding_model == "model-b"
+    assert store.reembedding_progress() == (0, 2)
+
+    pending = store.pending_reembedding(limit=1)
+    assert pending == [("c1", "first")]
+    store.store_reembedded(["c1"], np.array([[0.0, 0.0, 1.0]], dtype=np.float32))
+    assert store.reembedding_progress() == (1, 2)
+
+    # Searches still run against the old vectors mid-migration.
+    assert store.search([1.0, 0.0, 0.0, 0.0], k=1)[0].text == "first"
+    with pytest.raises(ValueError, match="dimension"):
+        store.search([0.0, 0.0, 1.0], k=1)
+
+    store.store_reembedded(["c2"], np.array([[0.0, 1.0, 0.0]], dtype=np.float32))
+    assert store.pending_reembedding(limit=10) == []
+    assert store.switch_embedding_model() is True
+
+    assert (store.embedding_model, store.dimension, store.reembedding_model) == ("model-b", 3, None)
+    assert store.get_meta("embedding_dimension") == "3"
+    assert store.search([0.0, 0.0, 1.0], k=1)[0].text == "first"
+    assert store.conn.execute("SELECT DISTINCT embedding_model FROM chunks").fetchall() == [("model-b",)]
+    # Constraints survive the table swap.
+    with pytest.raises(duckdb.ConstraintException):
+        store.store_chunks([Chunk("c9", "https://nowhere.example", "t", 0, [0.1] * 3)], model_id="model-b")
+
+def test_switch_waits_for_chunks_written_during_migration(store):
+    import numpy as np
+
+    _seed(store)
+    store.begin_reembedding("model-b", 3)
+    store.store_reembedded(["c1", "c2"], np.ones((2, 3), dtype=np.float32))
+
+    store.upsert_bookmark("https://b.com", "B", "", None, "b.com", "indexed")
+    store.store_chunks([Chunk("c3", "https://b.com", "late", 0, [0.1] * 4)], model_id="model-a")
+
+    assert store.switch_embedding_model() is False
+    assert store.embedding_model == "model-a"
+    assert store.pending_reembedding(limit=10) == [("c3", "late")]
+
+def test_reembedding_resumes_after_reopen_and_can_be_aborted(tmp_path):
+    import numpy as np
+
+    db_path = str(tmp_path / "reembed.duckdb")
+    store = DuckDBStore(db_path=db_path)
+    store.initialize()
+    _seed(store)
+    store.begin_reembedding("model-b", 3)
+    store.store_reembedded(["c1"], np.ones((1, 3), dtype=np.float32))
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path)
+    reopened.initialize()
+    assert reopened.reembedding_model == "model-b"
+    reopened.begin_reembedding("model-b", 3)
+    assert reopened.reembedding_progress() == (1, 2)
+
+    # A migration to yet another model starts over.
+    reopened.begin_reembedding("model-c", 2)
+    assert reopened.reembedding_progress() == (0, 2)
+
+    reopened.abort_reembedding()
+    assert reopened.reembedding_model is None
+    assert reopened.get_meta("reembedding_model") is None
+    assert reopened.embedding_model == "model-a"
+    reopened.close()
+
+def test_index_follows_writes_and_reloads_on_open(tmp_path):
+    db_path = str(tmp_path / "index.duckdb")
+    store = DuckDBStore(db_path=db_path)
+    store.initialize()
+    assert store.index is None  # no width yet
+
+    _seed(store)
+    assert len(store.index) == 2
+    store.store_chunks([Chunk("c3", "https://a.com", "only", 0, [0.0, 0.0, 1.0, 0.0])], model_id="model-a")
+    assert store.index.ids == ["c3"]
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path)
+    reopened.initialize()
+    assert reopened.index.ids == ["c3"]
+    assert reopened.search([0.0, 0.0, 1.0, 0.0], k=5)[0].text == "only"
+    reopened.close()
+
+def test_index_and_sql_scan_agree(tmp_path):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((60, 8)).astype(np.float32)
+    query = rng.standard_normal(8).astype(np.float32).tolist()
+    results = {}
+    kinds = ["duckdb", "numpy", "int8", "binary"] + (["hnsw"] if importlib.util.find_spec("hnswlib") else [])
+    for kind in kinds:
+        # 60 chunks fit in one HNSW candidate list and in the quantized
+        # indexes' re-rank shortlist, so every backend is exact here.
+        store = DuckDBStore(db_path=":memory:", vector_index=kind)
+        store.initialize()
+        for j in range(3):
+            store.upsert_bookmark(f"https://{j}.com", str(j), f"F{j % 2}", None, f"{j}.com", "indexed")
+        store.store_chunks([Chunk(f"c{i}", f"https://{i % 3}.com", f"t{i}", i, vectors[i]) for i in range(60)])
+        results[kind] = [
+            [(r.text, round(r.score, 5)) for r in store.search(query, k=7, filters=filters)]
+            for filters in (None, {"folder": "F1"}, {"domain": "2.com"}, {"domain": ["0.com", "2.com"]})
+        ]
+    for kind in kinds:
+        assert results[kind] == results["duckdb"]
+
+@requires_hnswlib
+def test_hnsw_index_is_saved_and_caught_up_on_open(tmp_path):
+    db_path = str(tmp_path / "hnsw.duckdb")
+    store = DuckDBStore(db_path=db_path, vector_index="hnsw")
+    store.initialize()
+    _seed(store)
+    assert store.index.dirty
+    store.save_index()
+    assert os.path.exists(db_path + ".hnsw") and not store.index.dirty
+    # Written after the last save: the saved graph misses c3 and still has c1/c2.
+    store.store_chunks([Chunk("c3", "https://a.com", "only", 0, [0.0, 0.0, 1.0, 0.0])], model_id="model-a")
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path, vector_index="hnsw")
+    reopened.initialize()
+    assert reopened.index.ids == ["c3"]
+    assert reopened.search([0.0, 0.0, 1.0, 0.0], k=5)[0].text == "only"
+    assert not reopened.index.dirty  # the catch-up was saved
+    reopened.close()
+
+@requires_hnswlib
+def test_hnsw_index_is_rebuilt_for_other_vectors(tmp_path):
+    db_path = str(tmp_path / "hnsw.duckdb")
+    store = DuckDBStore(db_path=db_path, vector_index="hnsw")
+    store.initialize()
+    _seed(store)
+    store.save_index()
+    # Same chunk IDs, new vectors from another model.
+    store.begin_reembedding("model-b", 4)
+    store.store_reembedded(["c1", "c2"], [[0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 1.0, 0.0]])
+    assert store.switch_embedding_model()
+    store.close()
+
+    reopened = DuckDBStore(db_path=db_path, vector_index="hnsw")
+    reopened.initialize()
+    assert reopened.index.source == "model-b"
+    assert reopened.search([0.0, 0.0, 0.0, 1.0], k=1)[0].metadata["chunk_id"] == "c1"
+    reopened.close()
+
+def test_quantized_index_reranks_with_full_precision_vectors(tmp_path):
+    import numpy as np
+
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((500, 32)).astype(np.float32)
+    query = (vectors[3] + 0.3 * rng.standard_normal(32)).astype(np.float32).tolist()
+    store = DuckDBStore(db_path=":memory:", vector_index="binary", rerank_factor=20)
+    store.initialize()
+    store.upsert_bookmark("https://a.com", "A", "", None, "a.com", "indexed")
+    store.store_chunks([Chunk(f"c{i}", "https://a.com", f"t{i}", i, vectors[i]) for i in range(500)])
+
+    exact = vectors @ np.asarray(query) / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    hits = store.search(query, k=3)
+    assert hits[0].metadata["chunk_id"] == "c3"
+    # Scores are the exact cosines, not the binary estimates.
+    assert hits[0].score == pytest.approx(float(exact[3]), abs=1e-5)
+    assert store.index.nbytes == 1024 * 4  # 4 bytes per reserved row, not 128
+
+def _ivf_store(db_path, n=2000, dim=16, **kwargs):
+    import numpy as np
+
+    rng = np.random.default_rng(2)
+    vectors = (rng.standard_normal((n, 4)) @ rng.standard_normal((4, dim))).astype(np.float32)
+    store = DuckDBStore(db_path=db_path, vector_index="ivf", **kwargs)
+    store.initialize()
+    store.upsert_bookmark("https://a.com", "A", "F", None, "a.com", "indexed")
+    store.store_chunks([Chunk(f"c{i}", "https://a.com", f"t{i}", i, vectors[i]) for i in range(n)])
+    return store, vectors
+
+
+def test_ivf_rebalance_partitions_and_clusters_the_table(tmp_path):
+    db_path = str(tmp_path / "ivf.duckdb")
+    store, vectors = _ivf_store(db_path, ivf_nprobe=3)
+    query = vectors[42].tolist()
+    exact = [r.metadata["chunk_id"] for r in store.search(query, k=5)]  # untrained: full scan
+
+    assert store.index is None  # searched in SQL, not from memory
+    assert store.rebalance_ivf(n_lists=20)
+    assert store.centroids.shape == (20, 16)
+    partitions = [r[0] for r in store.conn.execute("SELECT partition_id FROM chunks ORDER BY rowid").fetchall()]
+    assert None not in partitions and partitions == sorted(partitions)
+    assert store.search(query, k=5)[0].metadata["chunk_id"] == "c42"
+    store.ivf_nprobe = 20  # every partition: exact again
+    assert [r.metadata["chunk_id"] for r in store.search(query, k=5)] == exact
+
+    # New writes are filed under the nearest centroid; a reopen keeps the partitions.
+    store.upsert_bookmark("https://b.com", "B", "F", None, "b.com", "indexed")
+    store.store_chunks([Chunk("new", "https://b.com", "new", 0, vectors[42])])
+    assert store.conn.execute("SELECT partition_id IS NOT NULL FROM chunks WHERE chunk_id = 'new'").fetchone()[0]
+    store.close()
+    reopened = DuckDBStore(db_path=db_path, vector_index="ivf", ivf_nprobe=1)
+    reopened.initialize()
+    assert reopened.centroids.shape == (20, 16)
+    assert {r.metadata["chunk_id"] for r in reopened.search(query, k=2)} == {"c42", "new"}
+    reopened.close()
+
+def test_ivf_files_chunks_written_by_other_backends_on_open(tmp_path):
+    db_path = str(tmp_path / "ivf.duckdb")
+    store, vectors = _ivf_store(db_path, n=300)
+    assert store.rebalance_ivf(n_lists=4)
+    store.close()
+
+    plain = DuckDBStore(db_path=db_path, vector_index="numpy")
+    plain.initialize()
+    plain.upsert_bookmark("https://b.com", "B", "F", None, "b.com", "indexed")
+    plain.store_chunks([Chunk("plain", "https://b.com", "x", 0, vectors[0])])
+    plain.close()
+
+    reopened = DuckDBStore(db_path=db_path, vector_index="ivf")
+    reopened.initialize()
+    assert reopened.conn.execute("SELECT count(*) FROM chunks WHERE partition_id IS NULL").fetchone()[0] == 0
+    reopened.close()
+
+def test_ivf_needs_rebalance_when_collection_grows(monkeypatch):
+    from app.storage import duckdb_store
+
+    monkeypatch.setattr(duckdb_store, "IVF_MIN_TRAIN_ROWS", 500)
+    small, _ = _ivf_store(":memory:", n=400)
+    assert not small.ivf_needs_rebalance()
+    store, vectors = _ivf_store(":memory:", n=600)
+    assert store.ivf_needs_rebalance()
+    assert store.rebalance_ivf()
+    assert store.centroids.shape[0] == 24  # about sqrt(600)
+    assert not store.ivf_needs_rebalance()
+    store.upsert_bookmark("https://b.com", "B", "F", None, "b.com", "indexed")
+    store.store_chunks([Chunk(f"n{i}", "https://b.com", "x", i, vectors[i]) for i in range(600)])
+    assert store.ivf_needs_rebalance()
+
+def test_reembedding_switch_drops_ivf_partitions():
+    store, _ = _ivf_store(":memory:", n=100)
+    assert store.rebalance_ivf(n_lists=4)
+    ids = [r[0] for r in store.conn.execute("SELECT chunk_id FROM chunks").fetchall()]
+    store.begin_reembedding("model-b", 8)
+    store.store_reembedded(ids, [[1.0] * 8] * len(ids))
+    assert store.switch_embedding_model()
+    assert store.centroids is None
+    assert store.conn.execute("SELECT count(*) FROM ivf_centroids").fetchone()[0] == 0
+    assert store.conn.execute("SELECT count(*) FROM chunks WHERE partition_id IS NOT NULL").fetchone()[0] == 0
+    assert len(store.search([1.0] * 8, k=3)) == 3
+
+def _planner_corpus(vector_index):
+    import numpy as np
+
+    rng = np.random.default_rng(3)
+    vectors = (rng.standard_normal((1000, 4)) @ rng.standard_normal((4, 16))).astype(np.float32)
+    store = DuckDBStore(db_path=":memory:", vector_index=vector_index)
+    store.initialize()
+    for j in range(10):
+        store.upsert_bookmark(f"https://{j}.com", str(j), "Tiny" if j == 9 else "Big", None, f"{j}.com", "indexed")
+    # 111 chunks per "Big" bookmark, one for "Tiny".
+    owners = [9 if i == 0 else i % 9 for i in range(1000)]
+    store.store_chunks([Chunk(f"c{i}", f"https://{owners[i]}.com", f"t{i}", i, vectors[i]) for i in range(1000)])
+    return store, vectors
+
+def test_planner_strategies_return_the_exact_filtered_results():
+    from app.storage.planner import SearchCosts, SearchPlanner
+
+    exact, vectors = _planner_corpus("duckdb")
+    store, _ = _planner_corpus("numpy")
+    query = vectors[7].tolist()
+
+    def top(s, filters):
+        return [(r.metadata["chunk_id"], round(r.score, 4)) for r in s.search(query, k=5, filters=filters)]
+
+    assert store.plan_search(5, {"folder": "Big"}).strategy == "postfilter"
+    assert store.plan_search(5, {"folder": "Tiny"}).strategy == "prefilter"
+    assert store.plan_search(5, {"folder": "None"}).strategy == "empty"
+    for filters in ({"folder": "Big"}, {"folder": "Tiny"}, {"folder": "None"}, {"domain": ["1.com", "9.com"]}):
+        assert top(store, filters) == top(exact, filters)
+
+    # A skewed ranking leaves post-filtering short; it falls back to the filter's chunks.
+    store.planner = SearchPlanner(SearchCosts(gather_row=1e6))
+    assert store.plan_search(5, {"folder": "Tiny"}).strategy == "postfilter"
+    assert top(store, {"folder": "Tiny"}) == top(exact, {"folder": "Tiny"})
+
+    assert exact.plan_search(5, {"domain": "9.com"}).strategy == "scan"
+    scanned = top(exact, {"domain": "9.com"})
+    exact.planner = SearchPlanner(SearchCosts(fetch_query=0))
+    assert exact.plan_search(5, {"domain": "9.com"}).strategy == "fetch"
+    assert top(exact, {"domain": "9.com"}) == scanned
+
+def test_ivf_probes_more_partitions_for_small_folders(monkeypatch):
+    from app.storage import duckdb_store
+
+    store, vectors = _ivf_store(":memory:", n=2000, ivf_nprobe=1)
+    store.upsert_bookmark("https://b.com", "B", "Small", None, "b.com", "indexed")
+    store.store_chunks([Chunk(f"s{i}", "https://b.com", f"s{i}", i, vectors[i * 40]) for i in range(50)])
+    assert store.rebalance_ivf(n_lists=40)
+    # At this size a partition is far smaller than a row group, so probing
+    # would never pay off; plan as if partitions filled their row groups.
+    monkeypatch.setattr(duckdb_store, "IVF_ROW_GROUP_SIZE", 0)
+
+    plan = store.plan_search(5, {"folder": "Small"})
+    assert plan.strategy == "ivf" and plan.nprobe == 8  # ~2k matches expected in the probed partitions
+    query = vectors[3].tolist()
+    found = store.search(query, k=5, filters={"folder": "Small"})
+    assert len(found) == 5 and {r.metadata["url"] for r in found} == {"https://b.com"}
+def test_search_many_matches_single_searches(store):
+    import numpy as np
+
+    rng = np.random.default_rng(5)
+    vectors = rng.standard_normal((300, 8)).astype(np.float32)
+    for j, folder in enumerate(["A", "B", "C"]):
+        store.upsert_bookmark(f"https://{j}.com", folder, folder, None, f"{j}.com", "indexed")
+    store.store_chunks([Chunk(f"c{i}", f"https://{i % 3}.com", f"t{i}", i, vectors[i]) for i in range(300)])
+    queries = rng.standard_normal((6, 8)).astype(np.float32).tolist()
+    ks = [1, 4, 3, 5, 2, 0]
+    filters = [None, {"folder": "A"}, None, {"folder": ["B", "C"]}, {"folder": "A"}, None]
+
+    batched = store.search_many(queries, ks, filters)
+    single = [store.search(q, k, f) for q, k, f in zip(queries, ks, filters, strict=False)]
+
+    assert [len(found) for found in batched] == ks
+    for found, f in zip(batched, filters, strict=False):
+        if f:
+            assert {r.metadata["folder"] for r in found} <= set(np.atleast_1d(f["folder"]))
+    if store.vector_index in ("duckdb", "numpy", "ivf"):
+        assert store.planner.plan(store.vector_index, 8, 300, None, 5, queries=3).strategy in ("stream", "index")
+        assert [[r.metadata["chunk_id"] for r in found] for found in batched] == \
+            [[r.metadata["chunk_id"] for r in found] for found in single]
+        assert batched[0][0].score == pytest.approx(single[0][0].score, abs=1e-5)
+
+    assert store.search_many([], 5) == []
+    with pytest.raises(ValueError):
+        store.search_many(queries, [1, 2])
+
+def test_searches_run_concurrently_with_ingestion(store):
+    import threading
+
+    import numpy as np
+
+    rng = np.random.default_rng(6)
+    store.upsert_bookmarks([
+        BookmarkRecord(f"https://{j}.com", str(j), "F", datetime(2024, 1, 1), f"{j}.com", "indexed") for j in range(20)
+    ])
+    store.store_chunks([Chunk(f"c0-{i}", "https://0.com", f"t{i}", i, rng.standard_normal(8)) for i in range(20)])
+    queries = rng.standard_normal((10, 8)).tolist()
+    errors = []
+
+    def search():
+        try:
+            for q in queries:
+                assert len(store.search(q, k=3, filters={"folder": "F"})) == 3
+                assert store.stats()["total_chunks"] >= 20
+        except (AssertionError, duckdb.Error) as e:
+            errors.append(e)
+
+    def ingest():
+        try:
+            for j in range(1, 20):
+                store.store_chunks([
+                    Chunk(f"c{j}-{i}", f"https://{j}.com", f"t{i}", i, rng.standard_normal(8)) for i in range(20)
+                ])
+        except (AssertionError, duckdb.Error) as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest)] + [threading.Thread(target=search) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert store.stats() == {"total_bookmarks": 20, "failed_bookmarks": 0, "total_chunks": 400}
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_async_searches_match_sync_ones(store):
+    import asyncio
+
+    store.upsert_bookmark("https://a.com", "A", "Tech", None, "a.com", "indexed")
+    store.store_chunks([
+        Chunk(f"c{i}", "https://a.com", f"python topic {i}", i, [1.0, float(i), 0.0]) for i in range(5)
+    ])
+    query = [1.0, 2.0, 0.0]
+
+    found, batched = await asyncio.gather(
+        store.asearch(query, k=2, filters={"folder": "Tech"}),
+        store.asearch_many([query, query], [1, 2]),
+    )
+
+    assert [r.metadata["chunk_id"] for r in found] == \
+        [r.metadata["chunk_id"] for r in store.search(query, k=2, filters={"folder": "Tech"})]
+    assert [len(r) for r in batched] == [1, 2]
+    assert await store.alexical_search("python", k=3) == store.lexical_search("python", k=3)
+    store.close()
+
+
+def test_unknown_vector_index_is_rejected():
+    with pytest.raises(ValueError, match="vector_index"):
+        DuckDBStore(vector_index="faiss")
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import duckdb
+import pytest
+
+from app.storage.connections import ConnectionPool
+from app.storage.executor import BlockingExecutor, current_cancel_scope
+
+# Long enough that only an interrupt ends it within the test.
+SLOW_QUERY = "SELECT count(*) FROM range(20000000000)"
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_during_a_blocking_call():
+    executor = BlockingExecutor(max_workers=2)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    try:
+        thread = await executor.run(lambda: (time.sleep(0.2), threading.current_thread())[1])
+    finally:
+        ticker.cancel()
+        executor.close()
+
+    assert thread is not threading.current_thread()
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_timeout_interrupts_the_calls_query():
+    executor = BlockingExecutor(max_workers=1)
+    pool = ConnectionPool(duckdb.connect(), read_connections=1)
+    errors = []
+
+    def slow_count():
+        assert current_cancel_scope() is not None
+        with pool.read() as conn:
+            try:
+                return conn.execute(SLOW_QUERY).fetchone()
+            except duckdb.InterruptException as e:
+                errors.append(e)
+                raise
+
+    started = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run(slow_count, timeout_s=0.2)
+
+    # The worker and the cursor are free again straight away.
+    def quick():
+        with pool.read() as conn:
+            return conn.execute("SELECT 42").fetchone()
+
+    assert await executor.run(quick, timeout_s=10) == (42,)
+    assert time.perf_counter() - started < 10
+    assert len(errors) == 1
+    executor.close()
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_that_is_still_queued_never_runs():
+    executor = BlockingExecutor(max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    busy = asyncio.ensure_future(executor.run(release.wait, 5))
+    queued = asyncio.ensure_future(executor.run(ran.append, "queued"))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    release.set()
+    assert await busy is True
+    assert ran == []
+    executor.close()
+
+    with pytest.raises(ValueError):
+        BlockingExecutor(max_workers=0)
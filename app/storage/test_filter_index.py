@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.storage.filter_index import FilterIndex, folder_matches_prefix
+
+
+def _index():
+    index = FilterIndex(capacity=2)  # small, so bitmaps and rows have to grow
+    index.set_bookmarks(
+        ["https://a.com", "https://b.com", "https://c.com", "https://d.com"],
+        ["Tech", "Tech/Python", "Technology", None],
+        ["a.com", "b.com", "a.com", "d.com"],
+        np.array(["2023-01-01", "2023-06-01", "2024-01-01", "NaT"], dtype="datetime64[us]"),
+    )
+    index.add_chunks(["a0", "a1", "b0", "c0", "d0"],
+                     ["https://a.com", "https://a.com", "https://b.com", "https://c.com", "https://d.com"])
+    return index
+
+
+def test_folder_prefix_matches_whole_path_segments():
+    assert folder_matches_prefix("Tech", "Tech")
+    assert folder_matches_prefix("Tech/Python", "Tech")
+    assert not folder_matches_prefix("Technology", "Tech")
+
+
+def test_candidates_combine_folder_domain_and_date_conditions():
+    index = _index()
+    assert index.candidates() == ["a0", "a1", "b0", "c0", "d0"]
+    assert index.candidates(folders=["Tech"]) == ["a0", "a1"]
+    assert index.candidates(folders=["Tech", "Technology", "Missing"]) == ["a0", "a1", "c0"]
+    assert index.candidates(folder_prefixes=["Tech"]) == ["a0", "a1", "b0"]
+    assert index.candidates(domains=["a.com"], folder_prefixes=["Tech"]) == ["a0", "a1"]
+    assert index.candidates(folders=[]) == []
+
+    # Inclusive bounds; the undated bookmark never matches a date range.
+    assert index.candidates(date_from=np.datetime64("2023-06-01")) == ["b0", "c0"]
+    assert index.candidates(date_to=np.datetime64("2023-06-01")) == ["a0", "a1", "b0"]
+    assert index.candidates(date_from=np.datetime64("2023-02-01"), date_to=np.datetime64("2023-12-31")) == ["b0"]
+
+
+def test_metadata_changes_and_chunk_removal_are_tracked():
+    index = _index()
+    index.set_bookmarks(["https://a.com"], ["Food"], ["a.com"], np.array(["2025-01-01"], dtype="datetime64[us]"))
+    assert index.candidates(folders=["Tech"]) == []
+    assert index.candidates(folders=["Food"]) == ["a0", "a1"]
+    assert index.candidates(date_from=np.datetime64("2024-06-01")) == ["a0", "a1"]
+
+    index.remove_chunks(["a0", "b0", "unknown"])
+    assert len(index) == 3
+    index.add_chunks(["e0"], ["https://e.com"])  # reuses a freed row; bookmark not known yet
+    assert sorted(index.candidates()) == ["a1", "c0", "d0", "e0"]
+    assert "e0" not in index.candidates(folder_prefixes=["Tech", "Food"])
+
+
+def test_count_and_keep_agree_with_candidates():
+    index = _index()
+    assert index.count() == 5
+    assert index.count(folder_prefixes=["Tech"]) == len(index.candidates(folder_prefixes=["Tech"])) == 3
+    assert index.keep(["c0", "b0", "zz", "a1"], domains=["a.com"]) == ["c0", "a1"]
+
+    index.add_chunks(["a0"], ["https://c.com"])  # moved to another bookmark
+    index.remove_chunks(["b0"])
+    assert index.count(folders=["Tech"]) == 1
+    assert index.count(folders=["Technology"]) == 2
+    assert index.count(folder_prefixes=["Tech"]) == 1
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("hnswlib")
+
+from app.storage.hnsw_index import EXACT_CANDIDATE_LIMIT, HNSWIndex, HNSWParams
+from app.storage.vector_index import normalize_rows
+
+
+def _corpus(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return [f"c{i}" for i in range(n)], rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_search_finds_true_neighbours():
+    ids, vectors = _corpus(2000)
+    query = vectors[7] + 0.01
+    index = HNSWIndex(16, HNSWParams(ef_search=100), capacity=8)  # forces several resizes
+    index.add(ids, vectors)
+
+    expected = normalize_rows(vectors) @ normalize_rows(query)[0]
+    hits = index.search(query, k=10)
+    assert hits[0][0] == "c7"
+    assert hits[0][1] == pytest.approx(float(expected.max()), abs=1e-5)
+    exact = {f"c{i}" for i in np.argsort(-expected)[:10]}
+    assert len(exact & {chunk_id for chunk_id, _ in hits}) >= 9
+
+
+def test_readd_replaces_vector_and_remove_hides_chunk():
+    index = HNSWIndex(2)
+    index.add(["a", "b"], [[1, 0], [0, 1]])
+    index.add(["a"], [[0, 1]])
+    index.remove(["b", "missing"])
+    assert index.ids == ["a"]
+    assert index.search([0, 1], k=5) == [("a", pytest.approx(1.0))]
+    # Deleted slots are reused rather than growing the graph.
+    index.add(["c"], [[1, 1]])
+    assert index._graph.get_current_count() <= 3
+
+
+def test_candidates_restrict_results_small_and_large():
+    ids, vectors = _corpus(EXACT_CANDIDATE_LIMIT + 500)
+    index = HNSWIndex(16)
+    index.add(ids, vectors)
+    query = vectors[0]
+
+    small = ids[100:110]
+    assert {chunk_id for chunk_id, _ in index.search(query, k=20, candidates=small)} == set(small)
+
+    large = ids[: EXACT_CANDIDATE_LIMIT + 1]
+    hits = index.search(query, k=5, candidates=large)
+    assert hits[0][0] == "c0"
+    assert all(chunk_id in set(large) for chunk_id, _ in hits)
+
+
+def test_save_and_open_round_trip(tmp_path):
+    path = str(tmp_path / "index.hnsw")
+    ids, vectors = _corpus(300)
+    index = HNSWIndex(16, path=path, source="model-a")
+    index.add(ids, vectors)
+    index.remove(["c1"])
+    assert index.dirty
+    index.save()
+    assert not index.dirty
+
+    loaded = HNSWIndex.open(path, 16, source="model-a")
+    assert loaded is not None
+    assert sorted(loaded.ids) == sorted(index.ids)
+    assert loaded.search(vectors[5], k=1)[0][0] == "c5"
+    loaded.add(["new"], vectors[:1])  # labels continue after the saved ones
+    assert loaded.search(vectors[0], k=2)[0][0] in {"c0", "new"}
+
+
+def test_open_rejects_missing_or_mismatched_index(tmp_path):
+    path = str(tmp_path / "index.hnsw")
+    assert HNSWIndex.open(path, 16) is None
+    index = HNSWIndex(16, path=path, source="model-a")
+    index.add(*_corpus(10))
+    index.save()
+
+    assert HNSWIndex.open(path, 8, source="model-a") is None
+    assert HNSWIndex.open(path, 16, source="model-b") is None
+    assert HNSWIndex.open(path, 16, HNSWParams(m=32), source="model-a") is None
+    # ef_search is a query-time setting and does not invalidate the graph.
+    assert HNSWIndex.open(path, 16, HNSWParams(ef_search=10), source="model-a") is not None
@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.storage.ivf import assign_partitions, default_lists, nearest_partitions, train_centroids
+from app.storage.vector_index import normalize_rows
+
+
+def _clusters(per_cluster=200, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = normalize_rows(rng.standard_normal((4, dim)))
+    vectors = np.repeat(centres, per_cluster, axis=0) + 0.05 * rng.standard_normal((4 * per_cluster, dim))
+    return centres, vectors.astype(np.float32)
+
+
+def test_train_centroids_recovers_clusters():
+    centres, vectors = _clusters()
+    centroids = train_centroids(vectors, 4)
+    assert centroids.shape == (4, 8)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+    # Every true centre has a learned centroid almost on top of it.
+    assert (centres @ centroids.T).max(axis=1).min() > 0.99
+    labels = assign_partitions(vectors, centroids)
+    assert len(set(labels[:200].tolist())) == 1 and len(set(labels.tolist())) == 4
+
+
+def test_train_centroids_samples_and_caps_lists():
+    _, vectors = _clusters(per_cluster=5)
+    assert train_centroids(vectors, 100).shape == (20, 8)  # no more lists than vectors
+    assert train_centroids(vectors, 3, sample_size=10).shape == (3, 8)
+
+
+def test_nearest_partitions_and_default_lists():
+    centroids = normalize_rows(np.eye(4, dtype=np.float32))
+    assert nearest_partitions([0.9, 0.0, 0.1, 0.0], centroids, 2) == [0, 2]
+    assert nearest_partitions([1.0, 0.0, 0.0, 0.0], centroids, 10) == [0, 1, 2, 3]
+    assert nearest_partitions([1.0, 0.0, 0.0, 0.0], None, 2) == []
+    assert default_lists(10_000) == 100 and default_lists(0) == 1
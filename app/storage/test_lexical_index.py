@@ -0,0 +1,35 @@
+from app.storage.lexical_index import BM25Index, tokenize
+
+
+def test_tokenize_keeps_compound_terms_and_their_parts():
+    assert tokenize("What is scikit-learn? ERR_CONN_RESET in Node.js, C++") == [
+        "scikit-learn", "err_conn_reset", "node.js", "c++", "scikit", "learn", "node", "js",
+    ]
+
+
+def test_rare_terms_and_repeated_terms_rank_higher():
+    index = BM25Index(capacity=2)  # small, so rows have to grow
+    index.add(["a", "b", "c"], [
+        "python web framework",
+        "python python testing with pytest",
+        "error E1101 raised by pylint in python",
+    ])
+    assert [chunk_id for chunk_id, _ in index.search("E1101 python", 3)] == ["c", "b", "a"]
+    assert index.search("python", 3)[0][0] == "b"
+    assert index.search("python", 3, candidates=["a"])[0][0] == "a"
+    assert index.search("rust", 3) == []
+    assert index.search("the", 3) == []
+
+
+def test_removed_and_replaced_chunks_stop_matching_and_are_compacted():
+    index = BM25Index()
+    index.add([f"c{i}" for i in range(3000)], [f"term{i} shared" for i in range(3000)])
+    index.add(["c0"], ["replaced text"])
+    index.remove([f"c{i}" for i in range(1, 2900)])
+
+    assert len(index) == 101
+    assert len(index._chunk_ids) == 101  # dead rows compacted away
+    assert index.search("term0", 5) == []
+    assert index.search("replaced", 5)[0][0] == "c0"
+    assert index.search("term2950", 5)[0][0] == "c2950"
+    assert len(index.search("shared", 500)) == 100
@@ -0,0 +1,72 @@
+import logging
+
+import pytest
+
+from app.storage.planner import SearchPlanner
+
+
+def _plan(vector_index, rows, total=100_000, k=5, **kwargs):
+    return SearchPlanner().plan(vector_index, 384, total, rows, k, ef_search=64, **kwargs)
+
+
+def test_unfiltered_queries_use_the_global_index_or_scan():
+    assert _plan("numpy", None).strategy == "index"
+    assert _plan("hnsw", None).strategy == "index"
+    assert _plan("duckdb", None).strategy == "scan"
+    assert _plan("ivf", None).strategy == "scan"  # untrained
+    plan = _plan("ivf", None, n_lists=300, nprobe=8, row_group_size=2048)
+    assert (plan.strategy, plan.nprobe) == ("ivf", 8)
+    assert _plan("numpy", 0).strategy == "empty"
+
+
+def test_selective_filters_score_only_their_chunks():
+    assert _plan("numpy", 500).strategy == "prefilter"
+    assert _plan("int8", 90_000).strategy == "prefilter"  # no post-filtering over quantized codes
+    assert _plan("hnsw", 100).strategy == "prefilter"
+    assert _plan("duckdb", 20).strategy == "fetch"
+    assert _plan("duckdb", 5_000).strategy == "scan"
+
+
+def test_broad_filters_search_everything_then_filter():
+    plan = _plan("numpy", 80_000)
+    assert plan.strategy == "postfilter"
+    assert plan.fetch_k == 13  # about twice the hits the selectivity predicts for k=5
+    # Searching an approximate index globally would cost filtered recall.
+    assert _plan("hnsw", 10_000).strategy == "prefilter"
+
+
+def test_ivf_probes_more_partitions_for_selective_filters():
+    plan = _plan("ivf", 200, n_lists=300, nprobe=8, row_group_size=2048)
+    assert (plan.strategy, plan.nprobe) == ("ivf", 15)
+    # So selective that it would probe every partition: fetch them instead.
+    assert _plan("ivf", 30, n_lists=300, nprobe=8, row_group_size=2048).strategy == "fetch"
+
+
+
+def test_batches_read_sql_embeddings_once():
+    assert _plan("duckdb", None, queries=32).strategy == "stream"
+    assert _plan("duckdb", 5_000, queries=32).strategy == "stream"
+    assert _plan("duckdb", 20, queries=32).strategy == "fetch"
+    assert _plan("numpy", None, queries=32).strategy == "index"
+    # One matrix product: a batch costs far less than its queries one by one.
+    assert _plan("numpy", None, queries=32).estimated_ms < 8 * _plan("numpy", None).estimated_ms
+
+def test_record_logs_and_calibrates_estimates(caplog):
+    planner = SearchPlanner()
+    plan = planner.plan("numpy", 384, 100_000, None, 5)
+    with caplog.at_level(logging.DEBUG, logger="app.storage.planner"):
+        for _ in range(20):
+            planner.record(plan, 10 * plan.estimated_ms)
+    assert "Search plan index over 100000 rows" in caplog.text
+    assert planner.plan("numpy", 384, 100_000, None, 5).estimated_ms > 3 * plan.estimated_ms
+
+
+def test_concurrent_records_are_all_counted():
+    from concurrent.futures import ThreadPoolExecutor
+
+    planner = SearchPlanner()
+    plan = planner.plan("numpy", 384, 100_000, None, 5)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: planner.record(plan, 2 * plan.estimated_ms), range(30)))
+    # 30 updates of x2 ** 0.1 each, none lost.
+    assert planner.plan("numpy", 384, 100_000, None, 5).estimated_ms == pytest.approx(8 * plan.estimated_ms)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app.storage.quantized_index import QuantizedVectorIndex
+from app.storage.vector_index import normalize_rows
+
+
+def _corpus(n=2000, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    # Low-rank plus noise, so neighbours are meaningfully closer than the rest.
+    vectors = rng.standard_normal((n, 8)) @ rng.standard_normal((8, dim)) + 0.1 * rng.standard_normal((n, dim))
+    return [f"c{i}" for i in range(n)], vectors.astype(np.float32)
+
+
+def _fetcher(ids, vectors):
+    by_id = dict(zip(ids, vectors, strict=False))
+
+    def fetch(wanted):
+        found = [chunk_id for chunk_id in wanted if chunk_id in by_id]
+        return found, np.array([by_id[chunk_id] for chunk_id in found], dtype=np.float32)
+    return fetch
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_reranked_search_matches_exact_top_k(quantization):
+    ids, vectors = _corpus()
+    query = vectors[11] + 0.05
+    index = QuantizedVectorIndex(64, quantization, fetch_vectors=_fetcher(ids, vectors), capacity=8)
+    index.add(ids, vectors)
+
+    exact = normalize_rows(vectors) @ normalize_rows(query)[0]
+    hits = index.search(query, k=10)
+    assert [h[0] for h in hits] == [f"c{i}" for i in np.argsort(-exact)[:10]]
+    assert hits[0][1] == pytest.approx(float(exact.max()), abs=1e-6)
+
+
+def test_int8_scores_approximate_cosine_without_rerank():
+    ids, vectors = _corpus(200)
+    index = QuantizedVectorIndex(64, "int8")
+    index.add(ids, vectors)
+    exact = normalize_rows(vectors) @ normalize_rows(vectors[0])[0]
+    scores = dict(index.search(vectors[0], k=200))
+    assert max(abs(scores[f"c{i}"] - exact[i]) for i in range(200)) < 0.02
+
+
+def test_binary_codes_pad_odd_widths_and_follow_removals():
+    index = QuantizedVectorIndex(5, "binary")  # 5 bits -> one padded 16-bit word
+    index.add(["a", "b", "c"], [[1, 1, 1, 1, 1], [-1, -1, -1, -1, -1], [1, 1, 1, 1, -1]])
+    index.remove(["a"])
+    hits = index.search([1, 1, 1, 1, 1], k=3)
+    assert [h[0] for h in hits] == ["c", "b"]
+    assert hits[0][1] == pytest.approx(np.cos(np.pi / 5))
+    assert index.nbytes == index._codes.shape[0] * 2
+
+
+def test_candidates_and_unknown_quantization():
+    ids, vectors = _corpus(100)
+    index = QuantizedVectorIndex(64, "int8", fetch_vectors=_fetcher(ids, vectors))
+    index.add(ids, vectors)
+    assert {h[0] for h in index.search(vectors[0], k=5, candidates=["c7", "c8"])} == {"c7", "c8"}
+    with pytest.raises(ValueError, match="quantization"):
+        QuantizedVectorIndex(64, "pq")
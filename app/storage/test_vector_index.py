@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from app.storage.vector_index import VectorIndex, normalize_rows, top_k
+
+
+def test_top_k_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+
+
+def test_search_matches_brute_force_cosine():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 16)).astype(np.float32)
+    query = rng.standard_normal(16).astype(np.float32)
+    index = VectorIndex(16, capacity=8)  # forces several growths
+    index.add([f"c{i}" for i in range(500)], vectors)
+
+    expected = normalize_rows(vectors) @ normalize_rows(query)[0]
+    hits = index.search(query, k=10)
+    assert [h[0] for h in hits] == [f"c{i}" for i in np.argsort(-expected)[:10]]
+    assert hits[0][1] == pytest.approx(float(expected.max()), abs=1e-6)
+
+
+
+def test_search_many_matches_single_searches(monkeypatch):
+    from app.storage import vector_index
+
+    monkeypatch.setattr(vector_index, "QUERY_BLOCK", 2)  # several matrix products
+    rng = np.random.default_rng(1)
+    index = VectorIndex(8)
+    index.add([f"c{i}" for i in range(100)], rng.standard_normal((100, 8)).astype(np.float32))
+    queries = rng.standard_normal((5, 8)).astype(np.float32)
+    candidates = [f"c{i}" for i in range(0, 100, 3)]
+
+    for subset in (None, candidates):
+        batched = index.search_many(queries, k=4, candidates=subset)
+        single = [index.search(q, k=4, candidates=subset) for q in queries]
+        assert [[h[0] for h in hits] for hits in batched] == [[h[0] for h in hits] for hits in single]
+        assert [h[1] for h in batched[-1]] == pytest.approx([h[1] for h in single[-1]], abs=1e-6)
+
+def test_add_replaces_and_remove_compacts():
+    index = VectorIndex(2)
+    index.add(["a", "b", "c"], [[1, 0], [0, 1], [1, 1]])
+    index.add(["a", "d", "d"], [[0, 1], [1, 0], [-1, 0]])
+    assert len(index) == 4
+    assert index.search([0, 1], k=2)[0][1] == pytest.approx(1.0)
+    assert index.search([-1, 0], k=1) == [("d", pytest.approx(1.0))]
+
+    index.remove(["a", "missing"])
+    assert len(index) == 3
+    assert sorted(index.ids) == ["b", "c", "d"]
+    assert index.search([0, 1], k=1)[0][0] == "b"
+
+
+def test_candidates_restrict_the_search():
+    index = VectorIndex(2)
+    index.add(["a", "b", "c"], [[1, 0], [0.9, 0.1], [0, 1]])
+    assert [h[0] for h in index.search([1, 0], k=2, candidates=["b", "c", "gone"])] == ["b", "c"]
+    assert index.search([1, 0], k=2, candidates=[]) == []
+
+
+def test_dimension_mismatch_is_rejected():
+    index = VectorIndex(3)
+    with pytest.raises(ValueError):
+        index.add(["a"], [[1.0, 0.0]])
+    with pytest.raises(ValueError):
+        index.search([1.0, 0.0], k=1)
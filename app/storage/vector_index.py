@@ -0,0 +1,226 @@
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+# `search_many` scores at most this many queries per matrix product, bounding
+# the temporary (rows x queries) scores matrix.
+QUERY_BLOCK = 64
+
+
+def normalize_rows(matrix: npt.ArrayLike) -> npt.NDArray[np.float32]:
+    """L2-normalize each row (zero rows stay zero) as a contiguous float32 matrix."""
+    rows = np.asarray(matrix, dtype=np.float32)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    return np.ascontiguousarray(rows / np.clip(norms, 1e-12, None), dtype=np.float32)
+
+
+def top_k(scores: npt.NDArray[np.float32], k: int) -> npt.NDArray[np.intp]:
+    """Positions of the `k` highest scores, best first (argpartition, then a sort of k)."""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+class BaseVectorIndex(ABC):
+    """
+    In-process nearest-neighbour index over chunk embeddings, kept in step
+    with the `chunks` table by DuckDBStore. Scores are cosine similarities.
+    """
+    dimension: int
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def ids(self) -> list[str]:
+        """Chunk IDs currently indexed."""
+
+    @abstractmethod
+    def add(self, ids: Sequence[str], vectors: npt.ArrayLike) -> None:
+        """Add (or replace) the vectors for `ids`, one row of `vectors` each."""
+
+    @abstractmethod
+    def remove(self, ids: Sequence[str]) -> None:
+        """Drop the vectors for `ids`; unknown IDs are ignored."""
+
+    @abstractmethod
+    def search(self, query: npt.ArrayLike, k: int,
+               candidates: Sequence[str] | None = None) -> list[tuple[str, float]]:
+        """
+        The `k` (chunk_id, cosine similarity) pairs closest to `query`, best
+        first. With `candidates`, only those chunks are considered.
+        """
+
+    def search_many(self, queries: npt.ArrayLike, k: int,
+                    candidates: Sequence[str] | None = None) -> list[list[tuple[str, float]]]:
+        """
+        `search` for each row of `queries` (one list per query). Indexes that
+        can score several queries in one pass override this; the default
+        searches them one at a time.
+        """
+        return [self.search(q, k, candidates) for q in normalize_rows(queries)]
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the index has changes that `save` would persist."""
+        return False
+
+    def save(self) -> None:
+        """Persist the index, for indexes that are stored on disk."""
+        return
+
+
+class VectorIndex(BaseVectorIndex):
+    """
+    Exact in-memory cosine index. Embeddings are kept L2-normalized in one
+    contiguous float32 matrix, so a query is a single matrix-vector product
+    and a partial sort; row `i` belongs to chunk `ids[i]`.
+
+    The matrix grows by doubling, so adds are amortized; removals move the
+    last row into the hole. All access is serialized by a lock, since a
+    search must not see a row half-moved. Subclasses can keep rows in
+    another form by overriding `_allocate`, `_set_rows`, `_move_row` and
+    `_scores`.
+    """
+    def __init__(self, dimension: int, capacity: int = 1024):
+        if dimension < 1:
+            raise ValueError("dimension must be positive")
+        self.dimension = dimension
+        self._size = 0
+        self._capacity = max(1, capacity)
+        self._matrix: npt.NDArray[np.float32]
+        self._allocate(self._capacity)
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def ids(self) -> list[str]:
+        return self._ids
+
+    @property
+    def row_bytes(self) -> int:
+        """Memory per indexed vector."""
+        return 4 * self.dimension
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the row storage (including unused capacity)."""
+        return self.row_bytes * self._capacity
+
+    def _allocate(self, capacity: int) -> None:
+        """Resize row storage to `capacity` rows, keeping the first `_size`."""
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        if self._size:
+            grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+
+    def _set_rows(self, rows: npt.NDArray[np.intp], vectors: npt.NDArray[np.float32]) -> None:
+        """Store normalized `vectors` at row positions `rows`."""
+        self._matrix[rows] = vectors
+
+    def _move_row(self, src: int, dst: int) -> None:
+        self._matrix[dst] = self._matrix[src]
+
+    def _scores(self, q: npt.NDArray[np.float32], rows: list[int] | None) -> npt.NDArray[np.float32]:
+        """
+        Similarity of `q` to the given rows (all rows when None): a vector,
+        or one column per query when `q` is a (dimension x queries) matrix.
+        """
+        if rows is None:
+            return self._matrix[:self._size] @ q
+        return self._matrix[rows] @ q
+
+    def add(self, ids: Sequence[str], vectors: npt.ArrayLike) -> None:
+        if len(ids) == 0:
+            return
+        matrix = normalize_rows(vectors)
+        if matrix.shape != (len(ids), self.dimension):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dimension}, got {matrix.shape}")
+        # A repeated ID keeps its last vector.
+        positions = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        with self._lock:
+            new_ids: list[str] = []
+            new_positions: list[int] = []
+            replaced_rows: list[int] = []
+            replaced_positions: list[int] = []
+            for chunk_id, i in positions.items():
+                row = self._rows.get(chunk_id)
+                if row is None:
+                    new_ids.append(chunk_id)
+                    new_positions.append(i)
+                else:
+                    replaced_rows.append(row)
+                    replaced_positions.append(i)
+            if replaced_rows:
+                self._set_rows(np.asarray(replaced_rows, dtype=np.intp), matrix[replaced_positions])
+            if new_ids:
+                # New rows go in as one block copy.
+                self._reserve(self._size + len(new_ids))
+                self._set_rows(np.arange(self._size, self._size + len(new_ids)), matrix[new_positions])
+                for offset, chunk_id in enumerate(new_ids):
+                    self._rows[chunk_id] = self._size + offset
+                self._ids.extend(new_ids)
+                self._size += len(new_ids)
+
+    def _reserve(self, size: int) -> None:
+        if size <= self._capacity:
+            return
+        while self._capacity < size:
+            self._capacity *= 2
+        self._allocate(self._capacity)
+
+    def remove(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            for chunk_id in ids:
+                row = self._rows.pop(chunk_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    moved = self._ids[last]
+                    self._move_row(last, row)
+                    self._ids[row] = moved
+                    self._rows[moved] = row
+                self._ids.pop()
+                self._size -= 1
+
+    def search(self, query: npt.ArrayLike, k: int,
+               candidates: Sequence[str] | None = None) -> list[tuple[str, float]]:
+        return self.search_many(query, k, candidates)[0]
+
+    def search_many(self, queries: npt.ArrayLike, k: int,
+                    candidates: Sequence[str] | None = None) -> list[list[tuple[str, float]]]:
+        """One pass over the rows per QUERY_BLOCK queries, as a matrix product."""
+        matrix = normalize_rows(queries)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Query has dimension {matrix.shape[1]}, index holds {self.dimension}")
+        if k < 1:
+            return [[] for _ in matrix]
+        results: list[list[tuple[str, float]]] = []
+        with self._lock:
+            rows: list[int] | None = None
+            ids: Sequence[str] = self._ids
+            if candidates is not None:
+                rows = [self._rows[c] for c in candidates if c in self._rows]
+                ids = [self._ids[r] for r in rows]
+            for start in range(0, len(matrix), QUERY_BLOCK):
+                block = matrix[start:start + QUERY_BLOCK]
+                scores = self._scores(block[0] if len(block) == 1 else block.T, rows)
+                if scores.ndim == 1:
+                    scores = scores.reshape(-1, 1)
+                for column in range(len(block)):
+                    column_scores = scores[:, column]
+                    results.append([(ids[i], float(column_scores[i])) for i in top_k(column_scores, k)])
+        return results
@@ -84,3 +84,133 @@ def test_ollama_base_url_environment_overrides_yaml(tmp_path, monkeypatch):
     settings = Settings.load(path)
 
     assert settings.ollama_base_url == "http://ollama:11434"
+
+
+def test_query_cache_size_defaults_and_overrides(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).query_cache_size == 1024
+
+    path = _write(tmp_path, BASE_CONFIG + "\nquery_cache_size: 0\n")
+    assert Settings.load(path).query_cache_size == 0
+
+
+def test_embedding_backend_defaults_and_validation(tmp_path):
+    settings = Settings.load(_write(tmp_path, BASE_CONFIG))
+    assert settings.embedding_backend == "sentence-transformers"
+    assert settings.onnx_quantized is True
+
+    path = _write(tmp_path, BASE_CONFIG + '\nembedding_backend: "onnx"\nonnx_quantized: false\n')
+    settings = Settings.load(path)
+    assert settings.embedding_backend == "onnx"
+    assert settings.onnx_quantized is False
+
+    with pytest.raises(ValueError, match="embedding_backend"):
+        Settings.load(_write(tmp_path, BASE_CONFIG + '\nembedding_backend: "tensorrt"\n'))
+
+
+def test_embedding_pool_settings(tmp_path):
+    settings = Settings.load(_write(tmp_path, BASE_CONFIG))
+    assert settings.embedding_workers == 0
+    assert settings.embedding_pin_threads is False
+
+    path = _write(tmp_path, BASE_CONFIG + "\nembedding_workers: 4\nembedding_threads_per_worker: 2\nembedding_pin_threads: true\n")
+    settings = Settings.load(path)
+    assert (settings.embedding_workers, settings.embedding_threads_per_worker) == (4, 2)
+    assert settings.embedding_pin_threads is True
+
+
+def test_query_batch_settings(tmp_path):
+    settings = Settings.load(_write(tmp_path, BASE_CONFIG))
+    assert settings.query_batch_wait_ms == 2.0
+    assert settings.query_batch_max_size == 64
+
+    path = _write(tmp_path, BASE_CONFIG + "\nquery_batch_wait_ms: 0.5\nquery_batch_max_size: 0\n")
+    settings = Settings.load(path)
+    assert (settings.query_batch_wait_ms, settings.query_batch_max_size) == (0.5, 0)
+
+
+def test_warm_up_on_startup_defaults_on(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).warm_up_on_startup is True
+
+    path = _write(tmp_path, BASE_CONFIG + "\nwarm_up_on_startup: false\n")
+    assert Settings.load(path).warm_up_on_startup is False
+
+
+def test_embedding_truncate_dim_defaults_off(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).embedding_truncate_dim == 0
+
+    path = _write(tmp_path, BASE_CONFIG + "\nembedding_truncate_dim: 256\n")
+    assert Settings.load(path).embedding_truncate_dim == 256
+
+
+def test_reembed_settings(tmp_path):
+    settings = Settings.load(_write(tmp_path, BASE_CONFIG))
+    assert (settings.reembed_batch_size, settings.reembed_pause_ms) == (64, 100.0)
+
+    assert settings.reembed_untagged is False
+
+    path = _write(tmp_path, BASE_CONFIG + "\nreembed_batch_size: 0\nreembed_pause_ms: 5\nreembed_untagged: true\n")
+    settings = Settings.load(path)
+    assert (settings.reembed_batch_size, settings.reembed_pause_ms) == (0, 5.0)
+    assert settings.reembed_untagged is True
+
+
+def test_vector_index_defaults_and_validation(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).vector_index == "numpy"
+
+    path = _write(tmp_path, BASE_CONFIG + "\nvector_index: duckdb\n")
+    assert Settings.load(path).vector_index == "duckdb"
+
+    path = _write(tmp_path, BASE_CONFIG + "\nvector_index: binary\nrerank_factor: 20\n")
+    settings = Settings.load(path)
+    assert (settings.vector_index, settings.rerank_factor) == ("binary", 20)
+
+    path = _write(tmp_path, BASE_CONFIG + "\nvector_index: ivf\nivf_lists: 50\nivf_nprobe: 4\n")
+    settings = Settings.load(path)
+    assert (settings.vector_index, settings.ivf_lists, settings.ivf_nprobe) == ("ivf", 50, 4)
+
+    path = _write(tmp_path, BASE_CONFIG + "\nvector_index: faiss\n")
+    with pytest.raises(ValueError, match="vector_index"):
+        Settings.load(path)
+
+
+def test_hydration_cache_size_default_and_override(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).hydration_cache_size == 4096
+    path = _write(tmp_path, BASE_CONFIG + "\nhydration_cache_size: 0\n")
+    assert Settings.load(path).hydration_cache_size == 0
+
+
+def test_read_connections_default_and_override(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).read_connections == 4
+    path = _write(tmp_path, BASE_CONFIG + "\nread_connections: 8\n")
+    assert Settings.load(path).read_connections == 8
+
+
+def test_retrieval_timeout_default_and_override(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).retrieval_timeout_s == 10.0
+    path = _write(tmp_path, BASE_CONFIG + "\nretrieval_timeout_s: 0\n")
+    assert Settings.load(path).retrieval_timeout_s == 0.0
+
+
+def test_compress_documents_default_and_override(tmp_path):
+    assert Settings.load(_write(tmp_path, BASE_CONFIG)).compress_documents is True
+    path = _write(tmp_path, BASE_CONFIG + "\ncompress_documents: false\n")
+    assert Settings.load(path).compress_documents is False
+
+
+def test_hybrid_search_default_and_override(tmp_path):
+    settings = Settings.load(_write(tmp_path, BASE_CONFIG))
+    assert (settings.hybrid_search, settings.rrf_k) == (False, 60)
+
+    path = _write(tmp_path, BASE_CONFIG + "\nhybrid_search: true\nrrf_k: 10\n")
+    settings = Settings.load(path)
+    assert (settings.hybrid_search, settings.rrf_k) == (True, 10)
+
+
+def test_hnsw_parameters_default_and_override(tmp_path):
+    settings = Settings.load(_write(tmp_path, BASE_CONFIG))
+    assert (settings.hnsw_m, settings.hnsw_ef_construction, settings.hnsw_ef_search) == (16, 200, 64)
+
+    path = _write(tmp_path, BASE_CONFIG + "\nvector_index: hnsw\nhnsw_m: 32\nhnsw_ef_construction: 400\nhnsw_ef_search: 128\n")
+    settings = Settings.load(path)
+    assert settings.vector_index == "hnsw"
+    assert (settings.hnsw_m, settings.hnsw_ef_construction, settings.hnsw_ef_search) == (32, 400, 128)
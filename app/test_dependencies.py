@@ -0,0 +1,111 @@
+import functools
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import dependencies
+from app.embeddings.lazy import LazyEmbedder
+from app.embeddings.matryoshka import build_truncated
+
+
+def test_embedder_factory_for_model_parses_ids():
+    local = dependencies.embedder_factory_for_model("all-MiniLM-L6-v2")
+    assert local.keywords == {"model_name": "all-MiniLM-L6-v2"}
+
+    openai = dependencies.embedder_factory_for_model("openai:text-embedding-3-small")
+    assert openai.keywords == {"model": "text-embedding-3-small"}
+
+    truncated = dependencies.embedder_factory_for_model("nomic-embed-text-v1.5@256d")
+    assert truncated.func is build_truncated
+    assert truncated.args[1] == 256
+    assert isinstance(truncated.args[0], functools.partial)
+    assert truncated.args[0].keywords == {"model_name": "nomic-embed-text-v1.5"}
+
+
+def test_serving_embedder_follows_the_store_model(monkeypatch):
+    monkeypatch.setattr(dependencies, "_previous_embedders", {})
+    configured = MagicMock(model_id="model-b")
+    store = MagicMock(embedding_model=None)
+    assert dependencies.serving_embedder(store, configured) is configured
+
+    store.embedding_model = "model-b"
+    assert dependencies.serving_embedder(store, configured) is configured
+
+    # Untagged chunks' model is unknown; the configured one stands in.
+    store.embedding_model = dependencies.UNTAGGED_MODEL
+    assert dependencies.serving_embedder(store, configured) is configured
+
+    # Mid-migration, queries and new chunks go through the store's model.
+    store.embedding_model = "model-a"
+    previous = dependencies.serving_embedder(store, configured)
+    assert isinstance(previous, LazyEmbedder)
+    assert not previous.loaded
+    assert dependencies.serving_embedder(store, configured) is previous
+
+
+def test_rebuilt_embedder_must_match_the_id(monkeypatch):
+    monkeypatch.setattr(
+        dependencies, "embedder_factory_for_model", lambda model_id: lambda: MagicMock(model_id="other")
+    )
+    with pytest.raises(ValueError, match="Cannot rebuild"):
+        dependencies._build_embedder("model-a")
+
+
+def test_rebalance_store_partitions_only_when_due(monkeypatch):
+    store = MagicMock()
+    monkeypatch.setattr(dependencies, "get_store", lambda: store)
+    store.ivf_needs_rebalance.return_value = False
+    assert not dependencies.rebalance_store_partitions()
+    store.rebalance_ivf.assert_not_called()
+
+    store.ivf_needs_rebalance.return_value = True
+    store.rebalance_ivf.return_value = True
+    assert dependencies.rebalance_store_partitions()
+
+
+def test_close_resources_shuts_down_what_was_started(monkeypatch):
+    store, pool, coalescer = MagicMock(), MagicMock(), MagicMock()
+    monkeypatch.setattr(dependencies, "_store", store)
+    monkeypatch.setattr(dependencies, "_ingest_pool", pool)
+    monkeypatch.setattr(dependencies, "_coalescer", coalescer)
+
+    dependencies.close_resources()
+
+    store.close.assert_called_once_with()
+    pool.close.assert_called_once_with()
+    coalescer.close.assert_called_once_with()
+    assert (dependencies._store, dependencies._ingest_pool, dependencies._coalescer) == (None, None, None)
+    dependencies.close_resources()  # nothing left to close
+
+
+def test_replaced_coalescer_is_closed(monkeypatch):
+    monkeypatch.setattr(dependencies.settings, "query_batch_max_size", 8)
+    old = MagicMock()
+    monkeypatch.setattr(dependencies, "_coalescer", old)
+
+    rebuilt = dependencies.get_embedding_coalescer(MagicMock())
+
+    old.close.assert_called_once_with()
+    assert rebuilt is not old
+    rebuilt.close()
+
+
+@pytest.mark.parametrize("dimension, reembed_untagged, adopted", [
+    (384, False, True), (768, False, False), (384, True, False),
+])
+def test_untagged_store_is_adopted_only_at_the_configured_width(monkeypatch, dimension, reembed_untagged, adopted):
+    store = MagicMock(embedding_model=dependencies.UNTAGGED_MODEL, dimension=dimension)
+    embedder = MagicMock(model_id="model-a", dimension=384)
+    migration = MagicMock()
+    monkeypatch.setattr(dependencies, "_reembedding", None)
+    monkeypatch.setattr(dependencies, "get_store", lambda: store)
+    monkeypatch.setattr(dependencies, "get_embedder", lambda: embedder)
+    monkeypatch.setattr(dependencies, "ReembeddingMigration", lambda *args, **kwargs: migration)
+    monkeypatch.setattr(dependencies.settings, "reembed_batch_size", 64)
+    monkeypatch.setattr(dependencies.settings, "reembed_untagged", reembed_untagged)
+    store.adopt_untagged_chunks.side_effect = lambda model_id: setattr(store, "embedding_model", model_id)
+
+    started = dependencies.start_reembedding()
+
+    assert store.adopt_untagged_chunks.called is adopted
+    assert started is (None if adopted else migration)
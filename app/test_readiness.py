@@ -0,0 +1,35 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.embeddings.lazy import LazyEmbedder
+from app.readiness import ModelStatus, warm_up_llm, warm_up_models
+
+
+@pytest.mark.asyncio
+async def test_warm_up_llm_records_success_and_failure():
+    ok = MagicMock()
+    ok.warm_up = AsyncMock()
+    status = ModelStatus()
+    await warm_up_llm(ok, status)
+    assert status.state == "ready"
+    assert "warming" in status.seconds
+
+    down = MagicMock()
+    down.warm_up = AsyncMock(side_effect=ConnectionError("ollama unreachable"))
+    status = ModelStatus()
+    await warm_up_llm(down, status)
+    assert status.state == "failed"
+    assert "ollama unreachable" in status.error
+
+
+@pytest.mark.asyncio
+async def test_warm_up_models_warms_embedder_and_llm():
+    embedder = MagicMock(spec=LazyEmbedder)
+    llm = MagicMock()
+    llm.warm_up = AsyncMock()
+
+    await warm_up_models(embedder, llm)
+
+    embedder.warm_up.assert_called_once()
+    llm.warm_up.assert_awaited_once()
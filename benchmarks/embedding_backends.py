@@ -0,0 +1,115 @@
+"""
+Throughput / latency benchmark for the embedding backends: PyTorch
+sentence-transformers against ONNX Runtime fp32 and int8, at several batch
+sizes, plus vector parity of each ONNX variant against PyTorch.
+
+Requires the configured model to be downloadable (or cached) and an ONNX
+export, e.g.:
+    python -m app.embeddings.onnx_export --output ./data/onnx/all-MiniLM-L6-v2
+
+Usage:
+    PYTHONPATH=. python benchmarks/embedding_backends.py --onnx-dir ./data/onnx/all-MiniLM-L6-v2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from typing import Any
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.onnx_export import vector_parity
+
+RESULTS_DIR = "benchmarks/results"
+DEFAULT_BATCH_SIZES = [1, 8, 32, 128]
+DEFAULT_REPEATS = 5
+
+SAMPLE_SENTENCES = [
+    "DuckDB is an in-process analytical database.",
+    (
+        "Retrieval-augmented generation grounds answers in retrieved documents, "
+        "so the model cites sources instead of relying on its parametric memory."
+    ),
+    "How do I rotate logs?",
+    (
+        "The article compares several vector index structures, including HNSW graphs, "
+        "IVF partitions and product quantization, and measures recall against latency "
+        "on corpora ranging from one hundred thousand to ten million vectors."
+    ),
+]
+
+
+def make_texts(n: int) -> list[str]:
+    return [f"{SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)]} ({i})" for i in range(n)]
+
+
+def measure_embedder(embedder: BaseEmbedder, batch_size: int, repeats: int = DEFAULT_REPEATS) -> dict[str, Any]:
+    """
+    Time `repeats` calls of `embed_batch_array` on a `batch_size` batch after
+    one warm-up call. Reports per-call latency percentiles and texts/second.
+    """
+    texts = make_texts(batch_size)
+    embedder.embed_batch_array(texts)  # warm-up: first-call allocations, lazy init
+
+    latencies: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embedder.embed_batch_array(texts)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p95_index = min(len(latencies) - 1, round(0.95 * (len(latencies) - 1)))
+    return {
+        "batch_size": batch_size,
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "latency_p95_ms": round(latencies[p95_index] * 1000, 2),
+        "texts_per_second": round(batch_size * repeats / sum(latencies), 1),
+    }
+
+
+def run_benchmark(backends: dict[str, BaseEmbedder], batch_sizes: list[int],
+                  repeats: int = DEFAULT_REPEATS, reference: str = "pytorch") -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name, embedder in backends.items():
+        entry: dict[str, Any] = {"runs": [measure_embedder(embedder, b, repeats) for b in batch_sizes]}
+        if reference in backends and name != reference:
+            entry["parity_vs_" + reference] = vector_parity(backends[reference], embedder)
+        results[name] = entry
+        print(name, json.dumps(entry))
+    return results
+
+
+def main() -> None:
+    from app.embeddings.local_embedder import LocalEmbedder
+    from app.embeddings.onnx_embedder import ONNXEmbedder, load_embedder_config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--onnx-dir", required=True)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    args = parser.parse_args()
+
+    model_name = load_embedder_config(args.onnx_dir)["model_name"]
+    backends: dict[str, BaseEmbedder] = {
+        "pytorch": LocalEmbedder(model_name),
+        "onnx_fp32": ONNXEmbedder(args.onnx_dir, quantized=False),
+    }
+    try:
+        backends["onnx_int8"] = ONNXEmbedder(args.onnx_dir, quantized=True)
+    except FileNotFoundError:
+        print("No int8 export found; skipping onnx_int8.")
+
+    results = run_benchmark(backends, args.batch_sizes, args.repeats)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/embedding_backends_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "model": model_name, "results": results}, f, indent=2)
+    print(f"Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Padding waste and throughput of fixed-size arrival-order batches against
+token-length bucketing (`plan_token_batches`) on a chunk mix with skewed
+lengths, as produced by ingestion: mostly short chunks plus a tail of
+full-length ones.
+
+The baseline embeds the corpus in slices of `--batch-size` texts, each as one
+forward pass padded to its longest member. The bucketed run hands the whole
+corpus to `embed_batch_array` with a padded-token budget.
+
+Usage:
+    PYTHONPATH=. python benchmarks/embedding_batching.py --texts 2000 --batch-size 32
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.batching import (
+    DEFAULT_MAX_BATCH_TOKENS,
+    arrival_order_batches,
+    padding_stats,
+    plan_token_batches,
+)
+from benchmarks.embedding_backends import SAMPLE_SENTENCES
+
+RESULTS_DIR = "benchmarks/results"
+
+# No single fixed-size slice may exceed this, so the baseline really runs one
+# forward pass per slice.
+UNBOUNDED_TOKENS = 1 << 30
+
+
+def make_skewed_texts(n: int, seed: int = 0) -> list[str]:
+    """About 70% short chunks, 20% medium, 10% long enough to truncate."""
+    rng = random.Random(seed)
+    words = " ".join(SAMPLE_SENTENCES).split()
+    texts = []
+    for i in range(n):
+        roll = rng.random()
+        n_words = rng.randint(5, 30) if roll < 0.7 else rng.randint(60, 120) if roll < 0.9 else rng.randint(200, 300)
+        texts.append(f"({i}) " + " ".join(words[(i + k) % len(words)] for k in range(n_words)))
+    return texts
+
+
+def time_call(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_benchmark(make_embedder: Callable[[int, int], BaseEmbedder], texts: list[str],
+                  batch_size: int, max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS) -> dict[str, Any]:
+    """
+    `make_embedder(max_batch_tokens, max_batch_size)` must build an embedder
+    exposing `token_lengths` (LocalEmbedder and ONNXEmbedder both do).
+    """
+    fixed = make_embedder(UNBOUNDED_TOKENS, batch_size)
+    bucketed = make_embedder(max_batch_tokens, UNBOUNDED_TOKENS)
+    lengths: list[int] = bucketed.token_lengths(texts)
+
+    slices = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    # Warm-up both paths so lazy initialisation isn't timed.
+    fixed.embed_batch_array(slices[0])
+    bucketed.embed_batch_array(slices[0])
+
+    fixed_s = time_call(lambda: [fixed.embed_batch_array(s) for s in slices])
+    bucketed_s = time_call(lambda: bucketed.embed_batch_array(texts))
+
+    fixed_stats = padding_stats(lengths, arrival_order_batches(len(texts), batch_size))
+    bucketed_stats = padding_stats(lengths, plan_token_batches(lengths, max_batch_tokens, UNBOUNDED_TOKENS))
+    return {
+        "texts": len(texts),
+        "real_tokens": fixed_stats.real_tokens,
+        "arrival_order": {
+            "batch_size": batch_size,
+            "batches": fixed_stats.batches,
+            "padding_waste": round(fixed_stats.waste, 4),
+            "texts_per_second": round(len(texts) / fixed_s, 1),
+        },
+        "bucketed": {
+            "max_batch_tokens": max_batch_tokens,
+            "batches": bucketed_stats.batches,
+            "padding_waste": round(bucketed_stats.waste, 4),
+            "texts_per_second": round(len(texts) / bucketed_s, 1),
+        },
+        "speedup": round(fixed_s / bucketed_s, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["sentence-transformers", "onnx"], default="sentence-transformers")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--onnx-dir", default="./data/onnx/all-MiniLM-L6-v2")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-batch-tokens", type=int, default=DEFAULT_MAX_BATCH_TOKENS)
+    args = parser.parse_args()
+
+    if args.backend == "onnx":
+        from app.embeddings.onnx_embedder import ONNXEmbedder
+
+        def make_embedder(tokens: int, size: int) -> BaseEmbedder:
+            return ONNXEmbedder(args.onnx_dir, max_batch_tokens=tokens, max_batch_size=size)
+    else:
+        from app.embeddings.local_embedder import LocalEmbedder
+
+        def make_embedder(tokens: int, size: int) -> BaseEmbedder:
+            return LocalEmbedder(args.model, max_batch_tokens=tokens, max_batch_size=size)
+
+    result = run_benchmark(make_embedder, make_skewed_texts(args.texts), args.batch_size, args.max_batch_tokens)
+    print(json.dumps(result, indent=2))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/embedding_batching_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "backend": args.backend, "result": result}, f, indent=2)
+    print(f"Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
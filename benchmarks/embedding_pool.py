@@ -0,0 +1,59 @@
+"""
+Ingest-embedding throughput of the configured backend in-process against
+`PooledEmbedder` with an increasing number of worker processes, to check how
+close throughput scales to linear in cores.
+
+Usage:
+    PYTHONPATH=. python benchmarks/embedding_pool.py --workers 1 2 4 8 --batch-size 256
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from typing import Any
+
+from app.embeddings.pool import PooledEmbedder
+from benchmarks.embedding_backends import measure_embedder
+
+RESULTS_DIR = "benchmarks/results"
+
+
+def main() -> None:
+    from app.dependencies import embedder_factory
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--pin-threads", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+    baseline = measure_embedder(embedder_factory()(), args.batch_size, args.repeats)
+    results.append({"workers": 0, **baseline})
+    print(json.dumps(results[-1]))
+
+    for n in args.workers:
+        with PooledEmbedder(
+            embedder_factory(args.threads_per_worker),
+            num_workers=n,
+            threads_per_worker=args.threads_per_worker,
+            pin_threads=args.pin_threads,
+        ) as pool:
+            run = measure_embedder(pool, args.batch_size, args.repeats)
+        run["speedup_vs_in_process"] = round(run["texts_per_second"] / baseline["texts_per_second"], 2)
+        results.append({"workers": n, **run})
+        print(json.dumps(results[-1]))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/embedding_pool_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+    print(f"Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
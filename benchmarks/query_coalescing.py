@@ -0,0 +1,99 @@
+"""
+Query-embedding throughput under concurrent load: one forward pass per query
+(serialized on a single model, as /api/query did) against `EmbeddingCoalescer`
+batching whatever arrives within its wait window.
+
+Usage:
+    PYTHONPATH=. python benchmarks/query_coalescing.py --concurrency 1 8 32 --queries 512
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.coalescer import EmbeddingCoalescer
+from benchmarks.embedding_backends import make_texts
+
+RESULTS_DIR = "benchmarks/results"
+
+
+async def _drive(embed: Any, texts: list[str], concurrency: int) -> float:
+    """Run `texts` through `embed` from `concurrency` client tasks; returns seconds."""
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for text in texts:
+        queue.put_nowait(text)
+
+    async def client() -> None:
+        while not queue.empty():
+            await embed(queue.get_nowait())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def measure(embedder: BaseEmbedder, texts: list[str], concurrency: int,
+                  max_wait_ms: float = 2.0, max_batch_size: int = 64) -> dict[str, Any]:
+    model_lock = threading.Lock()
+
+    def embed_one(text: str) -> list[float]:
+        with model_lock:
+            return embedder.embed_single(text)
+
+    async def per_request(text: str) -> list[float]:
+        return await asyncio.to_thread(embed_one, text)
+
+    per_request_s = await _drive(per_request, texts, concurrency)
+
+    coalescer = EmbeddingCoalescer(embedder, max_wait_ms=max_wait_ms, max_batch_size=max_batch_size)
+    try:
+        coalesced_s = await _drive(coalescer.embed, texts, concurrency)
+        stats = coalescer.stats()
+    finally:
+        coalescer.close()
+
+    return {
+        "concurrency": concurrency,
+        "per_request_qps": round(len(texts) / per_request_s, 1),
+        "coalesced_qps": round(len(texts) / coalesced_s, 1),
+        "speedup": round(per_request_s / coalesced_s, 2),
+        "mean_batch_size": round(stats["batch_size"]["mean"], 2),
+        "mean_wait_ms": round(stats["wait_ms"]["mean"], 3),
+    }
+
+
+def main() -> None:
+    from app.dependencies import embedder_factory
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    embedder = embedder_factory()()
+    texts = make_texts(args.queries)
+    embedder.embed_batch_array(texts[:8])  # warm-up
+
+    results = []
+    for c in args.concurrency:
+        results.append(asyncio.run(measure(embedder, texts, c, args.max_wait_ms, args.max_batch_size)))
+        print(json.dumps(results[-1]))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/query_coalescing_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "model": embedder.model_id, "results": results}, f, indent=2)
+    print(f"Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Startup latency of the API server: how long `import app.main` takes, then,
+with uvicorn running in a subprocess, the time until /health answers, until
+/ready reports the embedder loaded, and the latency of the first query.
+
+The first query is sent either as soon as /health answers (a cold request
+that may pay for model loading itself) or after /ready (warm path), to show
+what the background warm-up saves. Queries reach Ollama for the answer, so
+without it running the first-query time is for retrieval plus a failed
+generation.
+
+Usage:
+    PYTHONPATH=. python benchmarks/startup.py --first-query-at ready
+    PYTHONPATH=. python benchmarks/startup.py --first-query-at healthy
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import httpx
+
+RESULTS_DIR = "benchmarks/results"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def poll_until(check: Callable[[], bool], timeout: float, interval: float = 0.05) -> float | None:
+    """Seconds until `check()` is true (request errors count as false), or None on timeout."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if check():
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass  # Not listening yet
+        time.sleep(interval)
+    return None
+
+
+def import_seconds() -> float:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(first_query_at: str, timeout: float = 300.0) -> dict[str, Any]:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result: dict[str, Any] = {"first_query_at": first_query_at}
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            healthy = poll_until(lambda: client.get(f"{base}/health").status_code == 200, timeout)
+            result["time_to_healthy_s"] = round(time.perf_counter() - started, 3) if healthy is not None else None
+
+            if first_query_at == "ready":
+                ready = poll_until(lambda: client.get(f"{base}/ready").status_code == 200, timeout)
+                result["time_to_ready_s"] = round(time.perf_counter() - started, 3) if ready is not None else None
+
+            query_start = time.perf_counter()
+            response = client.post(f"{base}/api/query", json={"question": "What is DuckDB?", "k": 3})
+            result["first_query_s"] = round(time.perf_counter() - query_start, 3)
+            result["first_query_status"] = response.status_code
+            result["time_to_first_answer_s"] = round(time.perf_counter() - started, 3)
+            result["readiness"] = client.get(f"{base}/ready").json()
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            # A model load in progress holds shutdown until it finishes.
+            server.kill()
+            server.wait()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first-query-at", choices=["healthy", "ready"], default="ready")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    result = {"import_app_main_s": round(import_seconds(), 3), **measure_startup(args.first_query_at, args.timeout)}
+    print(json.dumps(result, indent=2))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/startup_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "result": result}, f, indent=2)
+    print(f"Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Write-throughput benchmark for DuckDBStore: the columnar bulk path
+(`upsert_bookmarks` + `store_chunks` over Arrow tables) against the original
+row-at-a-time path (`executemany` with Python tuples and float lists).
+
+Both paths write the same synthetic corpus into a fresh on-disk database per
+run, so results include DuckDB's own write costs rather than just Python
+overhead. The row path runs at roughly a thousand chunks per second, so by
+default it is skipped above `--row-path-max` chunks (1M rows would take
+several minutes); raise the limit to measure it anyway.
+
+Usage:
+    PYTHONPATH=. python benchmarks/storage_write.py
+    PYTHONPATH=. python benchmarks/storage_write.py --sizes 10000 100000 --row-path-max 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+
+from app.storage.base import BookmarkRecord, Chunk
+from app.storage.duckdb_store import DuckDBStore
+
+RESULTS_DIR = "benchmarks/results"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_ROW_PATH_MAX = 100_000
+EMBEDDING_DIM = 384
+CHUNKS_PER_BOOKMARK = 10
+# Roughly one default-sized chunk (400 words) would make the 1M run several
+# GB of text; 500 chars keeps text realistic without dominating the run.
+CHUNK_TEXT_CHARS = 500
+
+
+@dataclass
+class SyntheticCorpus:
+    bookmarks: list[BookmarkRecord]
+    chunks: list[Chunk]
+
+
+def make_synthetic_corpus(n_chunks: int, dim: int = EMBEDDING_DIM, seed: int = 0,
+                          embeddings: np.ndarray | None = None) -> SyntheticCorpus:
+    """
+    Generate `n_chunks` chunks spread over `n_chunks / CHUNKS_PER_BOOKMARK`
+    bookmarks. Embeddings are row views of a single float32 matrix, the same
+    shape `BaseEmbedder.embed_batch_array` hands the ingest pipeline: random
+    Gaussian rows, or the given `embeddings`.
+    """
+    if embeddings is None:
+        rng = np.random.default_rng(seed)
+        matrix = rng.standard_normal((n_chunks, dim), dtype=np.float32)
+    else:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+    text = ("lorem ipsum dolor sit amet " * (CHUNK_TEXT_CHARS // 27 + 1))[:CHUNK_TEXT_CHARS]
+    now = datetime.now(UTC)
+
+    n_bookmarks = max(1, -(-n_chunks // CHUNKS_PER_BOOKMARK))
+    bookmarks = [
+        BookmarkRecord(
+            url=f"https://example{i % 97}.com/page/{i}",
+            title=f"Page {i}",
+            folder=f"Folder {i % 13}",
+            date_added=now,
+            domain=f"example{i % 97}.com",
+            status="indexed",
+        )
+        for i in range(n_bookmarks)
+    ]
+    chunks = [
+        Chunk(
+            chunk_id=f"chunk-{i}",
+            bookmark_url=bookmarks[i // CHUNKS_PER_BOOKMARK].url,
+            text=text,
+            chunk_index=i % CHUNKS_PER_BOOKMARK,
+            embedding=matrix[i],
+        )
+        for i in range(n_chunks)
+    ]
+    return SyntheticCorpus(bookmarks=bookmarks, chunks=chunks)
+
+
+def write_row_path(store: DuckDBStore, corpus: SyntheticCorpus) -> None:
+    """
+    The pre-columnar write path, kept here as the baseline: one upsert per
+    bookmark and an `executemany` of Python tuples per bookmark's chunks.
+    """
+    for b in corpus.bookmarks:
+        store.upsert_bookmark(b.url, b.title, b.folder, b.date_added, b.domain, b.status)
+
+    insert_query = """
+    INSERT INTO chunks (chunk_id, bookmark_url, chunk_text, chunk_index, embedding)
+    VALUES (?, ?, ?, ?, ?)
+    """
+    for start in range(0, len(corpus.chunks), CHUNKS_PER_BOOKMARK):
+        batch = corpus.chunks[start:start + CHUNKS_PER_BOOKMARK]
+        store.conn.begin()
+        store.conn.execute("DELETE FROM chunks WHERE bookmark_url = ?", [batch[0].bookmark_url])
+        store.conn.executemany(
+            insert_query,
+            [(c.chunk_id, c.bookmark_url, c.text, c.chunk_index, np.asarray(c.embedding).tolist()) for c in batch],
+        )
+        store.conn.commit()
+
+
+def write_columnar_path(store: DuckDBStore, corpus: SyntheticCorpus) -> None:
+    """The bulk path: one Arrow-backed statement for bookmarks, one for chunks."""
+    store.upsert_bookmarks(corpus.bookmarks)
+    store.store_chunks(corpus.chunks)
+
+
+def _time_write(path: str, corpus: SyntheticCorpus, workdir: str) -> float:
+    db_path = os.path.join(workdir, f"{path}-{len(corpus.chunks)}.duckdb")
+    store = DuckDBStore(db_path=db_path)
+    store.initialize()
+    store.conn.execute("SET enable_progress_bar = false")
+    try:
+        writer = write_row_path if path == "row" else write_columnar_path
+        start = time.perf_counter()
+        writer(store, corpus)
+        store.conn.execute("CHECKPOINT")
+        elapsed = time.perf_counter() - start
+
+        stored = store.conn.execute("SELECT count(*) FROM chunks").fetchone()
+        assert stored is not None and stored[0] == len(corpus.chunks), "benchmark wrote an incomplete corpus"
+        return elapsed
+    finally:
+        store.close()
+        os.remove(db_path)
+
+
+def run_benchmark(sizes: list[int], row_path_max: int = DEFAULT_ROW_PATH_MAX) -> list[dict[str, Any]]:
+    """
+    Time both write paths at each corpus size. Returns one result row per
+    size with seconds and chunks/second for each path, plus the speedup when
+    both were measured.
+    """
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            corpus = make_synthetic_corpus(n)
+
+            columnar_s = _time_write("columnar", corpus, workdir)
+            row_s: float | None = _time_write("row", corpus, workdir) if n <= row_path_max else None
+
+            results.append({
+                "chunks": n,
+                "columnar_seconds": round(columnar_s, 3),
+                "columnar_chunks_per_second": round(n / columnar_s),
+                "row_seconds": round(row_s, 3) if row_s is not None else None,
+                "row_chunks_per_second": round(n / row_s) if row_s else None,
+                "speedup": round(row_s / columnar_s, 1) if row_s else None,
+            })
+            print(json.dumps(results[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--row-path-max", type=int, default=DEFAULT_ROW_PATH_MAX)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.row_path_max)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/storage_write_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "results": results}, f, indent=2)
+    print(f"Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
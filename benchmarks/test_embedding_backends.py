@@ -0,0 +1,39 @@
+
+from app.embeddings.base import BaseEmbedder
+from benchmarks.embedding_backends import make_texts, measure_embedder, run_benchmark
+
+
+class ConstantEmbedder(BaseEmbedder):
+    def __init__(self, value: float):
+        self.value = value
+
+    def embed_single(self, text: str) -> list[float]:
+        return [self.value, 1.0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [[self.value, 1.0] for _ in texts]
+
+
+def test_make_texts_are_distinct():
+    texts = make_texts(10)
+    assert len(set(texts)) == 10
+
+
+def test_measure_embedder_reports_latency_and_throughput():
+    result = measure_embedder(ConstantEmbedder(0.0), batch_size=4, repeats=3)
+
+    assert result["batch_size"] == 4
+    assert result["latency_p95_ms"] >= result["latency_p50_ms"] >= 0
+    assert result["texts_per_second"] > 0
+
+
+def test_run_benchmark_reports_parity_against_reference():
+    results = run_benchmark(
+        {"pytorch": ConstantEmbedder(0.0), "onnx_fp32": ConstantEmbedder(0.0)},
+        batch_sizes=[1, 2],
+        repeats=2,
+    )
+
+    assert "parity_vs_pytorch" not in results["pytorch"]
+    assert results["onnx_fp32"]["parity_vs_pytorch"]["min_cosine"] > 0.999
+    assert [r["batch_size"] for r in results["onnx_fp32"]["runs"]] == [1, 2]
@@ -0,0 +1,44 @@
+
+import numpy as np
+import numpy.typing as npt
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.batching import plan_token_batches
+from benchmarks.embedding_batching import make_skewed_texts, run_benchmark
+
+
+class WordCountEmbedder(BaseEmbedder):
+    def __init__(self, max_batch_tokens: int, max_batch_size: int):
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+
+    def token_lengths(self, texts: list[str]) -> list[int]:
+        return [len(t.split()) for t in texts]
+
+    def embed_single(self, text: str) -> list[float]:
+        return [float(len(text.split()))]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_single(t) for t in texts]
+
+    def embed_batch_array(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        out = np.empty((len(texts), 1), dtype=np.float32)
+        lengths = self.token_lengths(texts)
+        for idx in plan_token_batches(lengths, self.max_batch_tokens, self.max_batch_size):
+            out[idx] = [[lengths[i]] for i in idx]
+        return out
+
+
+def test_skewed_texts_have_a_long_tail():
+    lengths = [len(t.split()) for t in make_skewed_texts(200)]
+
+    assert min(lengths) < 40
+    assert max(lengths) > 200
+
+
+def test_bucketing_reports_less_padding_than_arrival_order():
+    result = run_benchmark(WordCountEmbedder, make_skewed_texts(300), batch_size=32, max_batch_tokens=2048)
+
+    assert result["arrival_order"]["batches"] == 10
+    assert result["bucketed"]["padding_waste"] < result["arrival_order"]["padding_waste"]
+    assert result["speedup"] > 0
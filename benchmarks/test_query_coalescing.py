@@ -0,0 +1,14 @@
+import asyncio
+
+from benchmarks.embedding_backends import make_texts
+from benchmarks.query_coalescing import measure
+from benchmarks.test_embedding_backends import ConstantEmbedder
+
+
+def test_measure_reports_both_paths():
+    result = asyncio.run(measure(ConstantEmbedder(0.5), make_texts(40), concurrency=8, max_wait_ms=1))
+
+    assert result["concurrency"] == 8
+    assert result["per_request_qps"] > 0
+    assert result["coalesced_qps"] > 0
+    assert result["mean_batch_size"] >= 1
@@ -0,0 +1,26 @@
+import httpx
+
+from benchmarks.startup import free_port, import_seconds, poll_until
+
+
+def test_poll_until_times_successes_and_treats_errors_as_not_yet():
+    calls = []
+
+    def check() -> bool:
+        calls.append(1)
+        if len(calls) == 1:
+            raise httpx.ConnectError("not listening yet")
+        return len(calls) >= 3
+
+    assert poll_until(check, timeout=5, interval=0) is not None
+    assert len(calls) == 3
+    assert poll_until(lambda: False, timeout=0.05, interval=0.01) is None
+
+
+def test_free_port_is_bindable():
+    assert 0 < free_port() < 65536
+
+
+def test_importing_app_main_stays_fast():
+    # Regression guard for the deferred torch / nltk / readability imports.
+    assert import_seconds() < 3.0
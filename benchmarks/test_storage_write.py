@@ -0,0 +1,20 @@
+from benchmarks.storage_write import make_synthetic_corpus, run_benchmark
+
+
+def test_synthetic_corpus_shape():
+    corpus = make_synthetic_corpus(25, dim=8)
+
+    assert len(corpus.chunks) == 25
+    assert len(corpus.bookmarks) == 3
+    assert corpus.chunks[0].embedding.shape == (8,)
+    assert {c.bookmark_url for c in corpus.chunks} == {b.url for b in corpus.bookmarks}
+
+
+def test_run_benchmark_measures_both_paths_and_skips_large_row_runs():
+    results = run_benchmark([20, 40], row_path_max=20)
+
+    assert [r["chunks"] for r in results] == [20, 40]
+    assert results[0]["row_seconds"] is not None
+    assert results[0]["speedup"] is not None
+    assert results[1]["row_seconds"] is None
+    assert results[1]["columnar_chunks_per_second"] > 0
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.vector_search import recall_at_k, run_benchmark
+
+
+def test_recall_at_k():
+    assert recall_at_k([["a", "b"], ["c", "x"]], [["a", "b"], ["c", "d"]]) == 0.75
+    assert recall_at_k([[]], [[]]) == 1.0
+
+
+def test_run_benchmark_reports_each_backend():
+    results = run_benchmark([200], ["duckdb", "numpy", "int8", "binary"], n_queries=5, k=3, dim=8)
+
+    assert [r["vector_index"] for r in results] == ["duckdb", "numpy", "int8", "binary"]
+    assert [r.get("index_mb") for r in results[1:]] == [0.01, 0.0, 0.0]
+    for r in results:
+        assert r["chunks"] == 200
+        assert r["search"]["p50_ms"] > 0
+        assert r["batch_search"]["per_query_ms"] > 0
+        # Sign bits of 8-dimensional vectors are too coarse to always re-rank into the exact top 3.
+        expected = 0.8 if r["vector_index"] == "binary" else 1.0
+        assert r["recall_at_k"] >= expected
+        assert r["filtered_recall_at_k"] >= expected
+
+
+def test_run_benchmark_sweeps_hnsw_ef_search():
+    pytest.importorskip("hnswlib")
+    results = run_benchmark([200], ["hnsw"], n_queries=5, k=3, dim=8, ef_search=[8, 64])
+
+    assert [(r["vector_index"], r["ef_search"]) for r in results] == [("hnsw", 8), ("hnsw", 64)]
+    assert all(r["build_seconds"] >= 0 and 0 <= r["recall_at_k"] <= 1 for r in results)
+    assert results[1]["recall_at_k"] == 1.0  # ef >= corpus is exhaustive
+
+
+def test_run_benchmark_sweeps_ivf_nprobe():
+    results = run_benchmark([300], ["ivf"], n_queries=5, k=3, dim=8, nprobe=[1, 1000])
+
+    assert [(r["vector_index"], r["nprobe"]) for r in results] == [("ivf", 1), ("ivf", 1000)]
+    assert results[0]["build_seconds"] >= 0
+    assert results[1]["recall_at_k"] == 1.0  # every partition probed
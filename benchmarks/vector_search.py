@@ -0,0 +1,207 @@
+"""
+Search-latency benchmark for DuckDBStore's nearest-neighbour backends
+(`vector_index`): the SQL scan ("duckdb") against the in-memory NumPy index
+("numpy"), its int8/binary quantized variants ("int8", "binary"), the
+approximate HNSW graph ("hnsw") and the k-means partitioned SQL scan
+("ivf"), unfiltered and with a folder filter, over a synthetic corpus.
+In-memory indexes also report their size.
+
+Each size is written once to an on-disk database and reopened per backend,
+so the time to load an index at startup is reported too (for "hnsw" and
+"ivf", also the one-off build or partitioning). Recall@k is taken against
+the SQL scan's exact results; "hnsw" gets one row per --ef-search value and
+"ivf" one per --nprobe value, tracing recall against latency. Every query is
+also run as one `search_many` batch, reporting the time per query.
+
+Usage:
+    PYTHONPATH=. python benchmarks/vector_search.py
+    PYTHONPATH=. python benchmarks/vector_search.py --sizes 10000 100000 1000000 --queries 200
+    PYTHONPATH=. python benchmarks/vector_search.py --indexes hnsw --ef-search 16 32 64 128 256
+    PYTHONPATH=. python benchmarks/vector_search.py --indexes ivf --nprobe 1 4 16 64
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+from app.storage.duckdb_store import VECTOR_INDEXES, DuckDBStore
+from app.storage.hnsw_index import HNSWParams
+from app.storage.vector_index import VectorIndex
+from benchmarks.storage_write import EMBEDDING_DIM, make_synthetic_corpus
+
+RESULTS_DIR = "benchmarks/results"
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_QUERIES = 100
+DEFAULT_K = 5
+DEFAULT_EF_SEARCH = [16, 64, 256]
+DEFAULT_NPROBE = [1, 4, 16]
+LATENT_DIM = 32
+# The synthetic corpus spreads bookmarks over 13 folders.
+FOLDER_FILTER = {"folder": "Folder 3"}
+
+
+def make_embeddings(n: int, dim: int = EMBEDDING_DIM, seed: int = 0) -> np.ndarray:
+    """
+    Vectors spanning a LATENT_DIM-dimensional subspace plus a little noise.
+    Real sentence embeddings have a low intrinsic dimension; independent
+    Gaussian rows don't, leaving every point nearly equidistant from every
+    other - a worst case for graph indexes that says little about real recall.
+    """
+    basis = np.random.default_rng(0).standard_normal((min(LATENT_DIM, dim), dim), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    latent = rng.standard_normal((n, len(basis)), dtype=np.float32)
+    return latent @ basis + 0.1 * rng.standard_normal((n, dim), dtype=np.float32)
+
+
+def make_queries(n: int, dim: int = EMBEDDING_DIM, seed: int = 1) -> list[list[float]]:
+    return [list(map(float, q)) for q in make_embeddings(n, dim, seed)]
+
+
+def time_searches(store: DuckDBStore, queries: list[list[float]], k: int,
+                  filters: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Run every query once; returns latency percentiles and the chunk IDs found."""
+    latencies: list[float] = []
+    results: list[list[str]] = []
+    for q in queries:
+        start = time.perf_counter()
+        hits = store.search(q, k, filters)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        results.append([h.metadata["chunk_id"] for h in hits])
+    ms = np.array(latencies)
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "results": results,
+    }
+
+
+def time_batch(store: DuckDBStore, queries: list[list[float]], k: int,
+               filters: dict[str, Any] | None = None) -> dict[str, Any]:
+    """All queries as one `search_many` call; returns its time and time per query."""
+    start = time.perf_counter()
+    store.search_many(queries, k, filters)
+    total_ms = (time.perf_counter() - start) * 1000.0
+    return {"total_ms": round(total_ms, 3), "per_query_ms": round(total_ms / max(len(queries), 1), 3)}
+
+
+def recall_at_k(results: list[list[str]], exact: list[list[str]]) -> float:
+    """Mean fraction of each exact top-k that a backend also returned."""
+    per_query = [len(set(r) & set(e)) / len(e) for r, e in zip(results, exact, strict=False) if e]
+    return round(float(np.mean(per_query)), 4) if per_query else 1.0
+
+
+def run_benchmark(sizes: list[int], kinds: list[str], n_queries: int = DEFAULT_QUERIES,
+                  k: int = DEFAULT_K, dim: int = EMBEDDING_DIM,
+                  ef_search: list[int] | None = None,
+                  nprobe: list[int] | None = None) -> list[dict[str, Any]]:
+    """
+    One result row per (size, backend) with load time, latencies and recall;
+    per (size, ef_search) for "hnsw" and per (size, nprobe) for "ivf".
+    """
+    queries = make_queries(n_queries, dim)
+    sweeps = {"hnsw": ("ef_search", ef_search or DEFAULT_EF_SEARCH), "ivf": ("nprobe", nprobe or DEFAULT_NPROBE)}
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            db_path = os.path.join(workdir, f"search-{n}.duckdb")
+            corpus = make_synthetic_corpus(n, dim=dim, embeddings=make_embeddings(n, dim))
+            writer = DuckDBStore(db_path=db_path, vector_index="duckdb")
+            writer.initialize()
+            writer.upsert_bookmarks(corpus.bookmarks)
+            writer.store_chunks(corpus.chunks)
+            writer.close()
+            del corpus
+
+            exact: dict[str, list[list[str]]] = {}
+            for kind in ["duckdb"] + [kind for kind in kinds if kind != "duckdb"]:
+                row: dict[str, Any] = {"chunks": n, "vector_index": kind}
+                params = HNSWParams()
+                kind_path = db_path
+                if kind in sweeps:
+                    # The first open builds and saves the graph, or partitions
+                    # the table (in a copy, which it rewrites); a reopen is
+                    # timed separately.
+                    if kind == "ivf":
+                        kind_path = os.path.join(workdir, f"search-{n}-ivf.duckdb")
+                        shutil.copyfile(db_path, kind_path)
+                    start = time.perf_counter()
+                    builder = DuckDBStore(db_path=kind_path, vector_index=kind, hnsw_params=params)
+                    builder.initialize()
+                    if kind == "ivf":
+                        builder.rebalance_ivf()
+                    row["build_seconds"] = round(time.perf_counter() - start, 3)
+                    builder.close()
+
+                start = time.perf_counter()
+                store = DuckDBStore(db_path=kind_path, vector_index=kind, hnsw_params=params)
+                store.initialize()
+                row["load_seconds"] = round(time.perf_counter() - start, 3)
+                if isinstance(store.index, VectorIndex):
+                    row["index_mb"] = round(store.index.row_bytes * len(store.index) / 2**20, 2)
+                try:
+                    knob, values = sweeps.get(kind, ("", [None]))
+                    for value in values:
+                        if kind == "hnsw":
+                            params.ef_search = value
+                        elif kind == "ivf":
+                            store.ivf_nprobe = value
+                        unfiltered = time_searches(store, queries, k)
+                        filtered = time_searches(store, queries, k, FOLDER_FILTER)
+                        if kind == "duckdb":
+                            exact = {"unfiltered": unfiltered["results"], "filtered": filtered["results"]}
+                        if kind not in kinds:
+                            continue
+
+                        results.append({
+                            **row,
+                            **({knob: value} if knob else {}),
+                            "search": {key: v for key, v in unfiltered.items() if key != "results"},
+                            "filtered_search": {key: v for key, v in filtered.items() if key != "results"},
+                            "batch_search": time_batch(store, queries, k),
+                            "filtered_batch_search": time_batch(store, queries, k, FOLDER_FILTER),
+                            "recall_at_k": recall_at_k(unfiltered["results"], exact["unfiltered"]),
+                            "filtered_recall_at_k": recall_at_k(filtered["results"], exact["filtered"]),
+                        })
+                        print(json.dumps(results[-1]))
+                finally:
+                    store.close()
+            for leftover in (db_path, f"{db_path}.hnsw", f"{db_path}.hnsw.ids.parquet",
+                             os.path.join(workdir, f"search-{n}-ivf.duckdb")):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--indexes", nargs="+", default=list(VECTOR_INDEXES), choices=VECTOR_INDEXES)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=DEFAULT_EF_SEARCH,
+                        help="HNSW per-query candidate list sizes to sweep")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=DEFAULT_NPROBE,
+                        help="IVF partitions scanned per query to sweep")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.indexes, args.queries, args.k,
+                            ef_search=args.ef_search, nprobe=args.nprobe)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/vector_search_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "k": args.k, "results": results}, f, indent=2)
+    print(f"Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
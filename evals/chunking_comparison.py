@@ -21,7 +21,7 @@ from app.ingestion.chunker import chunk_text
 from app.rag.engine import RAGEngine
 from app.rag.llm.base import BaseLLM
 from app.rag.retriever import Retriever
-from app.storage.base import BaseStorage, Chunk
+from app.storage.base import BaseStorage, BookmarkRecord, Chunk
 from evals.metrics.answer_quality import calculate_answer_relevance, calculate_faithfulness
 from evals.metrics.retrieval import mrr, precision_at_k, recall
 
@@ -57,16 +57,17 @@ def build_index_for_strategy(
     smaller chunks is a meaningfully different index, not just a different
     number in a results table.
     """
-    total_chunks = 0
+    bookmarks: list[BookmarkRecord] = []
+    db_chunks: list[Chunk] = []
     for url, text in documents:
         chunks = chunk_text(text, strategy.chunk_size, strategy.overlap)
         if not chunks:
             continue
 
         texts = [c.text for c in chunks]
-        embeddings = embedder.embed_batch(texts)
+        embeddings = embedder.embed_batch_array(texts)
 
-        db_chunks = [
+        db_chunks.extend(
             Chunk(
                 chunk_id=str(uuid.uuid4()),
                 bookmark_url=url,
@@ -77,20 +78,23 @@ def build_index_for_strategy(
                 end_char_idx=c.end_char_idx,
             )
             for i, c in enumerate(chunks)
-        ]
-
-        storage.upsert_bookmark(
-            url=url,
-            title=url,
-            folder="eval",
-            date_added=None,
-            domain=urlparse(url).netloc,
-            status="indexed",
         )
-        storage.store_chunks(db_chunks)
-        total_chunks += len(db_chunks)
+        bookmarks.append(
+            BookmarkRecord(
+                url=url,
+                title=url,
+                folder="eval",
+                date_added=None,
+                domain=urlparse(url).netloc,
+                status="indexed",
+            )
+        )
+
+    # One bulk write per index instead of one transaction per document.
+    storage.upsert_bookmarks(bookmarks)
+    storage.store_chunks(db_chunks)
 
-    return total_chunks
+    return len(db_chunks)
 
 
 async def evaluate_qa_pairs(
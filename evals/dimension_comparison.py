@@ -0,0 +1,180 @@
+"""
+Measures how retrieval quality degrades as embeddings are truncated to
+fewer dimensions (Matryoshka-style), against the eval dataset.
+
+Documents and questions are embedded once at the model's full width; each
+candidate dimension then gets its own fresh index holding the truncated,
+re-normalized vectors. Besides the usual ground-truth metrics, each
+dimension reports how much of the full-width top-k it still finds
+(`overlap_with_full`), its storage per vector and its mean search time.
+See `run_dimension_comparison.py` for the CLI entry point.
+"""
+
+import logging
+import time
+import uuid
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
+
+import numpy as np
+
+from app.embeddings.base import BaseEmbedder
+from app.embeddings.matryoshka import truncate_embeddings
+from app.ingestion.chunker import chunk_text
+from app.storage.base import BaseStorage, BookmarkRecord, Chunk, RetrievedChunk
+from evals.metrics.retrieval import mrr, precision_at_k, recall
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSIONS = [384, 256, 128, 64, 32]
+
+
+def _mean(values: list[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+@dataclass
+class EvalCorpus:
+    """The eval documents chunked and embedded once, at the model's full width."""
+    texts: list[str]
+    chunk_meta: list[tuple[str, int]]  # (url, chunk_index) per text
+    chunk_vectors: np.ndarray
+    query_vectors: np.ndarray
+    bookmarks: list[BookmarkRecord]
+
+
+def embed_corpus(
+    documents: list[tuple[str, str]],
+    qa_pairs: list[dict[str, Any]],
+    embedder: BaseEmbedder,
+    chunk_size: int = 400,
+    overlap: int = 50,
+) -> EvalCorpus | None:
+    """Chunk and embed `documents` and the questions; None if nothing chunks."""
+    texts: list[str] = []
+    chunk_meta: list[tuple[str, int]] = []
+    for url, text in documents:
+        for c in chunk_text(text, chunk_size, overlap):
+            texts.append(c.text)
+            chunk_meta.append((url, c.chunk_index))
+    if not texts:
+        return None
+    return EvalCorpus(
+        texts=texts,
+        chunk_meta=chunk_meta,
+        chunk_vectors=embedder.embed_batch_array(texts),
+        query_vectors=embedder.embed_batch_array([item["question"] for item in qa_pairs]),
+        bookmarks=[
+            BookmarkRecord(url=url, title=url, folder="eval", date_added=None,
+                           domain=urlparse(url).netloc, status="indexed")
+            for url, _ in documents
+        ],
+    )
+
+
+def load_store(storage: BaseStorage, corpus: EvalCorpus, chunk_vectors: np.ndarray) -> None:
+    """Initialize `storage` and write the corpus chunks with `chunk_vectors`."""
+    storage.initialize()
+    storage.upsert_bookmarks(corpus.bookmarks)
+    storage.store_chunks([
+        Chunk(chunk_id=str(uuid.uuid4()), bookmark_url=url, text=corpus.texts[i],
+              chunk_index=index, embedding=chunk_vectors[i])
+        for i, (url, index) in enumerate(corpus.chunk_meta)
+    ])
+
+
+def score_store(
+    storage: BaseStorage,
+    query_vectors: np.ndarray,
+    qa_pairs: list[dict[str, Any]],
+    k: int,
+    reference: list[list[tuple[str, str]]] | None = None,
+    search: Callable[[int], list[RetrievedChunk]] | None = None,
+) -> tuple[dict[str, float], float, list[list[tuple[str, str]]]]:
+    """
+    Search every question; returns the retrieval metrics (with each query's
+    overlap with `reference`'s hits, if given), the mean search time in ms,
+    and the (url, text) hits per query. `search(i)` replaces the plain
+    vector search for question i, e.g. to go through a `Retriever`.
+    """
+    precisions: list[float] = []
+    recalls: list[float] = []
+    mrrs: list[float] = []
+    overlaps: list[float] = []
+    latencies: list[float] = []
+    hits_per_query: list[list[tuple[str, str]]] = []
+    for q, item in enumerate(qa_pairs):
+        start = time.perf_counter()
+        found = search(q) if search else storage.search(query_vectors[q].tolist(), k=k)
+        latencies.append(time.perf_counter() - start)
+
+        urls = [str(s.metadata.get("url", "")) for s in found]
+        ground_truth = item.get("ground_truth_urls", [])
+        precisions.append(precision_at_k(urls, ground_truth, k=k))
+        # Several chunks of one page must not count as several recalled pages.
+        recalls.append(recall(list(dict.fromkeys(urls)), ground_truth))
+        mrrs.append(mrr(urls, ground_truth))
+
+        hits = [(u, s.text) for u, s in zip(urls, found, strict=False)]
+        hits_per_query.append(hits)
+        if reference:
+            expected = set(reference[q])
+            overlaps.append(len(expected & set(hits)) / len(expected) if expected else 1.0)
+
+    metrics = {
+        "precision_at_k": _mean(precisions),
+        "recall": _mean(recalls),
+        "mrr": _mean(mrrs),
+        "overlap_with_full": _mean(overlaps) if overlaps else 1.0,
+    }
+    return metrics, round(_mean(latencies) * 1000, 3), hits_per_query
+
+
+async def compare_dimensions(
+    documents: list[tuple[str, str]],
+    qa_pairs: list[dict[str, Any]],
+    embedder: BaseEmbedder,
+    dimensions: Sequence[int],
+    storage_factory: Callable[[int], BaseStorage],
+    k: int = 5,
+    chunk_size: int = 400,
+    overlap: int = 50,
+) -> dict[str, dict[str, Any]]:
+    """
+    `storage_factory(dimension)` must return a new, uninitialized store each
+    call (e.g. `lambda d: DuckDBStore(":memory:", dimension=d)`). Dimensions
+    wider than the model's are skipped.
+    """
+    corpus = embed_corpus(documents, qa_pairs, embedder, chunk_size, overlap)
+    if corpus is None:
+        return {}
+    full_dim = corpus.chunk_vectors.shape[1]
+
+    # The widest dimension goes first so narrower ones can be compared to it.
+    ordered = sorted({d for d in dimensions if d <= full_dim}, reverse=True)
+    skipped = sorted(set(dimensions) - set(ordered))
+    if skipped:
+        logger.warning("Skipping dimensions wider than the model (%d): %s", full_dim, skipped)
+
+    results: dict[str, dict[str, Any]] = {}
+    reference: list[list[tuple[str, str]]] = []
+    for dim in ordered:
+        storage = storage_factory(dim)
+        load_store(storage, corpus, truncate_embeddings(corpus.chunk_vectors, dim))
+        metrics, search_ms, hits_per_query = score_store(
+            storage, truncate_embeddings(corpus.query_vectors, dim), qa_pairs, k, reference,
+        )
+        if not reference:
+            reference = hits_per_query
+
+        results[str(dim)] = {
+            "dimension": dim,
+            "bytes_per_vector": 4 * dim,
+            "search_ms_mean": search_ms,
+            "metrics": metrics,
+        }
+        logger.info("dimension=%d metrics=%s", dim, results[str(dim)]["metrics"])
+
+    return results
@@ -0,0 +1,71 @@
+"""
+Measures what fusing BM25 keyword results into vector retrieval (the
+Retriever's `hybrid` mode) buys in retrieval quality at each k, and what it
+costs in search time, against the eval dataset.
+
+Documents and questions are embedded once into a single store with a text
+index; every k is then searched vector-only and hybrid. Each row reports the
+usual ground-truth metrics, how much of the same k's vector-only top-k the
+hybrid results keep (`overlap_with_full`), and the mean search time
+(excluding query embedding). See `run_hybrid_comparison.py` for the CLI
+entry point.
+"""
+
+import logging
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from app.embeddings.base import BaseEmbedder
+from app.rag.retriever import DEFAULT_RRF_K, Retriever
+from app.storage.base import RetrievedChunk
+from app.storage.duckdb_store import DuckDBStore
+from evals.dimension_comparison import embed_corpus, load_store, score_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KS = [1, 3, 5, 10]
+MODES = ("vector", "hybrid")
+
+
+async def compare_hybrid(
+    documents: list[tuple[str, str]],
+    qa_pairs: list[dict[str, Any]],
+    embedder: BaseEmbedder,
+    storage_factory: Callable[[], DuckDBStore],
+    ks: Sequence[int] = DEFAULT_KS,
+    rrf_k: int = DEFAULT_RRF_K,
+    chunk_size: int = 400,
+    overlap: int = 50,
+) -> dict[str, dict[str, Any]]:
+    """
+    `storage_factory()` must return a new, uninitialized store with
+    `text_index=True` (e.g. `lambda: DuckDBStore(":memory:", text_index=True)`).
+    Results are keyed "<mode>@<k>".
+    """
+    corpus = embed_corpus(documents, qa_pairs, embedder, chunk_size, overlap)
+    if corpus is None:
+        return {}
+    storage = storage_factory()
+    load_store(storage, corpus, corpus.chunk_vectors)
+    if storage.lexical_index is None:
+        raise ValueError("compare_hybrid needs a store opened with text_index=True")
+
+    questions = [item["question"] for item in qa_pairs]
+    results: dict[str, dict[str, Any]] = {}
+    for k in sorted(set(ks)):
+        reference: list[list[tuple[str, str]]] = []
+        for mode in MODES:
+            retriever = Retriever(storage, embedder, hybrid=mode == "hybrid", rrf_k=rrf_k)
+
+            def search(q: int, k: int = k, retriever: Retriever = retriever) -> list[RetrievedChunk]:
+                return retriever.search(questions[q], corpus.query_vectors[q].tolist(), k=k)
+
+            metrics, search_ms, hits_per_query = score_store(
+                storage, corpus.query_vectors, qa_pairs, k, reference, search=search,
+            )
+            if not reference:
+                reference = hits_per_query
+            results[f"{mode}@{k}"] = {"mode": mode, "k": k, "search_ms_mean": search_ms, "metrics": metrics}
+            logger.info("mode=%s k=%d metrics=%s", mode, k, metrics)
+
+    return results
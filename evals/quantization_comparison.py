@@ -0,0 +1,66 @@
+"""
+Measures what quantizing the in-memory search index costs in retrieval
+quality and buys in memory and speed, against the eval dataset.
+
+Documents and questions are embedded once; each `vector_index` variant
+("numpy" at full precision, then "int8" and "binary" with re-ranking) gets
+its own fresh store over the same vectors. Each reports the usual
+ground-truth metrics, how much of the full-precision top-k it still finds
+(`overlap_with_full`), its index memory per vector and its mean search time.
+See `run_quantization_comparison.py` for the CLI entry point.
+"""
+
+import logging
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from app.embeddings.base import BaseEmbedder
+from app.storage.duckdb_store import DuckDBStore
+from app.storage.vector_index import VectorIndex
+from evals.dimension_comparison import embed_corpus, load_store, score_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VARIANTS = ["numpy", "int8", "binary"]
+
+
+async def compare_quantizations(
+    documents: list[tuple[str, str]],
+    qa_pairs: list[dict[str, Any]],
+    embedder: BaseEmbedder,
+    variants: Sequence[str],
+    storage_factory: Callable[[str], DuckDBStore],
+    k: int = 5,
+    chunk_size: int = 400,
+    overlap: int = 50,
+) -> dict[str, dict[str, Any]]:
+    """
+    `storage_factory(vector_index)` must return a new, uninitialized store
+    each call (e.g. `lambda v: DuckDBStore(":memory:", vector_index=v)`).
+    "numpy" always runs first, as the full-precision reference.
+    """
+    corpus = embed_corpus(documents, qa_pairs, embedder, chunk_size, overlap)
+    if corpus is None:
+        return {}
+
+    results: dict[str, dict[str, Any]] = {}
+    reference: list[list[tuple[str, str]]] = []
+    for variant in ["numpy"] + [v for v in dict.fromkeys(variants) if v != "numpy"]:
+        storage = storage_factory(variant)
+        load_store(storage, corpus, corpus.chunk_vectors)
+        metrics, search_ms, hits_per_query = score_store(storage, corpus.query_vectors, qa_pairs, k, reference)
+        if not reference:
+            reference = hits_per_query
+        if variant not in variants:
+            continue
+
+        assert isinstance(storage.index, VectorIndex), f"{variant} is not an in-memory index"
+        results[variant] = {
+            "vector_index": variant,
+            "bytes_per_vector": storage.index.row_bytes,
+            "search_ms_mean": search_ms,
+            "metrics": metrics,
+        }
+        logger.info("vector_index=%s metrics=%s", variant, metrics)
+
+    return results
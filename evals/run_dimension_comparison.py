@@ -0,0 +1,73 @@
+"""
+CLI entry point: recall versus embedding dimension for Matryoshka-style
+truncation, using the eval dataset's ground-truth URLs as the documents.
+
+Only meaningful with a Matryoshka-trained embedding model; with others it
+shows how fast plain truncation degrades. Needs no LLM and does not touch
+the app's bookmark database.
+
+Usage:
+    PYTHONPATH=. python evals/run_dimension_comparison.py --dimensions 768 512 256 128 64
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+
+from app.dependencies import get_embedder
+from app.storage.duckdb_store import DuckDBStore
+from evals.dimension_comparison import DEFAULT_DIMENSIONS, compare_dimensions
+from evals.run_chunking_comparison import DATASET_PATH, RESULTS_DIR, fetch_and_clean_documents
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=DEFAULT_DIMENSIONS)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.path.exists(DATASET_PATH):
+        logger.error("Dataset not found at %s", DATASET_PATH)
+        return
+
+    with open(DATASET_PATH, "r") as f:
+        qa_pairs = json.load(f)
+
+    urls = sorted({url for item in qa_pairs for url in item.get("ground_truth_urls", [])})
+    documents = await fetch_and_clean_documents(urls)
+    if not documents:
+        logger.error("No documents could be fetched -- aborting comparison.")
+        return
+
+    results = await compare_dimensions(
+        documents=documents,
+        qa_pairs=qa_pairs,
+        embedder=get_embedder(),
+        dimensions=args.dimensions,
+        storage_factory=lambda dim: DuckDBStore(db_path=":memory:", dimension=dim),
+        k=args.k,
+    )
+
+    print("=== Recall vs Embedding Dimension ===")
+    print(f"{'dim':>6} {'bytes':>7} {'recall':>7} {'mrr':>6} {'overlap':>8} {'ms':>7}")
+    for row in results.values():
+        m = row["metrics"]
+        print(f"{row['dimension']:>6} {row['bytes_per_vector']:>7} {m['recall']:>7.3f} {m['mrr']:>6.3f} "
+              f"{m['overlap_with_full']:>8.3f} {row['search_ms_mean']:>7.2f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/dimension_comparison_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "results": results}, f, indent=2)
+    print(f"\nResults saved to {filename}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
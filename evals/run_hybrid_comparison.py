@@ -0,0 +1,73 @@
+"""
+CLI entry point: retrieval quality and search time of vector-only against
+hybrid (BM25 + vector, fused by reciprocal rank) retrieval at several k,
+using the eval dataset's ground-truth URLs as the documents.
+
+Needs no LLM and does not touch the app's bookmark database.
+
+Usage:
+    PYTHONPATH=. python evals/run_hybrid_comparison.py --ks 1 3 5 10 --rrf-k 60
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+
+from app.dependencies import get_embedder
+from app.rag.retriever import DEFAULT_RRF_K
+from app.storage.duckdb_store import DuckDBStore
+from evals.hybrid_comparison import DEFAULT_KS, compare_hybrid
+from evals.run_chunking_comparison import DATASET_PATH, RESULTS_DIR, fetch_and_clean_documents
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ks", type=int, nargs="+", default=DEFAULT_KS)
+    parser.add_argument("--rrf-k", type=int, default=DEFAULT_RRF_K)
+    args = parser.parse_args()
+
+    if not os.path.exists(DATASET_PATH):
+        logger.error("Dataset not found at %s", DATASET_PATH)
+        return
+
+    with open(DATASET_PATH, "r") as f:
+        qa_pairs = json.load(f)
+
+    urls = sorted({url for item in qa_pairs for url in item.get("ground_truth_urls", [])})
+    documents = await fetch_and_clean_documents(urls)
+    if not documents:
+        logger.error("No documents could be fetched -- aborting comparison.")
+        return
+
+    results = await compare_hybrid(
+        documents=documents,
+        qa_pairs=qa_pairs,
+        embedder=get_embedder(),
+        storage_factory=lambda: DuckDBStore(db_path=":memory:", text_index=True),
+        ks=args.ks,
+        rrf_k=args.rrf_k,
+    )
+
+    print("=== Vector vs Hybrid Retrieval ===")
+    print(f"{'mode':>7} {'k':>3} {'recall':>7} {'mrr':>6} {'overlap':>8} {'ms':>7}")
+    for row in results.values():
+        m = row["metrics"]
+        print(f"{row['mode']:>7} {row['k']:>3} {m['recall']:>7.3f} {m['mrr']:>6.3f} "
+              f"{m['overlap_with_full']:>8.3f} {row['search_ms_mean']:>7.2f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/hybrid_comparison_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "rrf_k": args.rrf_k, "results": results}, f, indent=2)
+    print(f"\nResults saved to {filename}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+CLI entry point: retrieval quality, index memory and search time of the
+full-precision in-memory index against its int8 and binary quantized
+variants, using the eval dataset's ground-truth URLs as the documents.
+
+Needs no LLM and does not touch the app's bookmark database. The eval
+corpus is small, so search times here mostly show fixed overhead; see
+benchmarks/vector_search.py for speed at scale.
+
+Usage:
+    PYTHONPATH=. python evals/run_quantization_comparison.py --rerank-factor 10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+
+from app.dependencies import get_embedder
+from app.storage.duckdb_store import DuckDBStore
+from app.storage.quantized_index import DEFAULT_RERANK_FACTOR
+from evals.quantization_comparison import DEFAULT_VARIANTS, compare_quantizations
+from evals.run_chunking_comparison import DATASET_PATH, RESULTS_DIR, fetch_and_clean_documents
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", nargs="+", default=DEFAULT_VARIANTS, choices=DEFAULT_VARIANTS)
+    parser.add_argument("--rerank-factor", type=int, default=DEFAULT_RERANK_FACTOR)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.path.exists(DATASET_PATH):
+        logger.error("Dataset not found at %s", DATASET_PATH)
+        return
+
+    with open(DATASET_PATH, "r") as f:
+        qa_pairs = json.load(f)
+
+    urls = sorted({url for item in qa_pairs for url in item.get("ground_truth_urls", [])})
+    documents = await fetch_and_clean_documents(urls)
+    if not documents:
+        logger.error("No documents could be fetched -- aborting comparison.")
+        return
+
+    results = await compare_quantizations(
+        documents=documents,
+        qa_pairs=qa_pairs,
+        embedder=get_embedder(),
+        variants=args.variants,
+        storage_factory=lambda variant: DuckDBStore(
+            db_path=":memory:", vector_index=variant, rerank_factor=args.rerank_factor,
+        ),
+        k=args.k,
+    )
+
+    print("=== Recall vs Index Quantization ===")
+    print(f"{'index':>7} {'bytes':>6} {'recall':>7} {'mrr':>6} {'overlap':>8} {'ms':>7}")
+    for row in results.values():
+        m = row["metrics"]
+        print(f"{row['vector_index']:>7} {row['bytes_per_vector']:>6} {m['recall']:>7.3f} {m['mrr']:>6.3f} "
+              f"{m['overlap_with_full']:>8.3f} {row['search_ms_mean']:>7.2f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"{RESULTS_DIR}/quantization_comparison_{timestamp}.json"
+    with open(filename, "w") as f:
+        json.dump({"timestamp": timestamp, "rerank_factor": args.rerank_factor, "results": results}, f, indent=2)
+    print(f"\nResults saved to {filename}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
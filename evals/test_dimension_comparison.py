@@ -0,0 +1,59 @@
+
+import numpy as np
+import pytest
+
+from app.embeddings.base import BaseEmbedder
+from app.storage.duckdb_store import DuckDBStore
+from evals.dimension_comparison import compare_dimensions
+
+
+class TopicEmbedder(BaseEmbedder):
+    """
+    16-dim vectors whose leading components carry the topic signal and whose
+    tail is deterministic noise, roughly how a Matryoshka model orders
+    information.
+    """
+    TOPICS = ("duck", "rust", "cook")
+
+    def embed_single(self, text: str) -> list[float]:
+        head = [4.0 if topic in text.lower() else 0.0 for topic in self.TOPICS]
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return head + rng.normal(0, 0.5, 13).tolist()
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_single(t) for t in texts]
+
+
+DOCUMENTS = [
+    ("https://duck.example/", " ".join(f"Ducks are birds, fact {i}." for i in range(30))),
+    ("https://rust.example/", " ".join(f"Rust is a systems language, note {i}." for i in range(30))),
+    ("https://cook.example/", " ".join(f"Cook pasta in salted water, step {i}." for i in range(30))),
+]
+QA_PAIRS = [
+    {"question": "tell me about ducks", "ground_truth_urls": ["https://duck.example/"]},
+    {"question": "what is rust", "ground_truth_urls": ["https://rust.example/"]},
+    {"question": "how to cook", "ground_truth_urls": ["https://cook.example/"]},
+]
+
+
+@pytest.mark.asyncio
+async def test_compare_dimensions_reports_each_width_against_full():
+    results = await compare_dimensions(
+        documents=DOCUMENTS,
+        qa_pairs=QA_PAIRS,
+        embedder=TopicEmbedder(),
+        dimensions=[16, 8, 3, 64],
+        storage_factory=lambda dim: DuckDBStore(db_path=":memory:", dimension=dim),
+        k=3,
+        chunk_size=40,
+        overlap=5,
+    )
+
+    # 64 is wider than the model and skipped; widest first
+    assert list(results) == ["16", "8", "3"]
+    assert results["16"]["metrics"]["overlap_with_full"] == 1.0
+    assert results["3"]["bytes_per_vector"] == 12
+    for row in results.values():
+        assert row["metrics"]["recall"] == pytest.approx(1.0)
+        assert 0.0 <= row["metrics"]["overlap_with_full"] <= 1.0
+        assert row["search_ms_mean"] >= 0
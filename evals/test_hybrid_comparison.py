@@ -0,0 +1,41 @@
+import pytest
+
+from app.storage.duckdb_store import DuckDBStore
+from evals.hybrid_comparison import compare_hybrid
+from evals.test_dimension_comparison import DOCUMENTS, QA_PAIRS, TopicEmbedder
+
+# "mallard" carries no topic signal for TopicEmbedder; only keywords find it.
+KEYWORD_DOCUMENTS = DOCUMENTS + [("https://mallard.example/", "The mallard is a dabbling species.")]
+KEYWORD_QA_PAIRS = QA_PAIRS + [
+    {"question": "mallard", "ground_truth_urls": ["https://mallard.example/"]},
+]
+
+
+@pytest.mark.asyncio
+async def test_compare_hybrid_reports_both_modes_per_k():
+    results = await compare_hybrid(
+        documents=KEYWORD_DOCUMENTS,
+        qa_pairs=KEYWORD_QA_PAIRS,
+        embedder=TopicEmbedder(),
+        storage_factory=lambda: DuckDBStore(db_path=":memory:", text_index=True),
+        ks=[3, 1],
+        chunk_size=40,
+        overlap=5,
+    )
+
+    assert list(results) == ["vector@1", "hybrid@1", "vector@3", "hybrid@3"]
+    assert results["vector@1"]["metrics"]["overlap_with_full"] == 1.0
+    for k in (1, 3):
+        assert results[f"hybrid@{k}"]["metrics"]["recall"] >= results[f"vector@{k}"]["metrics"]["recall"]
+        assert results[f"hybrid@{k}"]["search_ms_mean"] >= 0
+    # Vectors only find "mallard" by chance; fused in, its keyword match
+    # ranks at worst level with the best vector hit.
+    assert results["hybrid@3"]["metrics"]["recall"] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_compare_hybrid_needs_a_text_index():
+    with pytest.raises(ValueError, match="text_index"):
+        await compare_hybrid(DOCUMENTS, QA_PAIRS, TopicEmbedder(),
+                             storage_factory=lambda: DuckDBStore(db_path=":memory:"), ks=[1],
+                             chunk_size=40, overlap=5)
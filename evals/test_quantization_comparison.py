@@ -0,0 +1,28 @@
+import pytest
+
+from app.storage.duckdb_store import DuckDBStore
+from evals.quantization_comparison import compare_quantizations
+from evals.test_dimension_comparison import DOCUMENTS, QA_PAIRS, TopicEmbedder
+
+
+@pytest.mark.asyncio
+async def test_compare_quantizations_reports_each_variant_against_full_precision():
+    results = await compare_quantizations(
+        documents=DOCUMENTS,
+        qa_pairs=QA_PAIRS,
+        embedder=TopicEmbedder(),
+        variants=["binary", "int8"],
+        storage_factory=lambda variant: DuckDBStore(db_path=":memory:", vector_index=variant),
+        k=3,
+        chunk_size=40,
+        overlap=5,
+    )
+
+    # numpy only serves as the reference when not asked for
+    assert list(results) == ["binary", "int8"]
+    assert results["int8"]["bytes_per_vector"] == 16 + 4
+    assert results["binary"]["bytes_per_vector"] == 2
+    for row in results.values():
+        assert row["metrics"]["recall"] == pytest.approx(1.0)
+        # The corpus fits in the re-rank shortlist, so re-ranking restores the exact top-k.
+        assert row["metrics"]["overlap_with_full"] == 1.0
@@ -5,7 +5,9 @@ import { Send, User, Bot, ExternalLink, Loader2 } from 'lucide-react';
 interface Source {
   url: string;
   title: string;
-  score: number;
+  // null for a hybrid search hit that matched keywords only
+  score: number | null;
+  fused_score?: number | null;
   text: string;
 }
 
@@ -108,7 +110,7 @@ export default function Chat() {
                         >
                           {source.title || source.url}
                         </a>
-                        <span className="text-gray-500 text-[10px]">Score: {source.score.toFixed(3)}</span>
+                        <span className="text-gray-500 text-[10px]">{source.score === null ? 'Keyword match' : `Score: ${source.score.toFixed(3)}`}</span>
                       </li>
                     ))}
                   </ul>
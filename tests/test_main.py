@@ -1,3 +1,4 @@
+from unittest.mock import AsyncMock, MagicMock
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.testclient import TestClient
@@ -70,3 +71,33 @@ def test_api_routes_mounted():
     # Might be 200 if DB is ready (mocked or in-memory) or 500 if DB path invalid/locked
     # But route should exist (not 404)
     assert response.status_code in [200, 500]
+
+def test_ready_reports_503_until_embedder_is_loaded(monkeypatch):
+    from app.embeddings.lazy import LazyEmbedder
+
+    inner = MagicMock()
+    lazy = LazyEmbedder(lambda: inner)
+    monkeypatch.setattr(main_module, "get_embedder", lambda: lazy)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    assert response.json()["models"]["embedder"]["state"] == "not_loaded"
+
+    lazy.warm_up()
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert "llm" in response.json()["models"]
+
+def test_lifespan_starts_background_warm_up(monkeypatch):
+    warm_up = AsyncMock()
+    monkeypatch.setattr(main_module, "warm_up_models", warm_up)
+    monkeypatch.setattr(main_module, "get_embedder", MagicMock())
+    monkeypatch.setattr(main_module, "get_llm", MagicMock())
+    monkeypatch.setattr(main_module, "start_reembedding", MagicMock(return_value=None))
+
+    with TestClient(app) as started:
+        assert started.get("/health").status_code == 200
+
+    warm_up.assert_called_once()